@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark: backend detection wall time, legacy vs concurrent engine.
+
+Replaces the per-backend probe functions with stubs that sleep for a fixed
+delay, then times select() and doctor_lines() with the legacy sequential
+algorithm (every probe run twice by detect_all(), whole chain probed by
+select()) and with the current concurrent, lazy engine.
+
+Usage:
+    python benchmarks/bench_backend_detect.py [--delay 0.5] [--platform linux]
+"""
+
+import argparse
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import backend
+
+_PROBE_ATTRS = {
+    "podman-machine-hyperv": "_probe_podman_machine_hyperv",
+    "docker-desktop": "_probe_docker_desktop",
+    "podman-native": "_probe_podman_native",
+    "docker-native": "_probe_docker_native",
+    "podman-machine": "_probe_podman_machine",
+    "docker-machine": "_probe_docker_machine",
+}
+
+
+def _stub(name, delay):
+    def _probe():
+        time.sleep(delay)
+        return backend.BackendProbe(name, True, "stub 1.0")
+
+    return _probe
+
+
+# ---------------------------------------------------------------------------
+# Legacy reference implementation (pre-engine behaviour)
+# ---------------------------------------------------------------------------
+
+
+def _legacy_detect_all(plat):
+    fns = [getattr(backend, _PROBE_ATTRS[n]) for n in backend._FALLBACK_CHAIN[plat]]
+    return {fn().name: fn() for fn in fns}
+
+
+def _legacy_select(plat):
+    probes = _legacy_detect_all(plat)
+    for name in backend._FALLBACK_CHAIN[plat]:
+        if probes[name].available:
+            return name
+    raise RuntimeError("no backend")
+
+
+def _legacy_doctor(plat):
+    _legacy_detect_all(plat)
+    _legacy_select(plat)
+
+
+# ---------------------------------------------------------------------------
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.5, help="Stubbed probe latency in seconds")
+    parser.add_argument("--platform", default="linux", choices=sorted(backend._FALLBACK_CHAIN))
+    parser.add_argument("--repeat", type=int, default=3)
+    opts = parser.parse_args()
+
+    plat = opts.platform
+    with ExitStack() as stack:
+        for name, attr in _PROBE_ATTRS.items():
+            stack.enter_context(patch.object(backend, attr, _stub(name, opts.delay)))
+
+        rows = [
+            ("select()", lambda: _legacy_select(plat), lambda: backend.select("auto", plat)),
+            ("doctor_lines()", lambda: _legacy_doctor(plat), lambda: backend.doctor_lines(plat)),
+        ]
+        print(f"platform={plat} probe delay={opts.delay:.2f}s (best of {opts.repeat})\n")
+        print(f"{'operation':<16}{'before':>10}{'after':>10}{'speedup':>10}")
+        for label, before_fn, after_fn in rows:
+            before = _time(before_fn, opts.repeat)
+            after = _time(after_fn, opts.repeat)
+            print(f"{label:<16}{before:>9.2f}s{after:>9.2f}s{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
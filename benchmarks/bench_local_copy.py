@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark: local tree copy, legacy ``_copy_tree`` vs ``west_env.localcopy``.
+
+Generates a synthetic Zephyr-like tree (default 100k small source files in
+nested directories, plus an excluded ``build/`` directory) and times:
+
+* the legacy recursive ``Path.iterdir`` + per-component fnmatch + ``shutil.copy2``
+  copy into an empty destination, and again over an up-to-date one (it has
+  no unchanged-file skip, so both runs copy everything);
+* ``localcopy.copy_tree`` cold (empty destination) and warm (nothing
+  changed, every file skipped on size + mtime).
+
+Usage:
+    python benchmarks/bench_local_copy.py [--files 100000] [--workers 8] [--dir /tmp]
+"""
+
+import argparse
+import fnmatch
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import localcopy
+from west_env.sync import DEFAULT_EXCLUDES
+
+# ---------------------------------------------------------------------------
+# Legacy reference implementation (pre-localcopy behaviour)
+# ---------------------------------------------------------------------------
+
+
+def _legacy_is_excluded(path: Path, root: Path, patterns: list) -> bool:
+    parts = path.relative_to(root).parts
+    return any(fnmatch.fnmatch(part, pattern) for pattern in patterns for part in parts)
+
+
+def _legacy_copy_tree(src: Path, dst: Path, excludes: list):
+    dst.mkdir(parents=True, exist_ok=True)
+    for item in src.iterdir():
+        if _legacy_is_excluded(item, src, excludes):
+            continue
+        dest = dst / item.name
+        if item.is_dir():
+            _legacy_copy_tree(item, dest, excludes)
+        else:
+            shutil.copy2(str(item), str(dest))
+
+
+def _make_tree(root: Path, files: int, per_dir: int = 50):
+    rng = random.Random(42)
+    payload = os.urandom(64 * 1024)
+    for i in range(files):
+        d = root / f"modules/m{i // (per_dir * 40)}/sub{(i // per_dir) % 40}"
+        if i % per_dir == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        size = rng.choice((256, 1024, 2048, 4096, 16384, 65536))
+        (d / f"file{i}.c").write_bytes(payload[:size])
+    build = root / "build"
+    build.mkdir()
+    for i in range(files // 10):
+        (build / f"obj{i}.o").write_bytes(payload[:4096])
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dir", default=None, help="scratch directory (default: system temp)")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=opts.dir) as tmp:
+        base = Path(tmp)
+        src = base / "src"
+        print(f"generating {opts.files} files in {src} ...")
+        _make_tree(src, opts.files)
+
+        legacy_dst, new_dst = base / "legacy", base / "new"
+        legacy_cold, _ = _timed(lambda: _legacy_copy_tree(src, legacy_dst, DEFAULT_EXCLUDES))
+        legacy_warm, _ = _timed(lambda: _legacy_copy_tree(src, legacy_dst, DEFAULT_EXCLUDES))
+        new_cold, cold = _timed(lambda: localcopy.copy_tree(src, new_dst, DEFAULT_EXCLUDES, workers=opts.workers))
+        new_warm, warm = _timed(lambda: localcopy.copy_tree(src, new_dst, DEFAULT_EXCLUDES, workers=opts.workers))
+
+    print(f"\nlocal tree copy, {opts.files} files")
+    print(f"  {'':24} {'cold':>9} {'unchanged':>11}")
+    print(f"  {'legacy _copy_tree':24} {legacy_cold:8.2f}s {legacy_warm:10.2f}s")
+    print(f"  {'localcopy.copy_tree':24} {new_cold:8.2f}s {new_warm:10.2f}s")
+    print(f"  {'speed-up':24} {legacy_cold / new_cold:8.1f}x {legacy_warm / new_warm:10.1f}x")
+    print(f"\n  cold: {cold.summary()}")
+    print(f"  warm: {warm.summary()}")
+
+
+if __name__ == "__main__":
+    main()
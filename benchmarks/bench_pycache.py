@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark: containerised ``west build`` no-op latency with/without pycache.
+
+Runs ``west build -d <build-dir>`` against an already configured build
+directory (so the build itself is a no-op) in a fresh container, first with
+``PYTHONDONTWRITEBYTECODE=1`` (every run recompiles west, west-env and the
+Zephyr Python scripts) and then with the ``pycache`` cache volume mounted via
+``PYTHONPYCACHEPREFIX``.  The first pycache run populates the volume and is
+reported separately from the warm runs.
+
+Requires a container engine, the configured image and a west workspace whose
+build directory has been built once.
+
+Usage:
+    python benchmarks/bench_pycache.py --workspace ~/zephyrproject \\
+        [--build-dir build] [--runs 5] [--engine docker]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import runspec
+from west_env.cache import _VOLUME_NAMES
+from west_env.config import load_config
+from west_env.container import _run_args
+
+
+def _time_run(engine, args):
+    start = time.perf_counter()
+    subprocess.run([engine] + args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _spec(cfg, engine, workspace, pycache):
+    cfg.cache_pycache = pycache
+    return runspec.build(cfg, engine, workspace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspace", required=True, type=Path)
+    parser.add_argument("--build-dir", default="build")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--engine", default="docker")
+    opts = parser.parse_args()
+
+    workspace = opts.workspace.resolve()
+    cfg = load_config(workspace)
+    cfg.workspace_mode = "bind"
+    command = ["west", "build", "-d", opts.build_dir]
+
+    without = _run_args(_spec(cfg, opts.engine, workspace, False), command)
+    with_cache = _run_args(_spec(cfg, opts.engine, workspace, True), command)
+
+    subprocess.run([opts.engine, "volume", "rm", "-f", _VOLUME_NAMES["pycache"]], stdout=subprocess.DEVNULL)
+
+    off = [_time_run(opts.engine, without) for _ in range(opts.runs)]
+    first = _time_run(opts.engine, with_cache)
+    warm = [_time_run(opts.engine, with_cache) for _ in range(opts.runs)]
+
+    print(f"west build no-op latency ({opts.runs} runs, median)")
+    print(f"  PYTHONDONTWRITEBYTECODE=1   {statistics.median(off):7.2f}s")
+    print(f"  pycache volume (first run)  {first:7.2f}s")
+    print(f"  pycache volume (warm)       {statistics.median(warm):7.2f}s")
+    print(f"  saved per build             {statistics.median(off) - statistics.median(warm):7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
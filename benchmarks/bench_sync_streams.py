@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark: full workspace sync throughput against the upload stream count.
+
+Generates a synthetic workspace of several west-project-like directories
+(compressible source text) and times a full ``syncindex.sync`` with 1, 2,
+4 and 8 concurrent streams.
+
+By default the streams go to sync agents run by the host interpreter into a
+scratch directory (``python3`` standing in for the build image), which
+measures the host side: tar, compression and the pipes.  With ``--engine``
+and ``--image`` the agents run in containers of that image against a
+scratch volume, which adds the engine and VM boundary.
+
+Usage:
+    python benchmarks/bench_sync_streams.py [--projects 8] [--mb 256] [--compression gzip]
+    python benchmarks/bench_sync_streams.py --engine podman --image ghcr.io/zephyrproject-rtos/ci
+"""
+
+import argparse
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import syncagent, syncindex
+from west_env.sync import DEFAULT_EXCLUDES
+
+_VOLUME = "west-env-bench-streams"
+
+
+def _make_workspace(root: Path, projects: int, total_mb: int) -> list:
+    """Create *projects* directories of ~64 KiB source files; return their paths."""
+    rng = random.Random(42)
+    words = [f"sym_{i:05d}" for i in range(4096)]
+    text = " ".join(rng.choice(words) for _ in range(200_000)).encode()
+    per_project = total_mb * 1024 * 1024 // projects
+    paths = []
+    for p in range(projects):
+        rel = f"modules/proj{p}"
+        paths.append(rel)
+        for i in range(per_project // (64 * 1024) + 1):
+            d = root / rel / f"src{i // 64}"
+            d.mkdir(parents=True, exist_ok=True)
+            start = rng.randrange(len(text) - 64 * 1024)
+            (d / f"file{i}.c").write_bytes(text[start : start + 64 * 1024])
+    return paths
+
+
+def _agent_factory(opts, dest: Path):
+    if opts.engine:
+        argv = syncagent.agent_args(opts.engine, opts.image, [f"{_VOLUME}:/work"])
+    else:
+        argv = [sys.executable, "-c", syncagent.AGENT_SOURCE, str(dest)]
+    return syncagent.SyncAgent(argv).start()
+
+
+def _reset(opts, dest: Path):
+    if opts.engine:
+        subprocess.run([opts.engine, "volume", "rm", "-f", _VOLUME], capture_output=True)
+        subprocess.run([opts.engine, "volume", "create", _VOLUME], capture_output=True, check=True)
+    else:
+        shutil.rmtree(dest, ignore_errors=True)
+        dest.mkdir()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--mb", type=int, default=256, help="workspace size in MiB")
+    parser.add_argument("--compression", default="gzip", help="none | gzip | lzma | zstd")
+    parser.add_argument("--streams", default="1,2,4,8")
+    parser.add_argument("--engine", default=None, help="run the agents in containers of --image")
+    parser.add_argument("--image", default=None)
+    parser.add_argument("--dir", default=None, help="scratch directory (default: system temp)")
+    opts = parser.parse_args()
+    if opts.engine and not opts.image:
+        parser.error("--engine needs --image")
+
+    with tempfile.TemporaryDirectory(dir=opts.dir) as tmp:
+        base = Path(tmp)
+        root, dest = base / "ws", base / "volume"
+        print(f"generating {opts.mb} MiB in {opts.projects} projects under {root} ...")
+        projects = _make_workspace(root, opts.projects, opts.mb)
+
+        results = []
+        for streams in [int(n) for n in opts.streams.split(",")]:
+            _reset(opts, dest)
+            agent = _agent_factory(opts, dest)
+            try:
+                with patch.object(syncindex, "volume_id", return_value="bench"):
+                    start = time.perf_counter()
+                    stats = syncindex.sync(
+                        opts.engine or "none",
+                        _VOLUME,
+                        root,
+                        DEFAULT_EXCLUDES,
+                        full=True,
+                        compression=opts.compression,
+                        agent=lambda: agent,
+                        projects=projects,
+                        streams=streams,
+                    )
+                    elapsed = time.perf_counter() - start
+            finally:
+                agent.close()
+            results.append((streams, stats, elapsed))
+        if opts.engine:
+            subprocess.run([opts.engine, "volume", "rm", "-f", _VOLUME], capture_output=True)
+
+    print(f"\nfull sync, {opts.mb} MiB in {opts.projects} projects, compression={opts.compression}")
+    print(f"  {'streams':>7} {'time':>9} {'MB/s':>8} {'speed-up':>9}")
+    baseline = results[0][2]
+    for streams, stats, elapsed in results:
+        rate = stats.bytes_sent / 1024 / 1024 / elapsed
+        print(f"  {stats.streams:>7} {elapsed:8.2f}s {rate:8.1f} {baseline / elapsed:8.2f}x")
+    print(f"\n  last: {results[-1][1].summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Stand-in container engine for the sync tests (not a test module)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+# Stand-in engine: volumes are directories; "run" executes the shell command
+# on the host with /work pointing at the volume directory.
+FAKE_ENGINE = """\
+#!{python}
+import os, subprocess, sys
+base = {base!r}
+args = sys.argv[1:]
+with open(os.path.join(base, "calls.log"), "a") as log:
+    log.write(" ".join(args[:2]) + "\\n")
+if args[:2] == ["volume", "inspect"]:
+    path = os.path.join(base, args[-1])
+    if not os.path.isdir(path):
+        sys.exit(1)
+    print(os.stat(path).st_ino)
+    sys.exit(0)
+if args[:2] == ["volume", "rm"]:
+    import shutil
+    shutil.rmtree(os.path.join(base, args[-1]), ignore_errors=True)
+    sys.exit(0)
+if args[0] in ("run", "create"):
+    cmd = args[args.index("-c") + 1]
+    for vol, mnt in reversed([args[i + 1].split(":")[:2] for i, a in enumerate(args) if a == "-v"]):
+        path = os.path.join(base, vol)
+        os.makedirs(path, exist_ok=True)
+        cmd = cmd.replace(mnt, path)
+    if args[0] == "create":
+        cid = "c%d" % os.getpid()
+        with open(os.path.join(base, cid + ".ctr"), "w") as f:
+            f.write(path + "\\n" + cmd)
+        print(cid)
+        sys.exit(0)
+    sys.exit(subprocess.call(["sh", "-c", cmd]))
+if args[0] in ("cp", "start", "rm"):
+    import gzip, io, lzma, tarfile
+    ctr = os.path.join(base, args[-1].split(":")[0] + ".ctr")
+    if args[0] == "rm":
+        os.remove(ctr)
+        sys.exit(0)
+    with open(ctr) as f:
+        path, cmd = f.read().split("\\n", 1)
+    if args[0] == "start":
+        sys.exit(subprocess.call(["sh", "-c", cmd]))
+    data = sys.stdin.buffer.read()
+    if data[:2] == b"\\x1f\\x8b":
+        data = gzip.decompress(data)
+    elif data[:6] == b"\\xfd7zXZ\\x00":
+        data = lzma.decompress(data)
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(path)
+    sys.exit(0)
+sys.exit(2)
+"""
+
+
+def write_file(root: Path, rel: str, data: str) -> Path:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(data, encoding="utf-8")
+    return path
+
+
+def make_fake_engine(volumes: Path) -> Path:
+    """Write FAKE_ENGINE into *volumes* (one directory per volume); return its path."""
+    volumes.mkdir(parents=True, exist_ok=True)
+    engine = volumes / "fake-engine"
+    engine.write_text(textwrap.dedent(FAKE_ENGINE).format(python=sys.executable, base=str(volumes)), encoding="utf-8")
+    engine.chmod(0o755)
+    return engine
+
+
+class FakeEngineTestCase(unittest.TestCase):
+    """Runs each test in a temporary directory with a fake engine.
+
+    ``self.base`` is the directory, ``self.volumes`` (``base/engine``) holds
+    the volumes and ``self.engine`` is the engine script.
+    """
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.base = Path(self._tmp.name)
+        self.volumes = self.base / "engine"
+        self.engine = make_fake_engine(self.volumes)
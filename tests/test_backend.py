@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import sys
+import time
 import unittest
 from unittest.mock import patch
 from pathlib import Path
@@ -16,6 +17,7 @@ from west_env.backend import (
     detect_all,
     select,
     doctor_lines,
+    run_probes,
     ContainerBackend,
     _probe_podman_native,
     _probe_docker_native,
@@ -182,6 +184,74 @@ class TestDetectAll(unittest.TestCase):
         self.assertIn("docker-machine", result)
 
 
+def _slow_probe(name, delay, available=True, calls=None):
+    def _probe():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        return BackendProbe(name, available, "v1")
+
+    return _probe
+
+
+class TestDetectionEngine(unittest.TestCase):
+    def test_detect_all_runs_each_probe_once(self):
+        calls = []
+        with (
+            patch("west_env.backend._probe_podman_native", _slow_probe("podman-native", 0, calls=calls)),
+            patch("west_env.backend._probe_docker_native", _slow_probe("docker-native", 0, calls=calls)),
+        ):
+            result = detect_all("linux")
+        self.assertEqual(sorted(calls), ["docker-native", "podman-native"])
+        self.assertEqual(list(result), ["podman-native", "docker-native"])
+
+    def test_probes_run_concurrently(self):
+        with (
+            patch("west_env.backend._probe_podman_native", _slow_probe("podman-native", 0.3)),
+            patch("west_env.backend._probe_docker_native", _slow_probe("docker-native", 0.3)),
+        ):
+            start = time.monotonic()
+            detect_all("linux")
+            elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 0.55)
+
+    def test_select_does_not_wait_for_later_chain_entries(self):
+        with (
+            patch("west_env.backend._probe_podman_native", _slow_probe("podman-native", 0)),
+            patch("west_env.backend._probe_docker_native", _slow_probe("docker-native", 2.0)),
+        ):
+            start = time.monotonic()
+            name, _, _ = select("auto", "linux")
+            elapsed = time.monotonic() - start
+        self.assertEqual(name, "podman-native")
+        self.assertLess(elapsed, 1.0)
+
+    def test_slow_probe_times_out_as_unavailable(self):
+        with patch("west_env.backend._probe_podman_native", _slow_probe("podman-native", 2.0)):
+            result = run_probes(["podman-native"], timeout=0.1)
+        self.assertFalse(result["podman-native"].available)
+        self.assertIn("timed out", result["podman-native"].notes[0])
+
+    def test_raising_probe_is_reported_unavailable(self):
+        def _boom():
+            raise OSError("broken")
+
+        with patch("west_env.backend._probe_docker_native", _boom):
+            result = run_probes(["docker-native"])
+        self.assertFalse(result["docker-native"].available)
+        self.assertIn("broken", result["docker-native"].notes[0])
+
+    def test_explicit_backend_probes_only_that_backend(self):
+        calls = []
+        with (
+            patch("west_env.backend._probe_podman_native", _slow_probe("podman-native", 0, calls=calls)),
+            patch("west_env.backend._probe_docker_native", _slow_probe("docker-native", 0, calls=calls)),
+        ):
+            name, _, _ = select("docker-native", "linux")
+        self.assertEqual(name, "docker-native")
+        self.assertEqual(calls, ["docker-native"])
+
+
 class TestSelect(unittest.TestCase):
     def test_auto_linux_prefers_podman_over_docker(self):
         with patch(
@@ -0,0 +1,184 @@
+"""Unit tests for west_env.backendrank (auto-fastest backend selection)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import backend, backendrank, probecache
+from west_env.backend import BackendProbe, doctor_lines, select
+from west_env.backendrank import BackendScore, benchmark_backend, compute_score, rank_backends
+from west_env.config import EnvConfig
+from west_env.container import run_spec
+
+_BOTH_AVAILABLE = {
+    "podman-native": BackendProbe("podman-native", True, "podman 5"),
+    "docker-native": BackendProbe("docker-native", True, "docker 27"),
+}
+
+
+def _scores(**by_name):
+    return lambda name, image: by_name[name]
+
+
+class _RankTestCase(unittest.TestCase):
+    def setUp(self):
+        backendrank._session_results.clear()
+
+    def tearDown(self):
+        backendrank._session_results.clear()
+        backend.reset()
+        probecache.disable()
+
+
+class TestBenchmarkBackend(_RankTestCase):
+    def test_net_timings_subtract_cold_start(self):
+        # warm-up, 3 cold starts, write run, ingest run
+        timings = iter([5.0, 0.5, 0.4, 0.6, 0.5 + 0.3, 0.5 + 0.8])
+        with (
+            patch("west_env.backendrank._timed", side_effect=lambda *a, **k: next(timings)),
+            patch("west_env.backendrank.subprocess.run"),
+        ):
+            score = benchmark_backend("docker-native", "img")
+        self.assertTrue(score.ok)
+        self.assertAlmostEqual(score.cold_start_s, 0.5)
+        self.assertAlmostEqual(score.files_per_s, backendrank.BENCH_FILES / 0.3, places=0)
+        self.assertAlmostEqual(score.tar_mb_per_s, backendrank.BENCH_TAR_MB / 0.8, places=0)
+
+    def test_failure_is_reported_not_raised(self):
+        err = subprocess.CalledProcessError(125, ["docker", "run"])
+        with (
+            patch("west_env.backendrank._timed", side_effect=err),
+            patch("west_env.backendrank.subprocess.run"),
+        ):
+            score = benchmark_backend("docker-native", "img")
+        self.assertFalse(score.ok)
+        self.assertIsNotNone(score.error)
+
+    def test_score_is_lower_for_faster_backend(self):
+        self.assertLess(compute_score(0.2, 5000, 200), compute_score(1.0, 500, 50))
+
+
+class TestRanking(_RankTestCase):
+    def test_rank_orders_by_score_and_failures_last(self):
+        fake = _scores(
+            **{
+                "podman-native": BackendScore("podman-native", error="boom"),
+                "docker-native": BackendScore("docker-native", 0.3, 4000, 150, 1.2),
+                "podman-machine": BackendScore("podman-machine", 0.8, 900, 60, 4.1),
+            }
+        )
+        with patch("west_env.backendrank.benchmark_backend", side_effect=fake):
+            ranked = rank_backends(["podman-native", "docker-native", "podman-machine"], "img")
+        self.assertEqual([s.name for s in ranked], ["docker-native", "podman-machine", "podman-native"])
+
+    def test_results_are_stored_with_probe_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            probecache.enable(Path(tmp) / "probes.json")
+            result = BackendScore("docker-native", 0.3, 4000, 150, 1.2)
+            with patch("west_env.backendrank.benchmark_backend", return_value=result) as bench:
+                backendrank.measure("docker-native", "img")
+                backendrank._session_results.clear()
+                backendrank.measure("docker-native", "img")
+            self.assertEqual(bench.call_count, 1)
+            self.assertTrue(any(k.startswith("bench:docker-native") for k in probecache.active().keys()))
+
+
+class TestAutoFastestSelect(_RankTestCase):
+    def test_picks_best_measured_backend(self):
+        fake = _scores(
+            **{
+                "podman-native": BackendScore("podman-native", 0.9, 800, 40, 5.0),
+                "docker-native": BackendScore("docker-native", 0.3, 4000, 150, 1.2),
+            }
+        )
+        with (
+            patch("west_env.backend.detect_all", return_value=_BOTH_AVAILABLE),
+            patch("west_env.backendrank.benchmark_backend", side_effect=fake),
+        ):
+            name, _, _ = select("auto-fastest", "linux", image="img")
+        self.assertEqual(name, "docker-native")
+
+    def test_single_available_backend_skips_benchmark(self):
+        probes = {
+            "podman-native": BackendProbe("podman-native", False, notes=["not found"]),
+            "docker-native": BackendProbe("docker-native", True, "docker 27"),
+        }
+        with (
+            patch("west_env.backend.detect_all", return_value=probes),
+            patch("west_env.backendrank.benchmark_backend") as bench,
+        ):
+            name, _, _ = select("auto-fastest", "linux", image="img")
+        self.assertEqual(name, "docker-native")
+        bench.assert_not_called()
+
+    def test_without_image_falls_back_to_chain_order(self):
+        with patch("west_env.backend.detect_all", return_value=_BOTH_AVAILABLE):
+            name, _, warns = select("auto-fastest", "linux")
+        self.assertEqual(name, "podman-native")
+        self.assertTrue(any("no container image" in w for w in warns))
+
+    def test_doctor_prints_ranking_table(self):
+        fake = _scores(
+            **{
+                "podman-native": BackendScore("podman-native", 0.9, 800, 40, 5.0),
+                "docker-native": BackendScore("docker-native", 0.3, 4000, 150, 1.2),
+            }
+        )
+        with (
+            patch("west_env.backend.detect_all", return_value=_BOTH_AVAILABLE),
+            patch("west_env.backendrank.benchmark_backend", side_effect=fake),
+        ):
+            lines = doctor_lines("linux", preferred="auto-fastest", image="img")
+        self.assertTrue(any("backend selected: docker-native" in line for line in lines))
+        table = lines[lines.index("Backend performance ranking (auto-fastest):") :]
+        self.assertIn("docker-native", table[2])
+        self.assertIn("podman-native", table[3])
+
+    def test_runs_and_sync_use_the_ranked_engine(self):
+        from west_commands.env import EnvCommand
+
+        fake = _scores(
+            **{
+                "podman-native": BackendScore("podman-native", 0.3, 4000, 150, 1.2),
+                "docker-native": BackendScore("docker-native", 0.9, 800, 40, 5.0),
+            }
+        )
+        cfg = EnvConfig({"env": {"backend": "auto-fastest", "image": "img"}})
+        self.assertEqual(cfg.engine, "docker")  # the legacy default
+        engines = []
+
+        def get_engine(name, driver="cli"):
+            engines.append(name)
+            engine = Mock(name="engine")
+            engine.name = name
+            return engine, False
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch("west_env.backend.detect_all", return_value=_BOTH_AVAILABLE) as detect,
+            patch("west_env.backendrank.benchmark_backend", side_effect=fake),
+            patch("west_env.container.get_engine", side_effect=get_engine),
+            patch("west_env.credentials.container_args", return_value=[]),
+        ):
+            spec = run_spec(cfg, Path(tmp), Path(tmp), use_snapshot=False)
+            sync_engine = EnvCommand()._engine_name(cfg)
+        self.assertEqual(engines, ["podman"])
+        self.assertEqual((spec.engine, sync_engine), ("podman", "podman"))
+        detect.assert_called_once()  # selected once per invocation
+
+    def test_config_accepts_auto_fastest(self):
+        cfg = EnvConfig({"env": {"backend": "auto-fastest"}})
+        self.assertEqual(cfg.backend, "auto-fastest")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Unit tests for west_env.compress (adaptive sync stream compression)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import gzip
+import io
+import lzma
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import backend, compress
+from west_env.backend import BackendProbe
+from west_env.config import EnvConfig
+
+_TEXT = b"".join(b"static int reg_%05d = CONFIG_VALUE_%d;\n" % (i, i % 7) for i in range(20000))
+
+
+class _SlowLink(io.BytesIO):
+    """A sink that accepts *bps* bytes per second."""
+
+    def __init__(self, bps):
+        super().__init__()
+        self.bps = bps
+
+    def write(self, data):
+        time.sleep(len(data) / self.bps)
+        return super().write(data)
+
+
+class TestWriter(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.blob = Path(self._tmp.name) / "libvendor.a"
+        self.blob.write_bytes(os.urandom(compress.SKIP_MIN_BYTES * 2))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _roundtrip(self, codec, decompress):
+        sink = io.BytesIO()
+        writer = compress.CompressedWriter(sink, codec)
+        writer.write(_TEXT)
+        writer.member(str(self.blob), self.blob.stat().st_size)
+        writer.write(self.blob.read_bytes())
+        writer.member("src/main.c", 100)
+        writer.write(_TEXT)
+        writer.close()
+        self.assertEqual(decompress(sink.getvalue()), _TEXT + self.blob.read_bytes() + _TEXT)
+        self.assertEqual(writer.skipped_members, 1)
+        self.assertEqual(writer.wire_bytes, len(sink.getvalue()))
+        return writer
+
+    def test_gzip_members_roundtrip_and_store_precompressed_blobs(self):
+        writer = self._roundtrip("gzip", gzip.decompress)
+        # the random blob is stored, the text compresses well
+        self.assertLess(writer.wire_bytes, self.blob.stat().st_size + len(_TEXT) // 4)
+
+    def test_lzma_streams_roundtrip(self):
+        self._roundtrip("lzma", lzma.decompress)
+
+    def test_precompressed_detection(self):
+        self.assertTrue(compress.is_precompressed(str(self.blob), self.blob.stat().st_size))
+        text = Path(self._tmp.name) / "big.c"
+        text.write_bytes(_TEXT)
+        self.assertFalse(compress.is_precompressed(str(text), len(_TEXT)))
+        self.assertFalse(compress.is_precompressed(str(self.blob), 1024))  # too small to bother
+
+
+@patch.object(compress, "PROBE_BYTES", 256 * 1024)
+class TestAutoLevel(unittest.TestCase):
+    def _feed(self, sink):
+        writer = compress.CompressedWriter(sink, "gzip", auto=True)
+        for i in range(0, len(_TEXT), 10240):
+            writer.write(_TEXT[i : i + 10240])
+        writer.close()
+        self.assertEqual(gzip.decompress(sink.getvalue()), _TEXT)
+        return writer
+
+    def test_slow_link_gets_compressed(self):
+        writer = self._feed(_SlowLink(4 * 1024 * 1024))
+        self.assertNotEqual(writer.level, compress.STORED_LEVELS["gzip"])
+        self.assertLess(writer.ratio, 0.5)
+        self.assertIn("(auto)", writer.describe())
+
+    def test_fast_link_stays_stored(self):
+        with patch.object(compress.CompressedWriter, "_emit", autospec=True) as emit:
+            emit.side_effect = lambda self, data: (
+                setattr(self, "wire_bytes", self.wire_bytes + len(data)),
+                setattr(self, "write_s", self.write_s + len(data) / 1e12),
+            )
+            writer = compress.CompressedWriter(io.BytesIO(), "gzip", auto=True)
+            writer.write(_TEXT)
+        self.assertEqual(writer.level, compress.STORED_LEVELS["gzip"])
+
+
+class TestResolve(unittest.TestCase):
+    def test_native_linux_engine_is_uncompressed(self):
+        with patch("west_env.compress.sys.platform", "linux"):
+            self.assertEqual(compress.resolve("auto", "docker", "alpine", "docker-native"), ("none", False))
+
+    def test_auto_backend_is_resolved_before_the_native_check(self):
+        cfg = EnvConfig({"env": {"backend": "auto"}})
+        probes = {"docker-native": BackendProbe("docker-native", True, "docker 27")}
+        self.addCleanup(backend.reset)
+        with (
+            patch("west_env.backend._platform_chain", return_value=["docker-native"]),
+            patch("west_env.backend.detect_all", return_value=probes),
+            patch("west_env.compress.sys.platform", "linux"),
+        ):
+            selected = backend.selected_name(cfg)
+            self.assertEqual(selected, "docker-native")
+            self.assertEqual(compress.resolve("auto", "docker", "alpine", selected), ("none", False))
+
+    def test_describe_labels_only_real_stored_frames(self):
+        self.assertEqual(compress.CompressedWriter(io.BytesIO(), "gzip", level=0).describe(), "gzip stored")
+        self.assertEqual(compress.CompressedWriter(io.BytesIO(), "lzma", level=0).describe(), "lzma level 0")
+
+    @unittest.skipIf(compress._zstd() is None, "zstandard not installed")
+    def test_describe_zstd_fast_level_is_not_stored(self):
+        writer = compress.CompressedWriter(io.BytesIO(), "zstd", auto=True)
+        self.assertEqual(writer.level, -7)
+        self.assertEqual(writer.describe(), "zstd level -7 (auto)")
+
+    def test_zstd_falls_back_to_gzip(self):
+        with patch("west_env.compress._zstd", return_value=None):
+            self.assertEqual(compress.resolve("zstd", "podman", "alpine"), ("gzip", False))
+            self.assertEqual(compress.resolve("auto", "podman", "alpine", "podman-machine"), ("gzip", True))
+
+    def test_config_validation(self):
+        self.assertEqual(EnvConfig({}).sync_compression, "auto")
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"compression": "brotli"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
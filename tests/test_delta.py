@@ -0,0 +1,133 @@
+"""Unit tests for west_env.delta (block-level delta transfer)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase
+from tests.test_syncagent import _local_agent
+from west_env import delta, syncagent, syncindex
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES
+
+_OLD = random.Random(7).randbytes(300_000)
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.old = Path(self._tmp.name) / "old.bin"
+        self.old.write_bytes(_OLD)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _roundtrip(self, new, block=4096):
+        sig = delta.signature(str(self.old), block)
+        stream, result = io.BytesIO(), delta.DeltaResult(size=len(new))
+        delta.encode(new, delta.diff(new, block, sig), stream, result)
+        stream.seek(0)
+        out = io.BytesIO()
+        delta.apply(str(self.old), block, stream, out)
+        self.assertEqual(out.getvalue(), new)
+        return result
+
+    def test_unchanged_file_sends_no_literals(self):
+        result = self._roundtrip(_OLD)
+        self.assertEqual(result.literal_bytes, 0)
+        self.assertEqual(result.saved, len(_OLD))
+
+    def test_insertions_and_deletions_resynchronise(self):
+        self.assertLessEqual(self._roundtrip(_OLD[:1000] + b"INSERTED" + _OLD[1000:]).literal_bytes, 4096 + 8)
+        self.assertLessEqual(self._roundtrip(_OLD[:50_000] + _OLD[50_100:]).literal_bytes, 4096)
+        self.assertLessEqual(self._roundtrip(_OLD[:100] + bytes(5000) + _OLD[5100:]).literal_bytes, 3 * 4096)
+
+    def test_edges(self):
+        self.assertLess(self._roundtrip(_OLD + b"tail").literal_bytes, 4096)
+        self._roundtrip(_OLD[:-10])
+        self._roundtrip(b"")
+        self.assertEqual(self._roundtrip(os.urandom(20_000)).literal_bytes, 20_000)
+
+    def test_block_size_scales_with_file_size(self):
+        self.assertEqual(delta.block_size(1000), delta.MIN_BLOCK)
+        self.assertEqual(delta.block_size(100 * 1024 * 1024), 16 * 1024)
+        self.assertEqual(delta.block_size(1 << 40), delta.MAX_BLOCK)
+
+
+class TestDeltaSync(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ws = self.base / "ws"
+        self.vol = self.volumes / "ws-vol"
+        self.vol.mkdir(parents=True)
+        self.blob = self.ws / "modules/hal/blob.bin"
+        self.blob.parent.mkdir(parents=True)
+        self.blob.write_bytes(_OLD)
+        self.agent = _local_agent(self.vol)
+        self.addCleanup(self.agent.close)
+
+    def _sync(self, **kwargs):
+        kwargs.setdefault("delta_min_size", 64 * 1024)
+        return syncindex.sync(str(self.engine), "ws-vol", self.ws, DEFAULT_EXCLUDES, agent=lambda: self.agent, **kwargs)
+
+    def test_modified_large_file_goes_as_delta(self):
+        self._sync()
+        self.blob.write_bytes(_OLD[:200_000] + b"patched" + _OLD[200_000:])
+        os.chmod(self.blob, 0o600)
+        stats = self._sync()
+        target = self.vol / "modules/hal/blob.bin"
+        self.assertEqual(target.read_bytes(), self.blob.read_bytes())
+        self.assertEqual(target.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(target.stat().st_mtime_ns, self.blob.stat().st_mtime_ns)
+        self.assertEqual(stats.delta_files, 1)
+        self.assertGreater(stats.delta_saved, 250_000)
+        self.assertLess(stats.bytes_sent, 50_000)
+        self.assertIn("MB saved", stats.summary())
+        self.assertEqual(os.listdir(target.parent), ["blob.bin"])
+
+    def test_small_files_and_disabled_threshold_send_whole_files(self):
+        self._sync()
+        self.blob.write_bytes(_OLD[::-1])
+        self.assertEqual(self._sync(delta_min_size=0).delta_files, 0)
+        self.assertEqual((self.vol / "modules/hal/blob.bin").read_bytes(), _OLD[::-1])
+
+    def test_failed_or_impossible_delta_falls_back_to_whole_file(self):
+        self._sync()
+        (self.vol / "modules/hal/blob.bin").unlink()  # nothing to patch
+        self.blob.write_bytes(_OLD + b"x")
+        self.assertEqual(self._sync().delta_files, 0)
+        self.assertEqual((self.vol / "modules/hal/blob.bin").read_bytes(), _OLD + b"x")
+
+        self.blob.write_bytes(_OLD + b"y")
+        with patch.object(delta, "send", side_effect=syncagent.AgentError("delta result does not match")):
+            self.assertEqual(self._sync().delta_files, 0)
+        self.assertEqual((self.vol / "modules/hal/blob.bin").read_bytes(), _OLD + b"y")
+
+    def test_agent_rejects_a_mismatching_result(self):
+        self._sync()
+        entry = syncindex.load_index(self.ws)["files"]["modules/hal/blob.bin"]
+        with self.assertRaises(syncagent.AgentError):
+            delta.send(self.agent, str(self.ws), "modules/hal/blob.bin", entry[:3] + ["0" * 32])
+        self.assertEqual((self.vol / "modules/hal/blob.bin").read_bytes(), _OLD)
+        self.assertEqual(self.agent.count("modules/hal"), 1)  # no temp file left behind
+
+    def test_config(self):
+        self.assertEqual(EnvConfig({}).sync_delta_min_size, delta.DELTA_MIN_BYTES)
+        self.assertEqual(EnvConfig({"sync": {"delta_min_size": 0}}).sync_delta_min_size, 0)
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"delta_min_size": "8M"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
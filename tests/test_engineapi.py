@@ -0,0 +1,388 @@
+"""Unit tests for west_env.engineapi against a stand-in HTTP-over-UDS engine."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import parse_qsl
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import engineapi, syncindex
+from west_env.cache import CacheManager
+from west_env.engineapi import EngineClient, check_run, client_for, run_args_to_config, socket_candidates
+
+
+class FakeEngine:
+    """In-memory engine state shared by the stand-in server's handlers."""
+
+    def __init__(self):
+        self.connections = 0
+        self.volumes = {"west-env-cache-ccache": 3 * 1024 * 1024}
+        self.images = {"ghcr.io/example/image:latest", "img:latest", "alpine:latest"}
+        self.registry = {"ghcr.io/example/sdk:1.0"}
+        self.pulls = []
+        self.containers = {}
+        self.started = {}
+        self.exit_code = 0
+        self.output = [(1, b"hello from stdout\n"), (2, b"oops on stderr\n")]
+        self.archives = {}
+        self.posts = []
+        self.drop_posts = False  # close the connection without answering
+
+
+def _make_handler(engine):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            engine.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def address_string(self):
+            return "uds"
+
+        def _json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length)) if length else None
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/_ping":
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"OK")
+            elif path == "/version":
+                self._json(200, {"Version": "99.0-fake"})
+            elif path == "/system/df":
+                vols = [{"Name": n, "UsageData": {"Size": s}} for n, s in engine.volumes.items()]
+                self._json(200, {"Volumes": vols})
+            elif path.startswith("/volumes/"):
+                name = path[len("/volumes/") :]
+                if name in engine.volumes:
+                    self._json(200, {"Name": name})
+                else:
+                    self._json(404, {"message": f"no such volume: {name}"})
+            elif path.startswith("/images/"):
+                ref = path[len("/images/") : -len("/json")].replace("%2F", "/").replace("%3A", ":")
+                if ref in engine.images:
+                    self._json(200, {"Id": "sha256:abc"})
+                else:
+                    self._json(404, {"message": "no such image"})
+            else:
+                self._json(404, {"message": "not found"})
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            engine.posts.append(path)
+            if engine.drop_posts:
+                self.close_connection = True
+                return
+            if path == "/containers/create":
+                config = self._body()
+                image = config["Image"] if ":" in config["Image"] else config["Image"] + ":latest"
+                if image not in engine.images:
+                    self._json(404, {"message": f"No such image: {image}"})
+                    return
+                cid = f"c{len(engine.containers)}"
+                engine.containers[cid] = config
+                engine.started[cid] = threading.Event()
+                self._json(201, {"Id": cid})
+            elif path == "/images/create":
+                query = dict(parse_qsl(self.path.partition("?")[2]))
+                ref = f"{query['fromImage']}:{query['tag']}"
+                engine.pulls.append(ref)
+                if ref in engine.registry:
+                    engine.images.add(ref)
+                    lines = [{"status": f"Pulling from {query['fromImage']}"}, {"status": "Downloaded newer image"}]
+                else:
+                    lines = [{"status": "Pulling"}, {"error": f"manifest for {ref} not found"}]
+                body = "".join(json.dumps(line) + "\r\n" for line in lines).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif path.endswith("/attach"):
+                cid = path.split("/")[2]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+                self.end_headers()
+                engine.started[cid].wait(5)
+                for stream, data in engine.output:
+                    self.wfile.write(bytes([stream, 0, 0, 0]) + struct.pack(">I", len(data)) + data)
+                self.close_connection = True
+            elif path.endswith("/start"):
+                engine.started[path.split("/")[2]].set()
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif path.endswith("/wait"):
+                self._json(200, {"StatusCode": engine.exit_code})
+            else:
+                self._json(404, {"message": "not found"})
+
+        def do_PUT(self):
+            path, _, query = self.path.partition("?")
+            data = b""
+            while True:  # chunked request body
+                size = int(self.rfile.readline().strip(), 16)
+                data += self.rfile.read(size)
+                self.rfile.readline()
+                if not size:
+                    break
+            cid = path.split("/")[2]
+            if cid not in engine.containers:
+                self._json(404, {"message": f"no such container: {cid}"})
+                return
+            engine.archives[cid] = (query, data)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_DELETE(self):
+            path = self.path.split("?")[0]
+            if path.startswith("/containers/"):
+                engine.containers.pop(path.split("/")[2], None)
+                self.send_response(204)
+            elif path.startswith("/volumes/"):
+                engine.volumes.pop(path[len("/volumes/") :], None)
+                self.send_response(204)
+            else:
+                self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    return Handler
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "unix sockets required")
+class _EngineServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self._tmp.name, "engine.sock")
+        self.engine = FakeEngine()
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, _make_handler(self.engine))
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.client = EngineClient(self.socket_path)
+
+    def tearDown(self):
+        self.client.close()
+        engineapi.reset_clients()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+
+class TestEngineClient(_EngineServerTestCase):
+    def test_ping(self):
+        self.assertTrue(self.client.ping())
+
+    def test_requests_reuse_one_keepalive_connection(self):
+        self.client.version()
+        self.client.volume_inspect("west-env-cache-ccache")
+        self.client.image_inspect("ghcr.io/example/image:latest")
+        self.assertEqual(self.engine.connections, 1)
+
+    def test_reconnects_after_server_closes_connection(self):
+        self.client.version()
+        self.client._conn.sock.shutdown(socket.SHUT_RDWR)
+        self.assertEqual(self.client.version()["Version"], "99.0-fake")
+
+    def test_stale_connection_is_replaced_before_a_post(self):
+        self.client.version()
+        self.client._conn.sock.shutdown(socket.SHUT_RDWR)
+        self.client.container_start(self.client.container_create({"Image": "img"}))
+        self.assertEqual(self.engine.posts, ["/containers/create", "/containers/c0/start"])
+
+    def test_post_is_not_resent_after_the_engine_got_it(self):
+        self.engine.drop_posts = True
+        with self.assertRaises(ConnectionError):
+            self.client.container_start("c0")
+        self.assertEqual(self.engine.posts, ["/containers/c0/start"])
+
+    def test_missing_volume_and_image_return_none(self):
+        self.assertIsNone(self.client.volume_inspect("nope"))
+        self.assertIsNone(self.client.image_inspect("nope:latest"))
+
+    def test_volume_size_from_system_df(self):
+        self.assertEqual(self.client.volume_size("west-env-cache-ccache"), 3 * 1024 * 1024)
+        self.assertIsNone(self.client.volume_size("nope"))
+
+    def test_run_streams_output_and_returns_exit_code(self):
+        out, err = io.BytesIO(), io.BytesIO()
+        self.engine.exit_code = 3
+        code = self.client.run({"Image": "img", "Cmd": ["true"]}, stdout=out, stderr=err)
+        self.assertEqual(code, 3)
+        self.assertEqual(out.getvalue(), b"hello from stdout\n")
+        self.assertEqual(err.getvalue(), b"oops on stderr\n")
+        self.assertEqual(self.engine.containers, {})  # auto-removed
+
+    def test_check_run_raises_called_process_error(self):
+        self.engine.exit_code = 2
+        with patch("sys.stdout", io.TextIOWrapper(io.BytesIO())), patch("sys.stderr", io.TextIOWrapper(io.BytesIO())):
+            with self.assertRaises(subprocess.CalledProcessError):
+                check_run("docker", self.client, ["run", "--rm", "img", "true"])
+
+    def test_missing_image_is_pulled_then_created(self):
+        with patch("sys.stdout", io.TextIOWrapper(io.BytesIO())), patch("sys.stderr", io.TextIOWrapper(io.BytesIO())):
+            check_run("docker", self.client, ["run", "--rm", "ghcr.io/example/sdk:1.0", "true"])
+        self.assertEqual(self.engine.pulls, ["ghcr.io/example/sdk:1.0"])
+        self.assertEqual(self.engine.containers, {})
+
+    def test_missing_image_with_pull_never_is_not_pulled(self):
+        with self.assertRaises(engineapi.EngineAPIError) as ctx:
+            check_run("docker", self.client, ["run", "--rm", "--pull=never", "ghcr.io/example/sdk:1.0", "true"])
+        self.assertEqual(ctx.exception.status, 404)
+        self.assertEqual(self.engine.pulls, [])
+        with self.assertRaises(engineapi.EngineAPIError):
+            self.client.container_create({"Image": "ghcr.io/example/sdk:1.0"})  # default: never
+        self.assertEqual(self.engine.pulls, [])
+
+    def test_pull_error_in_progress_stream_raises(self):
+        with self.assertRaises(engineapi.EngineAPIError) as ctx:
+            self.client.run({"Image": "nope/missing", "Cmd": ["true"]})
+        self.assertIn("not found", str(ctx.exception))
+        self.assertEqual(self.engine.pulls, ["nope/missing:latest"])
+
+    def test_split_ref(self):
+        self.assertEqual(engineapi._split_ref("alpine"), ("alpine", "latest"))
+        self.assertEqual(engineapi._split_ref("localhost:5000/sdk"), ("localhost:5000/sdk", "latest"))
+        self.assertEqual(engineapi._split_ref("localhost:5000/sdk:1.0"), ("localhost:5000/sdk", "1.0"))
+        self.assertEqual(engineapi._split_ref("sdk@sha256:ab"), ("sdk@sha256:ab", ""))
+
+    def test_put_archive_streams_chunked_body(self):
+        cid = self.client.container_create({"Image": "alpine"})
+        payload = os.urandom(600_000)
+        result = self.client.put_archive(cid, "/work", lambda f: f.write(payload) and "filled")
+        self.assertEqual(result, "filled")
+        self.assertEqual(self.engine.archives[cid], ("path=%2Fwork", payload))
+        with self.assertRaises(engineapi.EngineAPIError):
+            self.client.put_archive("missing", "/work", lambda f: f.write(b"x"))
+
+    def test_sync_copies_archive_through_api(self):
+        root = Path(self._tmp.name) / "ws"
+        (root / "app").mkdir(parents=True)
+        (root / "app/main.c").write_text("int main;")
+        with (
+            patch.object(syncindex, "volume_id", return_value="v1"),
+            patch.object(syncindex, "volume_files", return_value=[]),
+        ):
+            syncindex.sync("docker", "ws-vol", root, [], transport="auto", client=self.client)
+            ((cid, (_query, data)),) = self.engine.archives.items()
+            with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+                self.assertEqual(tar.getnames(), ["app/main.c", syncindex.OWNER_FILE])
+            self.assertFalse(self.engine.started[cid].is_set())  # nothing to delete
+            self.assertNotIn(cid, self.engine.containers)
+
+            (root / "app/main.c").unlink()
+            syncindex.sync("docker", "ws-vol", root, [], transport="auto", client=self.client)
+        cid = max(self.engine.archives)
+        self.assertTrue(self.engine.started[cid].is_set())
+        self.assertEqual(self.engine.containers, {})
+
+    def test_cache_manager_uses_api(self):
+        cm = CacheManager("docker", client=self.client)
+        with patch("west_env.cache.subprocess") as sp:
+            self.assertTrue(cm._volume_exists("west-env-cache-ccache"))
+            self.assertEqual(cm._volume_size("west-env-cache-ccache"), 3 * 1024 * 1024)
+            cm._remove_volume("west-env-cache-ccache")
+        sp.check_call.assert_not_called()
+        sp.check_output.assert_not_called()
+        self.assertNotIn("west-env-cache-ccache", self.engine.volumes)
+
+    def test_client_for_auto_finds_socket_from_docker_host(self):
+        with patch.dict(os.environ, {"DOCKER_HOST": f"unix://{self.socket_path}"}):
+            client = client_for("docker", "auto")
+            self.assertIsNotNone(client)
+            self.assertIs(client_for("docker", "auto"), client)
+
+
+class TestDriverSelection(unittest.TestCase):
+    def test_cli_driver_returns_none(self):
+        self.assertIsNone(client_for("docker", "cli"))
+
+    def test_unknown_driver_raises(self):
+        with self.assertRaises(ValueError):
+            client_for("docker", "grpc")
+
+    def test_api_driver_raises_when_unreachable(self):
+        with patch.dict(os.environ, {"DOCKER_HOST": "unix:///nonexistent/docker.sock"}):
+            with self.assertRaises(RuntimeError):
+                client_for("docker", "api")
+
+    def test_auto_driver_falls_back_to_cli(self):
+        with patch.dict(os.environ, {"DOCKER_HOST": "unix:///nonexistent/docker.sock"}):
+            self.assertIsNone(client_for("docker", "auto"))
+
+    def test_tcp_docker_host_has_no_socket_candidates(self):
+        with patch.dict(os.environ, {"DOCKER_HOST": "tcp://10.0.0.1:2375"}):
+            self.assertEqual(socket_candidates("docker"), [])
+
+
+class TestRunArgsToConfig(unittest.TestCase):
+    def test_translates_west_env_run_args(self):
+        config, auto_remove = run_args_to_config(
+            [
+                "run",
+                "--rm",
+                "-v",
+                "/ws:/work",
+                "-w",
+                "/work/app",
+                "-e",
+                "A=1",
+                "--mount",
+                "type=tmpfs,destination=/work/build",
+                "img:1",
+                "sh",
+                "-c",
+                "west build",
+            ]
+        )
+        self.assertTrue(auto_remove)
+        self.assertEqual(config["Image"], "img:1")
+        self.assertEqual(config["Cmd"], ["sh", "-c", "west build"])
+        self.assertEqual(config["WorkingDir"], "/work/app")
+        self.assertEqual(config["Env"], ["A=1"])
+        self.assertEqual(config["HostConfig"]["Binds"], ["/ws:/work"])
+        self.assertEqual(config["HostConfig"]["Tmpfs"], {"/work/build": ""})
+
+    def test_interactive_runs_use_cli(self):
+        self.assertIsNone(run_args_to_config(["run", "--rm", "-i", "-t", "img", "sh"]))
+
+    def test_unknown_flag_uses_cli(self):
+        self.assertIsNone(run_args_to_config(["run", "--privileged", "img", "sh"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
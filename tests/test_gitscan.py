@@ -0,0 +1,164 @@
+"""Unit tests for west_env.gitscan (git-aware change enumeration)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import shutil
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import gitscan, syncindex
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES, WorkspaceSync
+
+_PROJECTS = ["modules/hal", "zephyr"]
+
+
+def _git(path: Path, *args) -> str:
+    return subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def _tree(root: Path) -> dict:
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file() and p.name != "calls.log"
+    }
+
+
+@unittest.skipIf(shutil.which("git") is None or sys.platform == "win32", "git and a POSIX shell required")
+class TestGitEnumeration(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ws = self.base / "ws"
+        self.vol = self.volumes / "ws-vol"
+        self.vol.mkdir(parents=True)
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x;")
+        write_file(self.ws, "zephyr/kernel/timer.c", "int t;")
+        write_file(self.ws, "zephyr/.gitignore", "*.o\n")
+        write_file(self.ws, "modules/hal/drv.c", "int d;")
+        write_file(self.ws, "app/src/main.c", "int main;")
+        for project in _PROJECTS:
+            _git(self.ws / project, "init", "-q")
+            _git(self.ws / project, "add", "-A")
+            _git(self.ws / project, "commit", "-qm", "initial")
+
+    def _sync(self, **kwargs):
+        kwargs.setdefault("projects", _PROJECTS)
+        kwargs.setdefault("git_enumeration", True)
+        stats = syncindex.sync(str(self.engine), "ws-vol", self.ws, DEFAULT_EXCLUDES, **kwargs)
+        expected = {rel: data for rel, data in _tree(self.ws).items() if "/.git/" not in rel}
+        expected = {rel: data for rel, data in expected.items() if not rel.startswith(".west/")}
+        expected = {rel: data for rel, data in expected.items() if not rel.endswith(".o")}
+        expected[syncindex.OWNER_FILE] = (self.vol / syncindex.OWNER_FILE).read_bytes()
+        self.assertEqual(_tree(self.vol), expected)
+        return stats
+
+    def test_unchanged_projects_are_not_walked(self):
+        first = self._sync()
+        self.assertEqual(first.git_projects, 0)  # no recorded HEADs yet
+        state = syncindex.load_index(self.ws)["git"]
+        self.assertEqual(state["zephyr"]["head"], _git(self.ws / "zephyr", "rev-parse", "HEAD"))
+        again = self._sync()
+        self.assertEqual((again.git_projects, again.scanned), (2, 1))  # only app/ is statted
+        self.assertIn("git: 2 projects", again.summary())
+
+    def test_working_tree_changes_are_found(self):
+        self._sync()
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x = 1;")
+        write_file(self.ws, "zephyr/kernel/new.c", "int n;")
+        write_file(self.ws, "zephyr/kernel/obj.o", "OBJ")  # ignored
+        (self.ws / "modules/hal/drv.c").unlink()
+        stats = self._sync()
+        self.assertEqual((stats.added, stats.modified, stats.deleted), (1, 1, 1))
+
+        # Reverting a dirty file, or deleting an untracked one, is still seen.
+        _git(self.ws / "zephyr", "checkout", "--", "kernel/sched.c")
+        (self.ws / "zephyr/kernel/new.c").unlink()
+        stats = self._sync()
+        self.assertEqual((stats.modified, stats.deleted), (1, 1))
+
+    def test_new_head_is_diffed(self):
+        self._sync()
+        write_file(self.ws, "zephyr/kernel/timer.c", "int t2;")
+        (self.ws / "zephyr/kernel/sched.c").unlink()
+        _git(self.ws / "zephyr", "commit", "-qam", "change")
+        stats = self._sync()
+        self.assertEqual((stats.git_projects, stats.modified, stats.deleted), (2, 1, 1))
+        _git(self.ws / "zephyr", "checkout", "-q", "HEAD~1")
+        stats = self._sync()
+        self.assertEqual((stats.added, stats.modified), (1, 1))
+
+    def test_unknown_head_or_submodules_fall_back_to_walk(self):
+        self._sync()
+        path = self.ws / syncindex.INDEX_PATH
+        index = json.loads(path.read_text())
+        index["git"]["zephyr"]["head"] = "0" * 40
+        path.write_text(json.dumps(index))
+        write_file(self.ws, "zephyr/kernel/timer.c", "int t3;")
+        _git(self.ws / "zephyr", "commit", "-qam", "change")
+        self.assertEqual(self._sync().git_projects, 1)
+
+        write_file(self.ws, "modules/hal/.gitmodules", "")
+        self.assertEqual(self._sync().git_projects, 1)
+
+    def test_changed_excludes_drop_reused_entries(self):
+        self._sync()
+        self._sync()
+        stats = syncindex.sync(
+            str(self.engine),
+            "ws-vol",
+            self.ws,
+            DEFAULT_EXCLUDES + ["timer.c"],
+            projects=_PROJECTS,
+            git_enumeration=True,
+        )
+        self.assertEqual((stats.git_projects, stats.deleted), (2, 1))
+        self.assertFalse((self.vol / "zephyr/kernel/timer.c").exists())
+
+    def test_walk_fallback_when_gitignore_is_off_or_configured(self):
+        self.assertEqual(self._sync(git_enumeration=False).git_projects, 0)
+        self.assertEqual(self._sync(git_enumeration=False).git_projects, 0)
+        with patch.object(gitscan, "west_projects", return_value=_PROJECTS) as projects:
+            options = WorkspaceSync("sync").sync_options("docker", "ws-vol", self.ws)
+            self.assertEqual((options["projects"], options["git_enumeration"]), (_PROJECTS, True))
+            self.assertFalse(WorkspaceSync("sync", gitignore=False).git_enumeration)
+            self.assertFalse(WorkspaceSync("sync", enumeration="walk").git_enumeration)
+        self.assertEqual(projects.call_count, 1)
+
+    def test_west_projects(self):
+        write_file(self.ws, ".west/config", "[manifest]\npath = zephyr\nfile = west.yml\n")
+        write_file(
+            self.ws,
+            "zephyr/west.yml",
+            "manifest:\n  projects:\n"
+            "    - {name: hal, url: https://example.com/hal, path: modules/hal}\n"
+            "    - {name: cmsis, url: https://example.com/cmsis, path: modules/cmsis}\n",
+        )
+        self.assertEqual(gitscan.west_projects(self.ws), _PROJECTS)  # cmsis is not cloned
+        self.assertEqual(gitscan.west_projects(self.ws / "app"), [])
+
+
+class TestConfig(unittest.TestCase):
+    def test_enumeration(self):
+        self.assertEqual(EnvConfig({}).sync_enumeration, "auto")
+        self.assertEqual(EnvConfig({"sync": {"enumeration": "walk"}}).sync_enumeration, "walk")
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"enumeration": "git"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""Unit tests for west_env.ignore (gitignore-style exclusion rules)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import ignore, localcopy, syncindex
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES, WorkspaceSync
+
+_TREE = [
+    "README.md",
+    "app/src/main.c",
+    "app/debug.log",
+    "app/keep.log",
+    "app/build/zephyr.elf",
+    "docs/a.txt",
+    "docs/sub/b.txt",
+    "docs/sub/c.md",
+    "zephyr/kernel/sched.c",
+    "zephyr/kernel/sched.o",
+    "zephyr/out/gen.h",
+    "zephyr/scripts/out",
+    "zephyr/samples/x/gen/out.c",
+    "lib/foo/a/b/target.c",
+    "lib/foo/target.c",
+    "weird[1].c",
+]
+
+_ROOT_RULES = """\
+# comment
+*.log
+!keep.log
+/docs/*.txt
+build/
+lib/**/target.c
+weird\\[1\\].c
+"""
+
+_ZEPHYR_RULES = "*.o\nout/\n**/gen/\n"
+
+
+def _make_tree(root: Path):
+    for rel in _TREE:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel, encoding="utf-8")
+    (root / ".gitignore").write_text(_ROOT_RULES, encoding="utf-8")
+    (root / "zephyr" / ".gitignore").write_text(_ZEPHYR_RULES, encoding="utf-8")
+
+
+def _files(root, excludes):
+    return {rel for rel, _p, st in ignore.walk(root, excludes) if not Path(root, rel).is_dir()}
+
+
+class TestPatterns(unittest.TestCase):
+    def test_last_matching_rule_wins(self):
+        m = ignore.IgnoreMatcher(["*.log", "!keep.log", "keep.log"])
+        self.assertTrue(m.ignored("keep.log", False))
+        m = ignore.IgnoreMatcher(["*.log", "!keep.log"])
+        self.assertFalse(m.ignored("a/keep.log", False))
+        self.assertTrue(m.ignored("a/other.log", False))
+
+    def test_anchoring_and_directory_only(self):
+        m = ignore.IgnoreMatcher(["/build", "out/", "docs/*.txt"])
+        self.assertTrue(m.is_ignored("build", True))
+        self.assertFalse(m.is_ignored("app/build", True))
+        self.assertTrue(m.is_ignored("x/out/gen.h"))
+        self.assertFalse(m.is_ignored("x/out", False))  # a file named out
+        self.assertTrue(m.is_ignored("docs/a.txt"))
+        self.assertFalse(m.is_ignored("docs/sub/b.txt"))
+
+    def test_double_star(self):
+        m = ignore.IgnoreMatcher(["a/**/b", "**/gen", "logs/**"])
+        for rel in ("a/b", "a/x/b", "a/x/y/b", "gen", "q/r/gen", "logs/x/y"):
+            self.assertTrue(m.is_ignored(rel), rel)
+        self.assertFalse(m.is_ignored("logs", True))
+
+    def test_default_excludes_skip_generated_trees(self):
+        m = ignore.IgnoreMatcher(DEFAULT_EXCLUDES)
+        for rel in ("twister-out", "twister-out.2", "app/build-nrf52", "zephyr/build"):
+            self.assertTrue(m.is_ignored(rel, True), rel)
+        self.assertFalse(m.is_ignored("scripts/build-tools.py", False))
+
+
+class TestWalk(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name).resolve()
+        _make_tree(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @unittest.skipUnless(shutil.which("git"), "git required")
+    def test_matches_git_semantics(self):
+        subprocess.run(["git", "init", "-q", str(self.root)], check=True)
+        out = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+            cwd=self.root,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        expected = {p for p in out.split("\0") if p}
+        self.assertEqual(_files(self.root, ignore.IgnoreMatcher([".git"])), expected)
+
+    def test_ignored_directories_are_not_walked(self):
+        (self.root / "twister-out.1" / "deep").mkdir(parents=True)
+        scanned = []
+        real_scandir = ignore.os.scandir
+
+        def recording(path):
+            scanned.append(Path(path).name)
+            return real_scandir(path)
+
+        with patch("west_env.ignore.os.scandir", side_effect=recording):
+            list(ignore.walk(self.root, DEFAULT_EXCLUDES))
+        self.assertNotIn("twister-out.1", scanned)
+        self.assertNotIn("build", scanned)
+        self.assertNotIn("out", scanned)
+
+    def test_all_transfer_paths_ship_the_same_files(self):
+        expected = _files(self.root, DEFAULT_EXCLUDES)
+        self.assertEqual(set(syncindex.scan(self.root, DEFAULT_EXCLUDES)), expected)
+        with tempfile.TemporaryDirectory() as dst:
+            localcopy.copy_tree(self.root, dst, DEFAULT_EXCLUDES)
+            self.assertEqual({p.relative_to(dst).as_posix() for p in Path(dst).rglob("*") if p.is_file()}, expected)
+
+    @unittest.skipUnless(shutil.which("rsync"), "rsync required")
+    def test_rsync_filters_ship_the_same_files(self):
+        expected = _files(self.root, DEFAULT_EXCLUDES)
+        with tempfile.TemporaryDirectory() as dst:
+            subprocess.run(
+                ["rsync", "-a"] + ignore.rsync_args(self.root, DEFAULT_EXCLUDES) + [f"{self.root}/", dst],
+                check=True,
+            )
+            self.assertEqual({p.relative_to(dst).as_posix() for p in Path(dst).rglob("*") if p.is_file()}, expected)
+
+    def test_rsync_filters_order_nested_rules_first(self):
+        args = ignore.rsync_args(self.root, ["build"])
+        self.assertLess(args.index("--filter=- /zephyr/**/*.o"), args.index("--filter=+ keep.log"))
+        self.assertLess(args.index("--filter=+ keep.log"), args.index("--filter=- *.log"))
+        self.assertEqual(args[-1], "--filter=- build")
+
+
+class TestConfiguredRules(unittest.TestCase):
+    def test_sync_exclude_and_gitignore_switch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _make_tree(root)
+            (root / "app" / ".westenvignore").write_text("src/\n", encoding="utf-8")
+            cfg = EnvConfig({"sync": {"exclude": ["README.md"], "gitignore": False}})
+            ws = WorkspaceSync("sync", excludes=DEFAULT_EXCLUDES + cfg.sync_exclude, gitignore=cfg.sync_gitignore)
+            files = _files(root, ws.matcher)
+            self.assertNotIn("README.md", files)
+            self.assertNotIn("app/src/main.c", files)  # .westenvignore always applies
+            self.assertIn("app/debug.log", files)  # .gitignore switched off
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"exclude": "build"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
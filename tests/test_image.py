@@ -0,0 +1,186 @@
+"""Unit tests for west_env.image (digest lock, prefetch, pull policy)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import image, probecache, runspec
+from west_env.config import EnvConfig
+from west_env.engineapi import run_args_to_config
+
+_DIGEST = "sha256:" + "d" * 64
+
+
+def _make_registry_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/token"):
+                state["token_queries"].append(self.path)
+                body = json.dumps({"token": "t0k"}).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_response(404)
+                self.end_headers()
+
+        def do_HEAD(self):
+            port = self.server.server_address[1]
+            if self.path != "/v2/team/zephyr-env/manifests/latest":
+                self.send_response(404)
+                self.end_headers()
+            elif self.headers.get("Authorization") != "Bearer t0k":
+                self.send_response(401)
+                self.send_header(
+                    "WWW-Authenticate",
+                    f'Bearer realm="http://127.0.0.1:{port}/token",service="stand-in",'
+                    'scope="repository:team/zephyr-env:pull"',
+                )
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header("Docker-Content-Digest", _DIGEST)
+                self.end_headers()
+
+    return Handler
+
+
+class TestReferences(unittest.TestCase):
+    def test_parse_reference(self):
+        self.assertEqual(
+            image.parse_reference("ghcr.io/org/img:1.2"),
+            ("ghcr.io", "org/img", "1.2", None),
+        )
+        self.assertEqual(image.parse_reference("ubuntu"), ("registry-1.docker.io", "library/ubuntu", "latest", None))
+        self.assertEqual(
+            image.parse_reference("localhost:5000/a/b@" + _DIGEST),
+            ("localhost:5000", "a/b", None, _DIGEST),
+        )
+
+    def test_pinned_reference_drops_tag_but_keeps_port(self):
+        self.assertEqual(image.pinned_reference("localhost:5000/a/b:latest", _DIGEST), f"localhost:5000/a/b@{_DIGEST}")
+
+
+class TestRegistryDigest(unittest.TestCase):
+    def setUp(self):
+        self.state = {"token_queries": []}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _make_registry_handler(self.state))
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.ref = f"127.0.0.1:{self.server.server_address[1]}/team/zephyr-env:latest"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_resolves_digest_with_anonymous_token(self):
+        self.assertEqual(image.registry_digest(self.ref), _DIGEST)
+        self.assertIn("scope=repository%3Ateam%2Fzephyr-env%3Apull", self.state["token_queries"][0])
+
+    def test_unknown_tag_falls_back_to_engine(self):
+        ref = self.ref.replace(":latest", ":nope")
+        with patch("west_env.image.engine_digest", return_value=_DIGEST) as engine_digest:
+            self.assertEqual(image.resolve_digest("docker", ref), _DIGEST)
+        engine_digest.assert_called_once_with("docker", ref)
+
+    def test_lock_pins_runs_to_digest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ws = Path(tmp).resolve()
+            lock = image.write_lock(ws, "docker", self.ref)
+            self.assertTrue((ws / "west-env.lock").exists())
+            self.assertEqual(lock["pinned"], self.ref.replace(":latest", f"@{_DIGEST}"))
+
+            cfg = EnvConfig({"env": {"image": self.ref, "workspace_mode": "bind"}})
+            with patch("west_env.credentials.detect_strategy", return_value="none"):
+                spec = runspec.build(cfg, "docker", ws)
+            self.assertEqual(spec.image, lock["pinned"])
+
+            # A lock for a different image is ignored
+            self.assertIsNone(image.locked_reference(ws, "ghcr.io/other/img:latest"))
+
+
+class TestEngineDigest(unittest.TestCase):
+    def test_picks_matching_repo_digest(self):
+        digests = json.dumps(["mirror.local/x@sha256:000", f"ghcr.io/org/img@{_DIGEST}"])
+        with (
+            patch("west_env.image.subprocess.check_call"),
+            patch("west_env.image.subprocess.check_output", return_value=digests),
+        ):
+            self.assertEqual(image.engine_digest("podman", "ghcr.io/org/img:latest"), _DIGEST)
+
+
+class TestPresenceAndPolicy(unittest.TestCase):
+    def tearDown(self):
+        probecache.disable()
+
+    def test_presence_check_caches_only_positive_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            probecache.enable(Path(tmp) / "probes.json")
+            with patch("west_env.image._inspect", side_effect=[False, True, True]) as inspect:
+                self.assertFalse(image.is_present("docker", "img:1"))
+                self.assertTrue(image.is_present("docker", "img:1"))
+                self.assertTrue(image.is_present("docker", "img:1"))
+            self.assertEqual(inspect.call_count, 2)
+
+    def test_pull_policy_in_run_options(self):
+        spec = runspec.RunSpec("docker", "img", "/ws", "bind", pull="always")
+        self.assertIn("--pull=always", spec.options())
+        spec.prepared = True  # local snapshot images are never pulled
+        self.assertNotIn("--pull=always", spec.options())
+        self.assertEqual(runspec.RunSpec("docker", "img", "/ws", "bind").options(), [])
+        with self.assertRaises(ValueError):
+            runspec.RunSpec("docker", "img", "/ws", "bind", pull="sometimes").options()
+
+    def test_config_rejects_unknown_pull_policy(self):
+        with self.assertRaises(ValueError):
+            EnvConfig({"env": {"pull": "sometimes"}})
+
+    def test_api_driver_accepts_pull_never(self):
+        self.assertIsNotNone(run_args_to_config(["run", "--rm", "--pull=never", "img", "true"]))
+        self.assertIsNone(run_args_to_config(["run", "--rm", "--pull=always", "img", "true"]))
+
+
+@unittest.skipIf(sys.platform == "win32", "POSIX shell script engine")
+class TestPrefetch(unittest.TestCase):
+    def test_prefetch_runs_pull_in_background(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ws = Path(tmp)
+            fake_engine = ws / "fake-engine"
+            fake_engine.write_text('#!/bin/sh\nsleep 0.5\necho "pulled $2"\n', encoding="utf-8")
+            fake_engine.chmod(0o755)
+
+            start = time.monotonic()
+            pid = image.prefetch(ws, str(fake_engine), "img:2")
+            self.assertLess(time.monotonic() - start, 0.4)
+            self.assertTrue(image.prefetch_state(ws)["running"])
+            self.assertEqual(image.prefetch(ws, str(fake_engine), "img:2"), pid)  # no second pull
+
+            deadline = time.monotonic() + 5
+            while image.prefetch_state(ws)["running"] and time.monotonic() < deadline:
+                try:
+                    os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    pass
+                time.sleep(0.05)
+            self.assertFalse(image.prefetch_state(ws)["running"])
+            self.assertIn("pulled img:2", (ws / ".west" / "west-env-prefetch.log").read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
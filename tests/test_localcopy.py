@@ -0,0 +1,109 @@
+"""Unit tests for west_env.localcopy (parallel local tree copy)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import errno
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import localcopy
+from west_env.sync import DEFAULT_EXCLUDES, _rsync_to
+
+
+def _write(root: Path, rel: str, data: str = "x"):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(data, encoding="utf-8")
+    return path
+
+
+class TestCopyTree(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.src, self.dst = base / "src", base / "dst"
+        for i in range(200):  # several pool batches
+            _write(self.src, f"zephyr/drivers/d{i // 50}/f{i}.c", f"int f{i};")
+        _write(self.src, "app/prj.conf", "CONFIG_X=y")
+        _write(self.src, "build/zephyr.elf", "ELF")
+        (self.src / "app" / "empty").mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_copies_tree_and_prunes_excludes(self):
+        stats = localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES, workers=4)
+        self.assertEqual((stats.scanned, stats.copied), (201, 201))
+        self.assertEqual((self.dst / "zephyr/drivers/d3/f199.c").read_text(), "int f199;")
+        self.assertTrue((self.dst / "app" / "empty").is_dir())
+        self.assertFalse((self.dst / "build").exists())
+        src_st = (self.src / "app/prj.conf").stat()
+        self.assertEqual((self.dst / "app/prj.conf").stat().st_mtime_ns, src_st.st_mtime_ns)
+
+    def test_second_copy_skips_unchanged_files(self):
+        localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        path = _write(self.src, "app/prj.conf", "CONFIG_X=n")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+        stats = localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        self.assertEqual((stats.copied, stats.skipped), (1, 200))
+        self.assertEqual((self.dst / "app/prj.conf").read_text(), "CONFIG_X=n")
+
+    def test_delete_removes_extraneous_but_not_excluded(self):
+        localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        (self.src / "zephyr/drivers/d0/f0.c").unlink()
+        _write(self.dst, "stale/old.c")
+        _write(self.dst, "build/keep.o")
+        stats = localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES, delete=True)
+        self.assertEqual(stats.deleted, 2)
+        self.assertFalse((self.dst / "zephyr/drivers/d0/f0.c").exists())
+        self.assertFalse((self.dst / "stale").exists())
+        self.assertTrue((self.dst / "build/keep.o").exists())
+
+    def test_read_only_and_symlinked_destinations_are_replaced(self):
+        localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        target = self.dst / "app/prj.conf"
+        target.chmod(0o444)
+        other = _write(self.dst, "outside.txt", "do not touch")
+        victim = self.dst / "zephyr/drivers/d0/f1.c"
+        victim.unlink()
+        victim.symlink_to(other)
+        _write(self.src, "app/prj.conf", "CONFIG_Y=y")
+        _write(self.src, "zephyr/drivers/d0/f1.c", "int changed;")
+        localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        self.assertEqual(target.read_text(), "CONFIG_Y=y")
+        self.assertFalse(victim.is_symlink())
+        self.assertEqual(other.read_text(), "do not touch")
+
+    @unittest.skipIf(sys.platform == "win32", "symlinks need privileges on Windows")
+    def test_symlinks_are_recreated(self):
+        (self.src / "app" / "link.c").symlink_to("../zephyr/drivers/d0/f0.c")
+        localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        self.assertEqual(os.readlink(self.dst / "app" / "link.c"), "../zephyr/drivers/d0/f0.c")
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "kernel copy paths are Linux-only")
+    def test_falls_back_when_kernel_copy_is_unsupported(self):
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "cross-device")
+
+        with patch("fcntl.ioctl", side_effect=unsupported), patch("os.copy_file_range", side_effect=unsupported):
+            localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        self.assertEqual((self.dst / "zephyr/drivers/d1/f60.c").read_text(), "int f60;")
+
+    def test_rsync_fallback_deletes(self):
+        localcopy.copy_tree(self.src, self.dst, DEFAULT_EXCLUDES)
+        _write(self.dst, "stale.c")
+        with patch("west_env.sync.shutil.which", return_value=None):
+            _rsync_to(self.src, str(self.dst), DEFAULT_EXCLUDES)
+        self.assertFalse((self.dst / "stale.c").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""Unit tests for west_env.modstore (shared module store)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import shutil
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from tests.test_gitscan import _git
+from west_env import modstore, syncindex
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES, WorkspaceSync
+
+_PROJECTS = ["modules/hal", "zephyr"]
+
+
+def _tree(root: Path, store: Path = None, prefix: str = "") -> dict:
+    """Return ``{rel: bytes}`` for the files under *root*.
+
+    Links to ``/store/<key>`` are followed into *store*, as in a container.
+    """
+    tree = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in (".git", ".west")]
+        for name in dirnames + filenames:
+            path = Path(dirpath) / name
+            rel = prefix + path.relative_to(root).as_posix()
+            if path.is_symlink() and os.readlink(path).startswith(modstore.STORE_MOUNT + "/"):
+                tree.update(_tree(store / os.path.basename(os.readlink(path)), store, rel + "/"))
+            elif name in filenames:
+                tree[rel] = path.read_bytes()
+    return tree
+
+
+@unittest.skipIf(shutil.which("git") is None or sys.platform == "win32", "git and a POSIX shell required")
+class TestModuleStore(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ws = self.base / "ws"
+        self.store = self.volumes / modstore.STORE_VOLUME
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x;")
+        write_file(self.ws, "zephyr/.gitignore", "*.o\n")
+        write_file(self.ws, "modules/hal/drv.c", "int d;")
+        write_file(self.ws, "app/src/main.c", "int main;")
+        for project in _PROJECTS:
+            _git(self.ws / project, "init", "-q")
+            _git(self.ws / project, "add", "-A")
+            _git(self.ws / project, "commit", "-qm", "initial")
+
+    def _sync(self, ws=None, volume="ws-vol", **kwargs):
+        ws = ws or self.ws
+        kwargs.setdefault("module_store", True)
+        stats = syncindex.sync(str(self.engine), volume, ws, DEFAULT_EXCLUDES, projects=_PROJECTS, **kwargs)
+        expected = {rel: data for rel, data in _tree(ws).items() if not rel.endswith(".o")}
+        actual = _tree(self.volumes / volume, self.store)
+        self.assertTrue((self.volumes / volume / syncindex.OWNER_FILE).is_file())
+        self.assertEqual(actual, expected)
+        return stats
+
+    def _entries(self) -> list:
+        return sorted(p.name for p in self.store.iterdir())
+
+    def test_clean_projects_are_linked_to_the_store(self):
+        stats = self._sync()
+        self.assertEqual(stats.store_projects, 2)
+        self.assertEqual(stats.bytes_sent, len("int main;"))  # only the non-project files
+        self.assertIn("module store: 2 projects", stats.summary())
+        link = self.volumes / "ws-vol" / "zephyr"
+        self.assertTrue(link.is_symlink())
+        head = _git(self.ws / "zephyr", "rev-parse", "HEAD")
+        self.assertTrue(
+            os.readlink(link).endswith("/" + modstore.shareable(self.ws, DEFAULT_EXCLUDES, ["zephyr"])["zephyr"])
+        )
+        self.assertTrue(os.path.basename(os.readlink(link)).startswith(head + "-"))
+        self.assertEqual(len(self._entries()), 2)
+        self.assertNotIn("zephyr/kernel/sched.c", syncindex.load_index(self.ws)["files"])
+
+    def test_second_workspace_at_the_same_revisions_sends_nothing_for_them(self):
+        self._sync()
+        other = self.base / "other"
+        shutil.copytree(self.ws, other, symlinks=True, ignore=shutil.ignore_patterns(".west"))
+        stats = self._sync(other, "other-vol")
+        self.assertEqual((stats.store_projects, stats.store_bytes), (2, 0))
+        self.assertEqual(len(self._entries()), 2)
+
+    def test_no_op_sync_does_not_query_the_store(self):
+        self._sync()
+        log = self.volumes / "calls.log"
+        log.unlink()
+        self._sync()
+        self.assertNotIn("run --rm", log.read_text())
+
+    def test_modified_project_gets_a_private_copy_until_clean(self):
+        self._sync()
+        write_file(self.ws, "zephyr/kernel/sched.c", "int y;")
+        stats = self._sync()
+        self.assertEqual(stats.store_projects, 1)
+        self.assertFalse((self.volumes / "ws-vol" / "zephyr").is_symlink())
+        self.assertIn("zephyr/kernel/sched.c", syncindex.load_index(self.ws)["files"])
+
+        _git(self.ws / "zephyr", "checkout", "-q", "--", ".")
+        stats = self._sync()
+        self.assertEqual(stats.store_projects, 2)
+        self.assertTrue((self.volumes / "ws-vol" / "zephyr").is_symlink())
+        self.assertNotIn("zephyr/kernel/sched.c", syncindex.load_index(self.ws)["files"])
+
+    def test_new_revision_gets_a_new_entry(self):
+        self._sync()
+        write_file(self.ws, "zephyr/kernel/timer.c", "int t;")
+        _git(self.ws / "zephyr", "add", "-A")
+        _git(self.ws / "zephyr", "commit", "-qm", "timer")
+        stats = self._sync()
+        self.assertEqual(stats.store_bytes, len("int x;") + len("*.o\n") + len("int t;"))
+        self.assertEqual(len(self._entries()), 3)  # old entries stay for other workspaces
+
+    def test_ignored_and_untracked_ignored_files_stay_out(self):
+        write_file(self.ws, "zephyr/kernel/sched.o", "OBJ")  # ignored: the project stays clean
+        self._sync()
+        self.assertTrue((self.volumes / "ws-vol" / "zephyr").is_symlink())
+        self.assertFalse((self.volumes / "ws-vol" / "zephyr/kernel/sched.o").exists())
+
+    def test_nested_projects_are_not_shared(self):
+        write_file(self.ws, "zephyr/sub/x.c", "int s;")
+        _git(self.ws / "zephyr", "add", "-A")
+        _git(self.ws / "zephyr", "commit", "-qm", "sub")
+        self.assertEqual(
+            sorted(modstore.shareable(self.ws, DEFAULT_EXCLUDES, _PROJECTS + ["zephyr/sub"])), ["modules/hal"]
+        )
+
+    def test_turning_the_store_off_replaces_links_with_copies(self):
+        self._sync()
+        self._sync(module_store=False)
+        self.assertFalse((self.volumes / "ws-vol" / "zephyr").is_symlink())
+        self.assertNotIn("store", syncindex.load_index(self.ws))
+
+    def test_recreated_store_is_repopulated(self):
+        self._sync()
+        shutil.rmtree(self.store)
+        stats = self._sync(full=False)
+        self.assertEqual(len(self._entries()), 2)
+        self.assertGreater(stats.store_bytes, 0)
+
+
+class TestModuleStoreConfig(unittest.TestCase):
+    def test_volume_args_mount_the_store_read_only(self):
+        args = WorkspaceSync(workspace_mode="sync", module_store=True).volume_args(Path("/ws"), "docker")
+        self.assertEqual(args[-2:], ["-v", f"{modstore.STORE_VOLUME}:/store:ro"])
+        args = WorkspaceSync(workspace_mode="sync", module_store=True, gitignore=False).volume_args(
+            Path("/ws"), "docker"
+        )
+        self.assertNotIn(f"{modstore.STORE_VOLUME}:/store:ro", args)
+        self.assertEqual(len(WorkspaceSync(workspace_mode="sync").volume_args(Path("/ws"), "docker")), 2)
+
+    def test_sync_options(self):
+        ws = WorkspaceSync(workspace_mode="sync", module_store=True)
+        self.assertTrue(ws.sync_options("docker", "vol", Path("/nonexistent"))["module_store"])
+
+    def test_config(self):
+        self.assertFalse(EnvConfig({}).sync_module_store)
+        self.assertTrue(EnvConfig({"sync": {"module_store": True}}).sync_module_store)
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"module_store": "yes"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
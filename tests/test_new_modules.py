@@ -67,6 +67,12 @@ class TestCacheVolumeArgs(unittest.TestCase):
         self.assertTrue(any("sdk" in a for a in args))
         self.assertTrue(any("pip" in a for a in args))
 
+    def test_pycache_flag_adds_volume_and_prefix(self):
+        cm = CacheManager("docker")
+        args = cm.volume_args(pycache=True)
+        self.assertIn(f"{_VOLUME_NAMES['pycache']}:/root/.cache/pycache", args)
+        self.assertIn("PYTHONPYCACHEPREFIX=/root/.cache/pycache", args)
+
 
 class TestCacheReset(unittest.TestCase):
     def test_reset_unknown_target_raises(self):
@@ -95,6 +101,28 @@ class TestCacheReset(unittest.TestCase):
             cm.reset("ccache")
         self.assertEqual(calls, [_VOLUME_NAMES["ccache"]])
 
+    def test_reset_pycache_only_removes_pycache(self):
+        cm = CacheManager("docker")
+        calls = []
+        with (
+            patch.object(cm, "_volume_exists", return_value=True),
+            patch.object(cm, "_remove_volume", side_effect=lambda v: calls.append(v)),
+        ):
+            cm.reset("pycache")
+        self.assertEqual(calls, [_VOLUME_NAMES["pycache"]])
+
+    def test_stats_reports_pycache_file_count(self):
+        cm = CacheManager("docker")
+        with (
+            patch.object(cm, "_volume_exists", return_value=True),
+            patch.object(cm, "_volume_size", return_value=1024),
+            patch.object(cm, "_ccache_stats", return_value={}),
+            patch("west_env.cache.subprocess.check_output", return_value="1234\n"),
+        ):
+            data = cm.stats()
+        self.assertEqual(data["pycache"]["volume"], _VOLUME_NAMES["pycache"])
+        self.assertEqual(data["pycache_files"], 1234)
+
 
 class TestCacheVolumeArgsFromConfig(unittest.TestCase):
     def test_reads_flags_from_config(self):
@@ -0,0 +1,158 @@
+"""Unit tests for west_env.probecache."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import probecache
+from west_env.probecache import ProbeCache, binary_fingerprint, cached
+
+
+class _CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self._tmp.name) / "probes.json"
+
+    def tearDown(self):
+        probecache.disable()
+        self._tmp.cleanup()
+
+
+class TestProbeCache(_CacheTestCase):
+    def test_put_then_get_hits(self):
+        cache = ProbeCache(self.cache_path)
+        cache.put("k", "fp", "value")
+        self.assertEqual(cache.get("k", "fp"), (True, "value"))
+
+    def test_persists_across_instances(self):
+        ProbeCache(self.cache_path).put("k", "fp", ["a", 1])
+        self.assertEqual(ProbeCache(self.cache_path).get("k", "fp"), (True, ["a", 1]))
+
+    def test_fingerprint_mismatch_is_miss(self):
+        cache = ProbeCache(self.cache_path)
+        cache.put("k", "fp-old", "value")
+        self.assertEqual(cache.get("k", "fp-new"), (False, None))
+
+    def test_expired_entry_is_miss(self):
+        cache = ProbeCache(self.cache_path, ttl=10)
+        with patch("west_env.probecache.time.time", return_value=1000.0):
+            cache.put("k", "fp", "value")
+        with patch("west_env.probecache.time.time", return_value=1011.0):
+            self.assertEqual(cache.get("k", "fp"), (False, None))
+
+    def test_refresh_ignores_existing_entries(self):
+        ProbeCache(self.cache_path).put("k", "fp", "value")
+        self.assertEqual(ProbeCache(self.cache_path, refresh=True).get("k", "fp"), (False, None))
+
+    def test_corrupt_file_is_treated_as_empty(self):
+        self.cache_path.write_text("{not json", encoding="utf-8")
+        self.assertEqual(ProbeCache(self.cache_path).keys(), [])
+
+
+class TestCachedHelper(_CacheTestCase):
+    def test_disabled_cache_always_computes(self):
+        calls = []
+        cached("k", "fp", lambda: calls.append(1))
+        cached("k", "fp", lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+    def test_enabled_cache_computes_once(self):
+        probecache.enable(self.cache_path)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "v"
+
+        self.assertEqual(cached("k", "fp", compute), "v")
+        self.assertEqual(cached("k", "fp", compute), "v")
+        self.assertEqual(len(calls), 1)
+
+    def test_cache_if_skips_storing(self):
+        probecache.enable(self.cache_path)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return False
+
+        cached("k", "fp", compute, cache_if=bool)
+        cached("k", "fp", compute, cache_if=bool)
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_validation_recomputes(self):
+        probecache.enable(self.cache_path)
+        cached("k", "fp", lambda: "stale")
+        self.assertEqual(cached("k", "fp", lambda: "fresh", validate=lambda v: v != "stale"), "fresh")
+
+    def test_binary_fingerprint_changes_with_path(self):
+        with patch.dict("os.environ", {"PATH": "/a"}):
+            fp_a = binary_fingerprint("no-such-binary-xyz")
+        with patch.dict("os.environ", {"PATH": "/b"}):
+            fp_b = binary_fingerprint("no-such-binary-xyz")
+        self.assertNotEqual(fp_a, fp_b)
+
+
+class TestProbeConsumers(_CacheTestCase):
+    def test_binary_version_shells_out_once(self):
+        from west_env.backend import _binary_version
+
+        probecache.enable(self.cache_path)
+        with (
+            patch("west_env.backend.which", return_value="/usr/bin/docker"),
+            patch("west_env.backend.subprocess.check_output", return_value="Docker version 24.0.0\n") as co,
+        ):
+            self.assertEqual(_binary_version("docker"), "Docker version 24.0.0")
+            self.assertEqual(_binary_version("docker"), "Docker version 24.0.0")
+        self.assertEqual(co.call_count, 1)
+
+    def test_detect_strategy_is_cached(self):
+        from west_env import credentials
+
+        probecache.enable(self.cache_path)
+        with (
+            patch("west_env.credentials._ssh_agent_socket", return_value=None),
+            patch("west_env.credentials._git_credential_manager_installed", return_value=True) as gcm,
+        ):
+            self.assertEqual(credentials.detect_strategy(), "credential-manager")
+            self.assertEqual(credentials.detect_strategy(), "credential-manager")
+        self.assertEqual(gcm.call_count, 1)
+
+    def test_find_jlink_exe_revalidates_cached_path(self):
+        from west_env import flash
+
+        probecache.enable(self.cache_path)
+        exe = Path(self._tmp.name) / "JLinkExe"
+        exe.write_text("", encoding="utf-8")
+        with patch("west_env.flash.which", return_value=str(exe)):
+            self.assertEqual(flash.find_jlink_exe(), exe)
+        exe.unlink()
+        with patch("west_env.flash.which", return_value=None), patch("west_env.flash.sys.platform", "linux"):
+            self.assertIsNone(flash.find_jlink_exe())
+
+    def test_find_jlink_exe_does_not_cache_not_found(self):
+        from west_env import flash
+
+        probecache.enable(self.cache_path)
+        exe = Path(self._tmp.name) / "JLinkExe"
+        with patch("west_env.flash.which", return_value=None), patch("west_env.flash.sys.platform", "linux"):
+            self.assertIsNone(flash.find_jlink_exe())
+        exe.write_text("", encoding="utf-8")  # installed outside PATH, e.g. /opt/SEGGER/JLink
+        with (
+            patch("west_env.flash.which", return_value=None),
+            patch("west_env.flash._JLINK_SEARCH_PATHS_LINUX", [self._tmp.name]),
+            patch("west_env.flash.sys.platform", "linux"),
+        ):
+            self.assertEqual(flash.find_jlink_exe(), exe)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Unit tests for west_env.resources (host-aware container limits)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import runspec
+from west_env.config import EnvConfig
+from west_env.engineapi import run_args_to_config
+from west_env.resources import build_jobs, format_size, parse_size, resolve
+
+GiB = 1024**3
+_CAPACITY = {"cpus": 8, "memory": 16 * GiB, "source": "docker info"}
+
+
+class TestSizes(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("12g"), 12 * GiB)
+        self.assertEqual(parse_size("512MB"), 512 * 1024**2)
+        self.assertEqual(parse_size(1024), 1024)
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+    def test_format_size(self):
+        self.assertEqual(format_size(12 * GiB), "12g")
+        self.assertEqual(format_size(1536 * 1024**2), "1536m")
+
+
+class TestResolve(unittest.TestCase):
+    def test_none_policy_has_no_limits(self):
+        limits = resolve({"policy": "none"}, "docker")
+        self.assertEqual(limits.run_args(), [])
+        self.assertEqual(limits.env(), {})
+
+    def test_auto_sizes_from_engine_capacity(self):
+        with patch("west_env.resources.engine_capacity", return_value=_CAPACITY):
+            limits = resolve({"policy": "auto"}, "docker", "build", backend="docker-native")
+        self.assertEqual(limits.cpus, 7)  # one core left for the native host
+        self.assertEqual(limits.memory, int(16 * GiB * 0.85) // 1024**2 * 1024**2)
+        self.assertEqual(limits.shm_size, 2 * GiB)
+        self.assertEqual(limits.jobs, 7)
+        args = limits.run_args()
+        self.assertEqual(args[args.index("--cpus") + 1], "7")
+        self.assertIn("--pids-limit", args)
+
+    def test_vm_backend_uses_all_vm_cpus(self):
+        with patch("west_env.resources.engine_capacity", return_value=_CAPACITY):
+            limits = resolve({"policy": "auto"}, "podman", backend="podman-machine-hyperv")
+        self.assertEqual(limits.cpus, 8)
+
+    def test_explicit_and_per_action_overrides(self):
+        settings = {"policy": "explicit", "cpus": 4, "memory": "8g", "actions": {"build": {"cpus": 6}}}
+        self.assertEqual(resolve(settings, "docker", "shell").cpus, 4)
+        build = resolve(settings, "docker", "build")
+        self.assertEqual(build.cpus, 6)
+        self.assertEqual(build.jobs, 6)
+        self.assertIsNone(build.pids_limit)
+
+    def test_jobs_capped_by_memory(self):
+        self.assertEqual(build_jobs(16, 4 * GiB), 4)
+        self.assertEqual(build_jobs(2, 64 * GiB), 2)
+
+    def test_engine_info_parsing(self):
+        from west_env.resources import _engine_capacity_uncached
+
+        podman = json.dumps({"host": {"cpus": 4, "memTotal": 8 * GiB}})
+        with patch("west_env.resources.subprocess.check_output", return_value=podman):
+            self.assertEqual(_engine_capacity_uncached("podman")["cpus"], 4)
+        docker = json.dumps({"NCPU": 12, "MemTotal": 32 * GiB})
+        with patch("west_env.resources.subprocess.check_output", return_value=docker):
+            self.assertEqual(_engine_capacity_uncached("docker")["memory"], 32 * GiB)
+
+
+class TestConfigAndRunSpec(unittest.TestCase):
+    def test_shorthand_and_validation(self):
+        self.assertEqual(EnvConfig({"resources": "auto"}).resources["policy"], "auto")
+        self.assertEqual(EnvConfig({}).resources["policy"], "none")
+        with self.assertRaises(ValueError):
+            EnvConfig({"resources": {"policy": "greedy"}})
+        with self.assertRaises(ValueError):
+            EnvConfig({"resources": {"policy": "explicit", "actions": {"build": {"gpus": 1}}}})
+
+    def test_runspec_applies_limits_and_parallelism(self):
+        cfg = EnvConfig(
+            {
+                "env": {"image": "img", "workspace_mode": "bind"},
+                "resources": {"policy": "explicit", "cpus": 4, "memory": "8g", "shm_size": "1g"},
+            }
+        )
+        cfg.action = "build"
+        with tempfile.TemporaryDirectory() as tmp, patch("west_env.credentials.detect_strategy", return_value="none"):
+            spec = runspec.build(cfg, "docker", Path(tmp))
+        options = spec.options()
+        self.assertEqual(options[options.index("--memory") + 1], "8g")
+        self.assertEqual(options[options.index("--shm-size") + 1], "1g")
+        self.assertEqual(spec.env["CMAKE_BUILD_PARALLEL_LEVEL"], "4")
+        self.assertEqual(spec.limits["memory"], "8g")
+
+    def test_api_driver_translates_limits(self):
+        config, _ = run_args_to_config(
+            ["run", "--rm", "--cpus", "1.5", "--memory", "2g", "--pids-limit", "100", "img", "true"]
+        )
+        host = config["HostConfig"]
+        self.assertEqual(host["NanoCpus"], 1_500_000_000)
+        self.assertEqual(host["Memory"], 2 * GiB)
+        self.assertEqual(host["PidsLimit"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
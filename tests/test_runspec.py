@@ -0,0 +1,125 @@
+"""Unit tests for west_env.runspec (container run spec composition)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import runspec
+from west_env.config import EnvConfig
+from west_env.container import _container_args
+from west_env.runspec import RunSpec, compose
+
+_SSH_ARGS = ["-v", "/run/agent.sock:/tmp/ssh-agent.sock:ro", "-e", "SSH_AUTH_SOCK=/tmp/ssh-agent.sock"]
+
+
+def _cfg(**sections):
+    data = {"env": {"backend": "docker-native", "workspace_mode": "bind", "image": "ghcr.io/example/image:latest"}}
+    data.update(sections)
+    return EnvConfig(data)
+
+
+class _RunSpecTestCase(unittest.TestCase):
+    def setUp(self):
+        runspec.reset()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self._tmp.name).resolve()
+        patcher = patch("west_env.credentials.container_args", return_value=list(_SSH_ARGS))
+        self.creds = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        runspec.reset()
+        self._tmp.cleanup()
+
+
+class TestCompose(_RunSpecTestCase):
+    def test_merges_workspace_cache_and_credentials(self):
+        spec = compose(_cfg(cache={"ccache": True, "pip": True}), "docker", self.workspace)
+        self.assertEqual(spec.volumes[0], f"{self.workspace}:/work")
+        self.assertIn("west-env-cache-ccache:/root/.cache/ccache", spec.volumes)
+        self.assertIn("west-env-cache-pip:/root/.cache/pip", spec.volumes)
+        self.assertIn("/run/agent.sock:/tmp/ssh-agent.sock:ro", spec.volumes)
+        self.assertEqual(spec.env["CCACHE_DIR"], "/root/.cache/ccache")
+        self.assertEqual(spec.env["SSH_AUTH_SOCK"], "/tmp/ssh-agent.sock")
+        self.assertEqual(spec.env["PYTHONPATH"], "/work/modules/west-env")
+
+    def test_pycache_volume_replaces_dont_write_bytecode(self):
+        spec = compose(_cfg(cache={"pycache": True}), "docker", self.workspace)
+        self.assertEqual(spec.env["PYTHONPYCACHEPREFIX"], "/root/.cache/pycache")
+        self.assertNotIn("PYTHONDONTWRITEBYTECODE", spec.env)
+        self.assertEqual(compose(_cfg(), "docker", self.workspace).env["PYTHONDONTWRITEBYTECODE"], "1")
+
+    def test_volume_modes_mount_named_volume(self):
+        cfg = _cfg()
+        cfg.workspace_mode = "tmpfs"
+        spec = compose(cfg, "podman", self.workspace)
+        self.assertTrue(spec.volumes[0].startswith("west-env-ws-"))
+        self.assertEqual(spec.mounts, ["type=tmpfs,destination=/work/build"])
+
+    def test_workdir_follows_host_cwd(self):
+        (self.workspace / "app").mkdir()
+        spec = compose(_cfg(), "docker", self.workspace, self.workspace / "app")
+        self.assertEqual(spec.workdir, "/work/app")
+        self.assertEqual(compose(_cfg(), "docker", self.workspace).workdir, "/work")
+
+    def test_composed_once_per_config(self):
+        cfg = _cfg()
+        first = compose(cfg, "docker", self.workspace)
+        self.assertIs(compose(cfg, "docker", self.workspace), first)
+        self.assertEqual(self.creds.call_count, 1)
+        self.assertIsNot(compose(_cfg(), "docker", self.workspace), first)
+
+    def test_options_round_trip_through_add_args(self):
+        spec = compose(_cfg(cache={"ccache": True}), "docker", self.workspace)
+        copy = RunSpec(spec.engine, spec.image, spec.workspace, spec.workspace_mode)
+        copy.session_limits = spec.session_limits
+        copy.add_args(spec.options())
+        self.assertEqual(copy.options(), spec.options())
+        self.assertEqual(copy.fingerprint(), spec.fingerprint())
+
+    def test_fingerprint_ignores_workdir(self):
+        (self.workspace / "app").mkdir()
+        cfg = _cfg()
+        a = compose(cfg, "docker", self.workspace)
+        b = compose(cfg, "docker", self.workspace, self.workspace / "app")
+        self.assertEqual(a.fingerprint(), b.fingerprint())
+
+    def test_fingerprint_ignores_per_action_limits(self):
+        resources = {"policy": "explicit", "cpus": 4, "actions": {"build": {"cpus": 8, "memory": "12g"}}}
+        session_cfg, build_cfg = _cfg(resources=resources), _cfg(resources=resources)
+        session_cfg.action, build_cfg.action = "session", "build"
+        started = compose(session_cfg, "docker", self.workspace)
+        build = compose(build_cfg, "docker", self.workspace)
+        self.assertIn("--memory", build.options())
+        self.assertEqual(build.action_env(), {"CMAKE_BUILD_PARALLEL_LEVEL": "8"})
+        self.assertEqual(build.fingerprint(), started.fingerprint())
+
+        resources = dict(resources, cpus=2)  # the session's own limits changed
+        changed = _cfg(resources=resources)
+        changed.action = "build"
+        self.assertNotEqual(compose(changed, "docker", self.workspace).fingerprint(), started.fingerprint())
+
+
+class TestContainerArgsUseRunSpec(_RunSpecTestCase):
+    def test_build_run_gets_cache_and_credential_mounts(self):
+        engine = Mock(name="engine")
+        engine.name = "docker"
+        with patch("west_env.container.get_engine", return_value=(engine, False)):
+            _, _, args = _container_args(
+                _cfg(cache={"ccache": True}), ["west", "build"], workspace=self.workspace, host_cwd=self.workspace
+            )
+        self.assertIn("west-env-cache-ccache:/root/.cache/ccache", args)
+        self.assertIn("SSH_AUTH_SOCK=/tmp/ssh-agent.sock", args)
+        self.assertLess(args.index("SSH_AUTH_SOCK=/tmp/ssh-agent.sock"), args.index("ghcr.io/example/image:latest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
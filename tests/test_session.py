@@ -0,0 +1,190 @@
+"""Unit tests for west_env.session (long-lived build session containers)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import session
+from west_env.config import EnvConfig
+from west_env.container import run_container
+
+
+def _cfg(**session_cfg):
+    data = {
+        "env": {
+            "type": "container",
+            "container": {"engine": "docker", "image": "ghcr.io/example/image:latest"},
+        }
+    }
+    if session_cfg:
+        data["session"] = session_cfg
+    return EnvConfig(data)
+
+
+class _SessionTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self._tmp.name).resolve()
+        self.engine = Mock(name="engine")
+        self.engine.name = "docker"
+        patcher = patch("west_env.container.get_engine", return_value=(self.engine, False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _marker(self):
+        return json.loads((self.workspace / ".west" / "west-env-session.json").read_text())
+
+
+class TestSessionLifecycle(_SessionTestCase):
+    def test_start_runs_detached_named_container_and_writes_marker(self):
+        with (
+            patch("west_env.session._is_running", return_value=False),
+            patch("west_env.session.subprocess.check_call") as check_call,
+            patch("sys.stdout"),
+        ):
+            name = session.start(_cfg(idle_timeout=600), self.workspace)
+
+        args = check_call.call_args.args[0]
+        self.assertEqual(args[:4], ["docker", "run", "-d", "--rm"])
+        self.assertEqual(args[args.index("--name") + 1], name)
+        self.assertIn(f"{self.workspace}:/work", args)
+        self.assertIn("-ge 600", args[-1])
+        self.assertIn("safe.directory", args[-1])
+        marker = self._marker()
+        self.assertEqual(marker["name"], name)
+        self.assertEqual(marker["idle_timeout"], 600)
+
+    def test_start_is_idempotent_when_spec_matches(self):
+        with (
+            patch("west_env.session._is_running", return_value=False),
+            patch("west_env.session.subprocess.check_call"),
+            patch("sys.stdout"),
+        ):
+            session.start(_cfg(), self.workspace)
+        with (
+            patch("west_env.session._is_running", return_value=True),
+            patch("west_env.session.subprocess.check_call") as check_call,
+            patch("sys.stdout"),
+        ):
+            session.start(_cfg(), self.workspace)
+        check_call.assert_not_called()
+
+    def test_stop_removes_container_and_marker(self):
+        with (
+            patch("west_env.session._is_running", return_value=False),
+            patch("west_env.session.subprocess.check_call"),
+            patch("sys.stdout"),
+        ):
+            name = session.start(_cfg(), self.workspace)
+        with patch("west_env.session.subprocess.call") as call, patch("sys.stdout"):
+            session.stop(_cfg(), self.workspace)
+        self.assertEqual(call.call_args.args[0], ["docker", "rm", "-f", name])
+        self.assertFalse((self.workspace / ".west" / "west-env-session.json").exists())
+
+    def test_session_names_differ_per_workspace(self):
+        self.assertNotEqual(session.session_name(Path("/a/ws")), session.session_name(Path("/b/ws")))
+
+    def test_config_rejects_invalid_idle_timeout(self):
+        with self.assertRaises(ValueError):
+            _cfg(idle_timeout=0)
+
+
+class TestRunContainerUsesSession(_SessionTestCase):
+    def _start(self, cfg):
+        with (
+            patch("west_env.session._is_running", return_value=False),
+            patch("west_env.session.subprocess.check_call"),
+            patch("sys.stdout"),
+        ):
+            return session.start(cfg, self.workspace)
+
+    def _run(self, cfg, running=True):
+        with (
+            patch("west_env.container._west_topdir", return_value=str(self.workspace)),
+            patch("west_env.container.Path.cwd", return_value=self.workspace / "app"),
+            patch("west_env.session._is_running", return_value=running),
+            patch("west_env.container.subprocess.check_call") as check_call,
+            patch("sys.stdout"),
+        ):
+            run_container(cfg, ["west", "build", "-b", "native_sim"])
+        return check_call
+
+    def test_without_session_uses_one_shot_run(self):
+        with patch("west_env.session._is_running") as is_running:
+            self._run(_cfg())
+        is_running.assert_not_called()  # no marker, no engine query
+        self.engine.run.assert_called_once()
+
+    def test_running_session_uses_exec(self):
+        cfg = _cfg()
+        name = self._start(cfg)
+        check_call = self._run(cfg)
+        args = check_call.call_args.args[0]
+        self.assertEqual(args[:4], ["docker", "exec", "-w", "/work/app"])
+        self.assertIn(name, args)
+        self.assertEqual(args[-4:], ["west", "build", "-b", "native_sim"])
+        self.engine.run.assert_not_called()
+
+    def test_per_action_limits_do_not_make_the_session_stale(self):
+        resources = {"policy": "explicit", "cpus": 4, "actions": {"build": {"cpus": 8}}}
+        cfg = EnvConfig(
+            {
+                "env": {"type": "container", "container": {"engine": "docker", "image": "img:1"}},
+                "resources": resources,
+            }
+        )
+        cfg.action = "session"
+        self._start(cfg)
+        cfg.action = "build"
+        args = self._run(cfg).call_args.args[0]
+        self.assertEqual(args[1:6], ["exec", "-w", "/work/app", "-e", "CMAKE_BUILD_PARALLEL_LEVEL=8"])
+        self.engine.run.assert_not_called()
+
+    def test_reaped_session_falls_back_and_clears_marker(self):
+        cfg = _cfg()
+        self._start(cfg)
+        self._run(cfg, running=False)
+        self.engine.run.assert_called_once()
+        self.assertFalse((self.workspace / ".west" / "west-env-session.json").exists())
+
+    def test_stale_session_falls_back_to_run(self):
+        self._start(_cfg())
+        other = _cfg()
+        other.image = "ghcr.io/example/other:1"
+        self._run(other)
+        self.engine.run.assert_called_once()
+
+
+@unittest.skipUnless(shutil.which("sh"), "POSIX shell required")
+class TestExecWrapper(unittest.TestCase):
+    def test_wrapper_preserves_exit_code_and_arguments(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = session._EXEC_WRAPPER.replace("/tmp/.west-env", f"{tmp}/.west-env")
+            Path(tmp, ".west-env-busy").mkdir()
+            result = subprocess.run(
+                ["sh", "-c", script, "sh", "sh", "-c", 'printf "%s" "$1"; exit 7', "x", "a b"],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 7)
+            self.assertEqual(result.stdout, "a b")
+            self.assertEqual(list(Path(tmp, ".west-env-busy").iterdir()), [])
+            self.assertTrue(Path(tmp, ".west-env-activity").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Unit tests for west_env.snapshot (warm environment snapshot images)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import probecache, runspec, snapshot
+from west_env.config import EnvConfig
+from west_env.container import _container_args
+
+_IMAGE = "ghcr.io/example/image:latest"
+
+
+class FakeCLI:
+    """Just enough of the docker CLI for snapshot builds."""
+
+    def __init__(self):
+        self.images = {_IMAGE: "sha256:" + "a" * 64}
+        self.calls = []
+
+    def check_output(self, cmd, **kwargs):
+        self.calls.append(cmd)
+        ref = cmd[-1]
+        if cmd[1:3] == ["image", "inspect"] and ref in self.images:
+            return self.images[ref] + "\n"
+        raise subprocess.CalledProcessError(1, cmd)
+
+    def check_call(self, cmd, **kwargs):
+        self.calls.append(cmd)
+        if cmd[1] == "commit":
+            self.images[cmd[3]] = "sha256:" + "c" * 64
+        return 0
+
+    def call(self, cmd, **kwargs):
+        self.calls.append(cmd)
+        if cmd[1] == "rmi":
+            self.images.pop(cmd[2], None)
+        return 0
+
+    def patches(self):
+        return [
+            patch("west_env.snapshot.subprocess.check_output", side_effect=self.check_output),
+            patch("west_env.snapshot.subprocess.check_call", side_effect=self.check_call),
+            patch("west_env.snapshot.subprocess.call", side_effect=self.call),
+        ]
+
+
+class _SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        runspec.reset()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self._tmp.name).resolve()
+        (self.workspace / "west-env.yml").write_text("env:\n  image: x\n", encoding="utf-8")
+        self.cli = FakeCLI()
+        for p in self.cli.patches() + [patch("west_env.credentials.detect_strategy", return_value="none")]:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        runspec.reset()
+        self._tmp.cleanup()
+
+    def _spec(self, cfg=None):
+        cfg = cfg or EnvConfig({"env": {"workspace_mode": "bind", "image": _IMAGE, "backend": "docker-native"}})
+        return runspec.build(cfg, "docker", self.workspace)
+
+
+class TestSnapshotBuild(_SnapshotTestCase):
+    def test_tag_combines_base_id_and_config_hash(self):
+        tag = snapshot.build(self._spec())
+        self.assertEqual(tag, snapshot.snapshot_tag(self.cli.images[_IMAGE], snapshot.config_hash(self.workspace)))
+        self.assertTrue(tag.startswith("west-env-snapshot:aaaaaaaaaaaa-"))
+        self.assertIn(tag, self.cli.images)
+        self.assertEqual(snapshot.read_marker(self.workspace)["tag"], tag)
+
+    def test_setup_container_gets_mounts_but_no_env(self):
+        snapshot.build(self._spec())
+        run = next(c for c in self.cli.calls if c[1] == "run")
+        self.assertIn(f"{self.workspace}:/work", run)
+        self.assertNotIn("-e", run)
+        self.assertIn("safe.directory", run[-1])
+        self.assertIn("zephyr-export", run[-1])
+
+
+class TestSnapshotApply(_SnapshotTestCase):
+    def test_no_marker_leaves_spec_alone(self):
+        spec = self._spec()
+        self.assertIsNone(snapshot.apply(spec))
+        self.assertEqual(spec.image, _IMAGE)
+        self.assertEqual(self.cli.calls, [])
+
+    def test_current_snapshot_is_used_without_rebuild(self):
+        tag = snapshot.build(self._spec())
+        self.cli.calls.clear()
+        spec = self._spec()
+        self.assertEqual(snapshot.apply(spec), tag)
+        self.assertTrue(spec.prepared)
+        self.assertFalse(any(c[1] in ("run", "commit") for c in self.cli.calls))
+
+    def test_current_snapshot_costs_one_base_image_lookup(self):
+        snapshot.build(self._spec())
+        probecache.enable(self.workspace / "probes.json")
+        self.addCleanup(probecache.disable)
+        snapshot.apply(self._spec())
+        self.cli.calls.clear()
+        snapshot.apply(self._spec())
+        self.assertEqual([c[1:3] for c in self.cli.calls], [["image", "inspect"]])
+        self.assertEqual(self.cli.calls[0][-1], _IMAGE)
+
+    def _apply_stale(self):
+        with patch("sys.stdout", new_callable=io.StringIO) as out:
+            spec = self._spec()
+            self.assertIsNone(snapshot.apply(spec))
+        self.assertEqual((spec.image, spec.prepared), (_IMAGE, False))
+        self.assertFalse(any(c[1] in ("run", "commit", "rmi") for c in self.cli.calls))
+        self.assertIn("west env snapshot", out.getvalue())
+
+    def test_config_change_warns_and_uses_the_base_image(self):
+        snapshot.build(self._spec())
+        (self.workspace / "west-env.yml").write_text("env:\n  image: y\n", encoding="utf-8")
+        self.cli.calls.clear()
+        self._apply_stale()
+
+    def test_base_image_change_warns_and_uses_the_base_image(self):
+        snapshot.build(self._spec())
+        self.cli.images[_IMAGE] = "sha256:" + "b" * 64
+        self.cli.calls.clear()
+        self._apply_stale()
+
+    def test_removed_snapshot_image_warns(self):
+        tag = snapshot.build(self._spec())
+        del self.cli.images[tag]
+        self.cli.calls.clear()
+        self._apply_stale()
+
+    def test_rebuild_removes_the_old_image(self):
+        old = snapshot.build(self._spec())
+        (self.workspace / "west-env.yml").write_text("env:\n  image: y\n", encoding="utf-8")
+        new = snapshot.build(self._spec())
+        self.assertNotEqual(new, old)
+        self.assertNotIn(old, self.cli.images)
+        self.assertIn(new, self.cli.images)
+
+    def test_prepared_run_starts_straight_into_command(self):
+        tag = snapshot.build(self._spec())
+        engine = Mock(name="engine", client=None)
+        engine.name = "docker"
+        cfg = EnvConfig({"env": {"workspace_mode": "bind", "image": _IMAGE, "backend": "docker-native"}})
+        with patch("west_env.container.get_engine", return_value=(engine, False)):
+            _, _, args = _container_args(cfg, ["west", "build"], workspace=self.workspace, host_cwd=self.workspace)
+        self.assertEqual(args[-3:], [tag, "west", "build"])
+
+
+if __name__ == "__main__":
+    unittest.main()
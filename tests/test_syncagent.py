@@ -0,0 +1,223 @@
+"""Unit tests for west_env.syncagent (persistent in-volume sync agent)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import cache, syncagent, syncback, syncindex
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES, WorkspaceSync
+
+
+def _local_agent(root: Path) -> syncagent.SyncAgent:
+    """The agent program run by the host interpreter, rooted at *root*."""
+    return syncagent.SyncAgent([sys.executable, "-c", syncagent.AGENT_SOURCE, str(root)]).start()
+
+
+class TestProtocol(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.agent = _local_agent(self.root)
+
+    def tearDown(self):
+        self.agent.close()
+        self._tmp.cleanup()
+
+    def test_hello_reports_codecs(self):
+        self.assertIn("gzip", self.agent.codecs)
+        self.assertIn("lzma", self.agent.codecs)
+        self.assertEqual(syncindex.DELETE_LIST, ".west-env-sync-delete")  # hard-coded in AGENT_SOURCE
+
+    def test_put_extracts_and_applies_delete_list(self):
+        write_file(self.root, "old/stale.c", "x")
+        src = Path(self._tmp.name) / "src"
+        write_file(src, "app/main.c", "int main;")
+        writer = self.agent.put(lambda f: syncindex.write_stream(f, src, ["app/main.c"], ["old"]), "gzip")
+        self.assertEqual((self.root / "app/main.c").read_text(), "int main;")
+        self.assertFalse((self.root / "old").exists())
+        self.assertGreater(writer.wire_bytes, 0)
+
+    def test_stat_hash_get_delete_exec_count(self):
+        write_file(self.root, "build/zephyr.hex", "HEX")
+        write_file(self.root, "build/a.pyc", "")
+        st = self.agent.stat(["build/zephyr.hex", "missing"])
+        self.assertEqual(st["build/zephyr.hex"][0], 3)
+        self.assertIsNone(st["missing"])
+        digest = syncback.sha256_file(str(self.root / "build/zephyr.hex"))
+        self.assertEqual(self.agent.hash(["build"], names=["*.hex"]), {"build/zephyr.hex": digest})
+        self.assertEqual(self.agent.count("build", ".pyc"), 1)
+
+        received = {}
+
+        def consume(f):
+            with tarfile.open(fileobj=f, mode="r|") as tar:
+                for m in tar:
+                    received[m.name] = tar.extractfile(m).read()
+
+        self.agent.get(["build/zephyr.hex"], consume)
+        self.assertEqual(received, {"build/zephyr.hex": b"HEX"})
+
+        self.agent.delete(["build"])
+        self.assertFalse((self.root / "build").exists())
+        rc, out = self.agent.exec([sys.executable, "-c", "import os; print(os.environ['X'])"], env={"X": "42"})
+        self.assertEqual((rc, out.strip()), (0, "42"))
+
+    def test_failed_request_keeps_the_agent_usable(self):
+        with self.assertRaises(syncagent.AgentError):
+            self.agent.request("hash")  # missing "dirs"
+        self.assertEqual(self.agent.count("."), 0)
+
+    def test_dead_or_aborted_agent_restarts(self):
+        self.agent.proc.kill()
+        self.agent.proc.wait()
+        self.assertEqual(self.agent.count("."), 0)
+
+        def broken(f):
+            f.write(b"partial")
+            raise OSError("host read failed")
+
+        with self.assertRaises(OSError):
+            self.agent.put(broken)
+        self.assertFalse(self.agent.alive)
+        self.assertEqual(self.agent.count("."), 0)
+
+    def test_missing_interpreter_raises_agent_error(self):
+        with self.assertRaises(syncagent.AgentError):
+            syncagent.SyncAgent(["/nonexistent/python3", "-c", "pass"]).start()
+
+
+@unittest.skipIf(sys.platform == "win32", "POSIX shell required")
+class TestSyncThroughAgent(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ws = self.base / "ws"
+        self.vol = self.volumes / "ws-vol"
+        self.vol.mkdir(parents=True)
+        write_file(self.ws, "app/src/main.c", "int main;")
+        self.agent = _local_agent(self.vol)
+        self.addCleanup(self.agent.close)
+        self.addCleanup(syncagent.close_all)
+
+    def _runs(self):
+        log = self.volumes / "calls.log"
+        return log.read_text().count("run ") if log.exists() else 0
+
+    def test_sync_and_sync_back_use_no_helper_container(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return self.agent
+
+        stats = syncindex.sync(str(self.engine), "ws-vol", self.ws, DEFAULT_EXCLUDES, compression="lzma", agent=factory)
+        self.assertEqual((self.vol / "app/src/main.c").read_text(), "int main;")
+        self.assertIn("lzma", stats.summary())
+        syncindex.sync(str(self.engine), "ws-vol", self.ws, DEFAULT_EXCLUDES, agent=factory)
+        self.assertEqual(len(calls), 1)  # nothing changed: agent not needed
+
+        write_file(self.vol, "build/zephyr/zephyr.hex", "HEX")
+        back = syncback.sync_back(str(self.engine), "ws-vol", self.ws, self.ws / "artifacts", agent=self.agent)
+        self.assertEqual(back.updated, ["build/zephyr/zephyr.hex"])
+        again = syncback.sync_back(str(self.engine), "ws-vol", self.ws, self.ws / "artifacts", agent=self.agent)
+        self.assertEqual(again.files, 0)
+        self.assertEqual(self._runs(), 0)
+
+    def test_full_sync_lists_stale_files_through_the_agent(self):
+        write_file(self.vol, "app/src/old.c", "int old;")
+        stats = syncindex.sync(str(self.engine), "ws-vol", self.ws, DEFAULT_EXCLUDES, agent=lambda: self.agent)
+        self.assertEqual((stats.full, stats.deleted), (True, 1))
+        self.assertFalse((self.vol / "app/src/old.c").exists())
+        self.assertEqual(self._runs(), 0)
+
+    def test_parallel_streams_use_sibling_agents(self):
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x;")
+        with patch.object(syncindex, "PARALLEL_MIN_BYTES", 0):
+            stats = syncindex.sync(
+                str(self.engine),
+                "ws-vol",
+                self.ws,
+                DEFAULT_EXCLUDES,
+                agent=lambda: self.agent,
+                projects=["zephyr"],
+                streams=2,
+            )
+        self.assertEqual(stats.streams, 2)
+        self.assertEqual((self.vol / "zephyr/kernel/sched.c").read_text(), "int x;")
+        self.assertEqual(self._runs(), 0)
+        sibling = self.agent.workers(2)[1]
+        self.assertTrue(sibling.alive)
+        self.agent.close()
+        self.assertFalse(sibling.alive)
+
+    def test_agent_pool_reuses_one_process(self):
+        argv = [sys.executable, "-c", syncagent.AGENT_SOURCE, str(self.vol)]
+        with patch.object(syncagent, "agent_args", return_value=argv) as args:
+            ws = WorkspaceSync("sync", image="zephyr-build")
+            first = ws.agent_for(str(self.engine), "ws-vol")
+            self.assertIs(ws.agent_for(str(self.engine), "ws-vol"), first)
+        self.assertEqual(args.call_count, 1)
+
+    def test_unusable_image_falls_back_to_helper_containers(self):
+        ws = WorkspaceSync("sync", image="no-python")
+        with patch.object(syncagent, "agent_for", side_effect=syncagent.AgentError("no python3")):
+            with patch("sys.stdout", new_callable=io.StringIO) as out:
+                self.assertIsNone(ws.agent_for("docker", "ws-vol"))
+        self.assertIn("[WARN]", out.getvalue())
+        self.assertEqual(ws.agent_mode, "off")
+
+
+class TestAgentArgs(unittest.TestCase):
+    def test_run_and_session_exec_forms(self):
+        run = syncagent.agent_args("podman", "img", ["vol:/work"])
+        self.assertEqual(run[:4], ["podman", "run", "--rm", "-i"])
+        self.assertIn("vol:/work", run)
+        self.assertEqual(run[-5:-3], ["img", "python3"])
+        exec_ = syncagent.agent_args("podman", "img", ["vol:/work"], container="west-env-session-x")
+        self.assertEqual(exec_[:4], ["podman", "exec", "-i", "west-env-session-x"])
+
+    def test_agent_runs_in_matching_session(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with (
+                patch("west_env.session._read_marker", return_value={"engine": "podman", "name": "sess"}),
+                patch("west_env.session.mounted_volume", return_value="vol"),
+            ):
+                self.assertEqual(syncagent._session_container("podman", "vol", Path(tmp)), "sess")
+                self.assertIsNone(syncagent._session_container("podman", "other", Path(tmp)))
+                self.assertIsNone(syncagent._session_container("docker", "vol", Path(tmp)))
+
+    def test_config(self):
+        self.assertEqual(EnvConfig({}).sync_agent, "auto")
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"agent": "always"}})
+
+
+class TestCacheStatsThroughAgent(unittest.TestCase):
+    def test_pycache_count_uses_agent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_file(Path(tmp), "a/b.cpython-312.pyc", "")
+            agent = _local_agent(Path("/"))
+            self.addCleanup(agent.close)
+            cm = cache.CacheManager("docker", image="zephyr-build")
+            with (
+                patch.object(cm, "_volume_exists", return_value=True),
+                patch.object(syncagent, "agent_for", return_value=agent),
+                patch.object(cache, "PYCACHE_DIR", tmp),
+                patch("subprocess.check_output", side_effect=AssertionError("helper container started")),
+            ):
+                self.assertEqual(cm._pycache_files(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
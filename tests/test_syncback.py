@@ -0,0 +1,120 @@
+"""Unit tests for west_env.syncback (streamed artifact sync-back)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import syncback
+from west_env.config import EnvConfig
+from west_env.sync import WorkspaceSync
+
+
+class TestHostSide(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dst = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_manifest_uses_sha256sum_format_and_reuses_hashes(self):
+        write_file(self.dst, "build/zephyr/zephyr.hex", "HEX")
+        entries = syncback.host_hashes(self.dst, {})
+        digest = syncback.sha256_file(str(self.dst / "build/zephyr/zephyr.hex"))
+        self.assertEqual(syncback.manifest(entries), f"{digest}  build/zephyr/zephyr.hex\n".encode())
+        stale = {rel: e[:2] + ["cached"] for rel, e in entries.items()}
+        self.assertEqual(syncback.host_hashes(self.dst, stale)["build/zephyr/zephyr.hex"][2], "cached")
+
+    def test_receive_is_atomic_and_rejects_escaping_paths(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            info = tarfile.TarInfo("build/app.bin")
+            info.size, info.mode, info.mtime = 3, 0o640, 1_700_000_000
+            tar.addfile(info, io.BytesIO(b"BIN"))
+            info = tarfile.TarInfo("../escape.bin")
+            info.size = 1
+            tar.addfile(info, io.BytesIO(b"x"))
+        buf.seek(0)
+        entries, stats = {}, syncback.SyncBackStats()
+        with tarfile.open(fileobj=buf, mode="r|") as tar, self.assertRaises(ValueError):
+            syncback._receive(tar, self.dst, entries, stats)
+        target = self.dst / "build/app.bin"
+        self.assertEqual(target.read_bytes(), b"BIN")
+        self.assertEqual(target.stat().st_mtime, 1_700_000_000)
+        self.assertEqual(os.listdir(target.parent), ["app.bin"])  # no temp files left
+        self.assertEqual(stats.updated, ["build/app.bin"])
+        self.assertFalse((self.dst.parent / "escape.bin").exists())
+
+
+@unittest.skipIf(sys.platform == "win32" or not shutil.which("sha256sum"), "POSIX userland required")
+class TestSyncBack(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ws = self.base / "ws"
+        self.ws.mkdir()
+        self.vol = self.volumes / "ws-vol"
+        self.vol.mkdir(parents=True)
+        write_file(self.vol, "build/zephyr/zephyr.elf", "ELF1")
+        write_file(self.vol, "build/zephyr/zephyr.hex", "HEX1")
+        write_file(self.vol, "build/zephyr/zephyr.dts", "/dts-v1/;")
+        write_file(self.vol, "build/zephyr/main.c.obj", "OBJ")
+        write_file(self.vol, "app/src/main.c", "int main;")
+
+    def _back(self, artifacts=None):
+        ws = WorkspaceSync("sync", artifacts=artifacts)
+        return ws.sync_from_volume(str(self.engine), "ws-vol", self.ws / "artifacts")
+
+    def test_only_changed_artifacts_are_streamed(self):
+        stats = self._back()
+        self.assertEqual(sorted(stats.updated), ["build/zephyr/zephyr.elf", "build/zephyr/zephyr.hex"])
+        self.assertEqual(stats.bytes_received, 8)
+        self.assertEqual((self.ws / "artifacts/build/zephyr/zephyr.hex").read_text(), "HEX1")
+        self.assertTrue((self.ws / syncback.INDEX_PATH).is_file())
+
+        self.assertEqual(self._back().files, 0)
+        write_file(self.vol, "build/zephyr/zephyr.hex", "HEX2")
+        stats = self._back()
+        self.assertEqual(stats.updated, ["build/zephyr/zephyr.hex"])
+        self.assertIn("1 artifacts updated", stats.summary())
+
+    def test_configured_artifact_set(self):
+        artifacts = syncback.ArtifactSet(dirs=("build", "missing"), extensions=(".hex",), globs=("build/*/*.dts",))
+        stats = self._back(artifacts)
+        self.assertEqual(sorted(stats.updated), ["build/zephyr/zephyr.dts", "build/zephyr/zephyr.hex"])
+
+    def test_no_build_directory_is_not_an_error(self):
+        shutil.rmtree(self.vol / "build")
+        self.assertEqual(self._back().files, 0)
+
+    def test_container_failure_is_reported(self):
+        artifacts = syncback.ArtifactSet(dirs=("build",), extensions=(".hex",))
+        with patch.object(syncback, "select_cmd", return_value="exit 3"):
+            with self.assertRaises(subprocess.CalledProcessError):
+                self._back(artifacts)
+
+
+class TestConfig(unittest.TestCase):
+    def test_artifact_set_config(self):
+        cfg = EnvConfig({"sync": {"artifacts": {"extensions": [".uf2"], "globs": ["build/**/*.dts"]}}})
+        self.assertEqual(cfg.sync_artifact_dirs, ["build"])
+        self.assertEqual(cfg.sync_artifact_extensions, [".uf2"])
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"artifacts": {"dirs": "build"}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
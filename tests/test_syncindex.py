@@ -0,0 +1,224 @@
+"""Unit tests for west_env.syncindex (incremental workspace sync)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import syncindex
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES
+
+
+class TestComputeChanges(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        write_file(self.root, "zephyr/kernel/sched.c", "int x;")
+        write_file(self.root, "app/src/main.c", "int main;")
+        write_file(self.root, "build/zephyr/zephyr.elf", "ELF")
+        write_file(self.root, "app/.cache/junk", "junk")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_first_scan_adds_everything_but_excluded(self):
+        changes = syncindex.compute_changes(self.root, DEFAULT_EXCLUDES, {})
+        self.assertEqual(sorted(changes.added), ["app/src/main.c", "zephyr/kernel/sched.c"])
+        self.assertEqual(changes.deleted, [])
+
+    def test_added_modified_deleted_sets(self):
+        entries = syncindex.compute_changes(self.root, DEFAULT_EXCLUDES, {}).entries
+        write_file(self.root, "app/src/main.c", "int main(void);")
+        write_file(self.root, "app/src/new.c", "int y;")
+        (self.root / "zephyr/kernel/sched.c").unlink()
+        changes = syncindex.compute_changes(self.root, DEFAULT_EXCLUDES, entries)
+        self.assertEqual(changes.added, ["app/src/new.c"])
+        self.assertEqual(changes.modified, ["app/src/main.c"])
+        self.assertEqual(changes.deleted, ["zephyr/kernel/sched.c"])
+
+    def test_touch_without_content_change_is_not_resent(self):
+        entries = syncindex.compute_changes(self.root, DEFAULT_EXCLUDES, {}).entries
+        path = self.root / "app/src/main.c"
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        changes = syncindex.compute_changes(self.root, DEFAULT_EXCLUDES, entries)
+        self.assertFalse(changes.changed)
+        self.assertNotEqual(changes.entries["app/src/main.c"][1], entries["app/src/main.c"][1])
+
+    def test_process_pool_hashes_match_inline(self):
+        rels = sorted(syncindex.scan(self.root, []))
+        inline = syncindex.hash_files(self.root, rels)
+        with patch.object(syncindex, "POOL_MIN_FILES", 1):
+            pooled = syncindex.hash_files(self.root, rels, workers=2)
+        self.assertEqual(inline, pooled)
+
+    def test_stream_carries_uploads_and_delete_list(self):
+        buf = io.BytesIO()
+        syncindex.write_stream(buf, self.root, ["app/src/main.c"], ["gone.c", "old dir/x.h"])
+        buf.seek(0)
+        with tarfile.open(fileobj=buf) as tar:
+            names = tar.getnames()
+            deletes = tar.extractfile(syncindex.DELETE_LIST).read().split(b"\0")
+        self.assertEqual(names, ["app/src/main.c", syncindex.DELETE_LIST])
+        self.assertEqual(deletes, [b"gone.c", b"old dir/x.h"])
+
+
+@unittest.skipIf(sys.platform == "win32" or not shutil.which("tar"), "POSIX tar required")
+class TestIncrementalSync(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.base / "ws"
+        write_file(self.root, "app/src/main.c", "int main;")
+        write_file(self.root, "zephyr/kernel/sched.c", "int x;")
+        write_file(self.root, "build/out.elf", "ELF")
+
+    def _sync(self, **kwargs):
+        return syncindex.sync(str(self.engine), "ws-vol", self.root, DEFAULT_EXCLUDES, **kwargs)
+
+    def _runs(self):
+        return (self.volumes / "calls.log").read_text().count("run ")
+
+    def test_full_then_incremental_then_noop(self):
+        vol = self.volumes / "ws-vol"
+        stats = self._sync()
+        self.assertTrue(stats.full)
+        self.assertEqual((vol / "app/src/main.c").read_text(), "int main;")
+        self.assertFalse((vol / "build").exists())
+
+        write_file(self.root, "app/src/main.c", "int main(void);")
+        (self.root / "zephyr/kernel/sched.c").unlink()
+        stats = self._sync()
+        self.assertFalse(stats.full)
+        self.assertEqual((stats.added, stats.modified, stats.deleted), (0, 1, 1))
+        self.assertEqual((vol / "app/src/main.c").read_text(), "int main(void);")
+        self.assertFalse((vol / "zephyr/kernel/sched.c").exists())
+        self.assertFalse((vol / syncindex.DELETE_LIST).exists())
+
+        runs = self._runs()
+        stats = self._sync()
+        self.assertEqual((stats.added, stats.modified, stats.deleted), (0, 0, 0))
+        self.assertEqual(self._runs(), runs)  # no container for a no-change sync
+
+    def test_compressed_stream(self):
+        stats = self._sync(compression="gzip")
+        self.assertEqual((self.volumes / "ws-vol/app/src/main.c").read_text(), "int main;")
+        self.assertIn("gzip level 6", stats.summary())
+        self.assertGreater(stats.wire_bytes, 0)
+
+    def test_recreated_volume_forces_full_sync(self):
+        self._sync()
+        shutil.rmtree(self.volumes / "ws-vol")
+        stats = self._sync()
+        self.assertTrue(stats.full)
+        self.assertTrue((self.volumes / "ws-vol/zephyr/kernel/sched.c").exists())
+
+    def test_full_sync_into_an_unindexed_volume_removes_stale_files(self):
+        vol = self.volumes / "ws-vol"
+        write_file(vol, "app/src/old.c", "int old;")
+        write_file(vol, "build/out.elf", "ELF")
+        stats = self._sync()
+        self.assertTrue(stats.full)
+        self.assertEqual(stats.deleted, 1)
+        self.assertFalse((vol / "app/src/old.c").exists())
+        self.assertTrue((vol / "build/out.elf").exists())  # excluded: kept
+        self.assertTrue((vol / "app/src/main.c").exists())
+        self.assertTrue((vol / syncindex.OWNER_FILE).exists())
+        self.assertEqual(sorted(p.name for p in vol.iterdir()), [".west", "app", "build", "zephyr"])
+
+    def test_cp_transport_copies_one_archive(self):
+        vol = self.volumes / "ws-vol"
+        stats = self._sync(transport="cp", compression="gzip")
+        self.assertEqual((vol / "app/src/main.c").read_text(), "int main;")
+        self.assertIn("gzip", stats.summary())
+        calls = (self.volumes / "calls.log").read_text().splitlines()
+        self.assertEqual([c.split()[0] for c in calls if c.split()[0] != "volume"], ["create", "cp", "rm"])
+
+        (self.root / "zephyr/kernel/sched.c").unlink()
+        write_file(self.root, "app/src/main.c", "int main(void);")
+        self._sync(transport="cp")
+        self.assertFalse((vol / "zephyr/kernel/sched.c").exists())
+        self.assertFalse((vol / syncindex.DELETE_LIST).exists())
+        self.assertEqual((vol / "app/src/main.c").read_text(), "int main(void);")
+        self.assertIn("start -a", (self.volumes / "calls.log").read_text())
+        self.assertEqual(list(self.volumes.glob("*.ctr")), [])  # helper containers removed
+
+    def test_cp_transport_without_engine_decompression(self):
+        podman = self.engine.with_name("podman")
+        self.engine.rename(podman)
+        stats = syncindex.sync(str(podman), "ws-vol", self.root, DEFAULT_EXCLUDES, transport="cp", compression="gzip")
+        self.assertEqual(stats.compression, "")
+        self.assertEqual(syncindex.archive_codecs("/usr/bin/docker"), ("none", "gzip", "lzma"))
+
+    def test_parallel_streams_split_along_projects(self):
+        write_file(self.root, "modules/hal/drv.c", "int d;")
+        write_file(self.root, "modules/hal/sub/nested.c", "int n;")
+        projects = ["modules/hal", "modules/hal/sub", "zephyr"]
+        with patch.object(syncindex, "PARALLEL_MIN_BYTES", 0):
+            stats = self._sync(projects=projects, streams=8)
+            self.assertEqual((stats.streams, self._runs()), (4, 4))
+            self.assertIn("4 streams", stats.summary())
+            self.assertEqual((self.volumes / "ws-vol/modules/hal/sub/nested.c").read_text(), "int n;")
+
+            (self.root / "zephyr/kernel/sched.c").unlink()
+            write_file(self.root, "app/src/main.c", "int main(void);")
+            self.assertEqual(self._sync(projects=projects, streams=8).streams, 2)
+            self.assertFalse((self.volumes / "ws-vol/zephyr/kernel/sched.c").exists())
+            self.assertEqual((self.volumes / "ws-vol/app/src/main.c").read_text(), "int main(void);")
+
+    def test_small_uploads_use_one_stream(self):
+        stats = self._sync(projects=["zephyr"], streams=4)
+        self.assertEqual((stats.streams, self._runs()), (1, 1))
+
+    def test_failed_stream_fails_the_sync(self):
+        real = syncindex.apply_changes
+
+        def apply_changes(engine, volume, root, changes, *args, **kwargs):
+            if any(rel.startswith("zephyr/") for rel in changes.upload):
+                raise subprocess.CalledProcessError(1, "tar")
+            return real(engine, volume, root, changes, *args, **kwargs)
+
+        with (
+            patch.object(syncindex, "PARALLEL_MIN_BYTES", 0),
+            patch.object(syncindex, "apply_changes", side_effect=apply_changes),
+        ):
+            with self.assertRaises(subprocess.CalledProcessError):
+                self._sync(projects=["zephyr"], streams=2)
+        self.assertTrue((self.volumes / "ws-vol/app/src/main.c").exists())  # the other stream completed
+        self.assertEqual(syncindex.load_index(self.root), {})  # retried in full next time
+
+
+class TestPartition(unittest.TestCase):
+    def test_groups_are_balanced_by_bytes(self):
+        entries = {"a/x": [100], "b/x": [60], "c/x": [50], "top.c": [5], "b/y": [1]}
+        changes = syncindex.SyncChanges(added=list(entries), deleted=["c/old", "gone.c"], entries=entries)
+        groups = syncindex.partition(changes, ["a", "b", "c"], 2)
+        self.assertEqual([sorted(g.upload) for g in groups], [["a/x", "top.c"], ["b/x", "b/y", "c/x"]])
+        self.assertEqual([g.deleted for g in groups], [["gone.c"], ["c/old"]])
+        self.assertEqual(syncindex.partition(changes, [], 4), [changes])
+        self.assertEqual(syncindex.partition(changes, ["a"], 1), [changes])
+
+    def test_config(self):
+        self.assertEqual(EnvConfig({}).sync_streams, syncindex.DEFAULT_STREAMS)
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"streams": 0}})
+        self.assertEqual(EnvConfig({}).sync_transport, "auto")
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"transport": "rsync"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Unit tests for west_env.syncplan (sync dry run and statistics)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import shutil
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import syncindex, syncplan
+from west_env.sync import DEFAULT_EXCLUDES
+
+
+@unittest.skipIf(sys.platform == "win32" or not shutil.which("tar"), "POSIX tar required")
+class TestSyncPlan(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.base / "ws"
+        write_file(self.root, "zephyr/kernel/sched.c", "x" * 3000)
+        write_file(self.root, "modules/hal/drv.c", "d" * 2000)
+        write_file(self.root, "app/src/main.c", "int main;")
+        write_file(self.root, "west.yml", "manifest: {}")
+        write_file(self.root, "build/zephyr.elf", "E" * 10_000)  # excluded
+
+    def _plan(self, **kwargs):
+        return syncplan.plan(
+            self.root, DEFAULT_EXCLUDES, str(self.engine), "ws-vol", ["zephyr", "modules/hal"], **kwargs
+        )
+
+    def _sync(self):
+        return syncindex.sync(str(self.engine), "ws-vol", self.root, DEFAULT_EXCLUDES)
+
+    def test_dry_run_sends_and_saves_nothing(self):
+        result = self._plan()
+        self.assertTrue(result.full)
+        self.assertEqual((result.files, result.transfer_files, result.skipped_files), (4, 4, 0))
+        self.assertEqual(result.bytes, 3000 + 2000 + 9 + 12)
+        self.assertIsNone(result.projected_s)  # no throughput measured yet
+        self.assertIn("unknown", "\n".join(syncplan.describe(result)))
+        self.assertFalse((self.volumes / "calls.log").read_text().count("run "))
+        self.assertFalse((self.root / syncindex.INDEX_PATH).exists())
+
+    def test_profile_groups_by_project_and_top_level_directory(self):
+        result = self._plan()
+        self.assertEqual(
+            result.groups,
+            {"zephyr": [1, 3000], "modules/hal": [1, 2000], "app/": [1, 9], "(top level)": [1, 12]},
+        )
+        self.assertEqual(result.largest[0], (3000, "zephyr/kernel/sched.c"))
+        lines = syncplan.profile(result)
+        self.assertIn("zephyr", lines[1])  # largest group first
+        self.assertNotIn("build", "\n".join(lines))
+
+    def test_incremental_plan_and_projection_from_recorded_syncs(self):
+        self._sync()
+        write_file(self.root, "app/src/main.c", "int main(void);")
+        result = self._plan()
+        self.assertFalse(result.full)
+        self.assertEqual((result.transfer_files, result.skipped_files), (1, 3))
+
+        stats = json.loads((self.root / syncindex.STATS_PATH).read_text())["syncs"]
+        self.assertEqual(len(stats), 1)
+        self.assertEqual((stats[0]["files"], stats[0]["bytes"]), (4, 5021))
+        self.assertIn("mb_per_s", stats[0])
+
+        # Small syncs do not measure the link; a large enough one does.
+        self.assertIsNone(syncplan.measured_throughput(self.root))
+        syncindex.record_stats(self.root, syncindex.SyncStats(bytes_sent=8 << 20, throughput_bps=4 << 20))
+        result = self._plan()
+        self.assertEqual(result.throughput_bps, 4 << 20)
+        self.assertAlmostEqual(result.projected_s, result.scan_s + 15 / (4 << 20))
+        self.assertIn("4.0 MB/s", "\n".join(syncplan.describe(result)))
+
+    def test_noop_sync_records_nothing(self):
+        self._sync()
+        self._sync()
+        self.assertEqual(len(syncindex.load_stats(self.root)), 1)
+
+    def test_history_is_bounded(self):
+        for _ in range(syncindex.STATS_HISTORY + 5):
+            syncindex.record_stats(self.root, syncindex.SyncStats())
+        self.assertEqual(len(syncindex.load_stats(self.root)), syncindex.STATS_HISTORY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Unit tests for west_env.syncwatch (sync --watch daemon)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from west_env import syncwatch
+from west_env.config import EnvConfig
+from west_env.sync import DEFAULT_EXCLUDES
+from west_env.syncindex import SyncStats
+
+
+def _write(root: Path, rel: str, data: str = "x"):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(data, encoding="utf-8")
+
+
+class _WatcherCases:
+    def make(self, root):
+        raise NotImplementedError
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        _write(self.root, "app/src/main.c")
+        _write(self.root, "build/out.elf")
+        self.watcher = self.make(self.root)
+
+    def tearDown(self):
+        self.watcher.close()
+        self._tmp.cleanup()
+
+    def test_source_edit_is_reported(self):
+        _write(self.root, "app/src/main.c", "changed")
+        self.assertTrue(self.watcher.wait(timeout=1.0))
+
+    def test_excluded_paths_are_ignored(self):
+        _write(self.root, "build/out.elf", "rebuilt")
+        _write(self.root, "build/zephyr/new.o")
+        self.assertFalse(self.watcher.wait(timeout=0.3))
+
+    def test_new_directory_is_watched(self):
+        (self.root / "lib").mkdir()
+        while self.watcher.wait(timeout=0.2):
+            pass  # an empty directory alone has nothing to sync
+        _write(self.root, "lib/util.c")
+        self.assertTrue(self.watcher.wait(timeout=1.0))
+
+
+class TestPollWatcher(_WatcherCases, unittest.TestCase):
+    def make(self, root):
+        return syncwatch.PollWatcher(root, DEFAULT_EXCLUDES, interval=0.05)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+class TestInotifyWatcher(_WatcherCases, unittest.TestCase):
+    def make(self, root):
+        return syncwatch.InotifyWatcher(root, DEFAULT_EXCLUDES)
+
+    def test_make_watcher_prefers_inotify(self):
+        watcher = syncwatch.make_watcher(self.root, DEFAULT_EXCLUDES)
+        watcher.close()
+        self.assertEqual(watcher.kind, "inotify")
+        self.assertEqual(syncwatch.make_watcher(self.root, [], poll=True).kind, "poll")
+
+
+class TestStatus(unittest.TestCase):
+    def test_is_current_requires_live_daemon_for_same_volume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ws = Path(tmp)
+            self.assertFalse(syncwatch.is_current(ws, "docker", "vol"))
+            later = time.time() + 60
+            status = {"pid": os.getpid(), "engine": "docker", "volume": "vol", "checked": later, "scan_started": 1}
+            syncwatch.write_status(ws, state="current", **status)
+            self.assertTrue(syncwatch.is_current(ws, "docker", "vol"))
+            self.assertFalse(syncwatch.is_current(ws, "docker", "other-vol"))
+            self.assertFalse(syncwatch.is_current(ws, "podman", "vol"))
+            syncwatch.write_status(ws, state="pending", pid=os.getpid(), engine="docker", volume="vol")
+            self.assertFalse(syncwatch.is_current(ws, "docker", "vol"))
+            syncwatch.write_status(ws, state="current", **dict(status, pid=2**22 + 12345))
+            self.assertFalse(syncwatch.is_current(ws, "docker", "vol"))
+
+    def test_is_current_needs_a_quiet_check_after_the_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ws = Path(tmp)
+            status = {"pid": os.getpid(), "engine": "docker", "volume": "vol", "heartbeat": 0.1}
+            syncwatch.write_status(ws, state="current", checked=time.time() - 5, scan_started=1, **status)
+            start = time.monotonic()
+            self.assertFalse(syncwatch.is_current(ws, "docker", "vol"))  # watcher never confirmed
+            self.assertLess(time.monotonic() - start, 2)
+
+            later = time.time() + 60
+            syncwatch.write_status(ws, state="current", checked=later, scan_started=1, last_event=2, **status)
+            self.assertFalse(syncwatch.is_current(ws, "docker", "vol"))  # event after the last sync began
+
+
+class TestWatchLoop(unittest.TestCase):
+    def test_burst_is_coalesced_into_one_push(self):
+        calls = []
+
+        def fake_sync(engine, volume, root, excludes):
+            calls.append(time.monotonic())
+            return SyncStats(modified=1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ws = Path(tmp).resolve()
+            _write(ws, "app/main.c")
+            stop = threading.Event()
+            with patch("west_env.syncwatch.syncindex.sync", side_effect=fake_sync):
+                thread = threading.Thread(
+                    target=syncwatch.watch,
+                    args=("docker", "vol", ws, DEFAULT_EXCLUDES),
+                    kwargs={"debounce": 0.5, "interval": 0.05, "stop": stop, "log": lambda *_: None},
+                )
+                thread.start()
+                deadline = time.monotonic() + 5
+                while not calls and time.monotonic() < deadline:
+                    time.sleep(0.02)
+                self.assertTrue(syncwatch.is_current(ws, "docker", "vol"))  # waits for a heartbeat
+
+                for i in range(10):  # e.g. a git checkout touching many files
+                    _write(ws, f"app/f{i}.c", str(i))
+                deadline = time.monotonic() + 5
+                while len(calls) < 2 and time.monotonic() < deadline:
+                    time.sleep(0.02)
+                time.sleep(0.8)
+                stop.set()
+                thread.join(5)
+
+            self.assertEqual(len(calls), 2)  # initial sync + one batched delta
+            self.assertEqual(syncwatch.read_status(ws), {})
+
+
+class TestConfig(unittest.TestCase):
+    def test_sync_section(self):
+        cfg = EnvConfig({"sync": {"watcher": "poll", "debounce": 1, "poll_interval": 5}})
+        self.assertEqual((cfg.sync_watcher, cfg.sync_debounce, cfg.sync_poll_interval), ("poll", 1, 5))
+        self.assertEqual(EnvConfig({}).sync_watcher, "auto")
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"watcher": "fsevents"}})
+        with self.assertRaises(ValueError):
+            EnvConfig({"sync": {"debounce": 0}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Unit tests for west_env.volsnap (workspace volume snapshots)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import syncindex, volsnap
+from west_env.sync import DEFAULT_EXCLUDES
+
+
+def _tree(root: Path) -> dict:
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+@unittest.skipIf(sys.platform == "win32" or not shutil.which("tar"), "POSIX shell and tar required")
+class TestVolumeSnapshots(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ws = self.base / "ws"
+        self.vol = self.volumes / "ws-vol"
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x;")
+        write_file(self.ws, "app/src/main.c", "int main;")
+        self._sync()
+        write_file(self.vol, "build/zephyr/zephyr.elf", "ELF v1")  # built in the container
+
+    def _sync(self):
+        return syncindex.sync(str(self.engine), "ws-vol", self.ws, DEFAULT_EXCLUDES)
+
+    def _save(self, name="rel-1"):
+        return volsnap.save(str(self.engine), self.ws, "ws-vol", name)
+
+    def _restore(self, name="rel-1"):
+        return volsnap.restore(str(self.engine), self.ws, "ws-vol", name)
+
+    def test_save_copies_sources_and_build_directory(self):
+        record = self._save()
+        self.assertIn(record["method"], ("cp", "tar"))
+        self.assertEqual(_tree(self.volumes / "ws-vol-snap-rel-1"), _tree(self.vol))
+        self.assertIn("build/zephyr/zephyr.elf", _tree(self.volumes / "ws-vol-snap-rel-1"))
+        self.assertEqual([r["name"] for r in volsnap.list_snapshots(self.ws, "ws-vol")], ["rel-1"])
+        self.assertIn("rel-1", "\n".join(volsnap.describe(volsnap.list_snapshots(self.ws, "ws-vol"))))
+
+    def test_restore_brings_back_the_build_and_the_index(self):
+        self._save()
+        saved = _tree(self.vol)
+        # Switch branch: another source state and another build.
+        write_file(self.ws, "zephyr/kernel/sched.c", "int y;")
+        write_file(self.ws, "zephyr/kernel/new.c", "int n;")
+        self._sync()
+        write_file(self.vol, "build/zephyr/zephyr.elf", "ELF v2")
+
+        # Back to the first branch: restore, then sync the working tree.
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x;")
+        (self.ws / "zephyr/kernel/new.c").unlink()
+        self._restore()
+        self.assertEqual(_tree(self.vol), saved)
+        stats = self._sync()
+        self.assertEqual((stats.added, stats.modified, stats.deleted), (0, 0, 0))  # nothing to send
+        self.assertFalse(stats.full)
+        self.assertEqual((self.vol / "build/zephyr/zephyr.elf").read_text(), "ELF v1")
+
+    def test_restore_then_sync_sends_only_the_difference(self):
+        self._save()
+        write_file(self.ws, "app/src/main.c", "int main(void);")
+        self._restore()
+        stats = self._sync()
+        self.assertEqual((stats.added, stats.modified, stats.bytes_sent), (0, 1, len("int main(void);")))
+
+    def test_tar_fallback_without_gnu_cp(self):
+        bin_dir = self.base / "bin"
+        bin_dir.mkdir()
+        (bin_dir / "cp").write_text("#!/bin/sh\nexit 1\n")
+        (bin_dir / "cp").chmod(0o755)
+        with patch.dict(os.environ, {"PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}):
+            record = self._save()
+        self.assertEqual(record["method"], "tar")
+        self.assertEqual(_tree(self.volumes / "ws-vol-snap-rel-1"), _tree(self.vol))
+
+    def test_save_replaces_an_existing_snapshot(self):
+        self._save()
+        (self.vol / "build/zephyr/zephyr.elf").unlink()
+        self._save()
+        self.assertNotIn("build/zephyr/zephyr.elf", _tree(self.volumes / "ws-vol-snap-rel-1"))
+
+    def test_delete(self):
+        self._save()
+        volsnap.delete(str(self.engine), self.ws, "ws-vol", "rel-1")
+        self.assertFalse((self.volumes / "ws-vol-snap-rel-1").exists())
+        self.assertEqual(volsnap.list_snapshots(self.ws, "ws-vol"), [])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self._save("../evil")
+        with self.assertRaises(RuntimeError):
+            self._restore("missing")
+        with self.assertRaises(RuntimeError):
+            volsnap.save(str(self.engine), self.ws, "no-such-vol", "x")
+        self._save()
+        shutil.rmtree(self.volumes / "ws-vol-snap-rel-1")
+        with self.assertRaises(RuntimeError):
+            self._restore()
+
+    def test_snapshots_of_other_volumes_are_not_listed(self):
+        self._save()
+        self.assertEqual(volsnap.list_snapshots(self.ws, "other-vol"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""Unit tests for workspace volume identity and west_env.volumes (registry)."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tests.fake_engine import FakeEngineTestCase, write_file
+from west_env import syncindex, volsnap, volumes
+from west_env.sync import DEFAULT_EXCLUDES, WorkspaceSync, legacy_volume_name, workspace_volume_name
+
+
+class TestWorkspaceVolumeName(unittest.TestCase):
+    def test_same_directory_name_in_different_places(self):
+        a = workspace_volume_name(Path("/home/user/a/app"))
+        b = workspace_volume_name(Path("/home/user/b/app"))
+        self.assertNotEqual(a, b)
+        self.assertTrue(a.startswith("west-env-ws-app-"))
+        self.assertEqual(legacy_volume_name(Path("/home/user/a/app")), legacy_volume_name(Path("/home/user/b/app")))
+
+    def test_stable_and_valid(self):
+        path = Path("/home/user/My Workspace (v3.5)")
+        name = workspace_volume_name(path)
+        self.assertEqual(name, workspace_volume_name(path))
+        self.assertRegex(name, r"^[a-zA-Z0-9][a-zA-Z0-9_.-]*$")
+        self.assertLessEqual(len(workspace_volume_name(Path("/x/" + "a" * 80))), len("west-env-ws-") + 24 + 13)
+
+    def test_volume_args_use_the_new_name(self):
+        args = WorkspaceSync(workspace_mode="sync").volume_args(Path("/home/user/a/app"), "docker")
+        self.assertEqual(args, ["-v", f"{workspace_volume_name(Path('/home/user/a/app'))}:/work"])
+        status = WorkspaceSync(workspace_mode="sync").status(Path("/home/user/a/app"))
+        self.assertTrue(re.match(r"west-env-ws-app-[0-9a-f]{12}$", status["volume_name"]))
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.ws = base / "ws"
+        self.ws.mkdir()
+        env = patch.dict(os.environ, {"WEST_ENV_CACHE_DIR": str(base / "cache")})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_record_and_describe(self):
+        self.assertEqual(volumes.load(), {})
+        self.assertIn("none registered", volumes.describe()[0])
+        volumes.record(self.ws, "podman", "west-env-ws-ws-0123")
+        info = volumes.load()["west-env-ws-ws-0123"]
+        self.assertEqual(
+            (info["workspace"], info["engine"], info["index_hash"]), (str(self.ws.resolve()), "podman", None)
+        )
+        self.assertIn(str(self.ws.resolve()), "\n".join(volumes.describe()))
+
+    def test_index_hash_follows_the_index(self):
+        write_file(self.ws, str(syncindex.INDEX_PATH), "{}")
+        volumes.record(self.ws, "docker", "v")
+        self.assertEqual(volumes.load()["v"]["index_hash"], volumes.index_hash(self.ws))
+        write_file(self.ws, str(syncindex.INDEX_PATH), '{"files": {}}')
+        self.assertNotEqual(volumes.load()["v"]["index_hash"], volumes.index_hash(self.ws))
+
+    def test_removed_workspaces_are_flagged(self):
+        gone = Path(self._tmp.name) / "gone"
+        gone.mkdir()
+        volumes.record(gone, "docker", "west-env-ws-gone-1")
+        gone.rmdir()
+        self.assertIn("(workspace gone)", "\n".join(volumes.describe()))
+        with patch.object(syncindex, "volume_id", return_value=None):
+            lines = volumes.doctor_lines(self.ws, "docker")
+        self.assertIn("[INFO] workspace volume", lines[0])
+        self.assertTrue(any("removed workspace" in line for line in lines))
+
+
+@unittest.skipIf(sys.platform == "win32" or not shutil.which("tar"), "POSIX shell and tar required")
+class TestMigration(FakeEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.engine = str(self.engine)
+        self.ws = (self.base / "ws").resolve()
+        env = patch.dict(os.environ, {"WEST_ENV_CACHE_DIR": str(self.base / "cache")})
+        env.start()
+        self.addCleanup(env.stop)
+        write_file(self.ws, "zephyr/kernel/sched.c", "int x;")
+        write_file(self.ws, "app/src/main.c", "int main;")
+        self.legacy, self.new = legacy_volume_name(self.ws), workspace_volume_name(self.ws)
+
+    def _sync(self, volume):
+        return syncindex.sync(self.engine, volume, self.ws, DEFAULT_EXCLUDES)
+
+    def test_legacy_volume_is_copied_and_the_index_kept(self):
+        self._sync(self.legacy)
+        write_file(self.volumes / self.legacy, "build/zephyr.elf", "ELF")
+        volsnap.save(self.engine, self.ws, self.legacy, "rel-1")
+
+        self.assertEqual(volumes.migrate(self.engine, self.ws), self.legacy)
+        self.assertEqual((self.volumes / self.new / "build/zephyr.elf").read_text(), "ELF")
+        self.assertEqual(syncindex.load_index(self.ws)["volume"], self.new)
+        stats = self._sync(self.new)
+        self.assertFalse(stats.full)
+        self.assertEqual(stats.added + stats.modified + stats.deleted, 0)
+        self.assertEqual([r["name"] for r in volsnap.list_snapshots(self.ws, self.new)], ["rel-1"])
+        self.assertIn(self.new, volumes.load())
+        self.assertTrue((self.volumes / self.legacy).is_dir())  # left for other workspaces
+
+        self.assertIsNone(volumes.migrate(self.engine, self.ws))  # done once
+
+    def test_legacy_volume_synced_from_elsewhere_is_not_taken(self):
+        self._sync(self.legacy)
+        syncindex.save_index(self.ws, self.legacy, "another-volume-id", {})
+        self.assertIsNone(volumes.migrate(self.engine, self.ws))
+        self.assertFalse((self.volumes / self.new).exists())
+        self.assertTrue(self._sync(self.new).full)
+
+    def test_two_workspaces_sharing_a_legacy_volume(self):
+        a, b = (self.base / "a" / "app").resolve(), (self.base / "b" / "app").resolve()
+        write_file(a, "src/main.c", "int a;")
+        write_file(b, "src/main.c", "int b;")
+        legacy = legacy_volume_name(a)
+        self.assertEqual(legacy, legacy_volume_name(b))
+        syncindex.sync(self.engine, legacy, a, DEFAULT_EXCLUDES)
+        syncindex.sync(self.engine, legacy, b, DEFAULT_EXCLUDES)  # clobbers a's files
+        self.assertEqual(syncindex.load_index(a)["volume_id"], syncindex.load_index(b)["volume_id"])
+
+        self.assertIsNone(volumes.migrate(self.engine, a))
+        self.assertFalse((self.volumes / workspace_volume_name(a)).exists())
+        stats = syncindex.sync(self.engine, workspace_volume_name(a), a, DEFAULT_EXCLUDES)
+        self.assertTrue(stats.full)
+        self.assertEqual((self.volumes / workspace_volume_name(a) / "src/main.c").read_text(), "int a;")
+
+        self.assertEqual(volumes.migrate(self.engine, b), legacy)
+        self.assertEqual((self.volumes / workspace_volume_name(b) / "src/main.c").read_text(), "int b;")
+
+    def test_legacy_volume_without_owner_marker_is_not_taken(self):
+        self._sync(self.legacy)
+        (self.volumes / self.legacy / syncindex.OWNER_FILE).unlink()  # synced by an older release
+        self.assertIsNone(volumes.migrate(self.engine, self.ws))
+        self.assertTrue(self._sync(self.new).full)
+
+    def test_doctor_lines(self):
+        self._sync(self.legacy)
+        volumes.migrate(self.engine, self.ws)
+        lines = volumes.doctor_lines(self.ws, self.engine)
+        self.assertIn(f"[PASS] workspace volume: {self.new}", lines[0])
+        self.assertTrue(any(f"volume rm {self.legacy}" in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
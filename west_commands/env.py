@@ -2,6 +2,7 @@
 
 import json
 import platform as _platform_mod
+import subprocess
 import sys
 import time
 from pathlib import Path
@@ -15,6 +16,7 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from west.commands import WestCommand
+from west_env import engineapi, probecache
 from west_env.config import load_config
 from west_env.container import check_container, check_container_workspace
 from west_env.container import run_container
@@ -96,6 +98,9 @@ class EnvCommand(WestCommand):
                 "flash",
                 "debug",
                 "cache",
+                "session",
+                "snapshot",
+                "image",
                 "benchmark",
                 "generate-tasks",
                 "version",
@@ -126,6 +131,26 @@ class EnvCommand(WestCommand):
             action="store_true",
             help="(sync only) Sync artifacts from container back to host",
         )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="(sync only) Ignore the sync index and re-upload the whole workspace",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="(sync only) Keep running and push changes to the volume as files change",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="(sync only) Report what would be transferred and the projected time; send nothing",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="(sync only) Also print files and bytes per west project / directory and the largest files",
+        )
         parser.add_argument(
             "--clean",
             action="store_true",
@@ -141,6 +166,23 @@ class EnvCommand(WestCommand):
             action="store_true",
             help="(cache reset) Clear modules cache only",
         )
+        parser.add_argument(
+            "--pycache",
+            action="store_true",
+            help="(cache reset) Clear Python bytecode cache only",
+        )
+
+        parser.add_argument(
+            "--print-run-spec",
+            action="store_true",
+            help="Print the container run spec (mounts, env, limits) as JSON and exit",
+        )
+
+        parser.add_argument(
+            "--refresh-probes",
+            action="store_true",
+            help="Ignore cached backend/credential/J-Link probe results and re-detect",
+        )
 
         parser.add_argument(
             "args",
@@ -151,13 +193,21 @@ class EnvCommand(WestCommand):
         return parser
 
     def do_run(self, args, unknown_args):
+        probecache.enable(refresh=getattr(args, "refresh_probes", False))
         cfg = load_config(self.topdir)
+        if args.workspace_mode:
+            cfg.workspace_mode = args.workspace_mode
+        cfg.action = args.action  # selects per-action resource overrides
         use_container = args.container or cfg.env_type == "container"
         passthrough = [a for a in args.args if a not in ("--container",)]
         passthrough.extend(a for a in unknown_args if a not in ("--container",))
 
         action = args.action
 
+        if getattr(args, "print_run_spec", False):
+            self._print_run_spec(cfg)
+            return
+
         if action == "init":
             print("Initializing environment...")
             if use_container:
@@ -182,6 +232,7 @@ class EnvCommand(WestCommand):
             cmd = ["west", "build"] + passthrough
             if use_container:
                 validate_workspace_layout(self.topdir)
+                self._presync(cfg)
                 self._run_container(cfg, cmd)
             else:
                 run_host(cmd)
@@ -197,7 +248,15 @@ class EnvCommand(WestCommand):
             self._doctor(cfg, use_container)
 
         elif action == "sync":
-            self._sync(cfg, args.workspace_mode or cfg.workspace_mode, back=getattr(args, "back", False))
+            self._sync(
+                cfg,
+                cfg.workspace_mode,
+                back=getattr(args, "back", False),
+                full=getattr(args, "full", False),
+                watch=getattr(args, "watch", False),
+                dry_run=getattr(args, "dry_run", False),
+                stats=getattr(args, "stats", False),
+            )
 
         elif action == "flash":
             self._flash(cfg, passthrough)
@@ -209,6 +268,21 @@ class EnvCommand(WestCommand):
             sub = passthrough[0] if passthrough else "stats"
             self._cache(cfg, sub, args)
 
+        elif action == "session":
+            sub = passthrough[0] if passthrough else "status"
+            self._session(cfg, sub)
+
+        elif action == "snapshot":
+            validate_workspace_layout(self.topdir)
+            if passthrough:
+                self._volume_snapshot(cfg, passthrough[0], passthrough[1:])
+            else:
+                self._snapshot(cfg)
+
+        elif action == "image":
+            sub = passthrough[0] if passthrough else "status"
+            self._image(cfg, sub)
+
         elif action == "benchmark":
             self._benchmark(cfg, passthrough)
 
@@ -231,6 +305,31 @@ class EnvCommand(WestCommand):
         except TypeError:
             return run_container(cfg, cmd, interactive=interactive)
 
+    def _print_run_spec(self, cfg):
+        from west_env.container import _run_args, run_spec
+
+        try:
+            spec = run_spec(cfg, self.topdir)
+        except RuntimeError as exc:
+            raise SystemExit(f"FATAL: {exc}")
+        data = spec.to_dict()
+        data["command"] = [spec.engine] + _run_args(spec, ["<command>"])
+        print(json.dumps(data, indent=2))
+
+    def _presync(self, cfg):
+        """Populate the workspace volume before a run in a volume-backed mode."""
+        if cfg.workspace_mode not in ("sync", "copy", "tmpfs"):
+            return
+        from west_env import syncwatch
+        from west_env.sync import workspace_volume_name
+
+        topdir = Path(self.topdir).resolve()
+        volume = workspace_volume_name(topdir)
+        if syncwatch.is_current(topdir, self._engine_name(cfg), volume):
+            print(f"[INFO] sync --watch reports volume {volume} current; skipping pre-sync")
+            return
+        self._sync(cfg, cfg.workspace_mode)
+
     def _doctor(self, cfg, use_container):
         from west_env import __version__
 
@@ -245,11 +344,17 @@ class EnvCommand(WestCommand):
             from west_env import backend as _backend
 
             print()
-            for line in _backend.doctor_lines():
+            preferred = "auto-fastest" if cfg.backend == "auto-fastest" else "auto"
+            for line in _backend.doctor_lines(preferred=preferred, image=cfg.image):
                 print(line)
         except Exception:
             pass
 
+        cache = probecache.active()
+        if cache is not None:
+            print(f"\n[INFO] probe cache: {cache.path}")
+            print("       run with --refresh-probes to re-detect")
+
         # Extended: credential strategy
         try:
             from west_env import credentials as _creds
@@ -273,6 +378,16 @@ class EnvCommand(WestCommand):
         # Legacy container checks (kept for test compatibility)
         if use_container:
             ok &= check_container(cfg)
+            ok &= self._doctor_run_spec(cfg)
+            from west_env import snapshot
+
+            for line in snapshot.doctor_lines(Path(self.topdir).resolve()):
+                print(line)
+            if cfg.workspace_mode in ("sync", "copy", "tmpfs"):
+                from west_env import volumes
+
+                for line in volumes.doctor_lines(Path(self.topdir).resolve(), self._engine_name(cfg)):
+                    print(line)
             ok &= self._doctor_container_workspace(cfg)
         else:
             print("\n[INFO] container execution disabled")
@@ -283,6 +398,26 @@ class EnvCommand(WestCommand):
         else:
             print("One or more checks failed [FAIL]")
 
+    def _doctor_run_spec(self, cfg):
+        from west_env.container import run_spec
+
+        try:
+            spec = run_spec(cfg, self.topdir, use_snapshot=False)
+        except Exception as exc:  # noqa
+            print(f"[FAIL] run spec: {exc}")
+            return False
+        print(
+            f"[INFO] run spec: workspace_mode={spec.workspace_mode}, {len(spec.volumes)} volume(s), env {len(spec.env)}"
+        )
+        for volume in spec.volumes:
+            print(f"       -v {volume}")
+        from west_env import resources
+
+        limits = resources.resolve(cfg.resources, spec.engine, "build", cfg.backend)
+        print(f"[INFO] resources (build): {limits.describe()}")
+        print("       full spec: west env <action> --print-run-spec")
+        return True
+
     def _doctor_container_workspace(self, cfg):
         topdir = Path(self.topdir).resolve()
         mpath, mfile = _read_west_manifest_location(topdir)
@@ -298,25 +433,88 @@ class EnvCommand(WestCommand):
             print("       ensure you run west from the workspace root")
             return False
 
-    def _sync(self, cfg, mode, back=False):
-        from west_env.sync import WorkspaceSync, _workspace_slug
+    def _agent_image(self, cfg):
+        """The build image reference the sync agent runs in (None without one)."""
+        from west_env import image
+
+        if not cfg.image:
+            return None
+        return image.locked_reference(Path(self.topdir).resolve(), cfg.image) or cfg.image
+
+    def _sync(self, cfg, mode, back=False, full=False, watch=False, dry_run=False, stats=False):
+        from west_env import volumes
+        from west_env.backend import selected_name
+        from west_env.sync import DEFAULT_EXCLUDES, WorkspaceSync, workspace_volume_name
+        from west_env.syncback import ArtifactSet
 
         topdir = Path(self.topdir).resolve()
-        ws = WorkspaceSync(workspace_mode=mode)
         engine_name = self._engine_name(cfg)
-        volume = f"west-env-ws-{_workspace_slug(topdir)}"
+        ws = WorkspaceSync(
+            workspace_mode=mode,
+            excludes=DEFAULT_EXCLUDES + cfg.sync_exclude,
+            client=engineapi.client_for(engine_name, cfg.engine_driver),
+            gitignore=cfg.sync_gitignore,
+            compression=cfg.sync_compression,
+            backend=selected_name(cfg) if cfg.sync_compression == "auto" else cfg.backend,
+            artifacts=ArtifactSet(
+                dirs=tuple(cfg.sync_artifact_dirs),
+                extensions=tuple(cfg.sync_artifact_extensions),
+                globs=tuple(cfg.sync_artifact_globs),
+            ),
+            image=self._agent_image(cfg),
+            agent=cfg.sync_agent,
+            delta_min_size=cfg.sync_delta_min_size,
+            enumeration=cfg.sync_enumeration,
+            streams=cfg.sync_streams,
+            transport=cfg.sync_transport,
+            module_store=cfg.sync_module_store,
+        )
+        volume = workspace_volume_name(topdir)
 
         if back:
             print(f"Syncing artifacts back from container (mode={mode})...")
             artifacts_dir = topdir / "artifacts"
-            ws.sync_from_volume(engine_name, volume, artifacts_dir)
-            print(f"[OK] artifacts written to {artifacts_dir}")
+            summary = ws.sync_from_volume(engine_name, volume, artifacts_dir)
+            print(f"[OK] {summary.summary()}")
+            print(f"     artifacts written to {artifacts_dir}")
         else:
             print(f"Syncing source to container (mode={mode})...")
             ws.warn_if_needed()
-            if mode in ("sync", "copy", "tmpfs"):
-                ws.sync_to_volume(topdir, engine_name, volume)
+            if mode in ("sync", "copy", "tmpfs") and not dry_run:
+                legacy = volumes.migrate(engine_name, topdir, ws.image or "alpine")
+                if legacy:
+                    print(f"[OK] migrated workspace volume {legacy} -> {volume}")
+            if watch and mode in ("sync", "copy", "tmpfs"):
+                from west_env import syncwatch
+
+                volumes.record(topdir, engine_name, volume)  # last_sync: when the watch started
+                syncwatch.watch(
+                    engine_name,
+                    volume,
+                    topdir,
+                    ws.matcher,
+                    debounce=cfg.sync_debounce,
+                    interval=cfg.sync_poll_interval,
+                    poll=cfg.sync_watcher == "poll",
+                    **ws.sync_options(engine_name, volume, topdir),
+                )
+            elif mode in ("sync", "copy", "tmpfs") and dry_run:
+                from west_env import syncplan
+
+                result = syncplan.plan(topdir, ws.matcher, engine_name, volume, ws.projects(topdir), full=full)
+                for line in syncplan.describe(result) + ([""] + syncplan.profile(result) if stats else []):
+                    print(line)
+            elif mode in ("sync", "copy", "tmpfs"):
+                summary = ws.sync_to_volume(topdir, engine_name, volume, full=full)
+                volumes.record(topdir, engine_name, volume)
                 print(f"[OK] source synced to volume {volume}")
+                print(f"     {summary.summary()}")
+                if stats:
+                    from west_env import syncplan
+
+                    result = syncplan.plan(topdir, ws.matcher, engine_name, volume, ws.projects(topdir))
+                    for line in [""] + syncplan.profile(result):
+                        print(line)
             else:
                 print("[INFO] bind mode: no sync needed; host path mounted directly")
 
@@ -348,19 +546,119 @@ class EnvCommand(WestCommand):
     def _cache(self, cfg, sub_action, args):
         from west_env.cache import CacheManager
 
-        cm = CacheManager(self._engine_name(cfg))
+        engine_name = self._engine_name(cfg)
+        cm = CacheManager(
+            engine_name,
+            client=engineapi.client_for(engine_name, cfg.engine_driver),
+            image=self._agent_image(cfg),
+            agent=cfg.sync_agent,
+        )
         if sub_action == "stats":
+            from west_env import volumes
+
             cm.print_stats()
+            print()
+            for line in volumes.describe():
+                print(line)
         elif sub_action == "reset":
             if getattr(args, "ccache", False):
                 cm.reset("ccache")
             elif getattr(args, "modules", False):
                 cm.reset("modules")
+            elif getattr(args, "pycache", False):
+                cm.reset("pycache")
             else:
                 cm.reset("all")
         else:
             raise SystemExit(f"Unknown cache sub-action: {sub_action!r}. Use 'stats' or 'reset'.")
 
+    def _session(self, cfg, sub_action):
+        from west_env import session
+
+        topdir = Path(self.topdir).resolve()
+        if sub_action == "start":
+            validate_workspace_layout(self.topdir)
+            session.start(cfg, topdir)
+        elif sub_action == "stop":
+            session.stop(cfg, topdir)
+        elif sub_action == "status":
+            for line in session.describe(session.status(cfg, topdir)):
+                print(line)
+        else:
+            raise SystemExit(f"Unknown session sub-action: {sub_action!r}. Use 'start', 'stop' or 'status'.")
+
+    def _snapshot(self, cfg):
+        from west_env import snapshot
+        from west_env.container import run_spec
+
+        spec = run_spec(cfg, self.topdir, use_snapshot=False)
+        self._presync(cfg)
+        print(f"Building environment snapshot from {spec.image}...")
+        tag = snapshot.build(spec, engineapi.client_for(spec.engine, cfg.engine_driver))
+        print(f"[OK] snapshot image: {tag}")
+        print("     container runs in this workspace now start from the snapshot")
+
+    def _volume_snapshot(self, cfg, sub_action, names):
+        from west_env import volsnap
+        from west_env.sync import workspace_volume_name
+
+        if cfg.workspace_mode not in ("sync", "copy", "tmpfs"):
+            raise SystemExit(f"FATAL: workspace_mode={cfg.workspace_mode} has no workspace volume to snapshot")
+        topdir = Path(self.topdir).resolve()
+        engine_name = self._engine_name(cfg)
+        volume = workspace_volume_name(topdir)
+        image = self._agent_image(cfg) or "alpine"
+        if sub_action == "list":
+            for line in volsnap.describe(volsnap.list_snapshots(topdir, volume)):
+                print(line)
+            return
+        if sub_action not in ("save", "restore", "delete"):
+            raise SystemExit(f"Unknown snapshot sub-action: {sub_action!r}. Use 'save', 'restore', 'list' or 'delete'.")
+        if len(names) != 1:
+            raise SystemExit(f"usage: west env snapshot {sub_action} <name>")
+        name = names[0]
+        try:
+            if sub_action == "save":
+                record = volsnap.save(engine_name, topdir, volume, name, image)
+                print(f"[OK] saved {volume} as snapshot {name!r} ({record['method']}, {record['seconds']:.1f}s)")
+            elif sub_action == "restore":
+                from west_env import session
+
+                if session.status(cfg, topdir)["running"]:
+                    raise SystemExit("FATAL: a build session uses the volume; stop it first: west env session stop")
+                record = volsnap.restore(engine_name, topdir, volume, name, image)
+                print(f"[OK] restored snapshot {name!r} into {volume} ({record['method']}, {record['seconds']:.1f}s)")
+                print("     the next sync sends only what differs from the working tree")
+            else:
+                volsnap.delete(engine_name, topdir, volume, name)
+                print(f"[OK] deleted snapshot {name!r}")
+        except (ValueError, RuntimeError, subprocess.CalledProcessError) as exc:
+            raise SystemExit(f"FATAL: {exc}")
+
+    def _image(self, cfg, sub_action):
+        from west_env import image
+
+        if not cfg.image:
+            raise SystemExit("FATAL: no container image configured")
+        topdir = Path(self.topdir).resolve()
+        engine_name = self._engine_name(cfg)
+        if sub_action == "lock":
+            lock = image.write_lock(topdir, engine_name, cfg.image)
+            print(f"[OK] {cfg.image} locked to {lock['digest']}")
+            print(f"     written: {image.lock_path(topdir)}")
+        elif sub_action == "prefetch":
+            ref = image.locked_reference(topdir, cfg.image) or cfg.image
+            pid = image.prefetch(topdir, engine_name, ref)
+            print(f"[OK] pulling {ref} in the background (PID {pid})")
+            print("     check progress with: west env image status")
+        elif sub_action == "status":
+            client = engineapi.client_for(engine_name, cfg.engine_driver)
+            for line in image.status_lines(topdir, engine_name, cfg.image, client):
+                print(line)
+            print(f"[INFO] pull policy: {cfg.pull_policy}")
+        else:
+            raise SystemExit(f"Unknown image sub-action: {sub_action!r}. Use 'lock', 'prefetch' or 'status'.")
+
     def _benchmark(self, cfg, passthrough):
         topdir = Path(self.topdir).resolve()
         board = "native_sim"
@@ -371,11 +669,20 @@ class EnvCommand(WestCommand):
             elif not arg.startswith("-"):
                 sample = arg
 
+        limits = None
+        if cfg.env_type == "container":
+            from west_env.container import run_spec
+
+            try:
+                limits = run_spec(cfg, self.topdir).limits
+            except RuntimeError:
+                pass  # reported by the run below
         print(f"Benchmarking: board={board}, mode={cfg.workspace_mode}")
         start = time.monotonic()
         cmd = ["west", "build", "-b", board] + ([sample] if sample else [])
         try:
             if cfg.env_type == "container":
+                self._presync(cfg)
                 self._run_container(cfg, cmd)
             else:
                 run_host(cmd)
@@ -394,6 +701,7 @@ class EnvCommand(WestCommand):
             "backend": cfg.backend,
             "workspace_mode": cfg.workspace_mode,
             "elapsed_seconds": round(elapsed, 2),
+            "resources": limits,
         }
         bench_dir = topdir / "docs" / "benchmarks"
         bench_dir.mkdir(parents=True, exist_ok=True)
@@ -417,11 +725,17 @@ class EnvCommand(WestCommand):
         print("     No Remote WSL extension required.")
 
     def _engine_name(self, cfg) -> str:
-        """Return underlying binary name (docker or podman) for the config."""
-        backend = getattr(cfg, "backend", "auto") or "auto"
-        if "podman" in backend:
-            return "podman"
-        if "docker" in backend:
+        """Return underlying binary name (docker or podman) for the config.
+
+        The same engine container runs use (west_env.backend.engine_for).
+        """
+        from west_env.backend import engine_for
+        from west_env.engine import detect_engine
+
+        engine = engine_for(cfg)
+        if engine != "auto":
+            return engine
+        try:
+            return detect_engine("auto")[0]
+        except RuntimeError:
             return "docker"
-        engine = getattr(cfg, "engine", "docker") or "docker"
-        return "docker" if engine == "auto" else engine
@@ -11,15 +11,24 @@ Backends:
   docker-native          Docker binary, native Linux daemon    (Linux)
   podman-machine         Podman machine (non-Hyper-V VM)       (macOS preferred)
   docker-machine         Docker Desktop (macOS)                (macOS fallback)
+
+Low-level probe results are memoised through west_env.probecache when the
+persistent probe cache is enabled.
 """
 
 import json
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
 from dataclasses import dataclass, field
 from shutil import which
 from typing import Optional
 
+from west_env import engineapi, probecache
+
 
 # ---------------------------------------------------------------------------
 # Data types
@@ -46,71 +55,106 @@ def _binary_version(cmd: str, version_flag: str = "version") -> Optional[str]:
     """Return first line of `cmd version_flag` output, or None if unavailable."""
     if not which(cmd):
         return None
-    try:
-        out = subprocess.check_output(
-            [cmd, version_flag],
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=5,
-        )
-        return out.strip().splitlines()[0]
-    except Exception:  # noqa
-        return None
+
+    def _probe():
+        try:
+            out = subprocess.check_output(
+                [cmd, version_flag],
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=5,
+            )
+            return out.strip().splitlines()[0]
+        except Exception:  # noqa
+            return None
+
+    return probecache.cached(
+        f"version:{cmd}:{version_flag}",
+        probecache.binary_fingerprint(cmd),
+        _probe,
+        cache_if=lambda v: v is not None,
+    )
 
 
 def _podman_machine_running() -> bool:
     """Return True if at least one Podman machine is in 'Running' state."""
     if not which("podman"):
         return False
-    try:
-        out = subprocess.check_output(
-            ["podman", "machine", "list", "--format", "json"],
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=10,
-        )
-        machines = json.loads(out)
-        return any(m.get("Running") or m.get("State") == "running" for m in machines)
-    except Exception:  # noqa
-        return False
+
+    def _probe():
+        try:
+            out = subprocess.check_output(
+                ["podman", "machine", "list", "--format", "json"],
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=10,
+            )
+            machines = json.loads(out)
+            return any(m.get("Running") or m.get("State") == "running" for m in machines)
+        except Exception:  # noqa
+            return False
+
+    # Only a running machine is cached: "not running" must re-probe so that
+    # `podman machine start` takes effect immediately.
+    return probecache.cached(
+        "podman-machine-running",
+        probecache.binary_fingerprint("podman"),
+        _probe,
+        ttl=probecache.STATE_TTL,
+        cache_if=bool,
+    )
 
 
 def _hyperv_enabled() -> bool:
     """Return True if Hyper-V is enabled on Windows (requires PowerShell)."""
     if sys.platform != "win32":
         return False
-    try:
-        result = subprocess.run(
-            [
-                "powershell",
-                "-NoProfile",
-                "-Command",
-                "(Get-WindowsOptionalFeature -Online -FeatureName Microsoft-Hyper-V-All"
-                " -ErrorAction SilentlyContinue).State",
-            ],
-            capture_output=True,
-            text=True,
-            timeout=15,
-        )
-        return "Enabled" in result.stdout
-    except Exception:  # noqa
-        return False
+
+    def _probe():
+        try:
+            result = subprocess.run(
+                [
+                    "powershell",
+                    "-NoProfile",
+                    "-Command",
+                    "(Get-WindowsOptionalFeature -Online -FeatureName Microsoft-Hyper-V-All"
+                    " -ErrorAction SilentlyContinue).State",
+                ],
+                capture_output=True,
+                text=True,
+                timeout=15,
+            )
+            return "Enabled" in result.stdout
+        except Exception:  # noqa
+            return False
+
+    return probecache.cached("hyperv-enabled", probecache.host_fingerprint(), _probe)
 
 
 def _docker_uses_wsl2() -> bool:
     """Return True if the running Docker daemon reports a WSL2/Desktop backend."""
     if not which("docker"):
         return False
-    try:
-        out = subprocess.check_output(
-            ["docker", "info", "--format", "{{.OperatingSystem}}"],
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=10,
-        )
-        return "Docker Desktop" in out or "WSL" in out
-    except Exception:  # noqa
-        return False
+
+    def _probe():
+        try:
+            out = subprocess.check_output(
+                ["docker", "info", "--format", "{{.OperatingSystem}}"],
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=10,
+            )
+            return "Docker Desktop" in out or "WSL" in out
+        except Exception:  # noqa
+            return False
+
+    # A stopped daemon also reports False, so negative results are not cached.
+    return probecache.cached(
+        "docker-uses-wsl2",
+        probecache.binary_fingerprint("docker"),
+        _probe,
+        cache_if=bool,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -191,50 +235,124 @@ def _probe_docker_machine() -> BackendProbe:
 # ---------------------------------------------------------------------------
 
 
-def detect_all(host_platform: Optional[str] = None) -> dict:
-    """Probe all backends and return a dict keyed by backend name.
+# Fallback chains per platform
+_FALLBACK_CHAIN = {
+    "win32": ["podman-machine-hyperv", "docker-desktop"],
+    "darwin": ["podman-machine", "docker-machine"],
+    "linux": ["podman-native", "docker-native"],
+}
+
+# Upper bound on how long any single probe may take before it is reported
+# as unavailable.  The slowest probe (Hyper-V via PowerShell) uses 15 s.
+DEFAULT_PROBE_TIMEOUT = 20.0
+
+
+def _probe_functions() -> dict:
+    """Return backend name -> probe function (looked up at call time)."""
+    return {
+        "podman-machine-hyperv": _probe_podman_machine_hyperv,
+        "docker-desktop": _probe_docker_desktop,
+        "podman-native": _probe_podman_native,
+        "docker-native": _probe_docker_native,
+        "podman-machine": _probe_podman_machine,
+        "docker-machine": _probe_docker_machine,
+    }
+
+
+def _platform_chain(plat: str) -> list:
+    return list(_FALLBACK_CHAIN.get(plat, ["podman-native", "docker-native"]))
+
+
+def _start_probe(name: str, fn) -> Future:
+    """Run *fn* on a daemon thread and return a Future for its result.
+
+    Daemon threads are used instead of a ThreadPoolExecutor so that a probe
+    abandoned by a lazy select() never delays interpreter exit.
+    """
+    fut = Future()
+
+    def _target():
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            fut.set_result(fn())
+        except BaseException as exc:  # noqa
+            fut.set_exception(exc)
+
+    threading.Thread(target=_target, name=f"west-env-probe-{name}", daemon=True).start()
+    return fut
+
+
+def run_probes(names: list, timeout: Optional[float] = None, stop_at_first: bool = False) -> dict:
+    """Run the probes for *names* concurrently and collect results in order.
+
+    All probes start at once.  Results are gathered in the order of *names*;
+    with ``stop_at_first`` collection stops at the first available backend
+    and later probes are abandoned.  A probe that exceeds *timeout* seconds
+    or raises is reported as unavailable instead of failing detection.
+
+    Returns:
+        Ordered mapping of backend name -> BackendProbe.
+    """
+    timeout = DEFAULT_PROBE_TIMEOUT if timeout is None else timeout
+    fns = _probe_functions()
+    futures = {name: _start_probe(name, fns[name]) for name in names if name in fns}
+    deadline = time.monotonic() + timeout
+
+    results = {}
+    for name, fut in futures.items():
+        try:
+            probe = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            probe = BackendProbe(name, False, notes=[f"probe timed out after {timeout:g}s"])
+        except Exception as exc:  # noqa
+            probe = BackendProbe(name, False, notes=[f"probe failed: {exc}"])
+        results[name] = probe
+        if stop_at_first and probe.available:
+            break
+    return results
+
+
+def detect_all(
+    host_platform: Optional[str] = None,
+    names: Optional[list] = None,
+    stop_at_first: bool = False,
+    timeout: Optional[float] = None,
+) -> dict:
+    """Probe backends concurrently and return a dict keyed by backend name.
 
     Args:
         host_platform: Override sys.platform (for testing). 'win32' / 'linux' / 'darwin'.
+        names:         Backends to probe. Defaults to the platform fallback chain.
+        stop_at_first: Stop collecting at the first available backend.
+        timeout:       Per-probe timeout in seconds (DEFAULT_PROBE_TIMEOUT).
 
     Returns:
-        Mapping of backend name -> BackendProbe.
+        Mapping of backend name -> BackendProbe, in probe order.
     """
     plat = host_platform or sys.platform
-
-    if plat == "win32":
-        probes = [
-            _probe_podman_machine_hyperv,
-            _probe_docker_desktop,
-        ]
-    elif plat == "darwin":
-        probes = [
-            _probe_podman_machine,
-            _probe_docker_machine,
-        ]
-    else:  # linux and anything else
-        probes = [
-            _probe_podman_native,
-            _probe_docker_native,
-        ]
-
-    return {fn().name: fn() for fn in probes}
-
-
-# Fallback chains per platform
-_FALLBACK_CHAIN = {
-    "win32": ["podman-machine-hyperv", "docker-desktop"],
-    "darwin": ["podman-machine", "docker-machine"],
-    "linux": ["podman-native", "docker-native"],
-}
+    return run_probes(names or _platform_chain(plat), timeout=timeout, stop_at_first=stop_at_first)
 
 
-def select(preferred: str = "auto", host_platform: Optional[str] = None):
+def select(
+    preferred: str = "auto",
+    host_platform: Optional[str] = None,
+    probes: Optional[dict] = None,
+    image: Optional[str] = None,
+):
     """Select the best available backend.
 
+    Only the probes needed for the decision are awaited: an explicit backend
+    probes just that backend, and 'auto' stops at the first available entry
+    of the platform fallback chain.  'auto-fastest' probes the whole chain
+    and, when several backends are available, picks the one with the best
+    measured score (see west_env.backendrank).
+
     Args:
-        preferred: Explicit backend name, or 'auto'.
+        preferred: Explicit backend name, 'auto' or 'auto-fastest'.
         host_platform: Override sys.platform (for testing).
+        probes: Pre-computed detect_all() results to select from.
+        image: Container image used to benchmark backends for 'auto-fastest'.
 
     Returns:
         Tuple of (backend_name, BackendProbe, list_of_warning_strings).
@@ -243,21 +361,18 @@ def select(preferred: str = "auto", host_platform: Optional[str] = None):
         RuntimeError: If no backend is available.
     """
     plat = host_platform or sys.platform
-    probes = detect_all(plat)
     warnings = []
 
+    if preferred == "auto-fastest":
+        return _select_fastest(plat, probes, image)
+
     if preferred and preferred != "auto":
+        if probes is None:
+            probes = detect_all(plat, names=[preferred])
         probe = probes.get(preferred)
         if probe is None:
             # Try to probe it even if not in default chain for this platform
-            probe_fn = {
-                "podman-machine-hyperv": _probe_podman_machine_hyperv,
-                "docker-desktop": _probe_docker_desktop,
-                "podman-native": _probe_podman_native,
-                "docker-native": _probe_docker_native,
-                "podman-machine": _probe_podman_machine,
-                "docker-machine": _probe_docker_machine,
-            }.get(preferred)
+            probe_fn = _probe_functions().get(preferred)
             if probe_fn:
                 probe = probe_fn()
             else:
@@ -271,23 +386,17 @@ def select(preferred: str = "auto", host_platform: Optional[str] = None):
         return preferred, probe, warnings
 
     # Auto-select: walk fallback chain
-    chain = _FALLBACK_CHAIN.get(plat, ["podman-native", "docker-native"])
+    chain = _platform_chain(plat)
+    if probes is None:
+        probes = detect_all(plat, names=chain, stop_at_first=True)
     for name in chain:
         probe = probes.get(name)
         if probe is None:
             # Probe on demand if not in dict
-            probe_fns = {
-                "podman-machine-hyperv": _probe_podman_machine_hyperv,
-                "docker-desktop": _probe_docker_desktop,
-                "podman-native": _probe_podman_native,
-                "docker-native": _probe_docker_native,
-                "podman-machine": _probe_podman_machine,
-                "docker-machine": _probe_docker_machine,
-            }
-            if name in probe_fns:
-                probe = probe_fns[name]()
-            else:
+            probe_fn = _probe_functions().get(name)
+            if probe_fn is None:
                 continue
+            probe = probe_fn()
         if probe.available:
             if probe.warning:
                 warnings.append(probe.warning)
@@ -299,14 +408,40 @@ def select(preferred: str = "auto", host_platform: Optional[str] = None):
     raise RuntimeError(f"No supported container backend found on {plat}. Install Docker or Podman and try again.")
 
 
-def doctor_lines(host_platform: Optional[str] = None) -> list:
+def _select_fastest(plat: str, probes: Optional[dict], image: Optional[str]):
+    """Implement select('auto-fastest'): rank available backends by score."""
+    from west_env import backendrank
+
+    if probes is None:
+        probes = detect_all(plat)
+    available = [name for name in _platform_chain(plat) if name in probes and probes[name].available]
+    if len(available) < 2:
+        return select("auto", plat, probes=probes)
+    if not image:
+        name, probe, warnings = select("auto", plat, probes=probes)
+        warnings.append("auto-fastest: no container image configured; using fallback order")
+        return name, probe, warnings
+
+    ranking = [score for score in backendrank.rank_backends(available, image) if score.ok]
+    if not ranking:
+        name, probe, warnings = select("auto", plat, probes=probes)
+        warnings.append("auto-fastest: all backend benchmarks failed; using fallback order")
+        return name, probe, warnings
+
+    best = ranking[0]
+    probe = probes[best.name]
+    warnings = [probe.warning] if probe.warning else []
+    return best.name, probe, warnings
+
+
+def doctor_lines(host_platform: Optional[str] = None, preferred: str = "auto", image: Optional[str] = None) -> list:
     """Return a list of doctor output lines describing backend state."""
     plat = host_platform or sys.platform
     probes = detect_all(plat)
     lines = []
 
     try:
-        name, probe, sel_warnings = select(host_platform=plat)
+        name, probe, sel_warnings = select(preferred, host_platform=plat, probes=probes, image=image)
         lines.append(f"[PASS] backend selected: {name}")
         if probe.version:
             lines.append(f"       version: {probe.version}")
@@ -324,6 +459,13 @@ def doctor_lines(host_platform: Optional[str] = None) -> list:
         for note in probe.notes or []:
             lines.append(f"         {note}")
 
+    available = [n for n, p in probes.items() if p.available]
+    if preferred == "auto-fastest" and image and len(available) > 1:
+        from west_env import backendrank
+
+        lines.append("")
+        lines.extend(backendrank.ranking_lines(available, image))
+
     return lines
 
 
@@ -332,31 +474,107 @@ def doctor_lines(host_platform: Optional[str] = None) -> list:
 # ---------------------------------------------------------------------------
 
 
+# Map backend names to the underlying binary name
+_BINARY_MAP = {
+    "podman-machine-hyperv": "podman",
+    "docker-desktop": "docker",
+    "podman-native": "podman",
+    "docker-native": "docker",
+    "podman-machine": "podman",
+    "docker-machine": "docker",
+}
+
+
+def binary_for(name: str) -> str:
+    """Return the engine binary ('docker' or 'podman') behind backend *name*."""
+    return _BINARY_MAP.get(name, name.split("-")[0])
+
+
 class ContainerBackend:
     """Thin wrapper that mimics ContainerEngine for use in container.py."""
 
-    def __init__(self, name: str):
-        # Map new backend names to the underlying binary name
-        _binary_map = {
-            "podman-machine-hyperv": "podman",
-            "docker-desktop": "docker",
-            "podman-native": "podman",
-            "docker-native": "docker",
-            "podman-machine": "podman",
-            "docker-machine": "docker",
-        }
-        self.name = _binary_map.get(name, name.split("-")[0])
+    def __init__(self, name: str, driver: str = "cli"):
+        self.name = binary_for(name)
         self.backend_name = name
+        self.client = engineapi.client_for(self.name, driver)
 
     def run(self, args: list):
-        subprocess.check_call([self.name] + args)
+        engineapi.check_run(self.name, self.client, args)
+
+
+def get_backend(
+    preferred: str = "auto",
+    host_platform: Optional[str] = None,
+    driver: str = "cli",
+    selection: Optional[tuple] = None,
+):
+    """Return (ContainerBackend, warned) — compatible with get_engine() interface.
+
+    *selection* is a select() result to reuse (see resolve()) instead of
+    selecting again.
+    """
+    name, probe, warnings = selection or select(preferred=preferred, host_platform=host_platform)
+    return ContainerBackend(name, driver=driver), bool(warnings)
+
+
+# ---------------------------------------------------------------------------
+# Per-invocation selection
+# ---------------------------------------------------------------------------
+
+_resolved: dict = {}
+
 
+def resolve(cfg):
+    """Return select(cfg.backend, image=cfg.image) for this invocation.
 
-def get_backend(preferred: str = "auto", host_platform: Optional[str] = None):
-    """Return (ContainerBackend, warned) — compatible with get_engine() interface."""
+    Selected once per configuration object, so auto-fastest probes and
+    ranks the backends once and every command of the invocation -- container
+    runs, sync, cache and volume commands -- targets the same engine.
+
+    Raises:
+        RuntimeError: If no backend is available.
+    """
+    entry = _resolved.get(id(cfg))
+    if entry is None or entry[0] is not cfg:
+        preferred = getattr(cfg, "backend", "auto") or "auto"
+        entry = (cfg, select(preferred, image=getattr(cfg, "image", None)))
+        _resolved[id(cfg)] = entry
+    return entry[1]
+
+
+def engine_for(cfg) -> str:
+    """Return the engine binary *cfg* selects: docker, podman or auto (detect).
+
+    An explicit backend names its binary; auto-fastest uses the backend
+    resolve() picked; otherwise the legacy env.container.engine applies.
+    """
+    preferred = getattr(cfg, "backend", "auto") or "auto"
+    if preferred == "auto-fastest":
+        try:
+            return binary_for(resolve(cfg)[0])
+        except RuntimeError:
+            pass
+    if "podman" in preferred:
+        return "podman"
+    if "docker" in preferred:
+        return "docker"
+    return getattr(cfg, "engine", "docker") or "docker"
+
+
+def selected_name(cfg) -> str:
+    """Return the backend *cfg* runs on: the configured one, or the one resolve() picked.
+
+    Falls back to the configured name when no backend is available.
+    """
+    preferred = getattr(cfg, "backend", "auto") or "auto"
+    if preferred not in ("auto", "auto-fastest"):
+        return preferred
     try:
-        name, probe, warnings = select(preferred=preferred, host_platform=host_platform)
-        warned = bool(warnings)
-        return ContainerBackend(name), warned
+        return resolve(cfg)[0]
     except RuntimeError:
-        raise
+        return preferred
+
+
+def reset():
+    """Forget per-invocation selections (tests, or after the configuration changes)."""
+    _resolved.clear()
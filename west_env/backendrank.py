@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Performance ranking of available backends for ``backend: auto-fastest``.
+
+When more than one backend is available (e.g. both ``podman-native`` and
+``docker-native`` on Linux), each one is measured with a short, calibrated
+microbenchmark using the configured build image:
+
+  cold start   ``run --rm <image> true`` latency (median of 3 after a warm-up)
+  file writes  small files created inside a scratch named volume per second
+  tar ingest   MB/s of a tar stream extracted into a scratch named volume
+
+Write and ingest timings have the cold-start latency subtracted so they
+measure the work itself.  The score is the projected wall time, in seconds,
+of a reference workload (one container start, REF_FILES small writes and a
+REF_TAR_MB tar ingest); lower is better.
+
+Results are stored in the persistent probe cache (west_env.probecache) keyed
+by backend and image, fingerprinted on the engine binary, so the benchmark
+only re-runs when the engine changes, the TTL expires or ``--refresh-probes``
+is given.
+"""
+
+import io
+import os
+import statistics
+import subprocess
+import tarfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from west_env import probecache
+from west_env.backend import binary_for
+
+# Reference workload used to turn measurements into a single score
+REF_FILES = 2000
+REF_TAR_MB = 64
+
+# Benchmark sizes (kept small: the whole run must take seconds, not minutes)
+BENCH_FILES = 300
+BENCH_TAR_MB = 8
+
+RANK_TTL = 7 * 24 * 3600  # seconds
+
+_session_results: dict = {}
+
+
+@dataclass
+class BackendScore:
+    """Microbenchmark result for one backend."""
+
+    name: str
+    cold_start_s: Optional[float] = None
+    files_per_s: Optional[float] = None
+    tar_mb_per_s: Optional[float] = None
+    score: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.score is not None
+
+
+def _timed(cmd: list, data: Optional[bytes] = None) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, input=data, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=300)
+    return time.perf_counter() - start
+
+
+def _bench_tar(size_mb: int) -> bytes:
+    """Return an uncompressed tar of *size_mb* MB spread over 64 KiB files."""
+    chunk = os.urandom(64 * 1024)
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for i in range(size_mb * 16):
+            info = tarfile.TarInfo(f"bench/f{i:05d}")
+            info.size = len(chunk)
+            tar.addfile(info, io.BytesIO(chunk))
+    return buf.getvalue()
+
+
+def compute_score(cold_start_s: float, files_per_s: float, tar_mb_per_s: float) -> float:
+    """Projected seconds for the reference workload (lower is better)."""
+    return cold_start_s + REF_FILES / files_per_s + REF_TAR_MB / tar_mb_per_s
+
+
+def benchmark_backend(name: str, image: str) -> BackendScore:
+    """Run the microbenchmark for backend *name* using *image*."""
+    binary = binary_for(name)
+    volume = f"west-env-bench-{os.getpid()}-{name}"
+    write_script = f'i=0; while [ "$i" -lt {BENCH_FILES} ]; do echo x > /b/f$i; i=$((i+1)); done'
+    try:
+        # Warm-up run absorbs image pulls and first-start overhead.
+        _timed([binary, "run", "--rm", image, "true"])
+        cold = statistics.median(_timed([binary, "run", "--rm", image, "true"]) for _ in range(3))
+
+        subprocess.run(
+            [binary, "volume", "create", volume], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+        )
+        mount = ["-v", f"{volume}:/b"]
+        write_s = _timed([binary, "run", "--rm"] + mount + [image, "sh", "-c", write_script])
+        ingest_s = _timed(
+            [binary, "run", "--rm", "-i"] + mount + [image, "tar", "-xf", "-", "-C", "/b"], _bench_tar(BENCH_TAR_MB)
+        )
+    except (OSError, subprocess.SubprocessError) as exc:
+        return BackendScore(name, error=str(exc) or exc.__class__.__name__)
+    finally:
+        subprocess.run([binary, "volume", "rm", "-f", volume], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Floor the net timings so a noisy run can never divide by ~zero.
+    files_per_s = BENCH_FILES / max(write_s - cold, 0.01)
+    tar_mb_per_s = BENCH_TAR_MB / max(ingest_s - cold, 0.01)
+    return BackendScore(
+        name,
+        cold_start_s=round(cold, 4),
+        files_per_s=round(files_per_s, 1),
+        tar_mb_per_s=round(tar_mb_per_s, 1),
+        score=round(compute_score(cold, files_per_s, tar_mb_per_s), 3),
+    )
+
+
+def measure(name: str, image: str) -> BackendScore:
+    """Return the (cached) benchmark result for backend *name*."""
+    key = (name, image)
+    if key not in _session_results:
+        data = probecache.cached(
+            f"bench:{name}:{image}",
+            probecache.binary_fingerprint(binary_for(name)),
+            lambda: asdict(benchmark_backend(name, image)),
+            ttl=RANK_TTL,
+            cache_if=lambda d: d.get("error") is None,
+        )
+        _session_results[key] = BackendScore(**data)
+    return _session_results[key]
+
+
+def rank_backends(names: list, image: str) -> list:
+    """Return BackendScores for *names*, best first; failed runs sort last."""
+    scores = [measure(name, image) for name in names]
+    return sorted(scores, key=lambda s: (not s.ok, s.score if s.ok else 0.0))
+
+
+def ranking_lines(names: list, image: str) -> list:
+    """Return doctor output lines with the backend ranking table."""
+    lines = [
+        "Backend performance ranking (auto-fastest):",
+        f"  {'#':>2}  {'backend':<22}{'start':>9}{'files/s':>10}{'tar MB/s':>10}{'score':>9}",
+    ]
+    for rank, s in enumerate(rank_backends(names, image), 1):
+        if s.ok:
+            lines.append(
+                f"  {rank:>2}  {s.name:<22}{s.cold_start_s:>8.2f}s{s.files_per_s:>10.0f}"
+                f"{s.tar_mb_per_s:>10.1f}{s.score:>8.2f}s"
+            )
+        else:
+            lines.append(f"  {rank:>2}  {s.name:<22}[FAIL] {s.error}")
+    lines.append(f"       score = projected seconds for 1 start + {REF_FILES} file writes + {REF_TAR_MB} MB tar ingest")
+    return lines
@@ -6,6 +6,8 @@ Manages persistent Docker/Podman volumes for:
   modules  west module cache (.west/, Zephyr sources).
   sdk      Zephyr SDK binaries.
   pip      pip download/wheel cache.
+  pycache  Python bytecode for west, west-env and Zephyr scripts, written via
+           PYTHONPYCACHEPREFIX so no __pycache__ lands in the workspace.
 
 Usage
 -----
@@ -13,11 +15,14 @@ Usage
   west env cache reset     — prune all cache volumes
   west env cache reset --ccache   — prune ccache only
   west env cache reset --modules  — prune west modules only
+  west env cache reset --pycache  — prune Python bytecode only
 """
 
 import subprocess
 from typing import Optional
 
+from west_env import syncagent
+
 
 # Volume name templates
 _VOLUME_NAMES = {
@@ -25,20 +30,31 @@ _VOLUME_NAMES = {
     "modules": "west-env-cache-modules",
     "sdk": "west-env-cache-sdk",
     "pip": "west-env-cache-pip",
+    "pycache": "west-env-cache-pycache",
 }
 
+PYCACHE_DIR = "/root/.cache/pycache"
+
 
 class CacheManager:
     """Manages west-env named volumes."""
 
-    def __init__(self, engine_name: str = "docker"):
+    def __init__(self, engine_name: str = "docker", client=None, image: Optional[str] = None, agent: str = "auto"):
         self.engine = engine_name
+        # Optional west_env.engineapi.EngineClient; None uses the CLI.
+        self.client = client
+        # Build image for the sync agent that answers the stats queries;
+        # without one (or with agent="off") alpine helper containers are used.
+        self.image = image
+        self.agent_mode = agent
 
     # ------------------------------------------------------------------
     # Volume args (to be injected into docker/podman run)
     # ------------------------------------------------------------------
 
-    def volume_args(self, ccache: bool = False, modules: bool = False, sdk: bool = False, pip: bool = False) -> list:
+    def volume_args(
+        self, ccache: bool = False, modules: bool = False, sdk: bool = False, pip: bool = False, pycache: bool = False
+    ) -> list:
         """Return `-v` mount args for the enabled caches."""
         args = []
         if ccache:
@@ -50,6 +66,9 @@ class CacheManager:
             args += ["-v", f"{_VOLUME_NAMES['sdk']}:/opt/zephyr-sdk"]
         if pip:
             args += ["-v", f"{_VOLUME_NAMES['pip']}:/root/.cache/pip"]
+        if pycache:
+            args += ["-v", f"{_VOLUME_NAMES['pycache']}:{PYCACHE_DIR}"]
+            args += ["-e", f"PYTHONPYCACHEPREFIX={PYCACHE_DIR}"]
         return args
 
     def volume_args_from_config(self, cfg) -> list:
@@ -59,6 +78,7 @@ class CacheManager:
             modules=getattr(cfg, "cache_modules", False),
             sdk=getattr(cfg, "cache_sdk", False),
             pip=getattr(cfg, "cache_pip", False),
+            pycache=getattr(cfg, "cache_pycache", False),
         )
 
     # ------------------------------------------------------------------
@@ -72,13 +92,14 @@ class CacheManager:
             size = self._volume_size(name)
             result[key] = {"volume": name, "size_bytes": size}
         result["ccache_stats"] = self._ccache_stats()
+        result["pycache_files"] = self._pycache_files()
         return result
 
     def print_stats(self):
         """Print a human-readable cache stats report."""
         data = self.stats()
         print("west-env cache volumes:")
-        for key in ("ccache", "modules", "sdk", "pip"):
+        for key in _VOLUME_NAMES:
             info = data[key]
             size = info["size_bytes"]
             size_str = f"{size // 1024 // 1024} MB" if size is not None else "not created"
@@ -88,6 +109,8 @@ class CacheManager:
             print("\nccache stats:")
             for k, v in cc.items():
                 print(f"  {k}: {v}")
+        if data.get("pycache_files") is not None:
+            print(f"\npycache: {data['pycache_files']} compiled modules")
 
     # ------------------------------------------------------------------
     # Reset
@@ -97,7 +120,7 @@ class CacheManager:
         """Remove (prune) the specified cache volume(s).
 
         Args:
-            which: 'all', 'ccache', 'modules', 'sdk', or 'pip'.
+            which: 'all', 'ccache', 'modules', 'sdk', 'pip' or 'pycache'.
         """
         if which == "all":
             targets = list(_VOLUME_NAMES.values())
@@ -114,6 +137,8 @@ class CacheManager:
     # ------------------------------------------------------------------
 
     def _volume_exists(self, name: str) -> bool:
+        if self.client is not None:
+            return self.client.volume_inspect(name) is not None
         try:
             subprocess.check_call(
                 [self.engine, "volume", "inspect", name],
@@ -127,6 +152,8 @@ class CacheManager:
     def _volume_size(self, name: str) -> Optional[int]:
         if not self._volume_exists(name):
             return None
+        if self.client is not None:
+            return self.client.volume_size(name)
         try:
             out = subprocess.check_output(
                 [self.engine, "system", "df", "--format", "{{.Name}}\t{{.Size}}"],
@@ -141,9 +168,34 @@ class CacheManager:
             pass
         return None
 
+    def _agent(self):
+        """Return a sync agent with the existing stats volumes mounted, or None."""
+        if self.agent_mode == "off" or not self.image:
+            return None
+        mounts = [
+            f"{_VOLUME_NAMES[key]}:{path}"
+            for key, path in (("ccache", "/root/.cache/ccache"), ("pycache", PYCACHE_DIR))
+            if self._volume_exists(_VOLUME_NAMES[key])
+        ]
+        if not mounts:
+            return None
+        try:
+            return syncagent.agent_for(self.engine, self.image, mounts, root="/")
+        except syncagent.AgentError:
+            self.agent_mode = "off"
+            return None
+
     def _ccache_stats(self) -> dict:
         if not self._volume_exists(_VOLUME_NAMES["ccache"]):
             return {}
+        agent = self._agent()
+        if agent is not None:
+            try:
+                rc, out = agent.exec(["ccache", "-s"], env={"CCACHE_DIR": "/root/.cache/ccache"})
+                if rc == 0:
+                    return _parse_ccache_stats(out)
+            except syncagent.AgentError:
+                pass
         try:
             out = subprocess.check_output(
                 [
@@ -163,22 +215,49 @@ class CacheManager:
                 stderr=subprocess.DEVNULL,
                 timeout=30,
             )
-            stats = {}
-            for line in out.splitlines():
-                if "  " in line and line.strip():
-                    parts = line.rsplit("  ", 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        val = parts[1].strip()
-                        if key:
-                            stats[key] = val
-            return stats
+            return _parse_ccache_stats(out)
         except Exception:  # noqa
             return {}
 
+    def _pycache_files(self) -> Optional[int]:
+        if not self._volume_exists(_VOLUME_NAMES["pycache"]):
+            return None
+        agent = self._agent()
+        if agent is not None:
+            try:
+                return agent.count(PYCACHE_DIR, ".pyc")
+            except syncagent.AgentError:
+                pass
+        try:
+            out = subprocess.check_output(
+                [
+                    self.engine,
+                    "run",
+                    "--rm",
+                    "-v",
+                    f"{_VOLUME_NAMES['pycache']}:{PYCACHE_DIR}",
+                    "alpine",
+                    "sh",
+                    "-c",
+                    f"find {PYCACHE_DIR} -name '*.pyc' | wc -l",
+                ],
+                text=True,
+                stderr=subprocess.DEVNULL,
+                timeout=30,
+            )
+            return int(out.strip())
+        except Exception:  # noqa
+            return None
+
     def _remove_volume(self, name: str):
         if not self._volume_exists(name):
             return
+        if self.client is not None:
+            try:
+                self.client.volume_remove(name)
+            except Exception as exc:  # noqa
+                raise RuntimeError(f"Failed to remove volume {name!r}. Make sure no containers are using it.") from exc
+            return
         try:
             subprocess.check_call(
                 [self.engine, "volume", "rm", name],
@@ -189,6 +268,20 @@ class CacheManager:
             raise RuntimeError(f"Failed to remove volume {name!r}. Make sure no containers are using it.") from exc
 
 
+def _parse_ccache_stats(out: str) -> dict:
+    """Parse ``ccache -s`` output into {label: value}."""
+    stats = {}
+    for line in out.splitlines():
+        if "  " in line and line.strip():
+            parts = line.rsplit("  ", 1)
+            if len(parts) == 2:
+                key = parts[0].strip()
+                val = parts[1].strip()
+                if key:
+                    stats[key] = val
+    return stats
+
+
 def _parse_size(size_str: str) -> Optional[int]:
     """Parse Docker size string (e.g. '1.5GB', '512MB') to bytes."""
     s = size_str.strip().upper()
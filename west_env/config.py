@@ -15,6 +15,7 @@ def _west_topdir():
 
 _VALID_BACKENDS = {
     "auto",
+    "auto-fastest",
     "podman-machine-hyperv",
     "docker-desktop",
     "podman-native",
@@ -28,6 +29,8 @@ _VALID_BACKENDS = {
 
 _VALID_WORKSPACE_MODES = {"sync", "copy", "tmpfs", "bind"}
 
+_VALID_ENGINE_DRIVERS = {"cli", "api", "auto"}
+
 
 class EnvConfig:
     """Parsed west-env.yml configuration.
@@ -80,12 +83,19 @@ class EnvConfig:
             else:
                 self.workspace_mode = "bind"
 
+        # engine_driver: how engine queries are issued (CLI or Engine API socket)
+        self.engine_driver = env.get("engine_driver", "cli")
+
+        # pull: image pull policy passed to run (never | missing | always)
+        self.pull_policy = env.get("pull", "missing")
+
         # Cache sub-section
         _cache = data.get("cache", {})
         self.cache_ccache = bool(_cache.get("ccache", False))
         self.cache_modules = bool(_cache.get("modules", False))
         self.cache_sdk = bool(_cache.get("sdk", False))
         self.cache_pip = bool(_cache.get("pip", False))
+        self.cache_pycache = bool(_cache.get("pycache", False))
 
         # Git credential sub-section
         _git = data.get("git", {})
@@ -95,6 +105,51 @@ class EnvConfig:
         _jlink = data.get("jlink", {})
         self.jlink_mode = _jlink.get("mode", "host")
 
+        # Resource limits sub-section ("resources: auto" is shorthand)
+        _resources = data.get("resources", {}) or {}
+        if isinstance(_resources, str):
+            _resources = {"policy": _resources}
+        self.resources = dict(_resources)
+        self.resources.setdefault("policy", "none")
+
+        # Build session sub-section
+        _session = data.get("session", {})
+        self.session_idle_timeout = _session.get("idle_timeout", 1800)
+
+        # Workspace sync sub-section (sync --watch)
+        _sync = data.get("sync", {})
+        self.sync_watcher = _sync.get("watcher", "auto")
+        self.sync_debounce = _sync.get("debounce", 0.3)
+        self.sync_poll_interval = _sync.get("poll_interval", 2.0)
+        # extra gitignore-style exclusion patterns, added to the defaults
+        self.sync_exclude = _sync.get("exclude", []) or []
+        self.sync_gitignore = _sync.get("gitignore", True)
+        # stream compression across the VM boundary (auto | none | gzip | lzma | zstd)
+        self.sync_compression = _sync.get("compression", "auto")
+        # persistent in-volume sync agent in the build image (auto | off)
+        self.sync_agent = _sync.get("agent", "auto")
+        # modified files at least this large are sent as block deltas (0: never)
+        from west_env.delta import DELTA_MIN_BYTES
+
+        self.sync_delta_min_size = _sync.get("delta_min_size", DELTA_MIN_BYTES)
+        # how changed files are found: git status/diff per west project (auto) or a full stat walk
+        self.sync_enumeration = _sync.get("enumeration", "auto")
+        # concurrent upload streams for large syncs, split along west projects
+        from west_env.syncindex import DEFAULT_STREAMS
+
+        self.sync_streams = _sync.get("streams", DEFAULT_STREAMS)
+        # helper-container upload without the agent: auto | run (stdin to tar) | cp (one archive)
+        self.sync_transport = _sync.get("transport", "auto")
+        # link clean west projects to a module store volume shared by all workspaces
+        self.sync_module_store = _sync.get("module_store", False)
+        # artifact set streamed back by `sync --back` (dirs, extensions, globs)
+        from west_env.syncback import DEFAULT_DIRS, DEFAULT_EXTENSIONS
+
+        _artifacts = _sync.get("artifacts", {}) or {}
+        self.sync_artifact_dirs = _artifacts.get("dirs", list(DEFAULT_DIRS))
+        self.sync_artifact_extensions = _artifacts.get("extensions", list(DEFAULT_EXTENSIONS))
+        self.sync_artifact_globs = _artifacts.get("globs", []) or []
+
         # ------------------------------------------------------------------
         # Validation
         # ------------------------------------------------------------------
@@ -110,9 +165,78 @@ class EnvConfig:
         if self.workspace_mode not in _VALID_WORKSPACE_MODES:
             raise ValueError(f"unsupported env.workspace_mode: {self.workspace_mode}")
 
+        if self.engine_driver not in _VALID_ENGINE_DRIVERS:
+            raise ValueError(f"unsupported env.engine_driver: {self.engine_driver}")
+
+        if self.pull_policy not in {"never", "missing", "always"}:
+            raise ValueError(f"unsupported env.pull: {self.pull_policy}")
+
         if self.jlink_mode not in {"host", "tcp-server", "none"}:
             raise ValueError(f"unsupported jlink.mode: {self.jlink_mode}")
 
+        _validate_resources(self.resources)
+
+        if not isinstance(self.session_idle_timeout, int) or self.session_idle_timeout <= 0:
+            raise ValueError(f"unsupported session.idle_timeout: {self.session_idle_timeout}")
+
+        if self.sync_watcher not in {"auto", "poll"}:
+            raise ValueError(f"unsupported sync.watcher: {self.sync_watcher}")
+
+        if not isinstance(self.sync_exclude, list) or not all(isinstance(p, str) for p in self.sync_exclude):
+            raise ValueError(f"unsupported sync.exclude: {self.sync_exclude!r} (expected a list of patterns)")
+
+        from west_env.compress import MODES as _COMPRESSION_MODES
+
+        if self.sync_compression not in _COMPRESSION_MODES:
+            raise ValueError(f"unsupported sync.compression: {self.sync_compression}")
+
+        if self.sync_agent not in {"auto", "off"}:
+            raise ValueError(f"unsupported sync.agent: {self.sync_agent}")
+
+        if self.sync_enumeration not in {"auto", "walk"}:
+            raise ValueError(f"unsupported sync.enumeration: {self.sync_enumeration}")
+
+        if isinstance(self.sync_streams, bool) or not isinstance(self.sync_streams, int) or self.sync_streams < 1:
+            raise ValueError(f"unsupported sync.streams: {self.sync_streams}")
+
+        from west_env.syncindex import TRANSPORTS as _TRANSPORTS
+
+        if self.sync_transport not in _TRANSPORTS:
+            raise ValueError(f"unsupported sync.transport: {self.sync_transport}")
+
+        _delta_min = self.sync_delta_min_size
+        if isinstance(_delta_min, bool) or not isinstance(_delta_min, int) or _delta_min < 0:
+            raise ValueError(f"unsupported sync.delta_min_size: {_delta_min}")
+
+        for key in ("dirs", "extensions", "globs"):
+            value = getattr(self, f"sync_artifact_{key}")
+            if not isinstance(value, list) or not all(isinstance(p, str) and p for p in value):
+                raise ValueError(f"unsupported sync.artifacts.{key}: {value!r} (expected a list of strings)")
+
+        if not isinstance(self.sync_gitignore, bool):
+            raise ValueError(f"unsupported sync.gitignore: {self.sync_gitignore}")
+
+        if not isinstance(self.sync_module_store, bool):
+            raise ValueError(f"unsupported sync.module_store: {self.sync_module_store}")
+
+        for key, value in (("debounce", self.sync_debounce), ("poll_interval", self.sync_poll_interval)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"unsupported sync.{key}: {value}")
+
+
+def _validate_resources(resources):
+    from west_env.resources import KEYS, POLICIES
+
+    if resources["policy"] not in POLICIES:
+        raise ValueError(f"unsupported resources.policy: {resources['policy']}")
+    for key in resources:
+        if key not in KEYS and key not in ("policy", "actions"):
+            raise ValueError(f"unsupported resources key: {key}")
+    for action, overrides in (resources.get("actions") or {}).items():
+        for key in overrides or {}:
+            if key not in KEYS:
+                raise ValueError(f"unsupported resources.actions.{action} key: {key}")
+
 
 def find_config_path(topdir=None):
     if topdir is None:
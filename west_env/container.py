@@ -4,9 +4,11 @@ from pathlib import Path
 import shlex
 import subprocess
 
+from west_env import backend, image, runspec, session, snapshot
+from west_env.credentials import GIT_SAFE_DIRECTORY_CMD
 from west_env.engine import get_engine
 
-CONTAINER_WORKDIR = "/work"
+CONTAINER_WORKDIR = runspec.CONTAINER_WORKDIR
 
 
 def _west_topdir():
@@ -15,42 +17,34 @@ def _west_topdir():
     return west_topdir()
 
 
-def _container_workdir(workspace, host_cwd):
-    try:
-        rel = host_cwd.relative_to(workspace)
-        return f"{CONTAINER_WORKDIR}/{rel.as_posix()}"
-    except ValueError:
-        return CONTAINER_WORKDIR
-
-
-def _container_args(cfg, command, interactive=False, workspace=None, host_cwd=None):
+def _prepare(cfg, workspace=None, host_cwd=None, use_snapshot=True):
+    """Resolve the engine and the invocation's RunSpec."""
     if not cfg.image:
         raise RuntimeError("no container image configured")
 
-    engine, warned = get_engine(cfg.engine)
+    engine, warned = get_engine(backend.engine_for(cfg), driver=getattr(cfg, "engine_driver", "cli"))
 
     # Canonical west topdir (directory containing .west/)
     workspace = Path(workspace or _west_topdir()).resolve()
 
     # Host cwd (perhaps inside the workspace)
     host_cwd = Path(host_cwd or Path.cwd()).resolve()
-    container_wd = _container_workdir(workspace, host_cwd)
+    spec = runspec.compose(cfg, engine.name, workspace, host_cwd)
+    if use_snapshot:
+        snapshot.apply(spec, getattr(engine, "client", None))
+    return engine, warned, spec
+
+
+def _container_args(cfg, command, interactive=False, workspace=None, host_cwd=None):
+    engine, warned, spec = _prepare(cfg, workspace, host_cwd)
+    return engine, warned, _run_args(spec, command, interactive)
 
+
+def _run_args(spec, command, interactive=False):
     # -------------------------------------------------
     # Prepare container invocation
     # -------------------------------------------------
-    args = [
-        "run",
-        "--rm",
-        "-v",
-        f"{workspace}:{CONTAINER_WORKDIR}",
-        "-w",
-        container_wd,
-        "-e",
-        "PYTHONPATH=/work/modules/west-env",
-        "-e",
-        "PYTHONDONTWRITEBYTECODE=1",
-    ]
+    args = ["run", "--rm", "-w", spec.workdir] + spec.options()
 
     if interactive:
         args.extend(["-i", "-t"])
@@ -63,10 +57,14 @@ def _container_args(cfg, command, interactive=False, workspace=None, host_cwd=No
     # missing, Zephyr west extension commands (build,
     # flash, etc.) will NOT load.
     # -------------------------------------------------
-    git_prep = "git config --global safe.directory '*'"
+    args.append(spec.image)
+    if spec.prepared:
+        # Snapshot images already carry the setup: start straight into it.
+        return args + list(command)
+
+    git_prep = GIT_SAFE_DIRECTORY_CMD
     full_cmd = shlex.join(command)
 
-    args.append(cfg.image)
     args.extend(
         [
             "sh",
@@ -74,23 +72,39 @@ def _container_args(cfg, command, interactive=False, workspace=None, host_cwd=No
             f"{git_prep} && exec {full_cmd}",
         ]
     )
-    return engine, warned, args
+    return args
+
+
+def run_spec(cfg, workspace=None, host_cwd=None, use_snapshot=True):
+    """Return the RunSpec container actions in this invocation will use."""
+    return _prepare(cfg, workspace, host_cwd, use_snapshot)[2]
 
 
 def run_container(cfg, command, interactive=False):
-    engine, warned, args = _container_args(cfg, command, interactive=interactive)
+    engine, warned, spec = _prepare(cfg)
 
     if warned:
         print("[WARN] Both Docker and Podman detected; using Docker")
 
-    engine.run(args)
+    # Reuse a running build session (west env session start) when there is one.
+    exec_args = session.exec_args(spec, command, interactive=interactive)
+    if exec_args is not None:
+        subprocess.check_call([engine.name] + exec_args)
+        return
+
+    engine.run(_run_args(spec, command, interactive))
 
 
 def check_container(cfg):
     try:
-        engine, warned = get_engine(cfg.engine)
-        subprocess.check_output([engine.name, "--version"])
-        print(f"[PASS] container engine: {engine.name}")
+        engine, warned = get_engine(backend.engine_for(cfg), driver=getattr(cfg, "engine_driver", "cli"))
+        client = getattr(engine, "client", None)
+        if client is not None:
+            version = client.version().get("Version", "unknown")
+            print(f"[PASS] container engine: {engine.name} {version} (engine API: {client.socket_path})")
+        else:
+            subprocess.check_output([engine.name, "--version"])
+            print(f"[PASS] container engine: {engine.name}")
 
         if warned:
             print("[WARN] both Docker and Podman detected")
@@ -106,14 +120,11 @@ def check_container(cfg):
         return False
 
     try:
-        subprocess.check_output(
-            [engine.name, "image", "inspect", cfg.image],
-            stderr=subprocess.DEVNULL,
-        )
-        print(f"[PASS] container image available: {cfg.image}")
+        workspace = Path(_west_topdir()).resolve()
     except Exception:  # noqa
-        print(f"[WARN] container image not present locally: {cfg.image}")
-        print("       it will be pulled on first use")
+        workspace = Path.cwd().resolve()
+    for line in image.status_lines(workspace, engine.name, cfg.image, client):
+        print(line)
 
     return True
 
@@ -17,6 +17,8 @@ import sys
 from pathlib import Path
 from typing import Optional
 
+from west_env import probecache
+
 
 # ---------------------------------------------------------------------------
 # Detection helpers
@@ -75,6 +77,26 @@ def detect_strategy(preferred: str = "auto") -> str:
     if preferred != "auto":
         return preferred
 
+    return probecache.cached(
+        "credentials:strategy",
+        _strategy_fingerprint(),
+        _detect_strategy_uncached,
+        ttl=probecache.STATE_TTL,
+    )
+
+
+def _strategy_fingerprint() -> str:
+    """Invalidate on agent socket, git binary or global gitconfig changes."""
+    return "|".join(
+        [
+            probecache.binary_fingerprint("git"),
+            os.environ.get("SSH_AUTH_SOCK", ""),
+            probecache.file_fingerprint(Path.home() / ".gitconfig"),
+        ]
+    )
+
+
+def _detect_strategy_uncached() -> str:
     sock = _ssh_agent_socket()
     if sock:
         return "openssh-agent"
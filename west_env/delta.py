@@ -0,0 +1,248 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Block-level delta transfer for large modified files.
+
+Large generated or vendor files (blobs, prebuilt libraries, big ``.c``
+tables) often change only slightly between revisions, yet a modified file
+used to be resent whole.  For modified files of at least
+``sync.delta_min_size`` bytes, ``west env sync`` instead uses the rsync
+algorithm without an rsync binary:
+
+  1. the sync agent (west_env.syncagent) reports the signature of the copy
+     in the volume: per block an adler32 weak checksum and a blake2b strong
+     hash;
+  2. the host slides a rolling adler32 over the new file, confirms weak hits
+     with the strong hash, and emits "copy blocks i..j" and literal records;
+  3. the agent rebuilds the file next to the old one, checks the content
+     hash recorded in the sync index, and renames it into place.
+
+Rolling the checksum byte by byte is the costly part in Python, so it is
+only done near a mismatch (to resynchronise after an insertion or
+deletion); long runs of changed data are compared on block boundaries.
+A delta needs the agent; helper containers always receive whole files.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+DELTA_MIN_BYTES = 8 * 1024 * 1024
+MIN_BLOCK = 4 * 1024
+MAX_BLOCK = 128 * 1024
+ROLL_BLOCKS = 2  # bytes rolled after a miss, in blocks
+ROLL_STREAK = 4  # misses in a row before only block boundaries are tried
+ROLL_EVERY = 64  # ... and then one roll every this many misses
+
+_MOD = 65521
+_LITERAL_CHUNK = 1024 * 1024
+
+# Delta stream records
+COPY = b"C"  # ">QI": first block, block count
+LITERAL = b"L"  # ">I": length, then the bytes
+END = b"E"
+
+
+@dataclass
+class DeltaResult:
+    """One file sent as a delta."""
+
+    size: int = 0
+    literal_bytes: int = 0
+    copied_blocks: int = 0
+    wire_bytes: int = 0  # delta stream bytes after compression
+
+    @property
+    def saved(self) -> int:
+        return self.size - self.literal_bytes
+
+
+def block_size(size: int) -> int:
+    """Return the block size for a file of *size* bytes (about sqrt(size))."""
+    block = MIN_BLOCK
+    while block * block < size and block < MAX_BLOCK:
+        block *= 2
+    return block
+
+
+def strong(data) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def signature(path: str, block: int) -> dict:
+    """Return ``{"size", "weak", "strong"}`` for *path* in *block*-sized blocks.
+
+    The agent computes the same structure on the receiving side.
+    """
+    weak, strongs = [], []
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(block)
+            if not data:
+                break
+            weak.append(zlib.adler32(data))
+            strongs.append(strong(data))
+    return {"size": os.path.getsize(path), "weak": weak, "strong": strongs}
+
+
+def diff(data, block: int, sig: dict) -> list:
+    """Return ``("copy", first, count)`` and ``("literal", start, end)`` ops.
+
+    *data* is the new content (bytes or mmap); *sig* the old signature.
+    """
+    weak, strongs = sig["weak"], sig["strong"]
+    size = len(data)
+    full = sig["size"] // block  # blocks of full length in the old file
+    tail = sig["size"] - full * block
+    table = {}
+    for i in range(full):
+        table.setdefault(weak[i], []).append(i)
+
+    def match(pos, w):
+        for i in table.get(w, ()):
+            if strong(data[pos : pos + block]) == strongs[i]:
+                return i
+        return None
+
+    ops, state = [], {"run": None, "lit": 0}
+
+    def copy(pos, i, length):
+        run = state["run"]
+        if pos > state["lit"]:
+            if run:
+                ops.append(("copy", run[0], run[1]))
+                run = None
+            ops.append(("literal", state["lit"], pos))
+        if run and run[0] + run[1] == i:
+            run[1] += 1
+        else:
+            if run:
+                ops.append(("copy", run[0], run[1]))
+            run = [i, 1]
+        state["run"], state["lit"] = run, pos + length
+
+    end_of_blocks = size - tail if tail and size >= tail else size
+    pos = streak = 0
+    while pos + block <= end_of_blocks:
+        w = zlib.adler32(data[pos : pos + block])
+        i = match(pos, w)
+        if i is not None:
+            copy(pos, i, block)
+            pos += block
+            streak = 0
+            continue
+        streak += 1
+        if streak > ROLL_STREAK and streak % ROLL_EVERY:
+            pos += block  # long changed run: compare on block boundaries only
+            continue
+        # Roll forward looking for a block that moved.
+        a, b = w & 0xFFFF, w >> 16
+        last = min(pos + ROLL_BLOCKS * block, end_of_blocks - block)
+        q = pos
+        while q < last:
+            out, new = data[q], data[q + block]
+            a = (a - out + new) % _MOD
+            b = (b - block * out + a - 1) % _MOD
+            q += 1
+            if (a | b << 16) in table:
+                i = match(q, a | b << 16)
+                if i is not None:
+                    break
+        if i is not None:
+            copy(q, i, block)
+            pos = q + block
+            streak = 0
+        else:
+            pos = q + 1
+
+    # The old file's short last block, if the new file ends with it.
+    if tail and size - tail >= state["lit"] and strong(data[size - tail :]) == strongs[full]:
+        copy(size - tail, full, tail)
+    if state["run"]:
+        ops.append(("copy", *state["run"]))
+    if size > state["lit"]:
+        ops.append(("literal", state["lit"], size))
+    return ops
+
+
+def encode(data, ops, fileobj, result: DeltaResult):
+    """Write *ops* over *data* to *fileobj* as a delta stream."""
+    for op in ops:
+        if op[0] == "copy":
+            fileobj.write(COPY + struct.pack(">QI", op[1], op[2]))
+            result.copied_blocks += op[2]
+            continue
+        for start in range(op[1], op[2], _LITERAL_CHUNK):
+            chunk = data[start : min(op[2], start + _LITERAL_CHUNK)]
+            fileobj.write(LITERAL + struct.pack(">I", len(chunk)))
+            fileobj.write(chunk)
+            result.literal_bytes += len(chunk)
+    fileobj.write(END)
+
+
+def apply(old_path: str, block: int, stream, out) -> None:
+    """Rebuild a file from *old_path* and a delta *stream* into *out*.
+
+    The agent carries its own copy of this loop; this one serves tests and
+    local use.
+    """
+
+    def take(n):
+        buf = stream.read(n)
+        if len(buf) != n:
+            raise ValueError("truncated delta stream")
+        return buf
+
+    with open(old_path, "rb") as old:
+        while True:
+            kind = take(1)
+            if kind == END:
+                return
+            if kind == COPY:
+                first, count = struct.unpack(">QI", take(12))
+                old.seek(first * block)
+                remaining = count * block
+                while remaining:
+                    chunk = old.read(min(remaining, _LITERAL_CHUNK))
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    remaining -= len(chunk)
+            elif kind == LITERAL:
+                (n,) = struct.unpack(">I", take(4))
+                out.write(take(n))
+            else:
+                raise ValueError(f"bad delta record: {kind!r}")
+
+
+def send(agent, root: str, rel: str, entry: list, codec: str = "none") -> Optional[DeltaResult]:
+    """Send modified file *rel* through *agent* as a delta.
+
+    *entry* is its sync-index entry ``[size, mtime_ns, mode, digest]``.
+    Returns None when the volume has no copy to patch.
+    """
+    size, mtime_ns, mode, digest = entry
+    block = block_size(size)
+    sig = agent.signature(rel, block)
+    if sig.get("size") is None:
+        return None
+    result = DeltaResult(size=size)
+    with open(os.path.join(root, rel), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else _Empty() as data:
+
+            def fill(fileobj):
+                encode(data, diff(data, block, sig), fileobj, result)
+
+            writer = agent.patch(rel, block, fill, digest=digest, mode=mode, mtime_ns=mtime_ns, codec=codec)
+    result.wire_bytes = writer.wire_bytes
+    return result
+
+
+class _Empty(bytes):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -1,15 +1,17 @@
 # SPDX-License-Identifier: Apache-2.0
 
-import subprocess
 from shutil import which
 
+from west_env import engineapi
+
 
 class ContainerEngine:
-    def __init__(self, name):
+    def __init__(self, name, client=None):
         self.name = name
+        self.client = client
 
     def run(self, args):
-        subprocess.check_call([self.name] + args)
+        engineapi.check_run(self.name, self.client, args)
 
 
 def engine_available(name):
@@ -37,6 +39,6 @@ def detect_engine(preferred=None):
     raise RuntimeError("No supported container engine found")
 
 
-def get_engine(cfg_engine):
+def get_engine(cfg_engine, driver="cli"):
     name, warned = detect_engine(cfg_engine)
-    return ContainerEngine(name), warned
+    return ContainerEngine(name, client=engineapi.client_for(name, driver)), warned
@@ -0,0 +1,576 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Docker/Podman Engine API client over the local unix socket.
+
+An optional alternative to spawning a ``docker``/``podman`` CLI process for
+every query.  Each CLI call costs 50–300 ms (more on Windows); the Engine
+API answers the same inspect/volume/container requests over one pooled,
+keep-alive HTTP connection.
+
+Selected with ``env.engine_driver`` in west-env.yml:
+
+  cli   Always spawn the CLI (default).
+  api   Use the Engine API; fail if the socket is not reachable.
+  auto  Use the Engine API when the socket answers ``/_ping``, else the CLI.
+
+Socket discovery honours ``DOCKER_HOST`` (docker) and ``CONTAINER_HOST``
+(podman) when they are ``unix://`` URLs, then falls back to the engines'
+default socket locations.  TCP, SSH and Windows named-pipe endpoints are not
+supported and always use the CLI path.
+
+Only unversioned API paths are used so the client works with both Docker
+and Podman's Docker-compatible service (``podman system service``).
+"""
+
+import http.client
+import io
+import json
+import os
+import select
+import socket
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+from west_env.resources import parse_size
+
+_VALID_DRIVERS = {"cli", "api", "auto"}
+
+# Multiplexed attach stream types (non-TTY containers)
+_STREAM_STDOUT = 1
+_STREAM_STDERR = 2
+
+# Requests that may be sent again after the connection failed mid-request.
+_IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+
+class EngineAPIError(RuntimeError):
+    """Raised for non-success responses from the Engine API."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"engine API error {status}: {message}")
+        self.status = status
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that connects to a unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """Return True if the engine closed idle *conn* (its socket reads EOF)."""
+    if conn.sock is None:
+        return False  # not connected yet
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class _ChunkedBody(io.RawIOBase):
+    """Write-only file sending each write as one HTTP/1.1 chunk."""
+
+    def __init__(self, conn: http.client.HTTPConnection):
+        self.conn = conn
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if b:
+            self.conn.send(b"%x\r\n" % len(b) + bytes(b) + b"\r\n")
+        return len(b)
+
+
+# ---------------------------------------------------------------------------
+# Socket discovery
+# ---------------------------------------------------------------------------
+
+
+def socket_candidates(engine: str) -> list:
+    """Return candidate unix socket paths for *engine* ('docker' or 'podman')."""
+    env_var = "CONTAINER_HOST" if engine == "podman" else "DOCKER_HOST"
+    host = os.environ.get(env_var)
+    if host:
+        # An explicit non-unix endpoint means the CLI must be used.
+        return [host[len("unix://") :]] if host.startswith("unix://") else []
+
+    if engine == "podman":
+        candidates = []
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_dir:
+            candidates.append(os.path.join(runtime_dir, "podman", "podman.sock"))
+        if hasattr(os, "getuid"):
+            candidates.append(f"/run/user/{os.getuid()}/podman/podman.sock")
+        candidates.append("/run/podman/podman.sock")
+        return candidates
+
+    return [
+        "/var/run/docker.sock",
+        str(Path.home() / ".docker" / "run" / "docker.sock"),
+        str(Path.home() / ".docker" / "desktop" / "docker.sock"),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+class EngineClient:
+    """Minimal Engine API client with a pooled keep-alive connection.
+
+    One connection is kept open and reused for all request/response calls.
+    Streaming attach uses a dedicated connection because the engine hijacks
+    it for the container's output.
+    """
+
+    def __init__(self, socket_path: str, engine: str = "docker"):
+        self.socket_path = socket_path
+        self.engine = engine
+        self._conn: Optional[UnixHTTPConnection] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _request(self, method: str, path: str, body=None, query: Optional[dict] = None, ok=(200, 201, 204, 304)):
+        """Send one request over the pooled connection; return (status, parsed body)."""
+        if query:
+            path = f"{path}?{urlencode(query)}"
+        headers = {"Host": "localhost"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        with self._lock:
+            if self._conn is not None and _dropped(self._conn):
+                self._conn.close()
+                self._conn = None
+            for attempt in (1, 2):
+                if self._conn is None:
+                    self._conn = UnixHTTPConnection(self.socket_path)
+                sent = False
+                try:
+                    self._conn.request(method, path, body=payload, headers=headers)
+                    sent = True
+                    resp = self._conn.getresponse()
+                    data = resp.read()
+                    break
+                except (ConnectionError, http.client.HTTPException, BrokenPipeError):
+                    # Stale keep-alive connection: reconnect once.  A request
+                    # the engine may have acted on is only repeated if that
+                    # is harmless.
+                    self._conn.close()
+                    self._conn = None
+                    if attempt == 2 or (sent and method not in _IDEMPOTENT_METHODS):
+                        raise
+
+        parsed = _decode(data, resp.getheader("Content-Type", ""))
+        if resp.status not in ok:
+            message = parsed.get("message", "") if isinstance(parsed, dict) else str(parsed)
+            raise EngineAPIError(resp.status, message)
+        return resp.status, parsed
+
+    def _get_or_none(self, path: str):
+        try:
+            return self._request("GET", path)[1]
+        except EngineAPIError as exc:
+            if exc.status == 404:
+                return None
+            raise
+
+    # ------------------------------------------------------------------
+    # System
+    # ------------------------------------------------------------------
+
+    def ping(self, timeout: float = 2.0) -> bool:
+        """Return True if the engine answers ``/_ping`` within *timeout* seconds."""
+        conn = UnixHTTPConnection(self.socket_path, timeout=timeout)
+        try:
+            conn.request("GET", "/_ping", headers={"Host": "localhost"})
+            return conn.getresponse().status == 200
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+
+    def version(self) -> dict:
+        return self._request("GET", "/version")[1]
+
+    def system_df(self) -> dict:
+        return self._request("GET", "/system/df")[1]
+
+    # ------------------------------------------------------------------
+    # Images
+    # ------------------------------------------------------------------
+
+    def image_inspect(self, ref: str) -> Optional[dict]:
+        return self._get_or_none(f"/images/{quote(ref, safe='')}/json")
+
+    def image_pull(self, ref: str):
+        """Pull *ref* (``POST /images/create``), like ``docker pull``.
+
+        Raises:
+            EngineAPIError: If the engine reports an error, including one
+                reported in the progress stream after a 200 response.
+        """
+        name, tag = _split_ref(ref)
+        query = {"fromImage": name, "tag": tag} if tag else {"fromImage": name}
+        data = self._request("POST", "/images/create", query=query)[1]
+        lines = data.splitlines() if isinstance(data, str) else [json.dumps(data)]
+        for line in lines:
+            try:
+                progress = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(progress, dict) and progress.get("error"):
+                raise EngineAPIError(500, progress["error"])
+
+    # ------------------------------------------------------------------
+    # Volumes
+    # ------------------------------------------------------------------
+
+    def volume_inspect(self, name: str) -> Optional[dict]:
+        return self._get_or_none(f"/volumes/{quote(name, safe='')}")
+
+    def volume_list(self, filters: Optional[dict] = None) -> list:
+        query = {"filters": json.dumps(filters)} if filters else None
+        data = self._request("GET", "/volumes", query=query)[1] or {}
+        return data.get("Volumes") or []
+
+    def volume_create(self, name: str, labels: Optional[dict] = None) -> dict:
+        return self._request("POST", "/volumes/create", body={"Name": name, "Labels": labels or {}})[1]
+
+    def volume_remove(self, name: str, force: bool = False):
+        self._request("DELETE", f"/volumes/{quote(name, safe='')}", query={"force": int(force)})
+
+    def volume_size(self, name: str) -> Optional[int]:
+        """Return the volume's disk usage in bytes (from /system/df), or None."""
+        for vol in self.system_df().get("Volumes") or []:
+            if vol.get("Name") == name:
+                size = (vol.get("UsageData") or {}).get("Size")
+                return size if isinstance(size, int) and size >= 0 else None
+        return None
+
+    # ------------------------------------------------------------------
+    # Containers
+    # ------------------------------------------------------------------
+
+    def container_create(self, config: dict, name: Optional[str] = None, pull: str = "never") -> str:
+        """Create a container; return its id.
+
+        ``containers/create`` itself never pulls.  With *pull* ``missing``
+        (the CLI's default) an image the engine does not have (404) is
+        pulled and the create retried; with ``never`` the 404 is raised.
+        """
+        query = {"name": name} if name else None
+        try:
+            return self._request("POST", "/containers/create", body=config, query=query)[1]["Id"]
+        except EngineAPIError as exc:
+            if exc.status != 404 or pull != "missing":
+                raise
+        self.image_pull(config["Image"])
+        return self._request("POST", "/containers/create", body=config, query=query)[1]["Id"]
+
+    def container_start(self, cid: str):
+        self._request("POST", f"/containers/{cid}/start")
+
+    def container_wait(self, cid: str) -> int:
+        return int(self._request("POST", f"/containers/{cid}/wait")[1].get("StatusCode", 1))
+
+    def container_remove(self, cid: str, force: bool = False):
+        self._request("DELETE", f"/containers/{cid}", query={"force": int(force), "v": 0})
+
+    def container_attach(self, cid: str, stdout=None, stderr=None) -> threading.Thread:
+        """Attach to *cid*'s output and copy it to *stdout*/*stderr* on a thread.
+
+        Must be called before container_start() so no output is lost.
+        Returns the (already started) reader thread.
+        """
+        stdout = stdout or sys.stdout.buffer
+        stderr = stderr or sys.stderr.buffer
+        conn = UnixHTTPConnection(self.socket_path)
+        conn.request(
+            "POST",
+            f"/containers/{cid}/attach?stream=1&stdout=1&stderr=1",
+            headers={"Host": "localhost"},
+        )
+        resp = conn.getresponse()
+        if resp.status != 200:
+            conn.close()
+            raise EngineAPIError(resp.status, "attach failed")
+
+        def _pump():
+            try:
+                _demux(resp, stdout, stderr)
+            finally:
+                conn.close()
+
+        thread = threading.Thread(target=_pump, name=f"west-env-attach-{cid[:12]}", daemon=True)
+        thread.start()
+        return thread
+
+    def put_archive(self, cid: str, path: str, fill):
+        """Extract the tar stream ``fill(fileobj)`` writes into *path* of *cid*.
+
+        The container need not be running.  The body goes out with chunked
+        encoding on a dedicated connection, one buffer at a time; gzip and
+        xz streams are decompressed by the engine.  Returns what *fill*
+        returns.
+        """
+        conn = UnixHTTPConnection(self.socket_path)
+        try:
+            conn.putrequest("PUT", f"/containers/{cid}/archive?{urlencode({'path': path})}", skip_host=True)
+            conn.putheader("Host", "localhost")
+            conn.putheader("Content-Type", "application/x-tar")
+            conn.putheader("Transfer-Encoding", "chunked")
+            conn.endheaders()
+            body = io.BufferedWriter(_ChunkedBody(conn), 256 * 1024)
+            result = fill(body)
+            body.flush()
+            conn.send(b"0\r\n\r\n")
+            resp = conn.getresponse()
+            data = resp.read()
+        finally:
+            conn.close()
+        if resp.status != 200:
+            parsed = _decode(data, resp.getheader("Content-Type", ""))
+            message = parsed.get("message", "") if isinstance(parsed, dict) else str(parsed)
+            raise EngineAPIError(resp.status, message or "archive upload failed")
+        return result
+
+    def run(self, config: dict, auto_remove: bool = True, stdout=None, stderr=None, pull: str = "missing") -> int:
+        """Create, attach, start and wait for a container; return its exit code.
+
+        *pull* is ``missing`` or ``never``, as for container_create().
+        """
+        cid = self.container_create(config, pull=pull)
+        try:
+            reader = self.container_attach(cid, stdout=stdout, stderr=stderr)
+            self.container_start(cid)
+            code = self.container_wait(cid)
+            reader.join()
+            return code
+        finally:
+            if auto_remove:
+                try:
+                    self.container_remove(cid, force=True)
+                except (OSError, EngineAPIError):
+                    pass
+
+
+def _decode(data: bytes, content_type: str):
+    if not data:
+        return {}
+    if "json" in content_type:
+        try:
+            return json.loads(data)
+        except ValueError:
+            pass
+    return data.decode("utf-8", "replace")
+
+
+def _split_ref(ref: str) -> tuple:
+    """Split an image reference into ``(name, tag)`` for ``/images/create``.
+
+    Digest references are passed whole with no tag; an untagged name gets
+    ``latest``, as the CLI does.
+    """
+    if "@" in ref:
+        return ref, ""
+    name, sep, tag = ref.rpartition(":")
+    if not sep or "/" in tag:
+        return ref, "latest"
+    return name, tag
+
+
+def _demux(resp, stdout, stderr):
+    """Copy a multiplexed attach stream (8-byte frame headers) to the sinks."""
+    while True:
+        header = _read_exact(resp, 8)
+        if len(header) < 8:
+            return
+        stream, size = header[0], struct.unpack(">I", header[4:8])[0]
+        payload = _read_exact(resp, size)
+        sink = stderr if stream == _STREAM_STDERR else stdout
+        sink.write(payload)
+        sink.flush()
+        if len(payload) < size:
+            return
+
+
+def _read_exact(resp, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = resp.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+# ---------------------------------------------------------------------------
+# CLI `run` argument translation
+# ---------------------------------------------------------------------------
+
+
+# Resource-limit run flags -> (HostConfig key, value converter)
+_LIMIT_FLAGS = {
+    "--cpus": ("NanoCpus", lambda v: int(float(v) * 1e9)),
+    "--memory": ("Memory", parse_size),
+    "--shm-size": ("ShmSize", parse_size),
+    "--pids-limit": ("PidsLimit", int),
+    "--cpuset-cpus": ("CpusetCpus", str),
+}
+
+
+def run_args_to_config(args: list) -> Optional[tuple]:
+    """Translate west-env's own ``run`` CLI args into an API create config.
+
+    Only the flags west-env itself emits are understood.  Returns
+    ``(config, auto_remove)``, or None when the args need the CLI (unknown
+    flags, or an interactive TTY session).
+    """
+    if not args or args[0] != "run":
+        return None
+    binds, env, tmpfs, limits = [], [], {}, {}
+    workdir = None
+    auto_remove = False
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        if arg == "--rm":
+            auto_remove = True
+        elif arg in ("-i", "-t", "-it"):
+            return None
+        elif arg == "--pull=never":
+            pass  # check_run() passes it on to container_create()
+        elif arg in ("-v", "-w", "-e", "--mount") and i + 1 < len(args):
+            value = args[i + 1]
+            if arg == "-v":
+                binds.append(value)
+            elif arg == "-w":
+                workdir = value
+            elif arg == "-e":
+                env.append(value)
+            else:
+                opts = dict(kv.split("=", 1) for kv in value.split(",") if "=" in kv)
+                if opts.get("type") != "tmpfs" or "destination" not in opts:
+                    return None
+                tmpfs[opts["destination"]] = ""
+            i += 1
+        elif arg in _LIMIT_FLAGS and i + 1 < len(args):
+            key, convert = _LIMIT_FLAGS[arg]
+            limits[key] = convert(args[i + 1])
+            i += 1
+        elif arg.startswith("-"):
+            return None
+        else:
+            break
+        i += 1
+    if i >= len(args):
+        return None
+
+    config = {
+        "Image": args[i],
+        "Cmd": args[i + 1 :],
+        "Env": env,
+        "AttachStdout": True,
+        "AttachStderr": True,
+        "HostConfig": {"Binds": binds, "Tmpfs": tmpfs, **limits},
+    }
+    if workdir:
+        config["WorkingDir"] = workdir
+    return config, auto_remove
+
+
+def check_run(binary: str, client: Optional[EngineClient], args: list):
+    """Run ``<binary> <args>`` like subprocess.check_call, via the API if possible.
+
+    Raises:
+        subprocess.CalledProcessError: On a non-zero container exit code.
+    """
+    translated = run_args_to_config(args) if client is not None else None
+    if translated is None:
+        subprocess.check_call([binary] + args)
+        return
+    config, auto_remove = translated
+    options = args[: len(args) - len(config["Cmd"]) - 1]
+    pull = "never" if "--pull=never" in options else "missing"
+    code = client.run(config, auto_remove=auto_remove, pull=pull)
+    if code != 0:
+        raise subprocess.CalledProcessError(code, [binary] + args)
+
+
+# ---------------------------------------------------------------------------
+# Client pool
+# ---------------------------------------------------------------------------
+
+_clients: dict = {}
+_clients_lock = threading.Lock()
+
+
+def client_for(engine: str, driver: str = "cli") -> Optional[EngineClient]:
+    """Return a pooled EngineClient for *engine*, or None to use the CLI.
+
+    Raises:
+        ValueError: For an unknown driver name.
+        RuntimeError: If driver is 'api' and no engine socket answers.
+    """
+    if driver not in _VALID_DRIVERS:
+        raise ValueError(f"unsupported engine driver: {driver!r}")
+    if driver == "cli" or not hasattr(socket, "AF_UNIX"):
+        if driver == "api":
+            raise RuntimeError("engine API driver requires unix socket support")
+        return None
+
+    with _clients_lock:
+        for path in socket_candidates(engine):
+            client = _clients.get(path)
+            if client is None:
+                if not os.path.exists(path):
+                    continue
+                client = EngineClient(path, engine)
+                if not client.ping():
+                    continue
+                _clients[path] = client
+            return client
+
+    if driver == "api":
+        raise RuntimeError(f"{engine} engine API socket not reachable; tried: {', '.join(socket_candidates(engine))}")
+    return None
+
+
+def reset_clients():
+    """Close and forget all pooled clients (mainly for tests)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -17,6 +17,8 @@ from pathlib import Path
 from shutil import which
 from typing import Optional
 
+from west_env import probecache
+
 
 # ---------------------------------------------------------------------------
 # J-Link discovery
@@ -39,6 +41,22 @@ _JLINK_SEARCH_PATHS_MAC = [
 
 def find_jlink_exe(name: str = "JLinkExe") -> Optional[Path]:
     """Return the path to a J-Link executable, or None if not found."""
+    found = probecache.cached(
+        f"jlink:{name}",
+        probecache.host_fingerprint(),
+        lambda: _find_jlink_exe_uncached(name),
+        validate=lambda p: Path(p).is_file(),
+        cache_if=lambda p: p is not None,  # a later install is found at once
+    )
+    return Path(found) if found else None
+
+
+def _find_jlink_exe_uncached(name: str) -> Optional[str]:
+    found = _search_jlink_exe(name)
+    return str(found) if found else None
+
+
+def _search_jlink_exe(name: str) -> Optional[Path]:
     # Check PATH first
     found = which(name)
     if found:
@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Git-aware change enumeration for workspace sync.
+
+Statting every file of zephyr and its modules is the dominant cost of a
+no-op ``west env sync``, yet git already knows what changed.  For each west
+project that is a git repository, the sync index records the HEAD commit
+and the paths ``git status`` reported at the last sync.  The next sync then
+only stats:
+
+  * ``git diff --name-only <old HEAD> HEAD`` (commits checked out since),
+  * paths in the current ``git status --porcelain`` (including untracked
+    files), and
+  * paths that were dirty at the last sync (they may have been reverted).
+
+Every other file of the project keeps its index entry without being
+touched.  The rest of the workspace (top-level files, non-git
+directories), projects seen for the first time, and projects where git
+fails (e.g. the old HEAD is no longer available) fall back to the stat
+walk, as do projects with submodules or untracked nested repositories,
+whose contents ``git status`` does not list.  Ignore rules are applied to
+reused entries and candidates exactly as the walk applies them.
+
+Because untracked ignored files are invisible to ``git status``, the git
+strategy is only used while ``.gitignore`` files are honoured
+(``sync.gitignore: true``).  Files git ignores but ``.westenvignore``
+re-includes are only picked up by a walk (``sync --full`` or
+``sync.enumeration: walk``).
+"""
+
+import os
+import stat
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from west_env import ignore
+
+MAX_WORKERS = 8
+
+
+def west_projects(topdir: Path) -> list:
+    """Return the workspace-relative paths of the cloned west projects."""
+    try:
+        from west.manifest import Manifest
+
+        manifest = Manifest.from_topdir(topdir=str(topdir))
+    except Exception:  # noqa -- no west, or not a valid workspace
+        return []
+    topdir = Path(topdir).resolve()
+    paths = set()
+    for project in manifest.projects:
+        try:
+            rel = Path(project.abspath).resolve().relative_to(topdir).as_posix()
+        except (TypeError, ValueError):
+            continue
+        if rel != "." and (topdir / rel / ".git").exists():
+            paths.add(rel)
+    return sorted(paths)
+
+
+def _git(path: str, *args) -> Optional[bytes]:
+    try:
+        return subprocess.run(
+            ["git", "-C", path, *args],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _split(out: bytes) -> list:
+    return [p.decode("utf-8", "surrogateescape") for p in out.split(b"\0") if p]
+
+
+def project_state(path: str, previous: Optional[dict]) -> Optional[dict]:
+    """Ask git what may have changed in the project at *path*.
+
+    Returns ``{"head", "dirty", "changed"}`` (paths relative to the project),
+    or None when git cannot answer.  Without a *previous* state, ``changed``
+    is None: the caller must walk the project.
+    """
+    head = _git(path, "rev-parse", "--verify", "-q", "HEAD")
+    status = _git(path, "status", "--porcelain=v1", "-z", "--untracked-files=all", "--no-renames")
+    if head is None or status is None:
+        return None
+    head = head.decode().strip()
+    entries = [e[3:] for e in _split(status) if len(e) > 3]  # "XY <path>"
+    dirty = sorted(set(entries))
+    state = {"head": head, "dirty": dirty, "changed": None}
+    if not previous or "head" not in previous:
+        return state
+    if os.path.exists(os.path.join(path, ".gitmodules")) or any(e.endswith("/") for e in entries):
+        return state  # submodules / untracked nested repositories: walk it
+    changed = set(dirty) | set(previous.get("dirty", []))
+    if previous["head"] != head:
+        diff = _git(path, "diff", "--name-only", "-z", "--no-renames", previous["head"], head)
+        if diff is None:
+            return state  # old HEAD unknown here (gc'd, re-cloned): walk it
+        changed.update(_split(diff))
+    state["changed"] = sorted(changed)
+    return state
+
+
+class _Matchers:
+    """Ignore matchers per directory, built the way ignore.walk builds them."""
+
+    def __init__(self, root: Path, excludes):
+        self.root = str(root)
+        self.cache = {"": ignore.as_matcher(excludes).enter("", self.root)}
+
+    def for_dir(self, rel_dir: str):
+        """Return the matcher for entries of *rel_dir*, or None if it is ignored."""
+        if rel_dir in self.cache:
+            return self.cache[rel_dir]
+        parent_rel = rel_dir.rpartition("/")[0]
+        parent = self.for_dir(parent_rel)
+        if parent is None or parent.ignored(rel_dir, True):
+            matcher = None
+        else:
+            matcher = parent.enter(rel_dir, os.path.join(self.root, rel_dir))
+        self.cache[rel_dir] = matcher
+        return matcher
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        matcher = self.for_dir(rel.rpartition("/")[0])
+        return matcher is None or matcher.ignored(rel, is_dir)
+
+
+def enumerate_files(root: Path, excludes, projects: list, previous_files: dict, previous_git: dict):
+    """Return ``(current, git_state, scanned, git_projects)``.
+
+    *current* has the shape of syncindex.scan(): ``{rel: (size, mtime_ns,
+    mode)}``; files git vouches for are taken from *previous_files*.
+    *git_state* is the per-project state to record with the index; *scanned*
+    counts files actually statted, *git_projects* the projects git answered for.
+    """
+    root = Path(root)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(projects) or 1)) as pool:
+        states = dict(
+            zip(
+                projects,
+                pool.map(lambda p: project_state(str(root / p), previous_git.get(p)), projects),
+            )
+        )
+    git_state = {p: {"head": s["head"], "dirty": s["dirty"]} for p, s in states.items() if s}
+    nested = {p for p in projects for q in projects if p != q and (p.startswith(q + "/") or q.startswith(p + "/"))}
+    usable = {p: s for p, s in states.items() if s and s["changed"] is not None and p not in nested}
+
+    current, scanned = {}, 0
+    for rel, _path, st in ignore.walk(root, excludes, skip=set(usable)):
+        if stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode):
+            current[rel] = (st.st_size, st.st_mtime_ns, st.st_mode)
+            scanned += 1
+
+    matchers = _Matchers(root, excludes)
+    for project, state in usable.items():
+        prefix = project + "/"
+        candidates = {prefix + p for p in state["changed"]}
+        for rel, entry in previous_files.items():
+            if rel.startswith(prefix) and rel not in candidates and not matchers.ignored(rel, False):
+                current[rel] = tuple(entry[:3])
+        for rel in candidates:
+            try:
+                st = os.lstat(root / rel)
+            except OSError:
+                continue  # deleted
+            if not (stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode)) or matchers.ignored(rel, False):
+                continue
+            current[rel] = (st.st_size, st.st_mtime_ns, st.st_mode)
+            scanned += 1
+    return current, git_state, scanned, len(usable)
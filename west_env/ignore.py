@@ -0,0 +1,283 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Compiled workspace exclusion rules with .gitignore semantics.
+
+One rule set decides which files every transfer path ships -- the
+incremental tar stream (west_env.syncindex), the local copy engine
+(west_env.localcopy), ``sync --watch`` and rsync -- so they all move
+exactly the same files.  Rules come from, in increasing precedence:
+
+  1. ``sync.DEFAULT_EXCLUDES``
+  2. ``sync.exclude`` in west-env.yml
+  3. ``.gitignore`` (unless ``sync.gitignore: false``) and ``.westenvignore``
+     files, at the workspace root and in any walked sub-directory
+
+Patterns use gitignore syntax: ``!`` negates, a leading or inner ``/``
+anchors a pattern to the directory of the file that defines it, a trailing
+``/`` matches directories only, ``**`` spans directories, and the last
+matching rule wins (rules of deeper ignore files win over shallower ones).
+
+Each directory's rules compile into two regexes -- one for patterns that
+only look at the entry name, one for anchored path patterns -- so deciding
+an entry costs at most two regex matches per rule file.  Walkers prune
+ignored directories instead of descending into them, and ``rsync_args()``
+emits the same rules as rsync ``--filter`` options.
+"""
+
+import os
+import re
+import stat
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+IGNORE_FILES = (".gitignore", ".westenvignore")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One parsed ignore pattern."""
+
+    pattern: str  # normalised: no "!", no leading/trailing "/"
+    negate: bool
+    dir_only: bool
+    anchored: bool
+    index: int  # position in the defining rule list (later wins)
+
+
+def parse(line: str, index: int = 0) -> Optional[Rule]:
+    """Parse one gitignore *line*; None for blanks and comments."""
+    line = line.rstrip("\r\n")
+    if not line or line.startswith("#"):
+        return None
+    line = re.sub(r"(?<!\\) +$", "", line)
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    return Rule(line.lstrip("/"), negate, dir_only, anchored, index)
+
+
+def _translate(pattern: str) -> str:
+    """Translate the body of a gitignore *pattern* into a regex."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        at_segment_start = i == 0 or pattern[i - 1] == "/"
+        if c == "*" and pattern.startswith("**/", i) and at_segment_start:
+            out.append("(?:.*/)?")
+            i += 3
+        elif c == "*" and pattern.startswith("**", i) and i + 2 == n and at_segment_start:
+            out.append(".+")  # "dir/**" matches the contents, not dir itself
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 2 if pattern[i + 1 : i + 2] in ("!", "^") else i + 1)
+            if j < 0:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1 : j]
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _compile(rules: list):
+    """Combine *rules* into one regex; the first alternative is the last rule.
+
+    ``re`` tries alternatives left to right, so with the rules reversed the
+    matching group (``lastindex``) identifies the last matching rule.
+    """
+    if not rules:
+        return None, []
+    ordered = list(reversed(rules))
+    parts = []
+    for rule in ordered:
+        parts.append("(" + _translate(rule.pattern) + ("/" if rule.dir_only else "/?") + ")")
+    return re.compile("|".join(parts), re.DOTALL), ordered
+
+
+class IgnoreMatcher:
+    """Rules of one directory, chained to the rules of its parents."""
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = (),
+        ignore_files: Iterable[str] = IGNORE_FILES,
+        parent: Optional["IgnoreMatcher"] = None,
+        base: str = "",
+    ):
+        self.ignore_files = tuple(ignore_files)
+        self.parent = parent
+        self.base = base  # "" or "rel/dir/"
+        self.patterns = list(patterns)
+        self.rules = [r for r in (parse(p, i) for i, p in enumerate(self.patterns)) if r]
+        self._names, self._name_rules = _compile([r for r in self.rules if not r.anchored])
+        self._paths, self._path_rules = _compile([r for r in self.rules if r.anchored])
+
+    # -- construction ------------------------------------------------------
+
+    def enter(self, rel_dir: str, abs_dir: str, names=None) -> "IgnoreMatcher":
+        """Return the matcher for entries of *rel_dir* ("" for the root).
+
+        Reads the directory's ignore files, if any.  *names* (the directory
+        listing, when the caller already has it) avoids probing for them.
+        """
+        lines = []
+        for name in self.ignore_files:
+            if names is not None and name not in names:
+                continue
+            try:
+                with open(os.path.join(abs_dir, name), encoding="utf-8", errors="surrogateescape") as f:
+                    lines.extend(f.read().splitlines())
+            except OSError:
+                continue
+        if not lines:
+            return self
+        if not rel_dir and self.parent is None:
+            # Root ignore files extend the configured rules with higher precedence.
+            return IgnoreMatcher(self.patterns + lines, self.ignore_files)
+        return IgnoreMatcher(lines, self.ignore_files, parent=self, base=rel_dir + "/")
+
+    # -- matching ----------------------------------------------------------
+
+    def _decide(self, rel: str, name: str, is_dir: bool) -> Optional[bool]:
+        suffix = "/" if is_dir else ""
+        best = None
+        if self._names is not None:
+            m = self._names.fullmatch(name + suffix)
+            if m:
+                best = self._name_rules[m.lastindex - 1]
+        if self._paths is not None:
+            m = self._paths.fullmatch(rel + suffix)
+            if m:
+                rule = self._path_rules[m.lastindex - 1]
+                if best is None or rule.index > best.index:
+                    best = rule
+        return None if best is None else not best.negate
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        """True if *rel* is ignored, assuming its parent directory is not."""
+        name = rel.rsplit("/", 1)[-1]
+        m = self
+        while m is not None:
+            if rel.startswith(m.base):
+                decision = m._decide(rel[len(m.base) :], name, is_dir)
+                if decision is not None:
+                    return decision
+            m = m.parent
+        return False
+
+    def is_ignored(self, rel: str, is_dir: bool = False) -> bool:
+        """True if *rel* or any of its parent directories is ignored."""
+        parts = rel.strip("/").split("/")
+        for i in range(1, len(parts)):
+            if self.ignored("/".join(parts[:i]), True):
+                return True
+        return self.ignored("/".join(parts), is_dir)
+
+    def rsync_filters(self) -> list:
+        """Return this directory's own rules as rsync filter rules.
+
+        rsync stops at the first matching rule, so the rules are reversed;
+        patterns of nested rule files are anchored below their directory.
+        """
+        filters = []
+        for rule in reversed(self.rules):
+            sign = "+" if rule.negate else "-"
+            tail = "/" if rule.dir_only else ""
+            if rule.anchored:
+                pats = [f"/{self.base}{rule.pattern}"]
+            elif not self.base:
+                pats = [rule.pattern]
+            else:
+                pats = [f"/{self.base}{rule.pattern}", f"/{self.base}**/{rule.pattern}"]
+            filters += [f"{sign} {p}{tail}" for p in pats]
+        return filters
+
+
+def as_matcher(excludes) -> IgnoreMatcher:
+    """Return *excludes* as an IgnoreMatcher (pattern lists are compiled)."""
+    if isinstance(excludes, IgnoreMatcher):
+        return excludes
+    return IgnoreMatcher(excludes or ())
+
+
+def walk(root: Path, excludes, skip=()):
+    """Yield ``(rel, path, stat_result)`` for entries under *root*.
+
+    Ignored entries are skipped and ignored directories are not descended
+    into, nor are the directories in *skip* (relative paths).  A directory
+    is yielded before its contents.
+    """
+    stack = [("", str(root), as_matcher(excludes))]
+    while stack:
+        rel_dir, path, matcher = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        matcher = matcher.enter(rel_dir, path, {e.name for e in entries})
+        prefix = rel_dir + "/" if rel_dir else ""
+        for entry in entries:
+            rel = prefix + entry.name
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            is_dir = stat.S_ISDIR(st.st_mode)
+            if matcher.ignored(rel, is_dir):
+                continue
+            yield rel, entry.path, st
+            if is_dir and rel not in skip:
+                stack.append((rel, entry.path, matcher))
+
+
+def rsync_args(root: Path, excludes) -> list:
+    """Return rsync ``--filter`` options equivalent to *excludes* under *root*.
+
+    Nested ignore files are found with a directory-only walk, so rsync sees
+    every rule the Python walkers apply.
+    """
+    found = {}  # base -> matcher owning that directory's rules
+    stack = [("", str(root), as_matcher(excludes))]
+    while stack:
+        rel_dir, path, parent = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        current = parent.enter(rel_dir, path, {e.name for e in entries})
+        if current is not parent or not rel_dir:
+            found[current.base] = current
+        prefix = rel_dir + "/" if rel_dir else ""
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and not current.ignored(prefix + entry.name, True):
+                stack.append((prefix + entry.name, entry.path, current))
+
+    # Deeper rule files first, mirroring their precedence.
+    filters = []
+    for base in sorted(found, key=lambda b: b.count("/"), reverse=True):
+        filters.extend(found[base].rsync_filters())
+    return [f"--filter={f}" for f in filters]
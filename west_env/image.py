@@ -0,0 +1,300 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Container image lifecycle for west-env: digest lock, prefetch, pull policy.
+
+Lockfile
+  ``west env image lock`` resolves the configured image reference (e.g.
+  ``...:latest``) to its registry digest and writes ``west-env.lock`` next to
+  ``west-env.yml``.  While the lock matches ``env.image``, container runs use
+  the pinned ``repo@sha256:...`` reference, so every developer and CI job
+  builds with the same image until the lock is refreshed.
+
+Prefetch
+  ``west env image prefetch`` starts ``<engine> pull`` in the background
+  (output in ``.west/west-env-prefetch.log``) and returns immediately, so a
+  multi-GB image bump downloads while the user keeps working.
+  ``west env image status`` reports presence and prefetch progress.
+
+Pull policy
+  ``env.pull: never | missing | always`` is passed to ``run`` as ``--pull``.
+
+Digests are resolved with a HEAD request against the registry's v2 API
+(anonymous bearer token if the registry asks for one), falling back to
+``pull`` + ``image inspect`` through the engine.  Local presence checks are
+cached in the probe cache (west_env.probecache); only positive results are
+stored, so a finished pull is noticed immediately.
+"""
+
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+from west_env import probecache
+from west_env.util import pid_alive
+
+LOCK_FILENAME = "west-env.lock"
+PULL_POLICIES = ("never", "missing", "always")
+DEFAULT_PULL_POLICY = "missing"
+
+_PREFETCH_STATE = Path(".west") / "west-env-prefetch.json"
+_PREFETCH_LOG = Path(".west") / "west-env-prefetch.log"
+
+_MANIFEST_TYPES = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+
+
+# ---------------------------------------------------------------------------
+# References
+# ---------------------------------------------------------------------------
+
+
+def parse_reference(ref: str) -> tuple:
+    """Split *ref* into ``(registry, repository, tag, digest)``.
+
+    Follows the Docker rules: the first component is a registry only if it
+    contains '.' or ':' or is 'localhost'; Docker Hub official images live
+    under 'library/'.
+    """
+    name, digest = (ref.split("@", 1) + [None])[:2]
+    tag = None
+    last = name.rsplit("/", 1)[-1]
+    if ":" in last:
+        name, tag = name.rsplit(":", 1)
+    first, _, rest = name.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        registry, repo = first, rest
+    else:
+        registry, repo = "registry-1.docker.io", name
+        if "/" not in repo:
+            repo = f"library/{repo}"
+    if tag is None and digest is None:
+        tag = "latest"
+    return registry, repo, tag, digest
+
+
+def pinned_reference(ref: str, digest: str) -> str:
+    """Return ``<name>@<digest>`` for *ref* (any tag dropped)."""
+    name = ref.split("@", 1)[0]
+    last = name.rsplit("/", 1)[-1]
+    if ":" in last:
+        name = name.rsplit(":", 1)[0]
+    return f"{name}@{digest}"
+
+
+# ---------------------------------------------------------------------------
+# Digest resolution
+# ---------------------------------------------------------------------------
+
+
+def _registry_base(registry: str) -> str:
+    host = registry.split(":", 1)[0]
+    scheme = "http" if host in ("localhost", "127.0.0.1") else "https"
+    return f"{scheme}://{registry}"
+
+
+def _bearer_token(challenge: str, timeout: float) -> Optional[str]:
+    scheme, _, params = challenge.partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    fields = {}
+    for part in params.split(","):
+        key, _, value = part.strip().partition("=")
+        fields[key] = value.strip('"')
+    realm = fields.pop("realm", None)
+    if not realm:
+        return None
+    url = f"{realm}?{urllib.parse.urlencode(fields)}"
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        data = json.loads(resp.read())
+    return data.get("token") or data.get("access_token")
+
+
+def registry_digest(ref: str, timeout: float = 10.0) -> Optional[str]:
+    """Return the registry manifest digest for *ref* without pulling it."""
+    registry, repo, tag, digest = parse_reference(ref)
+    if digest:
+        return digest
+    url = f"{_registry_base(registry)}/v2/{repo}/manifests/{tag}"
+    headers = {"Accept": _MANIFEST_TYPES}
+    for _ in range(2):
+        req = urllib.request.Request(url, method="HEAD", headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return resp.headers.get("Docker-Content-Digest")
+        except urllib.error.HTTPError as exc:
+            challenge = exc.headers.get("WWW-Authenticate", "")
+            if exc.code != 401 or "Authorization" in headers:
+                return None
+            token = _bearer_token(challenge, timeout)
+            if not token:
+                return None
+            headers["Authorization"] = f"Bearer {token}"
+    return None
+
+
+def engine_digest(engine: str, ref: str) -> Optional[str]:
+    """Pull *ref* through the engine and return its repo digest."""
+    subprocess.check_call([engine, "pull", ref], stdout=subprocess.DEVNULL)
+    out = subprocess.check_output([engine, "image", "inspect", "-f", "{{json .RepoDigests}}", ref], text=True)
+    repo = parse_reference(ref)[1]
+    if repo.startswith("library/"):
+        repo = repo[len("library/") :]
+    entries = json.loads(out or "null") or []
+    for entry in entries:
+        name, _, digest = entry.partition("@")
+        if name.endswith(repo):
+            return digest
+    return entries[0].partition("@")[2] if entries else None
+
+
+def resolve_digest(engine: str, ref: str) -> str:
+    """Resolve *ref* to a digest via the registry API, falling back to the engine."""
+    try:
+        digest = registry_digest(ref)
+    except (OSError, ValueError):
+        digest = None
+    if not digest:
+        digest = engine_digest(engine, ref)
+    if not digest:
+        raise RuntimeError(f"could not resolve a digest for {ref}")
+    return digest
+
+
+# ---------------------------------------------------------------------------
+# Lockfile
+# ---------------------------------------------------------------------------
+
+
+def lock_path(workspace: Path) -> Path:
+    from west_env.config import find_config_path
+
+    return find_config_path(workspace).with_name(LOCK_FILENAME)
+
+
+def read_lock(workspace: Path) -> Optional[dict]:
+    try:
+        return json.loads(lock_path(workspace).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def write_lock(workspace: Path, engine: str, ref: str) -> dict:
+    """Resolve *ref* and write the lockfile; return its contents."""
+    digest = resolve_digest(engine, ref)
+    data = {
+        "image": ref,
+        "digest": digest,
+        "pinned": pinned_reference(ref, digest),
+        "locked_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    lock_path(workspace).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    return data
+
+
+def locked_reference(workspace: Path, ref: str) -> Optional[str]:
+    """Return the pinned reference for *ref* if the workspace lock covers it."""
+    lock = read_lock(workspace)
+    if lock and lock.get("image") == ref and lock.get("pinned"):
+        return lock["pinned"]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Presence, pull policy, prefetch
+# ---------------------------------------------------------------------------
+
+
+def _inspect(engine: str, ref: str, client=None) -> bool:
+    if client is not None:
+        return client.image_inspect(ref) is not None
+    try:
+        subprocess.check_output([engine, "image", "inspect", ref], stderr=subprocess.DEVNULL)
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def is_present(engine: str, ref: str, client=None) -> bool:
+    """Return True if *ref* is available locally (positive results cached)."""
+    return probecache.cached(
+        f"image:present:{engine}:{ref}",
+        probecache.binary_fingerprint(engine),
+        lambda: _inspect(engine, ref, client),
+        ttl=probecache.STATE_TTL,
+        cache_if=bool,
+    )
+
+
+def pull_args(policy: str) -> list:
+    """Return the ``run`` option for *policy* (none for the engine default)."""
+    if policy not in PULL_POLICIES:
+        raise ValueError(f"unsupported pull policy: {policy}")
+    return [] if policy == DEFAULT_PULL_POLICY else [f"--pull={policy}"]
+
+
+def prefetch(workspace: Path, engine: str, ref: str) -> int:
+    """Start a background ``pull`` of *ref*; return the pull process PID."""
+    state = prefetch_state(workspace)
+    if state and state.get("running") and state.get("image") == ref:
+        return state["pid"]
+
+    log_path = Path(workspace) / _PREFETCH_LOG
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    else:
+        kwargs["start_new_session"] = True
+    with log_path.open("wb") as log:
+        proc = subprocess.Popen(
+            [engine, "pull", ref], stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, **kwargs
+        )
+    (Path(workspace) / _PREFETCH_STATE).write_text(
+        json.dumps({"pid": proc.pid, "image": ref, "engine": engine, "started": time.time()}), encoding="utf-8"
+    )
+    return proc.pid
+
+
+def prefetch_state(workspace: Path) -> Optional[dict]:
+    """Return the last prefetch record with a ``running`` flag, or None."""
+    try:
+        state = json.loads((Path(workspace) / _PREFETCH_STATE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    state["running"] = pid_alive(state["pid"])
+    return state
+
+
+def status_lines(workspace: Path, engine: str, configured: str, client=None) -> list:
+    """Return doctor-style lines describing the image lock, presence and prefetch."""
+    lines = []
+    ref = locked_reference(workspace, configured) or configured
+    lock = read_lock(workspace)
+    if lock and lock.get("image") == configured:
+        lines.append(f"[PASS] image locked: {configured} -> {lock['digest'][:19]}… ({lock['locked_at']})")
+    elif lock:
+        lines.append(f"[WARN] {LOCK_FILENAME} is for {lock.get('image')}, not {configured}; run: west env image lock")
+    else:
+        lines.append("[INFO] image not locked to a digest (run: west env image lock)")
+
+    state = prefetch_state(workspace)
+    if is_present(engine, ref, client):
+        lines.append(f"[PASS] container image available: {ref}")
+    elif state and state.get("running") and state.get("image") == ref:
+        lines.append(f"[INFO] container image is being prefetched: {ref}")
+        lines.append(f"       log: {Path(workspace) / _PREFETCH_LOG}")
+    else:
+        lines.append(f"[WARN] container image not present locally: {ref}")
+        lines.append("       run: west env image prefetch  (pulls in the background)")
+    return lines
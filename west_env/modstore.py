@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Shared, content-addressed module store for workspace sync.
+
+Developers often keep several west workspaces pinned to the same zephyr and
+HAL revisions, and each workspace volume used to hold a full copy of every
+module.  With ``sync.module_store: true`` a west project whose working tree
+is clean is synced once into a store volume shared by all workspaces:
+
+  west-env-module-store:/<HEAD sha>-<rules>/...
+
+keyed by the project's commit and a short hash of the ignore rules that
+select its files (configured excludes and the ignore files above the
+project).  The workspace volume only gets a symlink ``/work/<project>`` ->
+``/store/<key>``, and west-env containers mount the store read-only at
+``/store``.  A second workspace at the same revisions therefore sends
+nothing for those projects.
+
+Projects with local changes (anything ``git status`` reports), submodules,
+or nested projects are synced into the workspace volume as before; when a
+shared project gets modified its symlink is replaced by a private copy, and
+when it is clean again the copy is replaced by the link.  Store entries are
+immutable, so shared projects are read-only inside the container (``west
+update`` belongs on the host).  Like git enumeration, the store needs
+``.gitignore`` files honoured: git does not report ignored files.  Entries
+of revisions no workspace uses any more are not removed yet; ``docker
+volume rm west-env-module-store`` resets the store.
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from west_env import gitscan, ignore
+
+STORE_VOLUME = "west-env-module-store"
+STORE_MOUNT = "/store"
+
+
+def volume_args() -> list:
+    """Return the ``run`` options that mount the store read-only."""
+    return ["-v", f"{STORE_VOLUME}:{STORE_MOUNT}:ro"]
+
+
+def _rules_hash(matcher) -> str:
+    """Hash the ignore rules in effect for a project directory."""
+    chain = []
+    while matcher is not None:
+        chain.append([matcher.base, matcher.patterns, list(matcher.ignore_files)])
+        matcher = matcher.parent
+    return hashlib.blake2b(json.dumps(chain).encode("utf-8"), digest_size=4).hexdigest()
+
+
+def shareable(root: Path, excludes, projects: list) -> dict:
+    """Return ``{project: store key}`` for the projects that can be shared.
+
+    A project qualifies when git reports a HEAD and a clean working tree,
+    it has no submodules, and no other west project is nested in it or
+    contains it.
+    """
+    root = Path(root)
+    matchers = gitscan._Matchers(root, excludes)
+    candidates = {}
+    for project in projects:
+        nested = any(p != project and (p.startswith(project + "/") or project.startswith(p + "/")) for p in projects)
+        matcher = None if nested else matchers.for_dir(project)
+        if matcher is not None and not (root / project / ".gitmodules").exists():
+            candidates[project] = matcher
+    with ThreadPoolExecutor(max_workers=gitscan.MAX_WORKERS) as pool:
+        states = dict(zip(candidates, pool.map(lambda p: gitscan.project_state(str(root / p), None), candidates)))
+    return {
+        project: f"{state['head']}-{_rules_hash(candidates[project])}"
+        for project, state in states.items()
+        if state is not None and not state["dirty"]
+    }
+
+
+def exclude(excludes, shared) -> ignore.IgnoreMatcher:
+    """Return *excludes* extended to leave the *shared* projects out of the sync."""
+    matcher = ignore.as_matcher(excludes)
+    return ignore.IgnoreMatcher(matcher.patterns + [f"/{p}/" for p in sorted(shared)], matcher.ignore_files)
+
+
+def is_shared(rel: str, shared) -> bool:
+    """Return True if *rel* lies in one of the *shared* projects."""
+    return any(rel == p or rel.startswith(p + "/") for p in shared)
+
+
+def project_files(root: Path, excludes, project: str) -> list:
+    """Return the project's tracked files the ignore rules keep (project-relative)."""
+    out = gitscan._git(str(Path(root) / project), "ls-files", "-z")
+    if out is None:
+        raise RuntimeError(f"git ls-files failed in {project}")
+    matchers = gitscan._Matchers(root, excludes)
+    return sorted(rel for rel in gitscan._split(out) if not matchers.ignored(f"{project}/{rel}", False))
+
+
+def missing(engine: str, keys, image: str = "alpine") -> set:
+    """Return the store *keys* that have no entry yet."""
+    keys = sorted(set(keys))
+    if not keys:
+        return set()
+    script = f'cd {STORE_MOUNT} && for k in {" ".join(keys)}; do [ -d "$k" ] || echo "$k"; done'
+    out = subprocess.check_output(
+        [engine, "run", "--rm", "-v", f"{STORE_VOLUME}:{STORE_MOUNT}", image, "sh", "-c", script], text=True
+    )
+    return set(out.split())
+
+
+def populate(engine: str, root: Path, excludes, project: str, key: str, image: str = "alpine") -> int:
+    """Copy *project*'s files into the store entry *key*; return the bytes sent.
+
+    The entry is extracted under a temporary name and renamed into place,
+    so a failed or concurrent populate never leaves a partial entry.
+    """
+    from west_env.syncindex import write_stream
+
+    files = project_files(root, excludes, project)
+    partial = f".partial-{key}-{os.getpid()}"
+    script = (
+        f"cd {STORE_MOUNT} && rm -rf {partial} && mkdir {partial} && tar -xf - -C {partial} && "
+        f"if [ -e {key} ]; then rm -rf {partial}; else mv {partial} {key}; fi"
+    )
+    proc = subprocess.Popen(
+        [engine, "run", "--rm", "-i", "-v", f"{STORE_VOLUME}:{STORE_MOUNT}", image, "sh", "-c", script],
+        stdin=subprocess.PIPE,
+    )
+    try:
+        write_stream(proc.stdin, Path(root) / project, files, [])
+    finally:
+        proc.stdin.close()
+        rc = proc.wait()
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, proc.args)
+    sent = 0
+    for rel in files:
+        try:
+            sent += os.lstat(os.path.join(root, project, rel)).st_size
+        except OSError:
+            pass
+    return sent
+
+
+def relink(engine: str, volume: str, previous: dict, current: dict, image: str = "alpine"):
+    """Point the workspace volume's project directories at their store entries.
+
+    Projects in *current* become symlinks to their entry (replacing a
+    private copy); projects only in *previous* lose their symlink, to be
+    filled by the sync that follows.
+    """
+    lines = []
+    for project, key in sorted(current.items()):
+        if previous.get(project) == key:
+            continue
+        target = shlex.quote(f"/work/{project}")
+        parent = shlex.quote(f"/work/{project}".rpartition("/")[0])
+        lines.append(f"rm -rf {target} && mkdir -p {parent} && ln -s {STORE_MOUNT}/{key} {target}")
+    for project in sorted(set(previous) - set(current)):
+        target = shlex.quote(f"/work/{project}")
+        lines.append(f"if [ -L {target} ]; then rm -f {target}; fi")
+    if lines:
+        subprocess.run(
+            [engine, "run", "--rm", "-v", f"{volume}:/work", image, "sh", "-c", " && ".join(lines)], check=True
+        )
+
+
+def update(engine: str, volume: str, root: Path, excludes, projects: list, previous: dict, image: str = "alpine"):
+    """Share the clean *projects* through the store; return ``(state, bytes_sent)``.
+
+    *previous* is the state recorded by the last sync of *volume* (``{}``
+    for a new volume): ``{"volume_id": <store identity>, "projects":
+    {project: key}}``.  Entries are only looked up when a project's key
+    changed or the store volume was recreated.
+    """
+    from west_env.syncindex import volume_id
+
+    keys = shareable(root, excludes, projects)
+    vid = volume_id(engine, STORE_VOLUME)
+    linked = previous.get("projects", {})
+    known = linked if vid and previous.get("volume_id") == vid else {}
+    todo = {project: key for project, key in keys.items() if known.get(project) != key}
+    absent = missing(engine, todo.values(), image)
+    sent = 0
+    for project, key in sorted(todo.items()):
+        if key in absent:
+            sent += populate(engine, root, excludes, project, key, image)
+            absent.discard(key)
+    relink(engine, volume, linked, keys, image)
+    return {"volume_id": vid or volume_id(engine, STORE_VOLUME), "projects": keys}, sent
@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Persistent on-disk cache for host probe results.
+
+Backend detection, credential strategy detection and J-Link discovery all
+shell out (``podman version``, ``docker info``, PowerShell, ``git config``)
+or walk search paths.  Their results rarely change between invocations, so
+they are cached per user in a small JSON file:
+
+  Linux    $XDG_CACHE_HOME/west-env/probes.json  (~/.cache/west-env)
+  macOS    ~/Library/Caches/west-env/probes.json
+  Windows  %LOCALAPPDATA%\\west-env\\probes.json
+
+Each entry carries a fingerprint (resolved binary path + mtime, a hash of
+PATH and the host platform).  A fingerprint mismatch or an expired TTL makes
+the entry a miss.  ``west env --refresh-probes`` ignores existing entries and
+re-probes everything.
+
+The cache is inactive until :func:`enable` is called (the ``west env`` command
+does this); library callers and unit tests get uncached behaviour by default.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from shutil import which
+from typing import Callable, Optional
+
+CACHE_FILENAME = "probes.json"
+DEFAULT_TTL = 24 * 3600  # seconds; static facts (versions, Hyper-V state)
+STATE_TTL = 300  # seconds; runtime state (machine running, agent service)
+
+_SCHEMA_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user west-env cache directory."""
+    override = os.environ.get("WEST_ENV_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+        return Path(base) / "west-env"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "west-env"
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "west-env"
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+
+def path_hash() -> str:
+    """Return a short hash of the current PATH."""
+    return hashlib.sha256(os.environ.get("PATH", "").encode("utf-8")).hexdigest()[:16]
+
+
+def host_fingerprint() -> str:
+    """Fingerprint shared by every entry: host platform + PATH hash."""
+    return f"{sys.platform}|{path_hash()}"
+
+
+def binary_fingerprint(cmd: str) -> str:
+    """Fingerprint for probes of *cmd*: resolved binary path and its mtime."""
+    found = which(cmd)
+    if not found:
+        return f"{host_fingerprint()}|{cmd}:missing"
+    resolved = os.path.realpath(found)
+    try:
+        mtime = os.stat(resolved).st_mtime_ns
+    except OSError:
+        mtime = 0
+    return f"{host_fingerprint()}|{resolved}:{mtime}"
+
+
+def file_fingerprint(path: Path) -> str:
+    """Fingerprint for a config file (path + mtime, or 'missing')."""
+    try:
+        return f"{path}:{os.stat(path).st_mtime_ns}"
+    except OSError:
+        return f"{path}:missing"
+
+
+# ---------------------------------------------------------------------------
+# Cache store
+# ---------------------------------------------------------------------------
+
+
+class ProbeCache:
+    """JSON-backed probe result cache with fingerprint and TTL checks."""
+
+    def __init__(self, path: Optional[Path] = None, ttl: Optional[float] = None, refresh: bool = False):
+        self.path = Path(path) if path else default_cache_dir() / CACHE_FILENAME
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._entries = {} if refresh else self._load()
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _SCHEMA_VERSION:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".probes-", dir=str(self.path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": _SCHEMA_VERSION, "entries": self._entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # A read-only home must never break detection
+
+    def get(self, key: str, fingerprint: str, ttl: Optional[float] = None):
+        """Return (hit, value) for *key*; a stale or mismatched entry is a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return False, None
+        max_age = self.ttl if ttl is None else min(ttl, self.ttl)
+        if time.time() - entry.get("time", 0) > max_age:
+            return False, None
+        return True, entry.get("value")
+
+    def put(self, key: str, fingerprint: str, value):
+        """Store a JSON-serialisable *value* and persist the cache file."""
+        with self._lock:
+            self._entries[key] = {"fingerprint": fingerprint, "time": time.time(), "value": value}
+            self._save()
+
+    def invalidate(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def keys(self) -> list:
+        with self._lock:
+            return sorted(self._entries)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide active cache
+# ---------------------------------------------------------------------------
+
+_active: Optional[ProbeCache] = None
+
+
+def enable(path: Optional[Path] = None, ttl: Optional[float] = None, refresh: bool = False) -> ProbeCache:
+    """Activate the persistent cache for this process and return it.
+
+    TTL defaults to ``WEST_ENV_PROBE_TTL`` (seconds) when set, else DEFAULT_TTL.
+    """
+    global _active
+    if ttl is None:
+        try:
+            ttl = float(os.environ["WEST_ENV_PROBE_TTL"])
+        except (KeyError, ValueError):
+            ttl = None
+    _active = ProbeCache(path, ttl=ttl, refresh=refresh)
+    return _active
+
+
+def disable():
+    """Deactivate the cache; probes run uncached afterwards."""
+    global _active
+    _active = None
+
+
+def active() -> Optional[ProbeCache]:
+    """Return the active cache, or None when caching is disabled."""
+    return _active
+
+
+def cached(
+    key: str,
+    fingerprint: str,
+    compute: Callable,
+    ttl: Optional[float] = None,
+    cache_if: Optional[Callable] = None,
+    validate: Optional[Callable] = None,
+):
+    """Return the cached value for *key*, computing and storing it on a miss.
+
+    Args:
+        key:         Cache key (e.g. 'version:podman:version').
+        fingerprint: Invalidation fingerprint; see binary_fingerprint().
+        compute:     Zero-argument callable that performs the real probe.
+        ttl:         Per-entry maximum age (capped by the cache TTL).
+        cache_if:    Predicate on the computed value; falsy skips storing it.
+        validate:    Predicate on a cached value; falsy forces a recompute.
+    """
+    cache = _active
+    if cache is None:
+        return compute()
+    hit, value = cache.get(key, fingerprint, ttl=ttl)
+    if hit and (validate is None or validate(value)):
+        return value
+    value = compute()
+    if cache_if is None or cache_if(value):
+        cache.put(key, fingerprint, value)
+    return value
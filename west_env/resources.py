@@ -0,0 +1,264 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Host-aware container resource limits for west-env.
+
+Configured in ``west-env.yml``::
+
+  resources:
+    policy: auto          # auto | explicit | none (default: none)
+    cpus: 6               # --cpus
+    memory: 12g           # --memory
+    shm_size: 1g          # --shm-size
+    pids_limit: 8192      # --pids-limit
+    cpuset: "0-5"         # --cpuset-cpus
+    jobs: 6               # build parallelism (CMAKE_BUILD_PARALLEL_LEVEL)
+    actions:              # per-action overrides of any key above
+      build: {cpus: 8, memory: 14g}
+
+``resources: auto`` is accepted as shorthand for ``policy: auto``.
+
+auto      CPUs and memory of the container host are read from ``<engine>
+          info`` (the VM for Podman machine / Docker Desktop, the host for
+          native engines), falling back to the local machine.  Limits are
+          sized from them; explicitly configured keys win.
+explicit  Only the configured keys are applied.
+none      No limits (the engine's defaults).
+
+Build parallelism follows the CPU limit but is capped so each job has about
+MEMORY_PER_JOB of memory, which keeps large links from being OOM-killed.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from west_env import probecache
+
+POLICIES = ("auto", "explicit", "none")
+KEYS = ("cpus", "memory", "shm_size", "pids_limit", "cpuset", "jobs")
+
+MEMORY_PER_JOB = 1024**3  # bytes of memory budgeted per parallel build job
+AUTO_MEMORY_FRACTION = 0.85  # leave headroom for the engine / VM OS
+AUTO_SHM_MAX = 2 * 1024**3
+AUTO_PIDS_LIMIT = 8192
+
+_VM_BACKEND_MARKERS = ("machine", "desktop")
+
+# What Limits adds to a run: these options (with a value) and this variable
+RUN_FLAGS = ("--cpus", "--memory", "--shm-size", "--pids-limit", "--cpuset-cpus")
+JOBS_ENV = "CMAKE_BUILD_PARALLEL_LEVEL"
+
+
+@dataclass
+class Limits:
+    """Resolved resource limits for one container action."""
+
+    policy: str = "none"
+    cpus: Optional[float] = None
+    memory: Optional[int] = None  # bytes
+    shm_size: Optional[int] = None  # bytes
+    pids_limit: Optional[int] = None
+    cpuset: Optional[str] = None
+    jobs: Optional[int] = None
+
+    def run_args(self) -> list:
+        """Return the ``run`` options for these limits."""
+        args = []
+        if self.cpus:
+            args += ["--cpus", _format_cpus(self.cpus)]
+        if self.memory:
+            args += ["--memory", format_size(self.memory)]
+        if self.shm_size:
+            args += ["--shm-size", format_size(self.shm_size)]
+        if self.pids_limit:
+            args += ["--pids-limit", str(self.pids_limit)]
+        if self.cpuset:
+            args += ["--cpuset-cpus", self.cpuset]
+        return args
+
+    def env(self) -> dict:
+        return {JOBS_ENV: str(self.jobs)} if self.jobs else {}
+
+    def to_dict(self) -> dict:
+        data = {k: v for k, v in asdict(self).items() if v is not None}
+        for key in ("memory", "shm_size"):
+            if key in data:
+                data[key] = format_size(data[key])
+        return data
+
+    def describe(self) -> str:
+        if self.policy == "none":
+            return "none (engine defaults)"
+        parts = [f"{k}={v}" for k, v in self.to_dict().items() if k != "policy"]
+        return f"{self.policy}: " + (", ".join(parts) if parts else "no limits")
+
+
+# ---------------------------------------------------------------------------
+# Sizes
+# ---------------------------------------------------------------------------
+
+_UNITS = {"b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def parse_size(value) -> int:
+    """Parse ``512m`` / ``12g`` / ``1.5GB`` / bytes into bytes."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    s = str(value).strip().lower().rstrip("b") or "0"
+    unit = s[-1] if s[-1] in _UNITS else "b"
+    number = s[:-1] if s[-1] in _UNITS else s
+    try:
+        return int(float(number) * _UNITS[unit])
+    except ValueError:
+        raise ValueError(f"invalid size: {value!r}") from None
+
+
+def format_size(n: int) -> str:
+    """Format *n* bytes for the engine CLI (``12g``, ``1536m``)."""
+    if n % 1024**3 == 0:
+        return f"{n // 1024**3}g"
+    return f"{max(1, n // 1024**2)}m"
+
+
+def _format_cpus(cpus: float) -> str:
+    return str(int(cpus)) if float(cpus).is_integer() else f"{cpus:.2f}"
+
+
+# ---------------------------------------------------------------------------
+# Capacity detection
+# ---------------------------------------------------------------------------
+
+
+def _local_memory() -> Optional[int]:
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/meminfo", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        elif sys.platform == "darwin":
+            out = subprocess.check_output(["sysctl", "-n", "hw.memsize"], text=True)
+            return int(out.strip())
+        elif sys.platform == "win32":
+            import ctypes
+
+            class _MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = _MemoryStatus()
+            status.dwLength = ctypes.sizeof(_MemoryStatus)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return int(status.ullTotalPhys)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def local_capacity() -> dict:
+    """Return CPUs and memory of the machine running west."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    return {"cpus": cpus, "memory": _local_memory(), "source": "host"}
+
+
+def _engine_capacity_uncached(engine: str) -> Optional[dict]:
+    try:
+        out = subprocess.check_output(
+            [engine, "info", "--format", "{{json .}}"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=20,
+        )
+        info = json.loads(out)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+    if "host" in info:  # podman
+        host = info["host"]
+        cpus, memory = host.get("cpus"), host.get("memTotal")
+    else:  # docker
+        cpus, memory = info.get("NCPU"), info.get("MemTotal")
+    if not cpus or not memory:
+        return None
+    return {"cpus": int(cpus), "memory": int(memory), "source": f"{engine} info"}
+
+
+def engine_capacity(engine: str) -> dict:
+    """Return CPUs/memory of the container host (VM or native), cached."""
+    found = probecache.cached(
+        f"resources:capacity:{engine}",
+        probecache.binary_fingerprint(engine),
+        lambda: _engine_capacity_uncached(engine),
+        ttl=probecache.STATE_TTL,
+        cache_if=lambda v: v is not None,
+    )
+    return found or local_capacity()
+
+
+# ---------------------------------------------------------------------------
+# Policy
+# ---------------------------------------------------------------------------
+
+
+def auto_limits(capacity: dict, vm: bool) -> dict:
+    """Size limits from *capacity*; a native host keeps one core for itself."""
+    cpus = capacity["cpus"]
+    if not vm and cpus >= 4:
+        cpus -= 1
+    limits = {"cpus": cpus, "pids_limit": AUTO_PIDS_LIMIT}
+    memory = capacity.get("memory")
+    if memory:
+        limits["memory"] = int(memory * AUTO_MEMORY_FRACTION) // 1024**2 * 1024**2
+        limits["shm_size"] = min(AUTO_SHM_MAX, memory // 8) // 1024**2 * 1024**2
+    return limits
+
+
+def build_jobs(cpus: Optional[float], memory: Optional[int]) -> Optional[int]:
+    """Return build parallelism for *cpus*, capped by MEMORY_PER_JOB."""
+    if not cpus:
+        return None
+    jobs = max(1, int(cpus))
+    if memory:
+        jobs = min(jobs, max(1, memory // MEMORY_PER_JOB))
+    return jobs
+
+
+def resolve(settings: dict, engine: str, action: Optional[str] = None, backend: str = "") -> Limits:
+    """Resolve the configured resource *settings* for *action*."""
+    settings = settings or {}
+    policy = settings.get("policy", "none")
+    if policy == "none":
+        return Limits()
+
+    values = {k: settings[k] for k in KEYS if settings.get(k) is not None}
+    values.update((settings.get("actions") or {}).get(action) or {})
+
+    if policy == "auto":
+        vm = any(marker in (backend or "") for marker in _VM_BACKEND_MARKERS)
+        merged = auto_limits(engine_capacity(engine), vm)
+        merged.update(values)
+        values = merged
+
+    limits = Limits(
+        policy=policy,
+        cpus=float(values["cpus"]) if values.get("cpus") else None,
+        memory=parse_size(values["memory"]) if values.get("memory") else None,
+        shm_size=parse_size(values["shm_size"]) if values.get("shm_size") else None,
+        pids_limit=int(values["pids_limit"]) if values.get("pids_limit") else None,
+        cpuset=str(values["cpuset"]) if values.get("cpuset") else None,
+    )
+    limits.jobs = int(values["jobs"]) if values.get("jobs") else build_jobs(limits.cpus, limits.memory)
+    return limits
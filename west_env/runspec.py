@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Container run specification for west-env.
+
+A RunSpec is everything ``docker run`` / ``podman run`` needs to know about a
+west-env container, composed once per invocation from EnvConfig:
+
+  workspace   mount for the workspace mode (bind path or named volume, tmpfs)
+  caches      named cache volumes and their env vars (cache: section)
+  credentials SSH agent forwarding (git: section)
+  resources   CPU/memory/shm/pids limits and build parallelism
+              (west_env.resources), per action; a session container gets
+              those of the ``session`` action
+  workdir     container working directory mirroring the host cwd
+  image       configured image, or its digest from west-env.lock, and the
+              pull policy
+
+Every container action (build, shell, init, benchmark, doctor, sessions) takes
+its mounts and environment from the same RunSpec, so what ``--print-run-spec``
+shows is exactly what runs.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+CONTAINER_WORKDIR = "/work"
+
+# Environment every west-env container gets
+BASE_ENV = {
+    "PYTHONPATH": "/work/modules/west-env",
+    "PYTHONDONTWRITEBYTECODE": "1",
+}
+
+_memo: dict = {}
+
+
+@dataclass
+class RunSpec:
+    """Mounts, environment and limits for a west-env container run."""
+
+    engine: str
+    image: str
+    workspace: str
+    workspace_mode: str
+    workdir: str = CONTAINER_WORKDIR
+    prepared: bool = False  # image already has the one-time setup (snapshot)
+    pull: str = "missing"  # pull policy (west_env.image.PULL_POLICIES)
+    volumes: list = field(default_factory=list)  # -v values
+    mounts: list = field(default_factory=list)  # --mount values
+    env: dict = field(default_factory=dict)
+    resources: list = field(default_factory=list)  # raw run options
+    limits: dict = field(default_factory=dict)  # resolved resource limits
+    session_limits: dict = field(default_factory=dict)  # limits a session container gets
+
+    def options(self) -> list:
+        """Return the ``run`` options for mounts, environment and limits."""
+        from west_env import image
+
+        args = []
+        for volume in self.volumes:
+            args += ["-v", volume]
+        for mount in self.mounts:
+            args += ["--mount", mount]
+        for key, value in self.env.items():
+            args += ["-e", f"{key}={value}"]
+        if not self.prepared:  # local snapshot images are never pulled
+            args += image.pull_args(self.pull)
+        return args + list(self.resources)
+
+    def fingerprint(self) -> str:
+        """Short hash of what a session container is started with.
+
+        The image and options, except the per-call workdir and this
+        action's resource limits: one session serves every action and runs
+        with ``session_limits``, which are hashed instead.
+        """
+        from west_env import resources
+
+        options, it = [], iter(self.options())
+        for arg in it:
+            value = next(it, None)
+            if arg in resources.RUN_FLAGS or (arg == "-e" and value.startswith(resources.JOBS_ENV + "=")):
+                continue
+            options += [arg, value]
+        data = json.dumps([self.image, options, self.session_limits], sort_keys=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+    def action_env(self) -> dict:
+        """Return this action's limit environment, for ``exec`` into a session."""
+        from west_env import resources
+
+        return {k: v for k, v in self.env.items() if k == resources.JOBS_ENV}
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["options"] = self.options()
+        return data
+
+    def add_args(self, args: list):
+        """Merge ``-v``/``--mount``/``-e`` pairs as produced by the helper modules."""
+        it = iter(args)
+        for flag in it:
+            value = next(it, None)
+            if value is None:
+                raise ValueError(f"missing value for run option {flag!r}")
+            if flag in ("-v", "--volume"):
+                if value not in self.volumes:
+                    self.volumes.append(value)
+            elif flag == "--mount":
+                if value not in self.mounts:
+                    self.mounts.append(value)
+            elif flag in ("-e", "--env"):
+                key, _, val = value.partition("=")
+                self.env[key] = val
+            else:
+                self.resources += [flag, value]
+
+
+def container_workdir(workspace: Path, host_cwd: Path) -> str:
+    """Map *host_cwd* to the matching path under /work (or /work itself)."""
+    try:
+        rel = host_cwd.relative_to(workspace)
+        return f"{CONTAINER_WORKDIR}/{rel.as_posix()}" if rel.parts else CONTAINER_WORKDIR
+    except ValueError:
+        return CONTAINER_WORKDIR
+
+
+def build(cfg, engine_name: str, workspace: Path, host_cwd: Optional[Path] = None) -> RunSpec:
+    """Compose a RunSpec from *cfg* (uncached; see compose())."""
+    from west_env import credentials, image, resources
+    from west_env.cache import CacheManager
+    from west_env.sync import WorkspaceSync
+
+    workspace = Path(workspace).resolve()
+    host_cwd = Path(host_cwd).resolve() if host_cwd else workspace
+    mode = getattr(cfg, "workspace_mode", "bind")
+
+    spec = RunSpec(
+        engine=engine_name,
+        image=image.locked_reference(workspace, cfg.image) or cfg.image,
+        workspace=str(workspace),
+        workspace_mode=mode,
+        workdir=container_workdir(workspace, host_cwd),
+        pull=getattr(cfg, "pull_policy", "missing"),
+    )
+    ws = WorkspaceSync(
+        workspace_mode=mode,
+        gitignore=getattr(cfg, "sync_gitignore", True),
+        module_store=getattr(cfg, "sync_module_store", False),
+    )
+    spec.add_args(ws.volume_args(workspace, engine_name))
+    spec.env.update(BASE_ENV)
+    spec.add_args(CacheManager(engine_name).volume_args_from_config(cfg))
+    if "PYTHONPYCACHEPREFIX" in spec.env:
+        # Bytecode goes to the pycache volume instead of being discarded.
+        spec.env.pop("PYTHONDONTWRITEBYTECODE", None)
+    settings, action, backend = (
+        getattr(cfg, "resources", None),
+        getattr(cfg, "action", None),
+        getattr(cfg, "backend", ""),
+    )
+    limits = resources.resolve(settings, engine_name, action, backend)
+    spec.resources += limits.run_args()
+    spec.env.update(limits.env())
+    spec.limits = limits.to_dict()
+    if action != "session":
+        limits = resources.resolve(settings, engine_name, "session", backend)
+    spec.session_limits = limits.to_dict()
+    spec.add_args(
+        credentials.container_args(credentials.detect_strategy(getattr(cfg, "git_credential_helper", "auto")))
+    )
+    return spec
+
+
+def compose(cfg, engine_name: str, workspace: Path, host_cwd: Optional[Path] = None) -> RunSpec:
+    """Return the RunSpec for this invocation, composing it only once."""
+    workspace = Path(workspace).resolve()
+    host_cwd = Path(host_cwd).resolve() if host_cwd else workspace
+    key = (id(cfg), engine_name, str(workspace), str(host_cwd))
+    entry = _memo.get(key)
+    if entry is None or entry[0] is not cfg:
+        entry = (cfg, build(cfg, engine_name, workspace, host_cwd))
+        _memo[key] = entry
+    return entry[1]
+
+
+def reset():
+    """Forget memoized specs (tests, or after the configuration changes)."""
+    _memo.clear()
@@ -0,0 +1,239 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Long-lived build session containers for west-env.
+
+Without a session every ``west env build``/``shell``/``benchmark`` starts a
+fresh ``run --rm`` container and pays for container creation, mount setup and
+``git config --global safe.directory '*'`` each time.
+
+``west env session start`` starts one named container per workspace with the
+same mounts and environment a one-shot run would get, performs the one-time
+setup, and then idles.  While it is running, run_container() executes
+commands in it with ``exec`` instead of ``run``.  The container reaps itself
+once no command has been active for ``session.idle_timeout`` seconds.
+
+Usage
+-----
+  west env session start    — start (or restart a stale) session container
+  west env session status   — show the session state
+  west env session stop     — stop and remove the session container
+
+A marker file (``.west/west-env-session.json``) records the running session
+so runs without a session never pay for an extra engine query.
+
+CPU, memory and other run limits are fixed when the container starts, so a
+session runs every action with the limits of the ``session`` action
+(``resources.actions.session``, else the top-level ``resources``).  An
+action's own limits do not make the session stale; its build parallelism is
+passed to each ``exec``.
+"""
+
+import hashlib
+import json
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_IDLE_TIMEOUT = 1800  # seconds
+
+_MARKER = Path(".west") / "west-env-session.json"
+_ACTIVITY = "/tmp/.west-env-activity"
+_BUSY_DIR = "/tmp/.west-env-busy"
+
+# PID 1 of the session container: one-time setup, then reap on idle.  Each
+# exec registers its shell PID under _BUSY_DIR so long builds keep it alive.
+_KEEPALIVE = """\
+trap 'exit 0' TERM INT
+{setup}
+mkdir -p {busy}
+touch {activity}
+while :; do
+  sleep 15 & wait $!
+  for f in {busy}/*; do
+    if [ -d "/proc/${{f##*/}}" ]; then touch {activity}; else rm -f "$f"; fi
+  done
+  last=$(stat -c %Y {activity} 2>/dev/null || echo 0)
+  [ $(( $(date +%s) - last )) -ge {idle} ] && exit 0
+done
+"""
+
+_EXEC_WRAPPER = f'touch {_ACTIVITY}; : > {_BUSY_DIR}/$$; "$@"; rc=$?; rm -f {_BUSY_DIR}/$$; touch {_ACTIVITY}; exit $rc'
+
+
+def session_name(workspace: Path) -> str:
+    """Return the container name of the session for *workspace*."""
+    workspace = Path(workspace).resolve()
+    digest = hashlib.sha256(str(workspace).encode("utf-8")).hexdigest()[:10]
+    slug = "".join(c if c.isalnum() or c in "-_." else "-" for c in workspace.name.lower())[:30]
+    return f"west-env-session-{slug}-{digest}"
+
+
+def _read_marker(workspace: Path) -> Optional[dict]:
+    try:
+        return json.loads((workspace / _MARKER).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(workspace: Path, data: dict):
+    path = workspace / _MARKER
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _clear_marker(workspace: Path):
+    try:
+        (workspace / _MARKER).unlink()
+    except OSError:
+        pass
+
+
+def _is_running(engine: str, name: str) -> bool:
+    try:
+        out = subprocess.check_output(
+            [engine, "container", "inspect", "-f", "{{.State.Running}}", name],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        return out.strip() == "true"
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def mounted_volume(engine: str, name: str, destination: str = "/work") -> Optional[str]:
+    """Return the volume mounted at *destination* in container *name*, if any."""
+    fmt = f'{{{{range .Mounts}}}}{{{{if eq .Destination "{destination}"}}}}{{{{.Name}}}}{{{{end}}}}{{{{end}}}}'
+    try:
+        out = subprocess.check_output(
+            [engine, "container", "inspect", "-f", fmt, name],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.strip() or None
+
+
+def _current_spec(cfg, workspace: Path):
+    from west_env.container import run_spec
+
+    spec = run_spec(cfg, workspace, workspace)
+    return spec.engine, Path(spec.workspace), spec
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def start(cfg, workspace: Path, idle_timeout: Optional[int] = None) -> str:
+    """Start the session container for *workspace* (idempotent); return its name."""
+    from west_env.credentials import GIT_SAFE_DIRECTORY_CMD
+
+    engine, workspace, spec = _current_spec(cfg, workspace)
+    idle = int(idle_timeout or getattr(cfg, "session_idle_timeout", DEFAULT_IDLE_TIMEOUT))
+    name = session_name(workspace)
+
+    marker = _read_marker(workspace)
+    if _is_running(engine, name):
+        if marker and marker.get("spec") == spec.fingerprint():
+            print(f"[OK] session already running: {name}")
+            return name
+        print(f"[INFO] session {name} was started with a different configuration; restarting")
+        _stop_container(engine, name)
+
+    keepalive = _KEEPALIVE.format(setup=GIT_SAFE_DIRECTORY_CMD, busy=_BUSY_DIR, activity=_ACTIVITY, idle=idle)
+    args = [
+        engine,
+        "run",
+        "-d",
+        "--rm",
+        "--name",
+        name,
+        "--label",
+        "west-env.session=1",
+        "--label",
+        f"west-env.workspace={workspace}",
+        "-w",
+        "/work",
+    ]
+    args += spec.options() + [spec.image, "sh", "-c", keepalive]
+    subprocess.check_call(args, stdout=subprocess.DEVNULL)
+
+    _write_marker(
+        workspace,
+        {"name": name, "engine": engine, "spec": spec.fingerprint(), "idle_timeout": idle, "started": time.time()},
+    )
+    print(f"[OK] session started: {name} (idle timeout {idle}s)")
+    return name
+
+
+def _stop_container(engine: str, name: str):
+    subprocess.call([engine, "rm", "-f", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop(cfg, workspace: Path):
+    """Stop and remove the session container for *workspace*."""
+    engine, workspace, _ = _current_spec(cfg, workspace)
+    name = session_name(workspace)
+    _stop_container(engine, name)
+    _clear_marker(workspace)
+    print(f"[OK] session stopped: {name}")
+
+
+def status(cfg, workspace: Path) -> dict:
+    """Return a dict describing the session for *workspace*."""
+    engine, workspace, spec = _current_spec(cfg, workspace)
+    name = session_name(workspace)
+    marker = _read_marker(workspace) or {}
+    running = _is_running(engine, name)
+    return {
+        "name": name,
+        "engine": engine,
+        "running": running,
+        "stale": running and marker.get("spec") != spec.fingerprint(),
+        "idle_timeout": marker.get("idle_timeout"),
+        "started": marker.get("started"),
+    }
+
+
+def exec_args(spec, command: list, interactive=False):
+    """Return ``exec`` args to run *command* in the active session, or None.
+
+    *spec* is the invocation's RunSpec.  None means no usable session: no
+    marker, another engine, the container was reaped, or it was started with
+    a different RunSpec.
+    """
+    workspace = Path(spec.workspace)
+    marker = _read_marker(workspace)
+    if not marker or marker.get("engine") != spec.engine:
+        return None
+    name = marker.get("name")
+    if not _is_running(spec.engine, name):
+        _clear_marker(workspace)
+        return None
+    if marker.get("spec") != spec.fingerprint():
+        print("[WARN] build session is stale (configuration changed); using a one-shot container")
+        print("       run: west env session start")
+        return None
+
+    args = ["exec", "-w", spec.workdir]
+    for key, value in spec.action_env().items():
+        args += ["-e", f"{key}={value}"]
+    if interactive:
+        args.extend(["-i", "-t"])
+    return args + [name, "sh", "-c", _EXEC_WRAPPER, "sh"] + list(command)
+
+
+def describe(info: dict) -> list:
+    """Return human-readable status lines for a status() dict."""
+    if not info["running"]:
+        return [f"[INFO] no build session running ({info['name']})"]
+    lines = [f"[PASS] build session running: {info['name']} ({info['engine']})"]
+    if info.get("idle_timeout"):
+        lines.append(f"       idle timeout: {info['idle_timeout']}s")
+    if info.get("started"):
+        lines.append(f"       started: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(info['started']))}")
+    if info["stale"]:
+        lines.append("[WARN] session configuration is stale; run: west env session start")
+    return lines
@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Warm environment snapshot images for west-env.
+
+Every fresh container otherwise repeats the same one-time setup before the
+real command: git ``safe.directory`` configuration, ``west zephyr-export``
+(CMake package registration) and a pip dependency check.
+
+``west env snapshot`` runs those steps once in a container derived from the
+configured image and commits the result as a local image tagged by the base
+image ID and a hash of ``west-env.yml``:
+
+  west-env-snapshot:<base-id[:12]>-<config-hash[:12]>
+
+A marker file (``.west/west-env-snapshot.json``) opts the workspace in.  From
+then on every container run uses the snapshot and starts straight into the
+command, at the cost of one base image lookup.  When the base image or
+``west-env.yml`` changes, runs warn and use the base image until ``west env
+snapshot`` rebuilds the snapshot (and removes the outdated image); the run
+path never builds images itself.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+SNAPSHOT_REPO = "west-env-snapshot"
+
+_MARKER = Path(".west") / "west-env-snapshot.json"
+
+# One-time initialisation baked into the snapshot image.
+SETUP_STEPS = [
+    "git config --global safe.directory '*'",
+    "if [ -d /work/zephyr ]; then west zephyr-export >/dev/null; fi",
+    "python3 -m pip check >/dev/null 2>&1 || echo '[WARN] pip check reported problems' >&2",
+]
+
+
+def config_hash(workspace: Path) -> str:
+    """Return a hash of the workspace's west-env.yml ('none' if absent)."""
+    from west_env.config import find_config_path
+
+    try:
+        data = find_config_path(workspace).read_bytes()
+    except OSError:
+        return "none"
+    return hashlib.sha256(data).hexdigest()
+
+
+def snapshot_tag(base_id: str, cfg_hash: str) -> str:
+    """Return the snapshot image reference for a base image ID and config hash."""
+    base = base_id.split(":", 1)[-1]
+    return f"{SNAPSHOT_REPO}:{base[:12]}-{cfg_hash[:12]}"
+
+
+def image_id(engine: str, ref: str, client=None) -> Optional[str]:
+    """Return the local image ID of *ref*, or None if it is not present."""
+    if client is not None:
+        info = client.image_inspect(ref)
+        return info.get("Id") if info else None
+    try:
+        out = subprocess.check_output(
+            [engine, "image", "inspect", "-f", "{{.Id}}", ref],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        return out.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_marker(workspace: Path) -> Optional[dict]:
+    try:
+        return json.loads((Path(workspace) / _MARKER).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(workspace: Path, data: dict):
+    path = Path(workspace) / _MARKER
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def build(spec, client=None) -> str:
+    """Run the setup steps for *spec* and commit them as a snapshot image.
+
+    Only the spec's mounts are applied to the setup container: ``-e``
+    values would otherwise be baked into the committed image config.
+    """
+    engine = spec.engine
+    workspace = Path(spec.workspace)
+    base_id = image_id(engine, spec.image, client)
+    if base_id is None:
+        subprocess.check_call([engine, "pull", spec.image])
+        base_id = image_id(engine, spec.image, client)
+        if base_id is None:
+            raise RuntimeError(f"image not available: {spec.image}")
+    tag = snapshot_tag(base_id, config_hash(workspace))
+
+    name = f"west-env-snapshot-build-{os.getpid()}"
+    args = [engine, "run", "--name", name, "-w", "/work"]
+    for volume in spec.volumes:
+        args += ["-v", volume]
+    for mount in spec.mounts:
+        args += ["--mount", mount]
+    args += [spec.image, "sh", "-c", " && ".join(SETUP_STEPS)]
+    try:
+        subprocess.check_call(args)
+        subprocess.check_call([engine, "commit", name, tag], stdout=subprocess.DEVNULL)
+    finally:
+        subprocess.call([engine, "rm", "-f", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    old = read_marker(workspace)
+    if old and old.get("tag") not in (None, tag):
+        subprocess.call([engine, "rmi", old["tag"]], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _write_marker(
+        workspace,
+        {"base_image": spec.image, "base_id": base_id, "tag": tag, "created": time.time()},
+    )
+    return tag
+
+
+def apply(spec, client=None) -> Optional[str]:
+    """Switch *spec* to the workspace's snapshot image if it is current.
+
+    Does nothing unless ``west env snapshot`` was run for the workspace.  A
+    stale or missing snapshot is reported and the base image used.
+    Returns the snapshot tag in use, or None.
+    """
+    from west_env import image
+
+    if spec.prepared:
+        return spec.image
+    marker = read_marker(Path(spec.workspace))
+    if not marker:
+        return None
+
+    tag = marker.get("tag")
+    base_id = image_id(spec.engine, spec.image, client)
+    if base_id is None or snapshot_tag(base_id, config_hash(Path(spec.workspace))) != tag:
+        print(f"[WARN] environment snapshot is out of date (base image or west-env.yml changed); using {spec.image}")
+        print("       rebuild it with: west env snapshot")
+        return None
+    if not image.is_present(spec.engine, tag, client):  # cached once seen
+        print(f"[WARN] environment snapshot image {tag} is missing; using {spec.image}")
+        print("       rebuild it with: west env snapshot")
+        return None
+
+    spec.image = tag
+    spec.prepared = True
+    return tag
+
+
+def doctor_lines(workspace: Path) -> list:
+    marker = read_marker(workspace)
+    if not marker:
+        return ["[INFO] environment snapshot: none (create with: west env snapshot)"]
+    return [
+        f"[PASS] environment snapshot: {marker['tag']}",
+        f"       base image: {marker.get('base_image')}",
+    ]
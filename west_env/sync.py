@@ -3,7 +3,8 @@
 
 Implements four workspace modes:
 
-  sync   rsync host → VM/container volume; sync artifacts back.
+  sync   incremental host → VM/container volume sync driven by a host-side
+         file index (west_env.syncindex); sync artifacts back.
          Recommended on Windows (avoids NTFS→Linux bind-mount overhead).
   copy   Copy source into container at build start; copy artifacts out at end.
          Portable fallback, no volume required.
@@ -12,32 +13,40 @@ Implements four workspace modes:
   bind   Direct host-path bind mount (Linux/macOS native; WARNING on Windows).
 
 Exclusion patterns (source sync only):
-  build/, .cache/, twister-out/, .west/, *.egg-info/
-  Configurable via west-env.yml sync.exclude.
+  build/, build-*/, .cache/, twister-out*/, .west/, /artifacts/, *.egg-info/, ...
+  plus west-env.yml sync.exclude and .gitignore / .westenvignore files,
+  all with gitignore semantics (see west_env.ignore).
 """
 
-import fnmatch
+import re
 import shutil
 import subprocess
 import sys
 from pathlib import Path
 from typing import Optional
 
+from west_env import delta, gitscan, ignore, localcopy, modstore, syncagent, syncback, syncindex
+
 # Directories always excluded from source → container sync
 DEFAULT_EXCLUDES = [
     "build",
+    "build-*/",
     ".cache",
-    "twister-out",
+    "twister-out*/",
     ".west",
     "*.egg-info",
     "__pycache__",
     ".git",
     ".venv",
     "venv",
+    "/artifacts/",  # sync --back destination
 ]
 
-# Artifact extensions sync'd back from container → host
-ARTIFACT_EXTENSIONS = {".elf", ".bin", ".hex", ".map", ".lst", ".s19"}
+# Workspace volumes are named VOLUME_PREFIX<slug>-<path hash> (workspace_volume_name)
+VOLUME_PREFIX = "west-env-ws-"
+
+# Artifact extensions sync'd back from container → host (see west_env.syncback)
+ARTIFACT_EXTENSIONS = set(syncback.DEFAULT_EXTENSIONS)
 
 
 class SyncWarning(UserWarning):
@@ -58,58 +67,147 @@ def _warn_bind_on_windows(workspace_mode: str):
         )
 
 
-def _is_excluded(path: Path, root: Path, patterns: list) -> bool:
+def _is_excluded(path: Path, root: Path, patterns) -> bool:
     """Return True if *path* (relative to *root*) matches any exclusion pattern."""
     try:
         rel = path.relative_to(root)
     except ValueError:
         return False
-    parts = rel.parts
-    for pattern in patterns:
-        # Match against any component in the path
-        if any(fnmatch.fnmatch(part, pattern) for part in parts):
-            return True
-    return False
-
-
-def _copy_tree(src: Path, dst: Path, excludes: list):
-    """Recursively copy *src* → *dst* honouring *excludes*."""
-    dst.mkdir(parents=True, exist_ok=True)
-    for item in src.iterdir():
-        if _is_excluded(item, src, excludes):
-            continue
-        dest = dst / item.name
-        if item.is_dir():
-            _copy_tree(item, dest, excludes)
-        else:
-            shutil.copy2(str(item), str(dest))
+    return ignore.as_matcher(patterns).is_ignored(rel.as_posix(), path.is_dir())
+
 
+def _copy_tree(src: Path, dst: Path, excludes, delete: bool = False):
+    """Copy *src* → *dst* honouring *excludes* (see west_env.localcopy).
 
-def _rsync_to(src: Path, dst_spec: str, excludes: list):
-    """rsync source → dst_spec, applying excludes.  Falls back to shutil on Windows."""
+    Unchanged files are skipped; returns a localcopy.CopyStats.
+    """
+    return localcopy.copy_tree(src, dst, excludes, delete=delete)
+
+
+def _rsync_to(src: Path, dst_spec: str, excludes):
+    """rsync source → dst_spec, applying excludes.  Falls back to a local copy."""
     if shutil.which("rsync"):
-        cmd = ["rsync", "-a", "--delete"]
-        for exc in excludes:
-            cmd += ["--exclude", exc]
+        cmd = ["rsync", "-a", "--delete"] + ignore.rsync_args(src, excludes)
         cmd += [str(src) + "/", dst_spec]
         subprocess.check_call(cmd)
     else:
-        # Fallback: plain Python copy (slower, no --delete)
-        dst_path = Path(dst_spec)
-        _copy_tree(src, dst_path, excludes)
+        # Fallback: parallel local copy with the same --delete semantics
+        _copy_tree(src, Path(dst_spec), excludes, delete=True)
 
 
 class WorkspaceSync:
     """Manages source ↔ container workspace synchronization."""
 
-    def __init__(self, workspace_mode: str = "bind", excludes: Optional[list] = None):
+    def __init__(
+        self,
+        workspace_mode: str = "bind",
+        excludes: Optional[list] = None,
+        client=None,
+        gitignore: bool = True,
+        compression: str = "none",
+        backend: str = "",
+        artifacts: Optional[syncback.ArtifactSet] = None,
+        image: Optional[str] = None,
+        agent: str = "auto",
+        delta_min_size: int = delta.DELTA_MIN_BYTES,
+        enumeration: str = "auto",
+        streams: int = syncindex.DEFAULT_STREAMS,
+        transport: str = "auto",
+        module_store: bool = False,
+    ):
         self.mode = workspace_mode
         self.excludes = list(excludes or DEFAULT_EXCLUDES)
+        # Honour .gitignore files (.westenvignore files always apply).
+        self.gitignore = gitignore
+        # Stream compression mode (west_env.compress.MODES) and the backend
+        # name, which lets "auto" skip compression for native engines.
+        self.compression = compression
+        self.backend = backend
+        # Files streamed back by sync_from_volume (dirs, extensions, globs).
+        self.artifacts = artifacts or syncback.ArtifactSet()
+        # Optional west_env.engineapi.EngineClient; None uses the CLI.
+        self.client = client
+        # Build image that runs the sync agent ("auto"); without an image, or
+        # with agent="off", throwaway alpine helper containers are used.
+        self.image = image
+        self.agent_mode = agent
+        # Modified files at least this large go as block deltas (0: never).
+        self.delta_min_size = delta_min_size
+        # "auto" asks git what changed in west projects; "walk" stats everything.
+        self.enumeration = enumeration
+        # Concurrent upload streams for large syncs, split along west projects.
+        self.streams = streams
+        self._projects: dict = {}
+        # Helper-container path without an agent (syncindex.TRANSPORTS):
+        # "run" pipes into tar -x, "cp" copies one archive (cp - / archive API).
+        self.transport = transport
+        # Link clean west projects to the shared module store (west_env.modstore).
+        self.module_store = module_store
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    @property
+    def matcher(self) -> ignore.IgnoreMatcher:
+        """The compiled rule set shared by every transfer path."""
+        files = ignore.IGNORE_FILES if self.gitignore else (".westenvignore",)
+        return ignore.IgnoreMatcher(self.excludes, ignore_files=files)
+
+    def agent_for(self, engine: str, volume_name: str, host_workspace: Optional[Path] = None):
+        """Return the pooled syncagent.SyncAgent for *volume_name*, or None.
+
+        Falls back (once, with a warning) to helper containers when the
+        image cannot run the agent.
+        """
+        if self.agent_mode == "off" or not self.image:
+            return None
+        try:
+            return syncagent.agent_for(engine, self.image, [f"{volume_name}:/work"], workspace=host_workspace)
+        except syncagent.AgentError as exc:
+            print(f"[WARN] {exc}; using helper containers")
+            self.agent_mode = "off"
+            return None
+
+    def projects(self, host_workspace: Path) -> list:
+        """Return the workspace-relative paths of the cloned west projects."""
+        host_workspace = Path(host_workspace).resolve()
+        if host_workspace not in self._projects:
+            self._projects[host_workspace] = gitscan.west_projects(host_workspace)
+        return self._projects[host_workspace]
+
+    @property
+    def git_enumeration(self) -> bool:
+        """Whether changes in west projects are asked from git.
+
+        Needs ``.gitignore`` files honoured: git does not report ignored files.
+        """
+        return self.enumeration == "auto" and self.gitignore
+
+    @property
+    def shares_modules(self) -> bool:
+        """Whether clean west projects come from the shared module store.
+
+        Like git enumeration, needs ``.gitignore`` files honoured.
+        """
+        return self.module_store and self.gitignore
+
+    def sync_options(self, engine: str, volume_name: str, host_workspace: Path) -> dict:
+        """Keyword arguments for syncindex.sync (shared with sync --watch)."""
+        host_workspace = Path(host_workspace).resolve()
+        return {
+            "compression": self.compression,
+            "backend": self.backend,
+            "agent": lambda: self.agent_for(engine, volume_name, host_workspace),
+            "delta_min_size": self.delta_min_size,
+            "projects": self.projects(host_workspace),
+            "git_enumeration": self.git_enumeration,
+            "streams": self.streams,
+            "transport": self.transport,
+            "client": self.client,
+            "module_store": self.shares_modules,
+        }
+
     def warn_if_needed(self):
         """Emit performance warning if mode is 'bind' on Windows."""
         _warn_bind_on_windows(self.mode)
@@ -125,60 +223,61 @@ class WorkspaceSync:
             return ["-v", f"{host_workspace}:/work"]
         elif self.mode in ("sync", "copy"):
             # Named volume (caller is responsible for populating it first)
-            volume_name = f"west-env-ws-{_workspace_slug(host_workspace)}"
-            return ["-v", f"{volume_name}:/work"]
+            volume_name = workspace_volume_name(host_workspace)
+            return ["-v", f"{volume_name}:/work"] + self._store_args()
         elif self.mode == "tmpfs":
-            volume_name = f"west-env-ws-{_workspace_slug(host_workspace)}"
+            volume_name = workspace_volume_name(host_workspace)
             return [
                 "-v",
                 f"{volume_name}:/work",
                 "--mount",
                 "type=tmpfs,destination=/work/build",
-            ]
+            ] + self._store_args()
         else:
             raise ValueError(f"Unknown workspace mode: {self.mode!r}")
 
-    def sync_to_volume(self, host_workspace: Path, engine: str, volume_name: str):
-        """Copy source files from host into a named Docker/Podman volume.
+    def _store_args(self) -> list:
+        # Shared projects are symlinks into the read-only module store.
+        return modstore.volume_args() if self.shares_modules else []
+
+    def sync_to_volume(self, host_workspace: Path, engine: str, volume_name: str, full: bool = False):
+        """Sync source files from host into a named Docker/Podman volume.
 
-        Uses a temporary container to write into the volume.
-        Excluded directories (build/, .cache/, etc.) are not copied.
+        Incremental: only files added or modified since the last sync are
+        streamed and files deleted on the host are removed from the volume
+        (see west_env.syncindex).  Ignored paths (build/, .cache/,
+        .gitignore matches, etc.; see west_env.ignore) are never copied.
+        The stream goes to the sync agent when one is available; large
+        syncs use several streams, one group of west projects each.
+        Returns a syncindex.SyncStats.
         """
         host_workspace = host_workspace.resolve()
-        # On Windows fall back to docker cp approach; on POSIX use tar pipe
-        if sys.platform == "win32" or not shutil.which("tar"):
-            _sync_via_docker_cp(engine, host_workspace, volume_name, self.excludes)
-        else:
-            _sync_via_tar_pipe(engine, host_workspace, volume_name, self.excludes)
+        return syncindex.sync(
+            engine,
+            volume_name,
+            host_workspace,
+            self.matcher,
+            full=full,
+            **self.sync_options(engine, volume_name, host_workspace),
+        )
 
     def sync_from_volume(self, engine: str, volume_name: str, host_dst: Path):
-        """Copy build artifacts from a named volume back to the host."""
-        host_dst.mkdir(parents=True, exist_ok=True)
-        # Extract artifact files from /work/build inside the volume
-        extract_cmd = [
-            engine,
-            "run",
-            "--rm",
-            "-v",
-            f"{volume_name}:/work",
-            "-v",
-            f"{host_dst}:/output",
-            "alpine",
-            "sh",
-            "-c",
-            "find /work/build -type f \\( "
-            + " -o ".join(f"-name '*{ext}'" for ext in ARTIFACT_EXTENSIONS)
-            + " \\) -exec cp --parents {} /output/ \\; 2>/dev/null || true",
-        ]
-        try:
-            subprocess.check_call(extract_cmd, stderr=subprocess.DEVNULL)
-        except subprocess.CalledProcessError:
-            pass  # Non-fatal: no artifacts yet
+        """Stream build artifacts from a named volume back to *host_dst*.
+
+        Only artifacts whose content differs from the copy already under
+        *host_dst* are transferred, each written atomically (see
+        west_env.syncback).  *host_dst* is expected inside the workspace,
+        whose ``.west/`` holds the host-side hash index.
+        Returns a syncback.SyncBackStats.
+        """
+        host_dst = Path(host_dst).resolve()
+        agent = self.agent_for(engine, volume_name, host_dst.parent)
+        return syncback.sync_back(engine, volume_name, host_dst.parent, host_dst, self.artifacts, agent=agent)
 
     def status(self, host_workspace: Path) -> dict:
         """Return a dict describing sync state."""
         host_workspace = host_workspace.resolve()
-        volume_name = f"west-env-ws-{_workspace_slug(host_workspace)}"
+        volume_name = workspace_volume_name(host_workspace)
         return {
             "mode": self.mode,
             "host_workspace": str(host_workspace),
@@ -197,40 +296,18 @@ def _workspace_slug(path: Path) -> str:
     return path.name.lower().replace(" ", "-").replace("\\", "-").replace("/", "-")[:40]
 
 
-def _sync_via_tar_pipe(engine: str, src: Path, volume_name: str, excludes: list):
-    """Pipe a tar stream into a volume via a temporary container."""
-    # Build exclude args for tar
-    tar_excludes = []
-    for exc in excludes:
-        tar_excludes += ["--exclude", exc]
-
-    tar_proc = subprocess.Popen(
-        ["tar", "-cf", "-"] + tar_excludes + ["-C", str(src), "."],
-        stdout=subprocess.PIPE,
-    )
-    docker_proc = subprocess.Popen(
-        [engine, "run", "--rm", "-v", f"{volume_name}:/work", "-i", "alpine", "tar", "-xf", "-", "-C", "/work"],
-        stdin=tar_proc.stdout,
-    )
-    tar_proc.stdout.close()
-    docker_proc.wait()
-    tar_proc.wait()
-
-
-def _sync_via_docker_cp(engine: str, src: Path, volume_name: str, excludes: list):
-    """Copy files into a volume using `docker cp` via a scratch container."""
-    # Create a scratch container
-    cid = subprocess.check_output(
-        [engine, "create", "-v", f"{volume_name}:/work", "alpine", "true"],
-        text=True,
-    ).strip()
-    try:
-        # Copy each file not matching excludes
-        for item in src.iterdir():
-            if not _is_excluded(item, src, excludes):
-                subprocess.check_call(
-                    [engine, "cp", str(item), f"{cid}:/work/{item.name}"],
-                    stderr=subprocess.DEVNULL,
-                )
-    finally:
-        subprocess.call([engine, "rm", cid], stderr=subprocess.DEVNULL)
+def workspace_volume_name(path: Path) -> str:
+    """Return the workspace volume for *path*.
+
+    A readable prefix from the directory name plus a hash of the resolved
+    path, so ``~/a/app`` and ``~/b/app`` get distinct volumes.
+    """
+    path = Path(path).resolve()
+    digest = syncindex.workspace_id(path)
+    slug = re.sub(r"[^a-z0-9_.-]", "-", _workspace_slug(path))[:24].strip("-.") or "ws"
+    return f"{VOLUME_PREFIX}{slug}-{digest}"
+
+
+def legacy_volume_name(path: Path) -> str:
+    """Return the name older releases gave *path*'s volume (last component only)."""
+    return f"{VOLUME_PREFIX}{_workspace_slug(Path(path).resolve())}"
@@ -0,0 +1,623 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Persistent in-volume sync agent.
+
+Every sync, sync-back and cache-stats call used to start a throwaway
+``alpine`` container: 1-3 s each on podman-machine, and a hard failure on
+an offline runner that cannot pull ``alpine``.  The agent is a small Python
+program (AGENT_SOURCE) run with ``python3 -c`` in the configured build
+image, so no extra image is needed.  It stays up for the lifetime of the
+west invocation -- or, while a build session is running with the workspace
+volume at /work, is started with ``exec`` in the session container -- and
+serves batches over a framed stdin/stdout protocol:
+
+  frame    4-byte big-endian length + bytes
+  request  one JSON frame ``{"op": ...}``; ``put`` and ``patch`` are followed
+           by data frames ending with an empty frame
+  reply    one JSON frame ``{"ok": true, ...}`` or ``{"ok": false, "error"}``;
+           ``get`` is followed by data frames ending with an empty frame
+
+  put      extract a tar stream (optionally gzip/lzma/zstd) into the root and
+           apply its trailing delete list (see west_env.syncindex)
+  signature / patch
+           block signatures of a file, and rebuilding it from a delta
+           stream (see west_env.delta)
+  delete   remove paths
+  stat     ``{path: [size, mtime_ns, mode] | None}``
+  hash     sha256 of files under ``dirs`` matching ``names`` / ``paths``
+  get      stream a tar of paths back
+  exec     run a command and return its exit code and stdout
+  count    number of files under a directory with a suffix
+  files    every file and symlink under the root
+
+WorkspaceSync and CacheManager obtain agents with agent_for(), which reuses
+one per engine, image and mount set.  ``sync.agent: off`` in west-env.yml
+restores the helper containers; they are also used when the image cannot
+run the agent (no ``python3``).
+"""
+
+import atexit
+import io
+import json
+import struct
+import subprocess
+from typing import Optional
+
+from west_env import compress
+
+PROTOCOL_VERSION = 1
+
+AGENT_SOURCE = r"""
+import fnmatch, hashlib, io, json, os, shutil, struct, subprocess, sys, tarfile, zlib
+
+ROOT = sys.argv[1] if len(sys.argv) > 1 else "/work"
+DELETE_LIST = ".west-env-sync-delete"
+IN, OUT = sys.stdin.buffer, sys.stdout.buffer
+
+
+def read_exact(n):
+    buf = b""
+    while len(buf) < n:
+        part = IN.read(n - len(buf))
+        if not part:
+            raise EOFError
+        buf += part
+    return buf
+
+
+def read_frame():
+    return read_exact(struct.unpack(">I", read_exact(4))[0])
+
+
+def send(data):
+    OUT.write(struct.pack(">I", len(data)))
+    OUT.write(data)
+
+
+def reply(**fields):
+    send(json.dumps(fields).encode())
+    OUT.flush()
+
+
+class Chunks(io.RawIOBase):
+    def __init__(self):
+        self.buf, self.eof = b"", False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.buf and not self.eof:
+            self.buf = read_frame()
+            self.eof = not self.buf
+        n = min(len(b), len(self.buf))
+        b[:n] = self.buf[:n]
+        self.buf = self.buf[n:]
+        return n
+
+    def drain(self):
+        while not self.eof:
+            self.buf = b""
+            self.readinto(bytearray(1))
+
+
+class Sender(io.RawIOBase):
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if len(b):
+            send(bytes(b))
+        return len(b)
+
+
+def zstd():
+    try:
+        from compression import zstd as mod
+        return lambda f: mod.ZstdFile(f)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return lambda f: zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+    except ImportError:
+        return None
+
+
+def decoder(codec, raw):
+    stream = io.BufferedReader(raw, 1 << 20)
+    if codec == "gzip":
+        import gzip
+        return gzip.GzipFile(fileobj=stream)
+    if codec == "lzma":
+        import lzma
+        return lzma.LZMAFile(stream)
+    if codec == "zstd":
+        return zstd()(stream)
+    return stream
+
+
+def path(rel):
+    return os.path.join(ROOT, rel)
+
+
+def remove(target):
+    if os.path.isdir(target) and not os.path.islink(target):
+        shutil.rmtree(target, ignore_errors=True)
+    elif os.path.lexists(target):
+        os.unlink(target)
+
+
+def op_put(req):
+    raw = Chunks()
+    files, deletes = 0, []
+    try:
+        with tarfile.open(fileobj=decoder(req.get("codec", "none"), raw), mode="r|") as tar:
+            for m in tar:
+                if m.name == DELETE_LIST:
+                    deletes = [p for p in tar.extractfile(m).read().split(b"\0") if p]
+                    continue
+                if m.name.startswith("/") or ".." in m.name.split("/"):
+                    continue
+                target = path(m.name)
+                if os.path.islink(target) or (os.path.isdir(target) and not m.isdir()):
+                    remove(target)
+                elif os.path.lexists(target) and m.isdir() and not os.path.isdir(target):
+                    remove(target)
+                kwargs = {"filter": "fully_trusted"} if hasattr(tarfile, "fully_trusted_filter") else {}
+                tar.extract(m, ROOT, **kwargs)
+                files += 1
+    finally:
+        raw.drain()
+    for rel in deletes:
+        remove(path(os.fsdecode(rel)))
+    return {"files": files, "deleted": len(deletes)}
+
+
+def op_signature(req):
+    block, weak, strong = req["block"], [], []
+    try:
+        f = open(path(req["path"]), "rb")
+    except OSError:
+        return {"size": None}
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        for data in iter(lambda: f.read(block), b""):
+            weak.append(zlib.adler32(data))
+            strong.append(hashlib.blake2b(data, digest_size=16).hexdigest())
+    return {"size": size, "weak": weak, "strong": strong}
+
+
+def take(stream, n):
+    buf = b""
+    while len(buf) < n:
+        part = stream.read(n - len(buf))
+        if not part:
+            raise ValueError("truncated delta stream")
+        buf += part
+    return buf
+
+
+def op_patch(req):
+    raw = Chunks()
+    target = path(req["path"])
+    tmp = target + ".west-env-delta"
+    block, h = req["block"], hashlib.blake2b(digest_size=16)
+    try:
+        stream = decoder(req.get("codec", "none"), raw)
+        with open(target, "rb") as old, open(tmp, "wb") as out:
+            while True:
+                kind = take(stream, 1)
+                if kind == b"E":
+                    break
+                if kind == b"C":
+                    first, count = struct.unpack(">QI", take(stream, 12))
+                    old.seek(first * block)
+                    remaining = count * block
+                    while remaining:
+                        data = old.read(min(remaining, 1 << 20))
+                        if not data:
+                            break
+                        h.update(data)
+                        out.write(data)
+                        remaining -= len(data)
+                elif kind == b"L":
+                    data = take(stream, struct.unpack(">I", take(stream, 4))[0])
+                    h.update(data)
+                    out.write(data)
+                else:
+                    raise ValueError("bad delta record %r" % kind)
+        if h.hexdigest() != req["digest"]:
+            raise ValueError("delta result does not match the expected content")
+        st = os.stat(target)
+        try:
+            os.chown(tmp, st.st_uid, st.st_gid)
+        except OSError:
+            pass
+        os.chmod(tmp, req["mode"] & 0o7777)
+        os.utime(tmp, ns=(req["mtime_ns"], req["mtime_ns"]))
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+    finally:
+        raw.drain()
+    return {}
+
+
+def op_delete(req):
+    for rel in req["paths"]:
+        remove(path(rel))
+    return {}
+
+
+def op_stat(req):
+    out = {}
+    for rel in req["paths"]:
+        try:
+            st = os.lstat(path(rel))
+            out[rel] = [st.st_size, st.st_mtime_ns, st.st_mode]
+        except OSError:
+            out[rel] = None
+    return {"stat": out}
+
+
+def sha256(p):
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def op_hash(req):
+    names, globs, out = req.get("names", []), req.get("paths", []), {}
+    for top in req["dirs"]:
+        for dirpath, _dirs, files in os.walk(path(top)):
+            for name in files:
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, ROOT)
+                if os.path.isfile(full) and (
+                    any(fnmatch.fnmatchcase(name, n) for n in names) or any(fnmatch.fnmatchcase(rel, g) for g in globs)
+                ):
+                    out[rel] = sha256(full)
+    return {"files": out}
+
+
+def op_exec(req):
+    env = dict(os.environ, **req.get("env", {}))
+    try:
+        proc = subprocess.run(req["argv"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+    except OSError as exc:
+        return {"rc": 127, "stdout": "", "error": str(exc)}
+    return {"rc": proc.returncode, "stdout": proc.stdout.decode("utf-8", "replace")}
+
+
+def op_count(req):
+    n = 0
+    for _dirpath, _dirs, files in os.walk(path(req["dir"])):
+        n += sum(1 for name in files if name.endswith(req.get("suffix", "")))
+    return {"count": n}
+
+
+def op_files(req):
+    out = []
+    for dirpath, dirs, files in os.walk(ROOT):
+        links = [name for name in dirs if os.path.islink(os.path.join(dirpath, name))]
+        for name in files + links:
+            out.append(os.path.relpath(os.path.join(dirpath, name), ROOT))
+    return {"files": out}
+
+
+def op_get(req):
+    reply(ok=True)
+    with tarfile.open(fileobj=Sender(), mode="w|") as tar:
+        for rel in req["paths"]:
+            try:
+                tar.add(path(rel), arcname=rel, recursive=False)
+            except OSError:
+                pass
+    send(b"")
+    OUT.flush()
+
+
+OPS = {
+    "put": op_put,
+    "patch": op_patch,
+    "signature": op_signature,
+    "delete": op_delete,
+    "stat": op_stat,
+    "hash": op_hash,
+    "exec": op_exec,
+    "count": op_count,
+    "files": op_files,
+}
+
+codecs = ["none", "gzip", "lzma"] + (["zstd"] if zstd() else [])
+reply(ok=True, version=1, codecs=codecs)
+while True:
+    try:
+        req = json.loads(read_frame())
+    except EOFError:
+        break
+    if req["op"] == "quit":
+        reply(ok=True)
+        break
+    if req["op"] == "get":
+        op_get(req)
+        continue
+    try:
+        reply(ok=True, **OPS[req["op"]](req))
+    except Exception as exc:
+        reply(ok=False, error="%s: %s" % (type(exc).__name__, exc))
+"""
+
+
+class AgentError(RuntimeError):
+    """Raised when the agent cannot be started or a request fails."""
+
+
+class _Chunks(io.RawIOBase):
+    """Readable view of data frames up to the terminating empty frame."""
+
+    def __init__(self, agent: "SyncAgent"):
+        self.agent = agent
+        self.buf, self.eof = b"", False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.buf and not self.eof:
+            self.buf = self.agent._read_frame()
+            self.eof = not self.buf
+        n = min(len(b), len(self.buf))
+        b[:n] = self.buf[:n]
+        self.buf = self.buf[n:]
+        return n
+
+    def drain(self):
+        while not self.eof:
+            self.buf = b""
+            self.readinto(bytearray(1))
+
+
+class _Sender(io.RawIOBase):
+    """Writable that frames each write as a data frame."""
+
+    def __init__(self, agent: "SyncAgent"):
+        self.agent = agent
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if len(b):
+            self.agent._send(bytes(b))
+        return len(b)
+
+
+class SyncAgent:
+    """Client end of one agent process (*argv* runs AGENT_SOURCE)."""
+
+    def __init__(self, argv: list):
+        self.argv = list(argv)
+        self.proc: Optional[subprocess.Popen] = None
+        self.codecs: tuple = ("none",)
+        self._siblings: list = []
+
+    # -- process -----------------------------------------------------------
+
+    def start(self) -> "SyncAgent":
+        try:
+            self.proc = subprocess.Popen(
+                self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            hello = self._reply()
+        except (OSError, AgentError) as exc:
+            self.close()
+            raise AgentError(f"sync agent did not start (is python3 in the image?): {exc}") from exc
+        if hello.get("version") != PROTOCOL_VERSION:
+            self.close()
+            raise AgentError(f"sync agent protocol mismatch: {hello.get('version')}")
+        self.codecs = tuple(hello.get("codecs", ("none",)))
+        return self
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def abort(self):
+        """Kill the agent (e.g. after a stream was cut off mid-request)."""
+        proc, self.proc = self.proc, None
+        if proc is not None:
+            proc.kill()
+            proc.wait()
+
+    def workers(self, n: int) -> list:
+        """Return this agent plus *n* - 1 siblings for concurrent streams.
+
+        Siblings run the same command, are kept for reuse and are closed
+        with this agent.  Raises AgentError.
+        """
+        while len(self._siblings) < n - 1:
+            self._siblings.append(SyncAgent(self.argv).start())
+        return [self] + self._siblings[: n - 1]
+
+    def close(self):
+        while self._siblings:
+            self._siblings.pop().close()
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            if proc.poll() is None:
+                self.proc = proc
+                self._send(json.dumps({"op": "quit"}).encode())
+                proc.stdin.flush()
+                self.proc = None
+            proc.stdin.close()
+            proc.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    # -- framing -----------------------------------------------------------
+
+    def _send(self, data: bytes):
+        try:
+            self.proc.stdin.write(struct.pack(">I", len(data)))
+            self.proc.stdin.write(data)
+        except (OSError, ValueError) as exc:
+            raise AgentError(f"sync agent exited: {exc}") from exc
+
+    def _read_frame(self) -> bytes:
+        header = self.proc.stdout.read(4)
+        if len(header) < 4:
+            raise AgentError("sync agent exited unexpectedly")
+        (size,) = struct.unpack(">I", header)
+        data = self.proc.stdout.read(size)
+        if len(data) < size:
+            raise AgentError("sync agent exited unexpectedly")
+        return data
+
+    def _reply(self) -> dict:
+        reply = json.loads(self._read_frame())
+        if not reply.get("ok"):
+            raise AgentError(f"sync agent: {reply.get('error', 'request failed')}")
+        return reply
+
+    def request(self, op: str, **fields) -> dict:
+        """Send one request and return its reply (restarting a dead agent once)."""
+        if not self.alive:
+            self.start()
+        self._send(json.dumps(dict(fields, op=op)).encode())
+        self.proc.stdin.flush()
+        return self._reply()
+
+    # -- operations --------------------------------------------------------
+
+    def put(self, fill, codec: str = "none", auto: bool = False) -> compress.CompressedWriter:
+        """Stream what ``fill(fileobj)`` writes as a tar into the root.
+
+        Returns the compress.CompressedWriter used for the stream.
+        """
+        return self._stream({"op": "put", "codec": codec}, fill, codec, auto)
+
+    def patch(self, rel: str, block: int, fill, digest: str, mode: int, mtime_ns: int, codec: str = "none"):
+        """Rebuild *rel* from the delta stream ``fill(fileobj)`` writes (see west_env.delta).
+
+        The agent checks the result against *digest* (the sync-index hash).
+        """
+        request = {"op": "patch", "path": rel, "block": block, "digest": digest, "mode": mode, "mtime_ns": mtime_ns}
+        return self._stream(dict(request, codec=codec), fill, codec, False)
+
+    def signature(self, rel: str, block: int) -> dict:
+        """Block signature of *rel* (``{"size": None}`` if it does not exist)."""
+        return self.request("signature", path=rel, block=block)
+
+    def _stream(self, request: dict, fill, codec: str, auto: bool) -> compress.CompressedWriter:
+        if not self.alive:
+            self.start()
+        self._send(json.dumps(request).encode())
+        framed = io.BufferedWriter(_Sender(self), 256 * 1024)
+        writer = compress.CompressedWriter(framed, codec, auto=auto)
+        try:
+            fill(writer)
+            writer.close()
+            framed.flush()
+            self._send(b"")
+            self.proc.stdin.flush()
+        except BaseException:
+            self.abort()  # the stream cannot be resumed
+            raise
+        self._reply()
+        return writer
+
+    def get(self, paths: list, consume):
+        """Call ``consume(fileobj)`` with a tar stream of *paths*."""
+        self.request("get", paths=list(paths))
+        stream = _Chunks(self)
+        try:
+            consume(io.BufferedReader(stream, 1024 * 1024))
+            stream.drain()
+        except BaseException:
+            self.abort()
+            raise
+
+    def hash(self, dirs, names=(), paths=()) -> dict:
+        return self.request("hash", dirs=list(dirs), names=list(names), paths=list(paths))["files"]
+
+    def stat(self, paths) -> dict:
+        return self.request("stat", paths=list(paths))["stat"]
+
+    def delete(self, paths):
+        self.request("delete", paths=list(paths))
+
+    def exec(self, argv: list, env: Optional[dict] = None) -> tuple:
+        reply = self.request("exec", argv=list(argv), env=dict(env or {}))
+        return reply["rc"], reply["stdout"]
+
+    def count(self, directory: str, suffix: str = "") -> int:
+        return self.request("count", dir=directory, suffix=suffix)["count"]
+
+    def files(self) -> list:
+        return self.request("files")["files"]
+
+
+# ---------------------------------------------------------------------------
+# Agent pool
+# ---------------------------------------------------------------------------
+
+_AGENTS: dict = {}
+
+
+def agent_args(engine: str, image: str, mounts=(), root: str = "/work", container: Optional[str] = None) -> list:
+    """Return the command that runs the agent with *mounts* (``-v`` values).
+
+    With *container* the agent is started with ``exec`` in that running
+    container instead of a new one.
+    """
+    if container:
+        return [engine, "exec", "-i", container, "python3", "-c", AGENT_SOURCE, root]
+    args = [engine, "run", "--rm", "-i", "--label", "west-env.agent=1"]
+    for mount in mounts:
+        args += ["-v", mount]
+    return args + [image, "python3", "-c", AGENT_SOURCE, root]
+
+
+def _session_container(engine: str, volume: str, workspace) -> Optional[str]:
+    """Name of the running build session with *volume* at /work, if any."""
+    from west_env import session
+
+    marker = session._read_marker(workspace) or {}
+    if marker.get("engine") != engine or not marker.get("name"):
+        return None
+    return marker["name"] if session.mounted_volume(engine, marker["name"]) == volume else None
+
+
+def agent_for(engine: str, image: str, mounts=(), root: str = "/work", workspace=None) -> SyncAgent:
+    """Return a started agent for *image* with *mounts*, shared per invocation.
+
+    When *workspace* has a running build session whose /work is the first
+    mount's volume, the agent runs inside it.  Raises AgentError.
+    """
+    key = (engine, image, tuple(mounts), root)
+    agent = _AGENTS.get(key)
+    if agent is not None and agent.alive:
+        return agent
+    container = None
+    if workspace is not None and mounts:
+        container = _session_container(engine, mounts[0].split(":")[0], workspace)
+    agent = SyncAgent(agent_args(engine, image, mounts, root, container)).start()
+    _AGENTS[key] = agent
+    return agent
+
+
+def close_all():
+    """Stop every pooled agent."""
+    while _AGENTS:
+        _AGENTS.popitem()[1].close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,246 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Streamed, incremental artifact sync-back (``west env sync --back``).
+
+Artifacts used to be copied out with ``find ... -exec cp --parents``: one
+``cp`` per file, every file every time, failures ignored.  Now one helper
+container hashes the candidate artifacts in the volume, compares them with
+a manifest of what the host already has, and streams only the differing
+files back as a single tar on stdout.
+
+The artifact set (``sync.artifacts`` in west-env.yml) is:
+
+  dirs        directories under /work to search (default ``build``)
+  extensions  file extensions to pick up (default .elf .bin .hex .map .lst .s19)
+  globs       extra ``find -path`` patterns relative to /work, e.g.
+              ``build/zephyr/*.dts`` (``*`` also matches ``/``)
+
+Files land under ``<workspace>/artifacts/`` at their path relative to
+/work, each written to a temporary file and renamed into place, so a
+flasher never sees a half-written image.  Host-side hashes are cached in
+``.west/west-env-artifact-index.json`` keyed on size and mtime.
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import tarfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_DIRS = ("build",)
+DEFAULT_EXTENSIONS = (".bin", ".elf", ".hex", ".lst", ".map", ".s19")
+INDEX_PATH = Path(".west") / "west-env-artifact-index.json"
+
+_SCHEMA_VERSION = 1
+_HASH_CHUNK = 1024 * 1024
+
+
+@dataclass
+class ArtifactSet:
+    """Which files in the volume count as build artifacts."""
+
+    dirs: tuple = DEFAULT_DIRS
+    extensions: tuple = DEFAULT_EXTENSIONS
+    globs: tuple = ()
+
+
+@dataclass
+class SyncBackStats:
+    """What one sync-back did."""
+
+    files: int = 0
+    bytes_received: int = 0
+    elapsed_s: float = 0.0
+    updated: list = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} artifacts updated, {self.bytes_received / 1024 / 1024:.1f} MB received "
+            f"in {self.elapsed_s:.2f}s"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Host side
+# ---------------------------------------------------------------------------
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_index(workspace: Path) -> dict:
+    try:
+        data = json.loads((Path(workspace) / INDEX_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if data.get("version") == _SCHEMA_VERSION else {}
+
+
+def _save_index(workspace: Path, entries: dict):
+    path = Path(workspace) / INDEX_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": _SCHEMA_VERSION, "files": entries}, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def host_hashes(dst: Path, previous: dict) -> dict:
+    """Return ``{rel: [size, mtime_ns, sha256]}`` for files under *dst*.
+
+    Entries of *previous* whose size and mtime still match are reused.
+    """
+    entries = {}
+    for dirpath, _dirs, files in os.walk(dst):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, dst).replace(os.sep, "/")
+            try:
+                st = os.stat(path)
+                old = previous.get(rel)
+                if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                    entries[rel] = old
+                else:
+                    entries[rel] = [st.st_size, st.st_mtime_ns, sha256_file(path)]
+            except OSError:
+                continue
+    return entries
+
+
+def manifest(entries: dict) -> bytes:
+    """Return *entries* in ``sha256sum`` output format."""
+    return "".join(f"{e[2]}  {rel}\n" for rel, e in sorted(entries.items())).encode("utf-8", "surrogateescape")
+
+
+def _safe_target(dst: Path, name: str) -> Path:
+    rel = Path(name)
+    if rel.is_absolute() or ".." in rel.parts or not rel.parts:
+        raise ValueError(f"refusing artifact path outside the destination: {name!r}")
+    return dst / rel
+
+
+def _receive(tar: tarfile.TarFile, dst: Path, entries: dict, stats: SyncBackStats):
+    """Write each regular member of *tar* atomically under *dst*."""
+    for member in tar:
+        if not member.isfile():
+            continue
+        target = _safe_target(dst, member.name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.west-env-tmp")
+        h = hashlib.sha256()
+        try:
+            with tar.extractfile(member) as src, open(tmp, "wb") as out:
+                while True:
+                    chunk = src.read(_HASH_CHUNK)
+                    if not chunk:
+                        break
+                    h.update(chunk)
+                    out.write(chunk)
+            os.chmod(tmp, member.mode & 0o777 or 0o644)
+            os.utime(tmp, ns=(int(member.mtime * 1e9),) * 2)
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        st = target.stat()
+        entries[member.name] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        stats.files += 1
+        stats.bytes_received += member.size
+        stats.updated.append(member.name)
+
+
+def _receive_stream(fileobj, dst: Path, entries: dict, stats: SyncBackStats):
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        _receive(tar, dst, entries, stats)
+
+
+# ---------------------------------------------------------------------------
+# Container side
+# ---------------------------------------------------------------------------
+
+
+def select_cmd(artifacts: ArtifactSet) -> str:
+    """Shell script: read the host manifest on stdin, tar changed artifacts to stdout."""
+    tests = [f"-name {shlex.quote('*' + ext)}" for ext in artifacts.extensions]
+    tests += [f"-path {shlex.quote(g.lstrip('/'))}" for g in artifacts.globs]
+    if not tests or not artifacts.dirs:
+        return "cat > /dev/null"
+    dirs = " ".join(shlex.quote(d.strip("/") or ".") for d in artifacts.dirs)
+    return (
+        "cd /work || exit 1; cat > /tmp/have; set --; "
+        f'for d in {dirs}; do [ -d "$d" ] && set -- "$@" "$d"; done; '
+        '[ "$#" -gt 0 ] || exit 0; '
+        f'find "$@" -type f \\( {" -o ".join(tests)} \\) -exec sha256sum {{}} + > /tmp/now || exit 1; '
+        "if [ -s /tmp/have ]; then grep -vxFf /tmp/have /tmp/now; else cat /tmp/now; fi | cut -c67- > /tmp/send; "
+        "[ -s /tmp/send ] || exit 0; tar -cf - -T /tmp/send"
+    )
+
+
+def sync_back(
+    engine: str,
+    volume: str,
+    workspace: Path,
+    dst: Path,
+    artifacts: Optional[ArtifactSet] = None,
+    image: str = "alpine",
+    agent=None,
+) -> SyncBackStats:
+    """Stream artifacts in *volume* that differ from those under *dst*.
+
+    *agent* is an optional west_env.syncagent.SyncAgent with *volume* at its
+    root; without one a helper container in *image* does the selection.
+    """
+    start = time.perf_counter()
+    artifacts = artifacts or ArtifactSet()
+    dst = Path(dst)
+    dst.mkdir(parents=True, exist_ok=True)
+    entries = host_hashes(dst, _load_index(workspace))
+    stats = SyncBackStats()
+
+    if agent is not None:
+        remote = agent.hash(
+            [d.strip("/") or "." for d in artifacts.dirs],
+            names=["*" + ext for ext in artifacts.extensions],
+            paths=[g.lstrip("/") for g in artifacts.globs],
+        )
+        wanted = sorted(rel for rel, digest in remote.items() if rel not in entries or entries[rel][2] != digest)
+        if wanted:
+            agent.get(wanted, lambda f: _receive_stream(f, dst, entries, stats))
+        _save_index(workspace, entries)
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    proc = subprocess.Popen(
+        [engine, "run", "--rm", "-i", "-v", f"{volume}:/work", image, "sh", "-c", select_cmd(artifacts)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        # The script reads the whole manifest before it writes anything.
+        proc.stdin.write(manifest(entries))
+        proc.stdin.close()
+        if proc.stdout.peek(1):
+            _receive_stream(proc.stdout, dst, entries, stats)
+    finally:
+        proc.stdout.close()
+        rc = proc.wait()
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, proc.args)
+
+    _save_index(workspace, entries)
+    stats.elapsed_s = time.perf_counter() - start
+    return stats
@@ -0,0 +1,730 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Host-side file index for incremental workspace sync.
+
+``west env sync`` used to tar the entire workspace into the volume on every
+run and never removed files deleted on the host.  The index records, for
+every synced file, its relative path, size, mtime_ns, mode and content hash:
+
+  <workspace>/.west/west-env-sync-index.json
+
+Each sync stats the tree (a west_env.ignore walk, ignored directories
+pruned), compares with the index and classifies files as added, modified or
+deleted.  Files whose size/mtime/mode are unchanged keep their recorded hash
+without being read; changed ones are re-hashed, so a ``touch`` alone does
+not resend a file.  Large hash workloads are spread over a process pool.
+
+Only added and modified files are streamed (a Python tar stream on the
+container's stdin, optionally compressed -- see west_env.compress),
+followed by a NUL-separated delete list that the container applies after
+extraction.  When nothing changed no container is started at all.  The
+index is bound to the volume's creation time, so a removed or recreated
+volume triggers a full sync.  Every transferring sync appends its files,
+bytes, seconds and MB/s to ``.west/west-env-sync-stats.json``, which
+west_env.syncplan uses to project transfer times.
+
+Given the workspace's west projects, the stat walk can be replaced inside
+git projects by asking git what changed (west_env.gitscan); the per-project
+HEAD and dirty paths are kept in the index under ``git``.
+
+Without an agent the stream goes to a helper container, either on its
+stdin (``run -i ... tar -x``) or, with the ``cp`` transport, as one archive
+copied into a created but unstarted container (``cp -`` or the Engine API's
+archive endpoint), which is only started when there are deletions to
+apply.  ``cp`` is the default on Windows and with the Engine API driver.
+
+Large uploads are split along project boundaries into up to ``streams``
+groups, sent concurrently (one helper container or agent each) into the
+same volume; each group carries its own delete list.  The sync fails, and
+the index is left untouched, if any stream fails.
+
+With the shared module store (west_env.modstore), clean west projects are
+linked to store entries before the upload and left out of the comparison;
+the links are recorded in the index under ``store``.
+"""
+
+import functools
+import hashlib
+import io
+import json
+import os
+import stat
+import subprocess
+import sys
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from west_env import compress, delta, gitscan, ignore, modstore, syncagent
+
+INDEX_PATH = Path(".west") / "west-env-sync-index.json"
+STATS_PATH = Path(".west") / "west-env-sync-stats.json"
+STATS_HISTORY = 50  # sync records kept
+DELETE_LIST = ".west-env-sync-delete"
+# Written into the volume by every transferring sync: which workspace (and
+# which set of index entries) the volume's contents belong to.  It lives in
+# the excluded .west/ directory, out of sight of builds and sync --back.
+OWNER_FILE = ".west/west-env-owner"
+
+# Hash in a process pool only when it pays for the pool start-up.
+POOL_MIN_FILES = 256
+POOL_MIN_BYTES = 64 * 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+
+TRANSPORTS = ("auto", "run", "cp")
+
+# Concurrent upload streams, used only when the upload is at least this large.
+DEFAULT_STREAMS = 4
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+_SCHEMA_VERSION = 1
+
+
+@dataclass
+class SyncChanges:
+    """Result of comparing the workspace with the index."""
+
+    added: list = field(default_factory=list)
+    modified: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    entries: dict = field(default_factory=dict)  # new index entries
+    scanned: int = 0
+    owner: bytes = b""  # OWNER_FILE contents sent with the stream
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+    @property
+    def upload(self) -> list:
+        return sorted(self.added + self.modified)
+
+    def upload_bytes(self) -> int:
+        return sum(self.entries[rel][0] for rel in self.added + self.modified)
+
+
+@dataclass
+class SyncStats:
+    """What one incremental sync did."""
+
+    scanned: int = 0
+    added: int = 0
+    modified: int = 0
+    deleted: int = 0
+    bytes_sent: int = 0  # file bytes uploaded
+    full: bool = False
+    elapsed_s: float = 0.0
+    wire_bytes: int = 0  # stream bytes after compression
+    compression: str = ""  # e.g. "gzip level 1 (auto)"
+    throughput_bps: float = 0.0  # uncompressed stream bytes per second
+    delta_files: int = 0  # modified files sent as block deltas
+    delta_saved: int = 0  # file bytes the deltas did not have to send
+    git_projects: int = 0  # projects enumerated through git instead of a walk
+    streams: int = 1  # concurrent upload streams
+    store_projects: int = 0  # projects linked to the shared module store
+    store_bytes: int = 0  # file bytes added to the module store
+
+    def summary(self) -> str:
+        kind = "full" if self.full else "incremental"
+        text = (
+            f"{kind}: {self.scanned} files scanned, {self.added} added, {self.modified} modified, "
+            f"{self.deleted} deleted, {self.bytes_sent / 1024 / 1024:.1f} MB sent in {self.elapsed_s:.2f}s"
+        )
+        if self.compression:
+            ratio = self.wire_bytes / self.bytes_sent if self.bytes_sent else 1.0
+            text += (
+                f" ({self.compression}: {self.wire_bytes / 1024 / 1024:.1f} MB on the wire, "
+                f"ratio {ratio:.2f}, {self.throughput_bps / 1024 / 1024:.1f} MB/s)"
+            )
+        if self.streams > 1:
+            text += f" ({self.streams} streams)"
+        if self.git_projects:
+            text += f" (git: {self.git_projects} projects)"
+        if self.delta_files:
+            text += f" (delta: {self.delta_files} files, {self.delta_saved / 1024 / 1024:.1f} MB saved)"
+        if self.store_projects:
+            text += f" (module store: {self.store_projects} projects, {self.store_bytes / 1024 / 1024:.1f} MB added)"
+        return text
+
+
+# ---------------------------------------------------------------------------
+# Scanning and hashing
+# ---------------------------------------------------------------------------
+
+
+def scan(root: Path, excludes) -> dict:
+    """Return ``{relpath: (size, mtime_ns, mode)}`` for files under *root*.
+
+    *excludes* is a pattern list or an ``ignore.IgnoreMatcher``; ignored
+    directories are not descended into.
+    """
+    result = {}
+    for rel, _path, st in ignore.walk(root, excludes):
+        if stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode):
+            result[rel] = (st.st_size, st.st_mtime_ns, st.st_mode)
+    return result
+
+
+def hash_file(path: str) -> str:
+    """Return the content hash of *path* (the link target for symlinks)."""
+    h = hashlib.blake2b(digest_size=16)
+    if os.path.islink(path):
+        h.update(os.readlink(path).encode("utf-8", "surrogateescape"))
+        return h.hexdigest()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _hash_chunk(root: str, rels: list) -> list:
+    out = []
+    for rel in rels:
+        try:
+            out.append((rel, hash_file(os.path.join(root, rel))))
+        except OSError:
+            out.append((rel, None))
+    return out
+
+
+def hash_files(root: Path, rels: list, total_bytes: int = 0, workers: Optional[int] = None) -> dict:
+    """Hash *rels* under *root*, in a process pool for large workloads."""
+    root = str(root)
+    if len(rels) < POOL_MIN_FILES and total_bytes < POOL_MIN_BYTES:
+        return dict(_hash_chunk(root, rels))
+    workers = workers or min(8, os.cpu_count() or 1)
+    size = max(16, len(rels) // (workers * 4) or 1)
+    chunks = [rels[i : i + size] for i in range(0, len(rels), size)]
+    result = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_hash_chunk, [root] * len(chunks), chunks):
+            result.update(part)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+def load_index(workspace: Path) -> dict:
+    try:
+        data = json.loads((Path(workspace) / INDEX_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == _SCHEMA_VERSION else {}
+
+
+def save_index(
+    workspace: Path,
+    volume: str,
+    volume_id: Optional[str],
+    entries: dict,
+    git: Optional[dict] = None,
+    store: Optional[dict] = None,
+):
+    path = Path(workspace) / INDEX_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"version": _SCHEMA_VERSION, "volume": volume, "volume_id": volume_id, "files": entries}
+    if git:
+        data["git"] = git
+    if store:
+        data["store"] = store
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_stats(workspace: Path) -> list:
+    """Return the recorded syncs, oldest first (see record_stats())."""
+    try:
+        data = json.loads((Path(workspace) / STATS_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return data.get("syncs", []) if isinstance(data, dict) else []
+
+
+def record_stats(workspace: Path, stats: SyncStats):
+    """Append *stats* to the workspace's sync statistics (last STATS_HISTORY kept)."""
+    record = {
+        "time": int(time.time()),
+        "full": stats.full,
+        "files": stats.added + stats.modified,
+        "deleted": stats.deleted,
+        "bytes": stats.bytes_sent,
+        "wire_bytes": stats.wire_bytes or stats.bytes_sent,
+        "seconds": round(stats.elapsed_s, 3),
+        "mb_per_s": round(stats.throughput_bps / 1024 / 1024, 2),
+        "streams": stats.streams,
+        "compression": stats.compression,
+    }
+    path = Path(workspace) / STATS_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    syncs = (load_stats(workspace) + [record])[-STATS_HISTORY:]
+    tmp.write_text(json.dumps({"version": _SCHEMA_VERSION, "syncs": syncs}, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def previous_state(root: Path, engine: str, volume: str, full: bool = False) -> tuple:
+    """Return ``(files, git, store, full, volume_id)`` from the index for *volume*.
+
+    The index is ignored (and *full* forced) when it belongs to another or a
+    recreated volume.  *store* is the west_env.modstore state.
+    """
+    index = load_index(root)
+    vid = volume_id(engine, volume)
+    if full or vid is None or index.get("volume") != volume or index.get("volume_id") != vid:
+        return {}, {}, {}, True, vid
+    return index.get("files", {}), index.get("git", {}), index.get("store", {}), False, vid
+
+
+def compute_changes(root: Path, excludes, previous: dict, current: Optional[dict] = None) -> SyncChanges:
+    """Compare the tree under *root* with *previous* index entries.
+
+    *current* is a precomputed scan() result (e.g. from west_env.gitscan).
+    """
+    if current is None:
+        current = scan(root, excludes)
+    changes = SyncChanges(scanned=len(current))
+    to_hash, to_hash_bytes = [], 0
+    for rel, (size, mtime_ns, mode) in current.items():
+        old = previous.get(rel)
+        if old and old[0] == size and old[1] == mtime_ns and old[2] == mode:
+            changes.entries[rel] = old
+        else:
+            to_hash.append(rel)
+            to_hash_bytes += size
+
+    hashes = hash_files(root, to_hash, to_hash_bytes)
+    for rel in to_hash:
+        size, mtime_ns, mode = current[rel]
+        digest = hashes.get(rel)
+        if digest is None:
+            continue  # vanished or unreadable while scanning
+        old = previous.get(rel)
+        changes.entries[rel] = [size, mtime_ns, mode, digest]
+        if old is None:
+            changes.added.append(rel)
+        elif old[3] != digest or old[2] != mode:
+            changes.modified.append(rel)
+
+    changes.deleted = sorted(set(previous) - set(changes.entries))
+    return changes
+
+
+# ---------------------------------------------------------------------------
+# Transfer
+# ---------------------------------------------------------------------------
+
+
+def _apply_cmd(codec: str = "none") -> str:
+    """Decode and extract the stream, then apply the delete list (its last member)."""
+    return (
+        f"{compress.decoder_command(codec)}tar -xf - -C /work && cd /work && "
+        f"if [ -f {DELETE_LIST} ]; then xargs -0 rm -rf -- < {DELETE_LIST}; rm -f {DELETE_LIST}; fi"
+    )
+
+
+def write_stream(fileobj, root: Path, upload: list, deleted: list, owner: bytes = b""):
+    """Write a tar stream of *upload* plus the delete list to *fileobj*.
+
+    A ``compress.CompressedWriter`` is told about each member so it can
+    store precompressed files.  A non-empty *owner* is written as OWNER_FILE.
+    """
+    hint = getattr(fileobj, "member", None)
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for rel in upload:
+            path = os.path.join(root, rel)
+            try:
+                if hint is not None:
+                    hint(path, os.lstat(path).st_size)
+                tar.add(path, arcname=rel, recursive=False)
+            except OSError:
+                pass  # vanished since the scan; picked up next sync
+        if owner:
+            info = tarfile.TarInfo(OWNER_FILE)
+            info.size = len(owner)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(owner))
+        if deleted:
+            data = b"\0".join(rel.encode("utf-8", "surrogateescape") for rel in deleted)
+            info = tarfile.TarInfo(DELETE_LIST)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+
+
+def workspace_id(root: Path) -> str:
+    """Return a short, stable hash of the resolved workspace path."""
+    path = os.path.normcase(str(Path(root).resolve()))
+    return hashlib.sha256(path.encode("utf-8", "surrogateescape")).hexdigest()[:12]
+
+
+def entries_hash(entries: dict) -> str:
+    """Return a short hash of index *entries* (what the volume should hold)."""
+    data = json.dumps(entries, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8", "surrogateescape"), digest_size=8).hexdigest()
+
+
+def owner_marker(root: Path, entries: dict) -> bytes:
+    """Return the OWNER_FILE contents for syncing *entries* of *root*."""
+    return json.dumps({"workspace": workspace_id(root), "files": entries_hash(entries)}).encode("utf-8")
+
+
+def read_owner(engine: str, volume: str, image: str = "alpine") -> Optional[dict]:
+    """Return *volume*'s OWNER_FILE contents, or None if it has none."""
+    try:
+        out = subprocess.check_output(
+            [engine, "run", "--rm", "-v", f"{volume}:/work", image, "sh", "-c", f"cat /work/{OWNER_FILE}"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        data = json.loads(out)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def volume_files(engine: str, volume: str, image: str = "alpine") -> list:
+    """Return the files and symlinks in *volume*, relative to its root."""
+    out = subprocess.check_output(
+        [
+            engine,
+            "run",
+            "--rm",
+            "-v",
+            f"{volume}:/work",
+            image,
+            "sh",
+            "-c",
+            "cd /work && find . \\( -type f -o -type l \\) -print0",
+        ],
+    )
+    rels = (p.decode("utf-8", "surrogateescape") for p in out.split(b"\0") if p)
+    return sorted(p[2:] if p.startswith("./") else p for p in rels)
+
+
+def stale_files(listed, excludes, entries: dict, shared=()) -> list:
+    """Return the *listed* volume files that a full sync of *entries* must delete.
+
+    Without a matching index the volume may hold files of an earlier
+    workspace state.  Excluded paths (build output) and *shared* module
+    store links are kept.
+    """
+    matcher = ignore.as_matcher(excludes)
+    return sorted(
+        rel
+        for rel in listed
+        if rel not in entries
+        and rel != OWNER_FILE
+        and not modstore.is_shared(rel, shared)
+        and not matcher.is_ignored(rel)
+    )
+
+
+def volume_id(engine: str, volume: str) -> Optional[str]:
+    """Return an identity for *volume* (its creation time), or None if absent."""
+    try:
+        out = subprocess.check_output(
+            [engine, "volume", "inspect", "-f", "{{.CreatedAt}}", volume],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        return out.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def apply_changes(
+    engine: str,
+    volume: str,
+    root: Path,
+    changes: SyncChanges,
+    image: str = "alpine",
+    codec: str = "none",
+    auto: bool = False,
+) -> compress.CompressedWriter:
+    """Stream *changes* into *volume* through a temporary container.
+
+    Returns the stream writer, which carries the compression statistics.
+    """
+    proc = subprocess.Popen(
+        [engine, "run", "--rm", "-i", "-v", f"{volume}:/work", image, "sh", "-c", _apply_cmd(codec)],
+        stdin=subprocess.PIPE,
+    )
+    writer = compress.CompressedWriter(proc.stdin, codec, auto=auto)
+    try:
+        write_stream(writer, root, changes.upload, changes.deleted, changes.owner)
+        writer.close()
+    finally:
+        proc.stdin.close()
+        rc = proc.wait()
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, proc.args)
+    return writer
+
+
+def _delete_cmd() -> str:
+    return f"cd /work && if [ -f {DELETE_LIST} ]; then xargs -0 rm -rf -- < {DELETE_LIST}; rm -f {DELETE_LIST}; fi"
+
+
+def archive_codecs(engine: str) -> tuple:
+    """Codecs an engine's archive upload accepts (docker decompresses gzip and xz)."""
+    return ("none",) if "podman" in Path(engine).name else ("none", "gzip", "lzma")
+
+
+def copy_changes(
+    engine: str,
+    volume: str,
+    root: Path,
+    changes: SyncChanges,
+    image: str = "alpine",
+    codec: str = "none",
+    auto: bool = False,
+    client=None,
+) -> compress.CompressedWriter:
+    """Copy *changes* into *volume* as a single archive; return the stream writer.
+
+    The archive is extracted into a created helper container with the volume
+    at /work -- by ``cp -``, or by *client* (a west_env.engineapi.EngineClient)
+    through the archive endpoint.  The container runs only to apply the
+    delete list.
+    """
+    cmd = ["sh", "-c", _delete_cmd()]
+    if client is not None:
+        config = {"Image": image, "Cmd": cmd, "HostConfig": {"Binds": [f"{volume}:/work"]}}
+        cid = client.container_create(config, pull="missing")
+    else:
+        cid = subprocess.check_output([engine, "create", "-v", f"{volume}:/work", image, *cmd], text=True).strip()
+
+    def fill(fileobj):
+        writer = compress.CompressedWriter(fileobj, codec, auto=auto)
+        write_stream(writer, root, changes.upload, changes.deleted, changes.owner)
+        writer.close()
+        return writer
+
+    try:
+        if client is not None:
+            writer = client.put_archive(cid, "/work", fill)
+        else:
+            proc = subprocess.Popen([engine, "cp", "-", f"{cid}:/work"], stdin=subprocess.PIPE)
+            try:
+                writer = fill(proc.stdin)
+            finally:
+                proc.stdin.close()
+                rc = proc.wait()
+            if rc != 0:
+                raise subprocess.CalledProcessError(rc, proc.args)
+        if changes.deleted:
+            if client is not None:
+                client.container_start(cid)
+                rc = client.container_wait(cid)
+            else:
+                rc = subprocess.call([engine, "start", "-a", cid], stdout=subprocess.DEVNULL)
+            if rc != 0:
+                raise subprocess.CalledProcessError(rc, cmd)
+    finally:
+        if client is not None:
+            client.container_remove(cid, force=True)
+        else:
+            subprocess.run([engine, "rm", "-f", cid], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return writer
+
+
+def _send_deltas(remote, root: Path, changes: SyncChanges, min_size: int, codec: str, stats: SyncStats) -> set:
+    """Send large modified files as block deltas; return the ones sent."""
+    sent = set()
+    for rel in changes.modified:
+        entry = changes.entries[rel]
+        if entry[0] < min_size or not stat.S_ISREG(entry[2]):
+            continue
+        try:
+            result = delta.send(remote, str(root), rel, entry, codec)
+        except (OSError, ValueError, syncagent.AgentError):
+            result = None  # changed again, or no usable copy: send it whole
+        if result is None:
+            continue
+        sent.add(rel)
+        stats.delta_files += 1
+        stats.delta_saved += result.saved
+        stats.bytes_sent -= result.saved
+        stats.wire_bytes += result.wire_bytes
+    return sent
+
+
+def partition(changes: SyncChanges, projects, streams: int) -> list:
+    """Split *changes* into at most *streams* SyncChanges along *projects*.
+
+    Files outside every project form one more group.  Groups are balanced
+    by upload bytes (largest first); a project never spans two groups, so
+    a deletion and an upload of the same subtree stay in one stream.
+    """
+    roots = sorted(projects or (), key=len, reverse=True)  # nested projects first
+
+    def owner(rel):
+        return next((p for p in roots if rel.startswith(p + "/")), "")
+
+    groups: dict = {}
+    for kind in ("added", "modified", "deleted"):
+        for rel in getattr(changes, kind):
+            getattr(groups.setdefault(owner(rel), SyncChanges(entries=changes.entries)), kind).append(rel)
+    if len(groups) <= 1 or streams <= 1:
+        return [changes]
+    buckets = [SyncChanges(entries=changes.entries) for _ in range(min(streams, len(groups)))]
+    for group in sorted(groups.values(), key=SyncChanges.upload_bytes, reverse=True):
+        bucket = min(buckets, key=SyncChanges.upload_bytes)
+        bucket.added += group.added
+        bucket.modified += group.modified
+        bucket.deleted += group.deleted
+    return [b for b in buckets if b.changed]
+
+
+def _send_parallel(send, groups: list) -> list:
+    """Run ``send(i, group)`` for every group concurrently; return the writers.
+
+    Every stream runs to completion; the first failure is then raised.
+    """
+    if len(groups) == 1:
+        return [send(0, groups[0])]
+    with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+        futures = [pool.submit(send, i, group) for i, group in enumerate(groups)]
+    errors = [f.exception() for f in futures if f.exception() is not None]
+    if errors:
+        raise errors[0]
+    return [f.result() for f in futures]
+
+
+def sync(
+    engine: str,
+    volume: str,
+    root: Path,
+    excludes,
+    full: bool = False,
+    compression: str = "none",
+    backend: str = "",
+    image: str = "alpine",
+    agent=None,
+    delta_min_size: int = delta.DELTA_MIN_BYTES,
+    projects: Optional[list] = None,
+    git_enumeration: bool = False,
+    streams: int = 1,
+    transport: str = "run",
+    client=None,
+    module_store: bool = False,
+) -> SyncStats:
+    """Incrementally sync *root* into *volume*; return what was done.
+
+    *compression* is a ``compress.MODES`` value; *backend* lets ``auto``
+    skip compression for native engines.  *agent* is a callable returning a
+    west_env.syncagent.SyncAgent for *volume* (or None for a helper
+    container); it is only called when there is something to send.  With
+    an agent, modified files of at least *delta_min_size* bytes (0: never)
+    are sent as block deltas (see west_env.delta).  *projects* are the
+    workspace-relative west project paths: uploads of at least
+    PARALLEL_MIN_BYTES are split along them into up to *streams* concurrent
+    streams, and with *git_enumeration* their changes are asked from git.
+    Without an agent, *transport* (``TRANSPORTS``) picks the helper
+    container path; *client* is an optional engineapi.EngineClient for it.
+    With *module_store*, clean west projects are linked to the shared
+    module store instead of being copied (see west_env.modstore).
+    """
+    start = time.perf_counter()
+    root = Path(root).resolve()
+    previous, previous_git, previous_store, full, vid = previous_state(root, engine, volume, full)
+
+    store, store_bytes = {}, 0
+    if projects and module_store:
+        store, store_bytes = modstore.update(engine, volume, root, excludes, projects, previous_store, image)
+    elif previous_store.get("projects"):
+        modstore.relink(engine, volume, previous_store["projects"], {}, image)  # store turned off
+    shared = store.get("projects", {})
+    if shared:
+        excludes = modstore.exclude(excludes, shared)
+        projects = [p for p in projects if p not in shared]
+
+    git_state, git_projects = {}, 0
+    if projects and git_enumeration:
+        current, git_state, scanned, git_projects = gitscan.enumerate_files(
+            root, excludes, projects, previous, previous_git
+        )
+        changes = compute_changes(root, excludes, previous, current)
+        changes.scanned = scanned
+    else:
+        changes = compute_changes(root, excludes, previous)
+    if shared:
+        # Files of newly shared projects went with their directory.
+        changes.deleted = [rel for rel in changes.deleted if not modstore.is_shared(rel, shared)]
+    stats = SyncStats(
+        scanned=changes.scanned,
+        added=len(changes.added),
+        modified=len(changes.modified),
+        deleted=len(changes.deleted),
+        bytes_sent=changes.upload_bytes(),
+        full=full,
+        git_projects=git_projects,
+        store_projects=len(shared),
+        store_bytes=store_bytes,
+    )
+    if changes.changed or full:
+        remote = agent() if agent is not None else None
+        if full and vid is not None:
+            # No index for what the volume holds: delete what the tree lacks.
+            listed = remote.files() if remote is not None else volume_files(engine, volume, image)
+            changes.deleted = stale_files(listed, excludes, changes.entries, shared)
+            stats.deleted = len(changes.deleted)
+        if remote is not None:
+            codec, auto = compress.resolve(compression, engine, image, backend, decoders=remote.codecs)
+            if delta_min_size:
+                sent = _send_deltas(remote, root, changes, delta_min_size, codec, stats)
+                changes.modified = [rel for rel in changes.modified if rel not in sent]
+        elif transport == "cp" or (transport == "auto" and (client is not None or sys.platform == "win32")):
+            decoders = archive_codecs(engine)
+            codec, auto = compress.resolve(compression, engine, image, backend, decoders=decoders)
+            if codec not in decoders:
+                codec, auto = "none", False
+            apply = functools.partial(copy_changes, client=client)
+        else:
+            codec, auto = compress.resolve(compression, engine, image, backend)
+            apply = apply_changes
+        groups = [changes]
+        if streams > 1 and changes.upload_bytes() >= PARALLEL_MIN_BYTES:
+            groups = partition(changes, projects, streams)
+        groups[0].owner = owner_marker(root, changes.entries)
+        stats.streams = len(groups)
+
+        if remote is not None:
+            agents = remote.workers(len(groups))
+
+            def send(i, group):
+                return agents[i].put(
+                    lambda f: write_stream(f, root, group.upload, group.deleted, group.owner), codec, auto
+                )
+        else:
+
+            def send(i, group):
+                return apply(engine, volume, root, group, image, codec=codec, auto=auto)
+
+        started = time.perf_counter()
+        writers = _send_parallel(send, groups)
+        vid = vid or volume_id(engine, volume)
+        save_index(root, volume, vid, changes.entries, git_state, store)
+        if codec != "none":
+            stats.compression = writers[0].describe()
+            stats.wire_bytes += sum(w.wire_bytes for w in writers)
+        elapsed = time.perf_counter() - started
+        raw = sum(w.raw_bytes for w in writers)
+        stats.throughput_bps = raw / elapsed if len(writers) > 1 and elapsed > 0 else writers[0].throughput()
+    elif changes.entries != previous or git_state != previous_git or store != previous_store:
+        vid = vid or volume_id(engine, volume)  # created by the store links
+        save_index(root, volume, vid, changes.entries, git_state, store)  # touched files, new HEADs
+
+    stats.elapsed_s = time.perf_counter() - start
+    if changes.changed or full:
+        record_stats(root, stats)
+    return stats
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Sync planner: what ``west env sync`` would move, and how long it would take.
+
+``west env sync --dry-run`` compares the workspace with the sync index
+exactly as a real sync does (same ignore rules, same index, same hashing of
+stat-changed files) but sends nothing and saves nothing.  It reports the
+files and bytes that would be transferred, deleted and skipped, and a
+projected transfer time from the link throughput measured by previous syncs
+(``.west/west-env-sync-stats.json``, written by west_env.syncindex).
+
+With ``--stats`` (after a dry run or a real sync) it adds a size profile --
+files and bytes per west project and per remaining top-level directory --
+and the largest files, which makes a missing exclude rule (a stray build
+tree, a vendored toolchain) obvious.
+"""
+
+import heapq
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from west_env import modstore, syncindex
+
+LARGEST_FILES = 10
+# Only syncs moving at least this much measure the link, not the latency.
+THROUGHPUT_MIN_BYTES = 1024 * 1024
+
+
+@dataclass
+class SyncPlan:
+    """What a sync would do, without doing it."""
+
+    files: int = 0
+    bytes: int = 0
+    transfer_files: int = 0
+    transfer_bytes: int = 0
+    deleted: int = 0
+    full: bool = False
+    scan_s: float = 0.0
+    throughput_bps: Optional[float] = None  # from previous syncs
+    groups: dict = field(default_factory=dict)  # name -> [files, bytes]
+    largest: list = field(default_factory=list)  # (bytes, rel)
+
+    @property
+    def skipped_files(self) -> int:
+        return self.files - self.transfer_files
+
+    @property
+    def skipped_bytes(self) -> int:
+        return self.bytes - self.transfer_bytes
+
+    @property
+    def projected_s(self) -> Optional[float]:
+        """Scan time plus transfer time at the measured throughput."""
+        if not self.transfer_bytes:
+            return self.scan_s
+        if not self.throughput_bps:
+            return None
+        return self.scan_s + self.transfer_bytes / self.throughput_bps
+
+
+def measured_throughput(workspace: Path) -> Optional[float]:
+    """Median bytes/s of previous syncs that moved enough data, or None."""
+    rates = [
+        s["mb_per_s"] * 1024 * 1024
+        for s in syncindex.load_stats(workspace)
+        if s.get("bytes", 0) >= THROUGHPUT_MIN_BYTES and s.get("mb_per_s")
+    ]
+    return statistics.median(rates) if rates else None
+
+
+def _group(rel: str, projects: list) -> str:
+    for project in projects:
+        if rel.startswith(project + "/"):
+            return project
+    head, sep, _ = rel.partition("/")
+    return head + "/" if sep else "(top level)"
+
+
+def plan(root: Path, excludes, engine: str, volume: str, projects=(), full: bool = False) -> SyncPlan:
+    """Return the SyncPlan for syncing *root* into *volume* (nothing is sent)."""
+    start = time.perf_counter()
+    root = Path(root).resolve()
+    previous, _git, store, full, _vid = syncindex.previous_state(root, engine, volume, full)
+    shared = store.get("projects", {})
+    if shared:
+        # Projects linked to the module store at the last sync are assumed to stay linked.
+        excludes = modstore.exclude(excludes, shared)
+    changes = syncindex.compute_changes(root, excludes, previous)
+    result = SyncPlan(
+        files=len(changes.entries),
+        transfer_files=len(changes.upload),
+        transfer_bytes=changes.upload_bytes(),
+        deleted=len(changes.deleted),
+        full=full,
+        throughput_bps=measured_throughput(root),
+    )
+    projects = sorted(projects or (), key=len, reverse=True)  # nested projects first
+    for rel, entry in changes.entries.items():
+        size = entry[0]
+        result.bytes += size
+        group = result.groups.setdefault(_group(rel, projects), [0, 0])
+        group[0] += 1
+        group[1] += size
+    result.largest = heapq.nlargest(LARGEST_FILES, ((e[0], rel) for rel, e in changes.entries.items()))
+    result.scan_s = time.perf_counter() - start
+    return result
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f} MB"
+
+
+def describe(result: SyncPlan) -> list:
+    """Return human-readable report lines for *result*."""
+    kind = "full" if result.full else "incremental"
+    lines = [
+        f"[INFO] {kind} sync would transfer {result.transfer_files} files ({_mb(result.transfer_bytes)}), "
+        f"delete {result.deleted}, skip {result.skipped_files} unchanged ({_mb(result.skipped_bytes)})",
+        f"       workspace: {result.files} files, {_mb(result.bytes)} after excludes; scanned in {result.scan_s:.2f}s",
+    ]
+    projected = result.projected_s
+    if projected is None:
+        lines.append("       projected time: unknown (no previous sync has measured the link)")
+    else:
+        rate = f" at {result.throughput_bps / 1024 / 1024:.1f} MB/s" if result.transfer_bytes else ""
+        lines.append(f"       projected time: {projected:.1f}s{rate}")
+    return lines
+
+
+def profile(result: SyncPlan) -> list:
+    """Return the size profile and largest-files lines for *result*."""
+    lines = [f"  {'project / directory':40s} {'files':>8} {'size':>11}"]
+    for name, (files, size) in sorted(result.groups.items(), key=lambda kv: kv[1][1], reverse=True):
+        lines.append(f"  {name:40s} {files:>8} {_mb(size):>11}")
+    lines.append("")
+    lines.append("  largest files:")
+    for size, rel in result.largest:
+        lines.append(f"  {_mb(size):>11}  {rel}")
+    return lines
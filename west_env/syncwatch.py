@@ -0,0 +1,353 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Continuous workspace sync driven by file-system events.
+
+``west env sync --watch`` keeps the workspace volume current while you
+edit.  It watches the workspace with inotify on Linux and falls back to
+periodic stat scans elsewhere (macOS, Windows) or when inotify is not
+usable.  Ignored paths (west_env.ignore rules) never trigger a sync.
+
+Bursts of events -- a ``git checkout``, an editor saving many files -- are
+coalesced: after the first event the watcher waits until the tree has been
+quiet for ``sync.debounce`` seconds (at most MAX_DELAY_S) and then pushes one
+batched delta through ``syncindex.sync``.
+
+The daemon publishes its state in::
+
+  <workspace>/.west/west-env-sync-watch.json
+
+``west env build`` reads it and skips its own pre-sync while a live daemon
+reports the volume as current.  "Current" alone could be stale -- an edit
+made just before the build may not have reached the daemon yet -- so the
+daemon also publishes when its watcher last confirmed the tree quiet
+(``checked``, at least every ``heartbeat`` seconds) and when it last saw an
+event; the build trusts the report only once ``checked`` is newer than its
+own start and no event arrived after the last sync began.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from west_env import ignore, syncindex
+from west_env.util import pid_alive
+
+STATUS_PATH = Path(".west") / "west-env-sync-watch.json"
+
+DEBOUNCE_S = 0.3
+MAX_DELAY_S = 5.0  # flush a continuous burst at least this often
+POLL_INTERVAL_S = 2.0
+HEARTBEAT_S = 1.0  # publish a quiet watcher's ``checked`` time this often
+
+# inotify(7)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+# ---------------------------------------------------------------------------
+# Watchers
+# ---------------------------------------------------------------------------
+
+
+class PollWatcher:
+    """Portable watcher: rescans the tree (stat only) every *interval* s."""
+
+    kind = "poll"
+
+    def __init__(self, root: Path, excludes, interval: float = POLL_INTERVAL_S):
+        self.root = Path(root)
+        self.excludes = excludes
+        self.interval = interval
+        self.checked = time.time()  # every change before this has been reported
+        self._snapshot = syncindex.scan(self.root, self.excludes)
+        self._next = time.monotonic() + interval
+
+    def wait(self, timeout: float) -> bool:
+        """Return True if the tree changed, waiting at most *timeout* s."""
+        now = time.monotonic()
+        if self._next > now + timeout:
+            time.sleep(timeout)
+            return False
+        time.sleep(max(0.0, self._next - now))
+        self._next = time.monotonic() + self.interval
+        started = time.time()
+        current = syncindex.scan(self.root, self.excludes)
+        changed = current != self._snapshot
+        self._snapshot = current
+        self.checked = started
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux watcher: one inotify watch per non-excluded directory."""
+
+    kind = "inotify"
+
+    def __init__(self, root: Path, excludes):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._root = str(root)
+        self._matcher = ignore.as_matcher(excludes)
+        self._dirs = {}  # wd -> (directory path, relative path, matcher for its entries)
+        try:
+            self._add_tree(self._root, "", self._matcher)
+        except OSError:
+            self.close()
+            raise
+        self.checked = time.time()  # every change before this has been reported
+
+    def _add_tree(self, top: str, top_rel: str, matcher):
+        stack = [(top, top_rel, matcher)]
+        while stack:
+            path, rel, parent = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            current = parent.enter(rel, path, {e.name for e in entries})
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue  # vanished or unreadable; a parent event still covers it
+            self._dirs[wd] = (path, rel, current)
+            prefix = rel + "/" if rel else ""
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and not current.ignored(prefix + entry.name, True):
+                    stack.append((entry.path, prefix + entry.name, current))
+
+    def _rewatch(self):
+        """Re-add every watch, e.g. after an ignore file changed."""
+        for wd in list(self._dirs):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._dirs.clear()
+        self._add_tree(self._root, "", self._matcher)
+
+    def wait(self, timeout: float) -> bool:
+        """Return True if a relevant event arrived within *timeout* s."""
+        started = time.time()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            self.checked = started  # anything earlier would be queued by now
+            return False
+        try:
+            data = os.read(self._fd, 256 * 1024)
+        except BlockingIOError:
+            return False
+        changed = rules_changed = False
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            raw = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & _IN_Q_OVERFLOW:
+                changed = True  # events were lost; the index scan catches up
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            watched = self._dirs.get(wd)
+            name = os.fsdecode(raw)
+            if watched is None or not name:
+                changed = True
+                continue
+            path, rel, matcher = watched
+            child = f"{rel}/{name}" if rel else name
+            if matcher.ignored(child, bool(mask & _IN_ISDIR)):
+                continue
+            changed = True
+            if name in matcher.ignore_files:
+                rules_changed = True
+            elif mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._add_tree(os.path.join(path, name), child, matcher)
+        if rules_changed:
+            self._rewatch()
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(root: Path, excludes, poll: bool = False, interval: float = POLL_INTERVAL_S):
+    """Return an inotify watcher where possible, else a polling one."""
+    if not poll:
+        try:
+            return InotifyWatcher(root, excludes)
+        except (OSError, AttributeError):
+            pass
+    return PollWatcher(root, excludes, interval)
+
+
+# ---------------------------------------------------------------------------
+# Status file
+# ---------------------------------------------------------------------------
+
+
+def read_status(workspace: Path) -> dict:
+    try:
+        return json.loads((Path(workspace) / STATUS_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_status(workspace: Path, **fields):
+    path = Path(workspace) / STATUS_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = dict(fields, updated=time.time())
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def clear_status(workspace: Path):
+    try:
+        (Path(workspace) / STATUS_PATH).unlink()
+    except OSError:
+        pass
+
+
+def is_current(workspace: Path, engine: str, volume: str) -> bool:
+    """True if a live watch daemon reports *volume* as up to date.
+
+    Waits at most one heartbeat for the watcher to confirm that nothing
+    changed since this call began; no tree walk is needed.
+    """
+    asked = time.time()
+    deadline = None
+    while True:
+        status = read_status(workspace)
+        if not (
+            status.get("state") == "current"
+            and status.get("volume") == volume
+            and status.get("engine") == engine
+            and pid_alive(status.get("pid"))
+        ):
+            return False
+        if (status.get("last_event") or 0) > status.get("scan_started", float("inf")):
+            return False  # seen, not yet synced
+        if status.get("checked", 0) >= asked:
+            return True
+        if deadline is None:
+            deadline = asked + float(status.get("heartbeat", HEARTBEAT_S)) + 0.5
+        if time.time() >= deadline:
+            return False
+        time.sleep(0.05)
+
+
+# ---------------------------------------------------------------------------
+# Daemon loop
+# ---------------------------------------------------------------------------
+
+
+def watch(
+    engine: str,
+    volume: str,
+    root: Path,
+    excludes,
+    debounce: float = DEBOUNCE_S,
+    interval: float = POLL_INTERVAL_S,
+    poll: bool = False,
+    stop: Optional[threading.Event] = None,
+    log=print,
+    **sync_options,
+):
+    """Keep *volume* in sync with *root* until *stop* is set or interrupted.
+
+    *sync_options* (e.g. ``compression``, ``backend``) go to ``syncindex.sync``.
+    """
+    root = Path(root).resolve()
+    excludes = ignore.as_matcher(excludes)
+    stop = stop or threading.Event()
+    watcher = make_watcher(root, excludes, poll=poll, interval=interval)
+    base = {"pid": os.getpid(), "engine": engine, "volume": volume, "watcher": watcher.kind}
+    base["heartbeat"] = max(HEARTBEAT_S, interval if watcher.kind == "poll" else 0)
+    marks = {"last_event": None, "scan_started": None}
+    published = {}
+
+    def publish(state, **extra):
+        write_status(root, state=state, checked=watcher.checked, **marks, **extra, **base)
+        published.update(state=state, checked=watcher.checked, extra=extra)
+
+    def push():
+        publish("syncing")
+        started = time.time()
+        try:
+            stats = syncindex.sync(engine, volume, root, excludes, **sync_options)
+        except Exception as exc:  # noqa: BLE001 - keep watching; retried on next event
+            publish("error", error=str(exc))
+            log(f"[WARN] sync failed: {exc}")
+            return
+        marks["scan_started"] = started
+        publish("current", last_sync=stats.summary())
+        if stats.added or stats.modified or stats.deleted or stats.full:
+            log(f"[OK] {stats.summary()}")
+
+    log(f"Watching {root} ({watcher.kind}); Ctrl-C to stop")
+    try:
+        push()
+        while not stop.is_set():
+            try:
+                if not watcher.wait(timeout=0.5):
+                    if published["state"] == "current" and watcher.checked - published["checked"] >= HEARTBEAT_S:
+                        publish("current", **published["extra"])  # heartbeat
+                    continue
+                marks["last_event"] = time.time()
+                publish("pending")
+                deadline = time.monotonic() + MAX_DELAY_S
+                while time.monotonic() < deadline and watcher.wait(timeout=debounce):
+                    pass
+            except OSError as exc:
+                # e.g. the inotify watch limit was hit by a new subtree
+                watcher.close()
+                watcher = PollWatcher(root, excludes, interval)
+                base.update(watcher=watcher.kind, heartbeat=max(HEARTBEAT_S, interval))
+                log(f"[WARN] {exc}; falling back to polling")
+            push()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        clear_status(root)
@@ -28,6 +28,22 @@ def host_shell_command():
     return ["/bin/sh"]
 
 
+def pid_alive(pid) -> bool:
+    """Return True if a process with *pid* exists."""
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    if sys.platform == "win32":
+        out = subprocess.run(["tasklist", "/FI", f"PID eq {pid}"], capture_output=True, text=True).stdout
+        return str(pid) in out
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
 def check_python():
     version = sys.version_info
     if version < MIN_PYTHON:
@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Named snapshots of the workspace volume (``west env snapshot save|restore``).
+
+The workspace volume holds one state: switching to another release branch
+means a near-full resync and, because ``build/`` lives in the volume too, a
+pristine rebuild.  A volume snapshot keeps a copy of the whole volume --
+sources and build directories -- in a volume of its own:
+
+  <workspace volume>-snap-<name>
+
+together with a copy of the host-side sync index that describes it
+(``.west/west-env-volume-snapshots/<name>.json`` and ``<name>.index.json``).
+Restoring copies the snapshot back into the workspace volume and reinstates
+that index, so the next ``west env sync`` only sends the files that differ
+between the snapshot and the current working tree, and ``west build`` finds
+its previous build directory.
+
+Docker and Podman have no volume clone operation, so the copy runs inside
+the engine, in one helper container that mounts both volumes: ``cp -a
+--reflink=auto`` (copy-on-write on btrfs/XFS storage, a plain in-VM copy
+otherwise) when the image has GNU cp, a ``tar | tar`` pipe when it does
+not.  Nothing crosses the host/VM boundary either way.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+from west_env import syncindex
+
+SNAPSHOT_DIR = Path(".west") / "west-env-volume-snapshots"
+
+_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*$")
+_SRC = "/snapshot-src"
+_DST = "/snapshot-dst"
+
+# Empty the destination, then copy with cp (reflinks where the storage
+# supports them) or fall back to a tar pipe; report which one was used.
+_CLONE_CMD = (
+    f"find {_DST} -mindepth 1 -maxdepth 1 -exec rm -rf {{}} + && "
+    f"if cp -a --reflink=auto {_SRC}/. {_DST}/ 2>/dev/null; then echo cp; else "
+    f"find {_DST} -mindepth 1 -maxdepth 1 -exec rm -rf {{}} + && "
+    f"tar -C {_SRC} -cf - . | tar -C {_DST} -xf - && echo tar; fi"
+)
+
+
+def snapshot_volume(volume: str, name: str) -> str:
+    """Return the volume holding snapshot *name* of *volume*."""
+    if not _NAME.match(name):
+        raise ValueError(f"invalid snapshot name: {name!r} (letters, digits, '_', '.', '-')")
+    return f"{volume}-snap-{name}"
+
+
+def _record_path(workspace: Path, name: str) -> Path:
+    return Path(workspace) / SNAPSHOT_DIR / f"{name}.json"
+
+
+def _index_path(workspace: Path, name: str) -> Path:
+    return Path(workspace) / SNAPSHOT_DIR / f"{name}.index.json"
+
+
+def clone(engine: str, src: str, dst: str, image: str = "alpine") -> str:
+    """Replace the contents of volume *dst* with those of *src*; return the method."""
+    out = subprocess.check_output(
+        [engine, "run", "--rm", "-v", f"{src}:{_SRC}:ro", "-v", f"{dst}:{_DST}", image, "sh", "-c", _CLONE_CMD],
+        text=True,
+    )
+    return out.strip().splitlines()[-1] if out.strip() else "cp"
+
+
+def save(engine: str, workspace: Path, volume: str, name: str, image: str = "alpine") -> dict:
+    """Copy *volume* into snapshot *name* (replacing it); return its record."""
+    target = snapshot_volume(volume, name)
+    vid = syncindex.volume_id(engine, volume)
+    if vid is None:
+        raise RuntimeError(f"workspace volume {volume} does not exist (run: west env sync)")
+    start = time.perf_counter()
+    method = clone(engine, volume, target, image)
+    record = {
+        "name": name,
+        "volume": volume,
+        "snapshot_volume": target,
+        "created": time.time(),
+        "method": method,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    path = _record_path(workspace, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index = syncindex.load_index(workspace)
+    if index.get("volume") == volume and index.get("volume_id") == vid:
+        shutil.copyfile(Path(workspace) / syncindex.INDEX_PATH, _index_path(workspace, name))
+    else:
+        _index_path(workspace, name).unlink(missing_ok=True)
+    path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    return record
+
+
+def load(workspace: Path, name: str) -> Optional[dict]:
+    try:
+        return json.loads(_record_path(workspace, name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def restore(engine: str, workspace: Path, volume: str, name: str, image: str = "alpine") -> dict:
+    """Copy snapshot *name* back into *volume* and reinstate its sync index."""
+    snapshot_volume(volume, name)  # validates the name
+    record = load(workspace, name)
+    if record is None or record.get("volume") != volume:
+        raise RuntimeError(f"no snapshot {name!r} of {volume} (list them with: west env snapshot list)")
+    if syncindex.volume_id(engine, record["snapshot_volume"]) is None:
+        raise RuntimeError(f"snapshot volume {record['snapshot_volume']} no longer exists")
+    start = time.perf_counter()
+    record = dict(record, method=clone(engine, record["snapshot_volume"], volume, image))
+    record["seconds"] = round(time.perf_counter() - start, 2)
+
+    try:
+        index = json.loads(_index_path(workspace, name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        index = {}
+    if index.get("files") is not None:
+        # The volume keeps its identity; the snapshot's index now describes it.
+        syncindex.save_index(
+            workspace,
+            volume,
+            syncindex.volume_id(engine, volume),
+            index["files"],
+            index.get("git"),
+            index.get("store"),
+        )
+    else:
+        (Path(workspace) / syncindex.INDEX_PATH).unlink(missing_ok=True)  # next sync is full
+    return record
+
+
+def delete(engine: str, workspace: Path, volume: str, name: str):
+    """Remove snapshot *name* of *volume* and its volume."""
+    target = snapshot_volume(volume, name)
+    subprocess.call([engine, "volume", "rm", "-f", target], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _record_path(workspace, name).unlink(missing_ok=True)
+    _index_path(workspace, name).unlink(missing_ok=True)
+
+
+def rename_volume(workspace: Path, old: str, new: str):
+    """Re-home *old*'s snapshot records to workspace volume *new* (volume migration)."""
+    for record in list_snapshots(workspace, old):
+        record["volume"] = new
+        _record_path(workspace, record["name"]).write_text(json.dumps(record, indent=2), encoding="utf-8")
+        index = _index_path(workspace, record["name"])
+        try:
+            data = json.loads(index.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        data["volume"] = new
+        index.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+
+def list_snapshots(workspace: Path, volume: str) -> list:
+    """Return the records of *volume*'s snapshots, oldest first."""
+    records = []
+    directory = Path(workspace) / SNAPSHOT_DIR
+    for path in sorted(directory.glob("*.json")) if directory.is_dir() else []:
+        if path.name.endswith(".index.json"):
+            continue
+        record = load(workspace, path.stem)
+        if record and record.get("volume") == volume:
+            records.append(record)
+    return sorted(records, key=lambda r: r.get("created", 0))
+
+
+def describe(records: list) -> list:
+    """Return human-readable lines for snapshot *records*."""
+    if not records:
+        return ["[INFO] no workspace volume snapshots (create one with: west env snapshot save <name>)"]
+    lines = []
+    for record in records:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(record.get("created", 0)))
+        lines.append(f"  {record['name']:24s} {created}  {record['snapshot_volume']}")
+    return lines
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Workspace volume registry and migration from legacy volume names.
+
+Workspace volumes used to be named after the last path component only, so
+``~/a/app`` and ``~/b/app`` shared ``west-env-ws-app`` and every sync of one
+clobbered the other.  They are now named by west_env.sync.
+workspace_volume_name() -- the readable prefix plus a hash of the resolved
+topdir -- and recorded, per user, next to the probe cache:
+
+  <cache dir>/volumes.json   (see west_env.probecache.default_cache_dir)
+
+with the workspace path, engine, last sync time and a hash of the sync
+index each volume was last synced with.  ``sync``, ``cache stats`` and
+``doctor`` read it: cache stats lists every workspace volume on the
+machine, and doctor flags volumes whose workspace has gone.
+
+A workspace still synced into its legacy volume is migrated on the next
+sync, but only when the volume provably holds its files: every transferring
+sync writes ``/work/.west/west-env-owner`` (syncindex.OWNER_FILE) with a hash of
+the workspace path and of the index entries it synced, and both must match
+the workspace's index.  Two workspaces sharing one legacy volume have the
+same volume identity, so the index alone cannot tell which synced last.
+The legacy volume is then copied into the new one inside the engine
+(west_env.volsnap.clone) and the index and volume snapshot records are
+rewritten, so nothing is re-uploaded or rebuilt.  Otherwise the new volume
+starts empty and gets a full sync.  The legacy volume is left in place,
+since another workspace with the same name may still use it.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from west_env import probecache, syncindex
+
+REGISTRY_FILENAME = "volumes.json"
+
+_SCHEMA_VERSION = 1
+
+
+def registry_path() -> Path:
+    return probecache.default_cache_dir() / REGISTRY_FILENAME
+
+
+def load() -> dict:
+    """Return ``{volume: record}`` from the registry."""
+    try:
+        data = json.loads(registry_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _SCHEMA_VERSION:
+        return {}
+    return data.get("volumes", {})
+
+
+def _save(volumes: dict):
+    path = registry_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"version": _SCHEMA_VERSION, "volumes": volumes}, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def index_hash(workspace: Path) -> Optional[str]:
+    """Return a short hash of *workspace*'s sync index, or None without one."""
+    try:
+        data = (Path(workspace) / syncindex.INDEX_PATH).read_bytes()
+    except OSError:
+        return None
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def record(workspace: Path, engine: str, volume: str):
+    """Register *volume* as *workspace*'s volume, synced now."""
+    volumes = load()
+    volumes[volume] = {
+        "workspace": str(Path(workspace).resolve()),
+        "engine": engine,
+        "last_sync": time.time(),
+        "index_hash": index_hash(workspace),
+    }
+    _save(volumes)
+
+
+def migrate(engine: str, workspace: Path, image: str = "alpine") -> Optional[str]:
+    """Move *workspace* from its legacy volume to its current one.
+
+    Returns the legacy volume name when it was migrated, else None (already
+    migrated, no legacy volume, or its owner marker names another workspace
+    or another file set -- then the next sync is simply a full one).
+    """
+    from west_env import volsnap
+    from west_env.sync import legacy_volume_name, workspace_volume_name
+
+    workspace = Path(workspace).resolve()
+    new, legacy = workspace_volume_name(workspace), legacy_volume_name(workspace)
+    index = syncindex.load_index(workspace)
+    if legacy == new or index.get("volume") != legacy:
+        return None
+    legacy_id = syncindex.volume_id(engine, legacy)
+    if legacy_id is None or index.get("volume_id") != legacy_id:
+        return None
+    owner = syncindex.read_owner(engine, legacy, image)
+    expected = json.loads(syncindex.owner_marker(workspace, index.get("files", {})))
+    if owner != expected:
+        return None  # last synced from another workspace, or by an older release
+    volsnap.clone(engine, legacy, new, image)
+    syncindex.save_index(
+        workspace,
+        new,
+        syncindex.volume_id(engine, new),
+        index.get("files", {}),
+        index.get("git"),
+        index.get("store"),
+    )
+    volsnap.rename_volume(workspace, legacy, new)
+    record(workspace, engine, new)
+    return legacy
+
+
+def describe(volumes: Optional[dict] = None) -> list:
+    """Return report lines for the registered workspace volumes."""
+    volumes = load() if volumes is None else volumes
+    if not volumes:
+        return ["west-env workspace volumes: none registered"]
+    lines = ["west-env workspace volumes:"]
+    for name, info in sorted(volumes.items()):
+        synced = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.get("last_sync", 0)))
+        gone = "" if Path(info.get("workspace", "")).is_dir() else "  (workspace gone)"
+        lines.append(f"  {name:40s}  {synced}  {info.get('workspace')}{gone}")
+    return lines
+
+
+def doctor_lines(workspace: Path, engine: str) -> list:
+    """Return doctor lines for *workspace*'s volume and stale registrations."""
+    from west_env.sync import legacy_volume_name, workspace_volume_name
+
+    workspace = Path(workspace).resolve()
+    volume = workspace_volume_name(workspace)
+    volumes = load()
+    info = volumes.get(volume)
+    if info is None:
+        lines = [f"[INFO] workspace volume: {volume} (not synced yet)"]
+    elif info.get("workspace") != str(workspace):
+        lines = [f"[WARN] workspace volume: {volume} is registered to {info.get('workspace')}"]
+    else:
+        synced = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.get("last_sync", 0)))
+        lines = [f"[PASS] workspace volume: {volume} (last sync {synced}, engine {info.get('engine')})"]
+        if info.get("index_hash") != index_hash(workspace):
+            lines.append("       sync index changed since that sync (snapshot restore or manual edit)")
+    legacy = legacy_volume_name(workspace)
+    if legacy != volume and syncindex.volume_id(engine, legacy) is not None:
+        lines.append(f"[INFO] legacy volume {legacy} still exists; remove it once no workspace uses it:")
+        lines.append(f"       {engine} volume rm {legacy}")
+    gone = sorted(n for n, i in volumes.items() if not Path(i.get("workspace", "")).is_dir())
+    for name in gone:
+        lines.append(f"[WARN] volume {name} belongs to a removed workspace ({volumes[name].get('workspace')})")
+    return lines